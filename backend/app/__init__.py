@@ -1,6 +1,11 @@
 """
 ThreatLens application package.
 """
+# Time application imports from the start; main.py reports them once the API is ready
+from .startup import STARTUP_TIMING, startup_timer
+if STARTUP_TIMING:
+    startup_timer.track_imports()
+
 from .models import Base, RawLog, Event, AIAnalysis, Report, MonitoringConfigDB, LogSource, ProcessingMetricsDB, NotificationHistory
 from .database import (
     get_database_session,
@@ -20,7 +25,7 @@ from .validation import (
     validate_log_content, validate_event_timestamp, validate_event_category,
     validate_severity_score, validate_recommendations_list, validate_source_identifier,
     validate_parsed_event, validate_ai_analysis_data, sanitize_log_content,
-    validate_file_upload
+    sanitize_log_content_with_report, validate_file_upload
 )
 
 __all__ = [
@@ -64,5 +69,6 @@ __all__ = [
     "validate_parsed_event",
     "validate_ai_analysis_data",
     "sanitize_log_content",
+    "sanitize_log_content_with_report",
     "validate_file_upload"
 ]
\ No newline at end of file
@@ -13,7 +13,6 @@ from typing import List, Optional, Dict, Any
 from datetime import datetime, timezone
 import re
 
-from groq import Groq
 from pydantic import BaseModel, Field
 
 try:
@@ -24,6 +23,10 @@ except ImportError:
     pass
 
 from app.schemas import ParsedEvent, AIAnalysis, EventCategory
+from app.startup import lazy_import
+
+# The Groq SDK is imported when the first client is created
+Groq = lazy_import("groq", "Groq")
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -0,0 +1,250 @@
+"""
+Async database access layer for ThreatLens.
+
+Provides SQLAlchemy asyncio engines (aiosqlite / asyncpg) so API handlers and
+the realtime writer can query the database without blocking the event loop.
+The synchronous sessions in app.database remain available for scripts.
+"""
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Dict, Any, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from . import database
+from .database import _apply_sqlite_pragmas, _sqlite_database_path, is_postgresql_url, is_sqlite_url
+
+logger = logging.getLogger(__name__)
+
+# Global async engines and session factories
+async_read_engine: Optional[AsyncEngine] = None
+async_write_engine: Optional[AsyncEngine] = None
+AsyncReadSessionLocal: Optional[async_sessionmaker] = None
+AsyncWriteSessionLocal: Optional[async_sessionmaker] = None
+
+
+def to_async_url(database_url: str) -> str:
+    """
+    Convert a synchronous database URL to its asyncio driver equivalent.
+    
+    Args:
+        database_url: SQLAlchemy URL such as sqlite:///... or postgresql://...
+        
+    Returns:
+        URL using the aiosqlite or asyncpg driver
+    """
+    scheme, separator, rest = database_url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    
+    if dialect == "sqlite":
+        return f"sqlite+aiosqlite{separator}{rest}"
+    if dialect in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{separator}{rest}"
+    return database_url
+
+
+def _attach_sqlite_pragmas(engine: AsyncEngine, read_only: bool) -> None:
+    """Apply the connection-scoped SQLite PRAGMAs on every new async connection."""
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        _apply_sqlite_pragmas(dbapi_connection, read_only=read_only)
+
+
+def create_async_read_engine() -> AsyncEngine:
+    """Create the async read-only engine used by API read endpoints."""
+    global async_read_engine
+    
+    if async_read_engine is None:
+        database_path = _sqlite_database_path() if is_sqlite_url() else None
+        
+        if database.DATABASE_READ_URL:
+            async_read_engine = create_async_engine(
+                to_async_url(database.DATABASE_READ_URL),
+                pool_size=database.DB_READ_POOL_SIZE,
+                pool_pre_ping=True
+            )
+        elif database_path is not None:
+            # Readers need an existing WAL database; let the sync writer create it first
+            database.create_database_engine()
+            async_read_engine = create_async_engine(
+                f"sqlite+aiosqlite:///file:{database_path}?mode=ro&uri=true",
+                pool_size=database.DB_READ_POOL_SIZE,
+                max_overflow=database.DB_READ_POOL_SIZE,
+                pool_pre_ping=True
+            )
+            _attach_sqlite_pragmas(async_read_engine, read_only=True)
+        elif is_postgresql_url():
+            async_read_engine = create_async_engine(
+                to_async_url(database.DATABASE_URL),
+                pool_size=database.DB_READ_POOL_SIZE,
+                max_overflow=database.DB_MAX_OVERFLOW,
+                pool_timeout=database.DB_POOL_TIMEOUT,
+                pool_recycle=database.DB_POOL_RECYCLE,
+                pool_pre_ping=True,
+                connect_args={
+                    "server_settings": {
+                        "application_name": "threatlens-async-reader",
+                        "default_transaction_read_only": "on"
+                    }
+                }
+            )
+        else:
+            async_read_engine = create_async_write_engine()
+            
+    return async_read_engine
+
+
+def create_async_write_engine() -> AsyncEngine:
+    """
+    Create the async writer engine used by the realtime ingest path.
+    
+    On SQLite this is a single pooled connection; waiting for it suspends
+    the coroutine instead of blocking the event loop. It takes turns with
+    the sync writers on the SQLite write lock, see
+    app.database.create_write_engine.
+    """
+    global async_write_engine
+    
+    if async_write_engine is None:
+        if is_sqlite_url():
+            database.create_database_engine()
+            async_write_engine = create_async_engine(
+                to_async_url(database.DATABASE_URL),
+                pool_size=1,
+                max_overflow=0,
+                pool_timeout=database.DB_WRITE_TIMEOUT,
+                pool_pre_ping=True
+            )
+            _attach_sqlite_pragmas(async_write_engine, read_only=False)
+        else:
+            async_write_engine = create_async_engine(
+                to_async_url(database.DATABASE_URL),
+                pool_size=database.DB_POOL_SIZE,
+                max_overflow=database.DB_MAX_OVERFLOW,
+                pool_timeout=database.DB_POOL_TIMEOUT,
+                pool_recycle=database.DB_POOL_RECYCLE,
+                pool_pre_ping=True
+            )
+            
+    return async_write_engine
+
+
+def _read_session_factory() -> async_sessionmaker:
+    """Get the async read-only session factory."""
+    global AsyncReadSessionLocal
+    
+    if AsyncReadSessionLocal is None:
+        AsyncReadSessionLocal = async_sessionmaker(
+            bind=create_async_read_engine(), autoflush=False, expire_on_commit=False
+        )
+    return AsyncReadSessionLocal
+
+
+def _write_session_factory() -> async_sessionmaker:
+    """Get the async writer session factory."""
+    global AsyncWriteSessionLocal
+    
+    if AsyncWriteSessionLocal is None:
+        AsyncWriteSessionLocal = async_sessionmaker(
+            bind=create_async_write_engine(), autoflush=False, expire_on_commit=False
+        )
+    return AsyncWriteSessionLocal
+
+
+async def get_async_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function to get an async read-only database session.
+    Used with FastAPI dependency injection for hot read endpoints.
+    """
+    async with _read_session_factory()() as db:
+        yield db
+
+
+@asynccontextmanager
+async def async_read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Async context manager for read-only database sessions."""
+    async with _read_session_factory()() as db:
+        yield db
+
+
+@asynccontextmanager
+async def async_write_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async context manager for sessions on the writer connection.
+    Commits on success and rolls back on error.
+    """
+    async with _write_session_factory()() as db:
+        try:
+            yield db
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+
+
+async def get_database_stats_async() -> Dict[str, Any]:
+    """
+    Get basic database statistics without blocking the event loop.
+    Mirrors app.database.get_database_stats.
+    """
+    stats = {
+        "raw_logs_count": 0,
+        "events_count": 0,
+        "ai_analysis_count": 0,
+        "reports_count": 0,
+        "log_sources_count": 0,
+        "monitoring_configs_count": 0,
+        "processing_metrics_count": 0,
+        "notification_history_count": 0,
+        "error": None
+    }
+    
+    required_tables = {
+        "raw_logs_count": "raw_logs",
+        "events_count": "events",
+        "ai_analysis_count": "ai_analysis",
+        "reports_count": "reports"
+    }
+    optional_tables = {
+        "log_sources_count": "log_sources",
+        "monitoring_configs_count": "monitoring_config",
+        "processing_metrics_count": "processing_metrics",
+        "notification_history_count": "notification_history"
+    }
+    
+    try:
+        async with async_read_session() as db:
+            for key, table in required_tables.items():
+                stats[key] = (await db.execute(text(f"SELECT COUNT(*) FROM {table}"))).scalar()
+                
+            # Real-time monitoring tables might not exist yet
+            for key, table in optional_tables.items():
+                try:
+                    stats[key] = (await db.execute(text(f"SELECT COUNT(*) FROM {table}"))).scalar()
+                except SQLAlchemyError:
+                    stats[key] = 0
+                    
+    except Exception as e:
+        stats["error"] = str(e)
+        logger.error(f"Failed to get database stats: {e}")
+        
+    return stats
+
+
+async def close_async_database_connections() -> None:
+    """
+    Dispose the async engines.
+    Should be called during application shutdown.
+    """
+    global async_read_engine, async_write_engine, AsyncReadSessionLocal, AsyncWriteSessionLocal
+    
+    for engine in {id(e): e for e in (async_read_engine, async_write_engine) if e is not None}.values():
+        await engine.dispose()
+        
+    async_read_engine = None
+    async_write_engine = None
+    AsyncReadSessionLocal = None
+    AsyncWriteSessionLocal = None
+    logger.info("Async database connections closed")
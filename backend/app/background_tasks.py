@@ -13,7 +13,8 @@ from contextlib import contextmanager
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
-from app.database import get_database_session, get_db_session
+from app.database import get_database_session, get_db_session, get_write_session, bulk_insert_events
+from app.metrics import QuantileSketch, RingBuffer, summarize
 from app.models import RawLog, Event, AIAnalysis as AIAnalysisModel
 from app.parser import parse_log_entries, ParsingError
 from app.analyzer import analyze_event, AnalysisError
@@ -41,27 +42,7 @@ class BackgroundTaskManager:
         """
         self.max_retries = max_retries
         self.retry_delay = retry_delay
-        self.stats = {
-            'total_tasks': 0,
-            'successful_tasks': 0,
-            'failed_tasks': 0,
-            'retried_tasks': 0,
-            'processing_times': []
-        }
-        self.realtime_stats = {
-            'websocket_updates_sent': 0,
-            'websocket_update_failures': 0,
-            'last_broadcast_time': None
-        }
-        
-        # Real-time processing extensions
-        self.realtime_stats = {
-            'realtime_entries_processed': 0,
-            'realtime_processing_times': [],
-            'websocket_updates_sent': 0,
-            'websocket_update_failures': 0,
-            'last_realtime_processing': None
-        }
+        self.reset_stats()
         
         # WebSocket manager for real-time updates (optional)
         self.websocket_manager = None
@@ -89,6 +70,7 @@ class BackgroundTaskManager:
                 # Record success
                 processing_time = time.time() - start_time
                 self.stats['processing_times'].append(processing_time)
+                self.processing_time_sketch.add(processing_time)
                 self.stats['successful_tasks'] += 1
                 
                 if attempt > 0:
@@ -255,15 +237,15 @@ class BackgroundTaskManager:
         """
         stats = self.stats.copy()
         
-        # Calculate average processing time
-        if stats['processing_times']:
-            stats['avg_processing_time'] = sum(stats['processing_times']) / len(stats['processing_times'])
-            stats['min_processing_time'] = min(stats['processing_times'])
-            stats['max_processing_time'] = max(stats['processing_times'])
-        else:
-            stats['avg_processing_time'] = 0
-            stats['min_processing_time'] = 0
-            stats['max_processing_time'] = 0
+        # Average, min and max over the recent processing times
+        summary = summarize(stats.pop('processing_times'))
+        stats['avg_processing_time'] = summary['mean']
+        stats['min_processing_time'] = summary['min']
+        stats['max_processing_time'] = summary['max']
+        
+        # Percentiles over every processed task
+        for name, value in self.processing_time_sketch.quantiles().items():
+            stats[f'{name}_processing_time'] = value
         
         # Calculate success rate
         if stats['total_tasks'] > 0:
@@ -283,12 +265,17 @@ class BackgroundTaskManager:
             'successful_tasks': 0,
             'failed_tasks': 0,
             'retried_tasks': 0,
-            'processing_times': []
+            'processing_times': RingBuffer(1000)
         }
+        self.processing_time_sketch = QuantileSketch()
+        
+        # Real-time processing extensions
         self.realtime_stats = {
+            'realtime_entries_processed': 0,
+            'realtime_processing_times': RingBuffer(100),
             'websocket_updates_sent': 0,
             'websocket_update_failures': 0,
-            'last_broadcast_time': None
+            'last_realtime_processing': None
         }
     
     def set_websocket_manager(self, websocket_manager):
@@ -461,67 +448,64 @@ class BackgroundTaskManager:
             # Process and store events
             events_analyzed = 0
             stored_events = []
+            db_rows = []
             
-            try:
-                with get_db_session() as db:
-                    for event in parsed_events:
-                        # Store event in database
-                        db_event = Event(
-                            id=event.id,
-                            raw_log_id=entry_id,
-                            timestamp=event.timestamp,
-                            source=event.source,
-                            message=event.message,
-                            category=event.category.value,
-                            parsed_at=event.parsed_at or datetime.now(timezone.utc)
-                        )
-                        db.add(db_event)
-                        
-                        # Run AI analysis
-                        try:
-                            ai_analysis = analyze_event(event)
-                            
-                            # Store AI analysis
-                            db_analysis = AIAnalysisModel(
-                                id=ai_analysis.id,
-                                event_id=ai_analysis.event_id,
-                                severity_score=ai_analysis.severity_score,
-                                explanation=ai_analysis.explanation,
-                                recommendations=str(ai_analysis.recommendations),
-                                analyzed_at=ai_analysis.analyzed_at or datetime.now(timezone.utc)
-                            )
-                            db.add(db_analysis)
-                            events_analyzed += 1
-                            
-                            # Prepare event data for WebSocket update
-                            stored_events.append({
-                                'id': event.id,
-                                'timestamp': event.timestamp.isoformat(),
-                                'source': event.source,
-                                'category': event.category.value,
-                                'message': event.message[:200] + '...' if len(event.message) > 200 else event.message,
-                                'severity_score': ai_analysis.severity_score,
-                                'explanation': ai_analysis.explanation[:100] + '...' if len(ai_analysis.explanation) > 100 else ai_analysis.explanation
-                            })
-                            
-                        except AnalysisError as e:
-                            logger.warning(f"Failed to analyze event {event.id}: {e}")
-                            # Continue with other events
-                            continue
+            # Run AI analysis before opening the writer session so the single
+            # writer connection is only held for the inserts themselves
+            for event in parsed_events:
+                db_rows.append(Event(
+                    id=event.id,
+                    raw_log_id=entry_id,
+                    timestamp=event.timestamp,
+                    source=event.source,
+                    message=event.message,
+                    category=event.category.value,
+                    parsed_at=event.parsed_at or datetime.now(timezone.utc)
+                ))
+                
+                try:
+                    ai_analysis = analyze_event(event)
                     
-                    # Commit all changes
-                    db.commit()
+                    db_rows.append(AIAnalysisModel(
+                        id=ai_analysis.id,
+                        event_id=ai_analysis.event_id,
+                        severity_score=ai_analysis.severity_score,
+                        explanation=ai_analysis.explanation,
+                        recommendations=str(ai_analysis.recommendations),
+                        analyzed_at=ai_analysis.analyzed_at or datetime.now(timezone.utc)
+                    ))
+                    events_analyzed += 1
                     
-                    # Send analysis complete update
-                    if self.websocket_manager:
-                        await self._send_processing_update({
-                            'type': 'analysis_complete',
-                            'entry_id': entry_id,
-                            'events_analyzed': events_analyzed,
-                            'events': stored_events[:5],  # Send first 5 events
-                            'total_events': len(stored_events),
-                            'timestamp': datetime.now(timezone.utc).isoformat()
-                        })
+                    # Prepare event data for WebSocket update
+                    stored_events.append({
+                        'id': event.id,
+                        'timestamp': event.timestamp.isoformat(),
+                        'source': event.source,
+                        'category': event.category.value,
+                        'message': event.message[:200] + '...' if len(event.message) > 200 else event.message,
+                        'severity_score': ai_analysis.severity_score,
+                        'explanation': ai_analysis.explanation[:100] + '...' if len(ai_analysis.explanation) > 100 else ai_analysis.explanation
+                    })
+                    
+                except AnalysisError as e:
+                    logger.warning(f"Failed to analyze event {event.id}: {e}")
+                    # Continue with other events
+                    continue
+            
+            try:
+                with get_write_session() as db:
+                    db.add_all(db_rows)
+                
+                # Send analysis complete update
+                if self.websocket_manager:
+                    await self._send_processing_update({
+                        'type': 'analysis_complete',
+                        'entry_id': entry_id,
+                        'events_analyzed': events_analyzed,
+                        'events': stored_events[:5],  # Send first 5 events
+                        'total_events': len(stored_events),
+                        'timestamp': datetime.now(timezone.utc).isoformat()
+                    })
                 
             except SQLAlchemyError as e:
                 error_msg = f"Database error processing real-time entry: {str(e)}"
@@ -549,10 +533,6 @@ class BackgroundTaskManager:
             self.realtime_stats['realtime_processing_times'].append(processing_time)
             self.realtime_stats['last_realtime_processing'] = datetime.now(timezone.utc)
             
-            # Keep only recent processing times
-            if len(self.realtime_stats['realtime_processing_times']) > 100:
-                self.realtime_stats['realtime_processing_times'] = self.realtime_stats['realtime_processing_times'][-50:]
-            
             result = {
                 'success': True,
                 'entry_id': entry_id,
@@ -656,8 +636,8 @@ class BackgroundTaskManager:
         if metrics['last_realtime_processing']:
             metrics['last_realtime_processing'] = metrics['last_realtime_processing'].isoformat()
         
-        # Remove raw processing times from output
-        del metrics['realtime_processing_times']
+        # Report the average instead of the raw processing times
+        metrics['avg_realtime_processing_time'] = summarize(metrics.pop('realtime_processing_times'))['mean']
         
         return metrics
 
@@ -702,18 +682,19 @@ def trigger_log_parsing(raw_log_id: str) -> bool:
             # Parse the log synchronously for immediate trigger
             parsed_events = parse_log_entries(raw_log.content, raw_log_id)
             
-            # Store parsed events
-            for event in parsed_events:
-                db_event = Event(
-                    id=event.id,
-                    raw_log_id=event.raw_log_id,
-                    timestamp=event.timestamp,
-                    source=event.source,
-                    message=event.message,
-                    category=event.category.value,
-                    parsed_at=event.parsed_at or datetime.now(timezone.utc)
-                )
-                db.add(db_event)
+            # Store parsed events in a single bulk insert (COPY on PostgreSQL)
+            bulk_insert_events(db, [
+                {
+                    'id': event.id,
+                    'raw_log_id': event.raw_log_id,
+                    'timestamp': event.timestamp,
+                    'source': event.source,
+                    'message': event.message,
+                    'category': event.category.value,
+                    'parsed_at': event.parsed_at or datetime.now(timezone.utc)
+                }
+                for event in parsed_events
+            ])
             
             db.commit()
             logger.info(f"Triggered parsing for raw log {raw_log_id}: {len(parsed_events)} events")
@@ -1,51 +1,188 @@
 """
 Database connection utilities and configuration for ThreatLens.
 """
+import io
 import os
 import logging
-from sqlalchemy import create_engine, text
+import sqlite3
+from datetime import datetime, date, timezone
+from sqlalchemy import create_engine, event, text, inspect, insert
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql import functions
 from sqlalchemy.exc import SQLAlchemyError
 from contextlib import contextmanager
-from typing import Generator, Optional
-from .models import Base
+from typing import Generator, Optional, List, Dict, Any
+from .models import Base, Event
 
 logger = logging.getLogger(__name__)
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/threatlens.db")
+if DATABASE_URL.startswith("postgres://"):
+    # Normalize the legacy scheme still emitted by some hosting providers
+    DATABASE_URL = "postgresql://" + DATABASE_URL[len("postgres://"):]
 SQLITE_WAL_MODE = True  # Enable WAL mode for better concurrency
 
+# Connection pool configuration (PostgreSQL)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_STATEMENT_TIMEOUT = float(os.getenv("DB_STATEMENT_TIMEOUT", "60.0"))  # seconds
+
+# Read/write split: one dedicated writer connection, a pool of read-only readers
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL")  # Optional replica for reads
+DB_READ_POOL_SIZE = int(os.getenv("DB_READ_POOL_SIZE", "8"))
+DB_WRITE_TIMEOUT = float(os.getenv("DB_WRITE_TIMEOUT", "30"))  # seconds to wait for the writer
+
+# Per-connection SQLite tuning (PRAGMAs are connection-scoped, so apply on every connect)
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "30000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "16384"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# Rows buffered per COPY chunk during bulk event ingest
+COPY_CHUNK_SIZE = 5000
+
 # Global engine and session factory
 engine = None
 SessionLocal = None
 
+# Dedicated writer and read-only reader engines
+write_engine = None
+read_engine = None
+WriteSessionLocal = None
+ReadSessionLocal = None
+
+
+def is_sqlite_url(database_url: Optional[str] = None) -> bool:
+    """Return True if the database URL points at SQLite."""
+    return (database_url or DATABASE_URL).startswith("sqlite")
+
+
+def is_postgresql_url(database_url: Optional[str] = None) -> bool:
+    """Return True if the database URL points at PostgreSQL."""
+    return (database_url or DATABASE_URL).startswith("postgresql")
+
+
+def _sqlite_database_path(database_url: Optional[str] = None) -> Optional[str]:
+    """Return the filesystem path of a SQLite URL, or None for in-memory databases."""
+    url = database_url or DATABASE_URL
+    if "///" not in url:
+        return None
+    path = url.split("///", 1)[1].split("?", 1)[0]
+    if not path or path == ":memory:":
+        return None
+    return os.path.abspath(path)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, read_only: bool = False) -> None:
+    """Apply connection-scoped PRAGMAs to a new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute("PRAGMA temp_store=memory")
+        if read_only:
+            cursor.execute("PRAGMA query_only=1")
+        else:
+            cursor.execute("PRAGMA synchronous=NORMAL")
+    finally:
+        cursor.close()
+
+
+def _create_sqlite_engine(**pool_options):
+    """Create a SQLite engine with WAL mode and per-connection performance PRAGMAs."""
+    sqlite_engine = create_engine(
+        DATABASE_URL,
+        echo=False,  # Set to True for SQL query logging in development
+        pool_pre_ping=True,  # Verify connections before use
+        connect_args={
+            "check_same_thread": False,  # Allow multiple threads for SQLite
+            "timeout": 30  # Connection timeout in seconds
+        },
+        **pool_options
+    )
+    
+    @event.listens_for(sqlite_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        _apply_sqlite_pragmas(dbapi_connection)
+    
+    # Enable WAL mode for SQLite if configured (persistent, so once per database)
+    if SQLITE_WAL_MODE:
+        with sqlite_engine.connect() as conn:
+            conn.execute(text("PRAGMA journal_mode=WAL"))
+            conn.commit()
+            logger.info("SQLite WAL mode enabled with performance optimizations")
+    
+    return sqlite_engine
+
+
+def _create_sqlite_read_engine(database_path: str):
+    """Create a pool of read-only SQLite connections (mode=ro, query_only)."""
+    def _connect_read_only():
+        return sqlite3.connect(
+            f"file:{database_path}?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            timeout=30
+        )
+    
+    sqlite_read_engine = create_engine(
+        "sqlite://",
+        creator=_connect_read_only,
+        echo=False,
+        poolclass=QueuePool,
+        pool_size=DB_READ_POOL_SIZE,
+        max_overflow=DB_READ_POOL_SIZE,
+        pool_pre_ping=True
+    )
+    
+    @event.listens_for(sqlite_read_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        _apply_sqlite_pragmas(dbapi_connection, read_only=True)
+    
+    return sqlite_read_engine
+
+
+def _create_postgresql_engine():
+    """Create a PostgreSQL engine backed by a tuned QueuePool."""
+    pg_engine = create_engine(
+        DATABASE_URL,
+        echo=False,
+        poolclass=QueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,  # Drop connections before server/proxy idle limits
+        pool_pre_ping=True,
+        pool_use_lifo=True,  # Keep a hot core of connections, let extras idle out
+        connect_args={
+            "application_name": "threatlens",
+            "connect_timeout": 10,
+            "options": f"-c statement_timeout={int(DB_STATEMENT_TIMEOUT * 1000)}"
+        }
+    )
+    
+    logger.info(
+        f"PostgreSQL engine created (pool_size={DB_POOL_SIZE}, "
+        f"max_overflow={DB_MAX_OVERFLOW}, pool_recycle={DB_POOL_RECYCLE}s)"
+    )
+    return pg_engine
+
 
 def create_database_engine():
     """Create and configure the SQLAlchemy engine."""
     global engine
     
     if engine is None:
-        # Create engine with SQLite-specific configurations
-        engine = create_engine(
-            DATABASE_URL,
-            echo=False,  # Set to True for SQL query logging in development
-            pool_pre_ping=True,  # Verify connections before use
-            connect_args={
-                "check_same_thread": False,  # Allow multiple threads for SQLite
-                "timeout": 30  # Connection timeout in seconds
-            }
-        )
-        
-        # Enable WAL mode for SQLite if configured
-        if SQLITE_WAL_MODE and DATABASE_URL.startswith("sqlite"):
-            with engine.connect() as conn:
-                conn.execute(text("PRAGMA journal_mode=WAL"))
-                conn.execute(text("PRAGMA synchronous=NORMAL"))
-                conn.execute(text("PRAGMA cache_size=1000"))
-                conn.execute(text("PRAGMA temp_store=memory"))
-                conn.commit()
-                logger.info("SQLite WAL mode enabled with performance optimizations")
+        if is_postgresql_url():
+            engine = _create_postgresql_engine()
+        elif is_sqlite_url():
+            engine = _create_sqlite_engine()
+        else:
+            engine = create_engine(DATABASE_URL, echo=False, pool_pre_ping=True)
     
     return engine
 
@@ -92,6 +229,140 @@ def get_db_session() -> Generator[Session, None, None]:
         db.close()
 
 
+def create_write_engine():
+    """
+    Create the dedicated writer engine used by ingestion paths.
+    
+    On SQLite this is a single pooled connection, so concurrent ingest
+    writers queue in-process instead of spinning on the database lock.
+    
+    It is one of three connections that may write to a SQLite file: this
+    one for threaded writers, the async writer in app.async_database for
+    the event loop, and the default engine behind get_db_session. They
+    cannot share a connection (aiosqlite drives its own thread), and they
+    do not need to: SQLite allows one write transaction at a time, every
+    writable connection sets busy_timeout, and the driver only issues
+    BEGIN at the first INSERT/UPDATE/DELETE. A writer that finds the lock
+    held therefore waits in the busy handler for SQLITE_BUSY_TIMEOUT_MS
+    instead of failing with "database is locked".
+    """
+    global write_engine
+    
+    if write_engine is None:
+        if is_sqlite_url() and _sqlite_database_path() is not None:
+            write_engine = _create_sqlite_engine(
+                poolclass=QueuePool,
+                pool_size=1,
+                max_overflow=0,
+                pool_timeout=DB_WRITE_TIMEOUT
+            )
+        else:
+            write_engine = create_database_engine()
+    
+    return write_engine
+
+
+def create_read_engine():
+    """
+    Create the read-only engine used by API reads.
+    
+    On SQLite readers open the file with mode=ro and query_only, so in WAL
+    mode they never take the write lock and never wait on the writer.
+    """
+    global read_engine
+    
+    if read_engine is None:
+        database_path = _sqlite_database_path() if is_sqlite_url() else None
+        
+        if DATABASE_READ_URL:
+            read_engine = create_engine(
+                DATABASE_READ_URL,
+                echo=False,
+                pool_size=DB_READ_POOL_SIZE,
+                pool_pre_ping=True
+            )
+        elif database_path is not None:
+            # Readers need an existing WAL database; let the writer create it first
+            create_database_engine()
+            read_engine = _create_sqlite_read_engine(database_path)
+        elif is_postgresql_url():
+            read_engine = create_engine(
+                DATABASE_URL,
+                echo=False,
+                poolclass=QueuePool,
+                pool_size=DB_READ_POOL_SIZE,
+                max_overflow=DB_MAX_OVERFLOW,
+                pool_timeout=DB_POOL_TIMEOUT,
+                pool_recycle=DB_POOL_RECYCLE,
+                pool_pre_ping=True,
+                connect_args={
+                    "application_name": "threatlens-reader",
+                    "options": "-c default_transaction_read_only=on"
+                }
+            )
+        else:
+            read_engine = create_database_engine()
+    
+    return read_engine
+
+
+@contextmanager
+def get_write_session() -> Generator[Session, None, None]:
+    """
+    Context manager for sessions on the dedicated writer connection.
+    Commits on success and rolls back on error. Do not hold it across awaits.
+    """
+    global WriteSessionLocal
+    
+    if WriteSessionLocal is None:
+        WriteSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=create_write_engine())
+    
+    db = WriteSessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _create_read_session() -> Session:
+    """Open a session on the read-only pool."""
+    global ReadSessionLocal
+    
+    if ReadSessionLocal is None:
+        ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=create_read_engine())
+    
+    return ReadSessionLocal()
+
+
+def get_read_database_session() -> Generator[Session, None, None]:
+    """
+    Dependency function to get a read-only database session.
+    Used with FastAPI dependency injection for read endpoints.
+    """
+    db = _create_read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@contextmanager
+def get_read_session() -> Generator[Session, None, None]:
+    """
+    Context manager for read-only database sessions.
+    Use this for queries outside of FastAPI that never write.
+    """
+    db = _create_read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 def init_database():
     """
     Initialize the database by creating all tables and indexes.
@@ -99,7 +370,8 @@ def init_database():
     """
     try:
         # Ensure data directory exists
-        os.makedirs("data", exist_ok=True)
+        if is_sqlite_url():
+            os.makedirs("data", exist_ok=True)
         
         # Create engine and tables
         engine = create_database_engine()
@@ -224,19 +496,12 @@ def check_database_health() -> dict:
             conn.execute(text("SELECT 1"))
             health_status["connection"] = True
         
-        # Check if tables exist
-        with engine.connect() as conn:
-            result = conn.execute(text("""
-                SELECT name FROM sqlite_master 
-                WHERE type='table' AND name IN ('raw_logs', 'events', 'ai_analysis', 'reports', 
-                'monitoring_config', 'log_sources', 'processing_metrics', 'notification_history')
-            """))
-            tables = [row[0] for row in result]
-            
-            expected_tables = {'raw_logs', 'events', 'ai_analysis', 'reports', 
-                             'monitoring_config', 'log_sources', 'processing_metrics', 'notification_history'}
-            health_status["tables_exist"] = expected_tables.issubset(set(tables))
-            health_status["existing_tables"] = tables
+        # Check if tables exist (dialect-neutral via the inspector)
+        expected_tables = {'raw_logs', 'events', 'ai_analysis', 'reports', 
+                         'monitoring_config', 'log_sources', 'processing_metrics', 'notification_history'}
+        tables = [name for name in inspect(engine).get_table_names() if name in expected_tables]
+        health_status["tables_exist"] = expected_tables.issubset(set(tables))
+        health_status["existing_tables"] = tables
         
         # If we get here, database is healthy
         health_status["status"] = "healthy"
@@ -265,7 +530,7 @@ def get_database_stats() -> dict:
     }
     
     try:
-        with get_db_session() as db:
+        with get_read_session() as db:
             # Count records in each table
             stats["raw_logs_count"] = db.execute(text("SELECT COUNT(*) FROM raw_logs")).scalar()
             stats["events_count"] = db.execute(text("SELECT COUNT(*) FROM events")).scalar()
@@ -300,12 +565,109 @@ def get_database_stats() -> dict:
     return stats
 
 
+def _format_copy_value(value: Any) -> str:
+    """Encode a single value for PostgreSQL COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    elif isinstance(value, bool):
+        value = int(value)
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def _with_column_defaults(table, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Fill Python-side column defaults into rows.
+    
+    COPY bypasses SQLAlchemy's INSERT compilation, so columns missing from
+    the row dictionaries would be stored as NULL instead of their model
+    defaults.
+    """
+    defaults = {}
+    for column in table.columns:
+        default = column.default
+        if default is None:
+            continue
+        if default.is_scalar:
+            defaults[column.name] = lambda arg=default.arg: arg
+        elif default.is_callable:
+            defaults[column.name] = lambda arg=default.arg: arg(None)
+        elif isinstance(default.arg, functions.current_timestamp):
+            # Naive UTC, as SQLite's CURRENT_TIMESTAMP stores it
+            defaults[column.name] = lambda: datetime.now(timezone.utc).replace(tzinfo=None)
+    
+    return [
+        {**{name: make() for name, make in defaults.items() if name not in row}, **row}
+        for row in rows
+    ]
+
+
+def _copy_rows(db: Session, table_name: str, columns: List[str], rows: List[Dict[str, Any]]) -> None:
+    """Stream rows into a PostgreSQL table with COPY FROM STDIN in bounded chunks."""
+    dbapi_connection = db.connection().connection.dbapi_connection
+    copy_sql = f"COPY {table_name} ({', '.join(columns)}) FROM STDIN"
+    
+    with dbapi_connection.cursor() as cursor:
+        for start in range(0, len(rows), COPY_CHUNK_SIZE):
+            chunk = rows[start:start + COPY_CHUNK_SIZE]
+            
+            if hasattr(cursor, "copy_expert"):
+                # psycopg2
+                buffer = io.StringIO()
+                for row in chunk:
+                    buffer.write("\t".join(_format_copy_value(row.get(col)) for col in columns))
+                    buffer.write("\n")
+                buffer.seek(0)
+                cursor.copy_expert(copy_sql, buffer)
+            else:
+                # psycopg 3
+                with cursor.copy(copy_sql) as copy:
+                    for row in chunk:
+                        copy.write_row([row.get(col) for col in columns])
+
+
+def bulk_insert_events(db: Session, rows: List[Dict[str, Any]]) -> int:
+    """
+    Insert many event rows in as few round trips as possible.
+    
+    On PostgreSQL the rows are streamed with COPY; other dialects fall back
+    to a single executemany INSERT. The caller owns the transaction.
+    
+    Args:
+        db: Active database session
+        rows: Event column dictionaries, all with the same keys
+        
+    Returns:
+        Number of rows inserted
+    """
+    if not rows:
+        return 0
+    
+    if db.get_bind().dialect.name == "postgresql":
+        rows = _with_column_defaults(Event.__table__, rows)
+        _copy_rows(db, Event.__tablename__, list(rows[0].keys()), rows)
+    else:
+        db.execute(insert(Event.__table__), rows)
+    
+    return len(rows)
+
+
 def close_database_connections():
     """
     Close all database connections.
     Should be called during application shutdown.
     """
     global engine
+    for extra_engine in (read_engine, write_engine):
+        if extra_engine is not None and extra_engine is not engine:
+            extra_engine.dispose()
     if engine:
         engine.dispose()
         logger.info("Database connections closed")
\ No newline at end of file
@@ -5,7 +5,7 @@ Provides helper functions for database maintenance and real-time processing.
 import logging
 import sys
 from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 
@@ -57,17 +57,19 @@ class DatabaseUtils:
                 stats["pending_notifications"] = result.scalar() or 0
                 
                 # Processing rate (events per hour in last 24 hours)
+                # parsed_at is stored as naive UTC, so bind a naive UTC cutoff
+                cutoff_time = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=24)
                 result = db.execute(text("""
                     SELECT COUNT(*) FROM events 
                     WHERE realtime_processed = 1 
-                    AND parsed_at > datetime('now', '-24 hours')
-                """))
+                    AND parsed_at > :cutoff_time
+                """), {"cutoff_time": cutoff_time})
                 recent_processed = result.scalar() or 0
                 stats["processing_rate"] = recent_processed / 24.0  # per hour
                 
                 # Average processing time (for events with processing_time)
                 result = db.execute(text("""
-                    SELECT AVG(CAST(processing_time AS REAL)) 
+                    SELECT AVG(CAST(processing_time AS DOUBLE PRECISION)) 
                     FROM events 
                     WHERE processing_time IS NOT NULL 
                     AND processing_time != ''
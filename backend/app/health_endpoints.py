@@ -10,12 +10,14 @@ import time
 from datetime import datetime, timezone
 from typing import Dict, Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
 from app.database import get_database_session, check_database_health
 from app.logging_config import get_logger
 from app.error_handling import create_health_check_error, with_error_handling
+from app.metrics import REGISTRY, MetricsRegistry
 from app.middleware import get_metrics_middleware
 from app.schemas import HealthCheckResponse
 
@@ -417,70 +419,51 @@ async def get_component_metrics():
         )
 
 
-@health_router.get("/metrics/prometheus")
+@health_router.get("/metrics/prometheus", response_class=PlainTextResponse)
 async def get_prometheus_metrics():
     """
     Get metrics in Prometheus format for monitoring integration.
     
+    Scrapes only read snapshots: resource usage without a sampling
+    interval, request totals kept by the metrics middleware, the most
+    recent component health results, and the pipeline counters and
+    histograms in the process-wide registry.
+    
     Returns:
         Prometheus-formatted metrics
     """
     try:
-        metrics_lines = []
+        snapshot = MetricsRegistry()
         
-        # System metrics
-        system_metrics = health_checker.get_system_metrics()
-        if 'error' not in system_metrics:
-            metrics_lines.extend([
-                f"# HELP threatlens_cpu_percent CPU usage percentage",
-                f"# TYPE threatlens_cpu_percent gauge",
-                f"threatlens_cpu_percent {system_metrics['cpu_percent']}",
-                f"",
-                f"# HELP threatlens_memory_percent Memory usage percentage",
-                f"# TYPE threatlens_memory_percent gauge",
-                f"threatlens_memory_percent {system_metrics['memory_percent']}",
-                f"",
-                f"# HELP threatlens_disk_percent Disk usage percentage",
-                f"# TYPE threatlens_disk_percent gauge",
-                f"threatlens_disk_percent {system_metrics['disk_percent']}",
-                f"",
-                f"# HELP threatlens_uptime_seconds System uptime in seconds",
-                f"# TYPE threatlens_uptime_seconds counter",
-                f"threatlens_uptime_seconds {health_checker.get_uptime()}",
-                f""
-            ])
+        # System metrics; cpu_percent(interval=None) compares with the previous call
+        snapshot.gauge("threatlens_cpu_percent", "CPU usage percentage").set(psutil.cpu_percent(interval=None))
+        snapshot.gauge("threatlens_memory_percent", "Memory usage percentage").set(psutil.virtual_memory().percent)
+        disk = psutil.disk_usage('/')
+        snapshot.gauge("threatlens_disk_percent", "Disk usage percentage").set((disk.used / disk.total) * 100)
+        snapshot.counter("threatlens_uptime_seconds", "System uptime in seconds").inc(health_checker.get_uptime())
         
         # API metrics
         metrics_middleware = get_metrics_middleware()
         if metrics_middleware:
             api_metrics = metrics_middleware.get_metrics()
-            metrics_lines.extend([
-                f"# HELP threatlens_http_requests_total Total HTTP requests",
-                f"# TYPE threatlens_http_requests_total counter",
-                f"threatlens_http_requests_total {api_metrics['total_requests']}",
-                f"",
-                f"# HELP threatlens_http_errors_total Total HTTP errors",
-                f"# TYPE threatlens_http_errors_total counter",
-                f"threatlens_http_errors_total {api_metrics['total_errors']}",
-                f"",
-                f"# HELP threatlens_http_request_duration_seconds Average HTTP request duration",
-                f"# TYPE threatlens_http_request_duration_seconds gauge",
-                f"threatlens_http_request_duration_seconds {api_metrics['average_processing_time']}",
-                f""
-            ])
+            snapshot.counter(
+                "threatlens_http_requests_total", "Total HTTP requests"
+            ).inc(api_metrics['total_requests'])
+            snapshot.counter(
+                "threatlens_http_errors_total", "Total HTTP errors"
+            ).inc(api_metrics['total_errors'])
+            snapshot.gauge(
+                "threatlens_http_request_duration_seconds", "Average HTTP request duration"
+            ).set(api_metrics['average_processing_time'])
         
-        # Component health metrics
-        component_health = await health_checker.check_all_components()
-        metrics_lines.extend([
-            f"# HELP threatlens_component_health Component health status (1=healthy, 0=unhealthy)",
-            f"# TYPE threatlens_component_health gauge"
-        ])
-        
-        for component, health in component_health.items():
-            health_value = 1 if health.get('status') == 'healthy' else 0
-            metrics_lines.append(f'threatlens_component_health{{component="{component}"}} {health_value}')
+        # Component health from the last check; checks run on their own endpoints
+        component_health = snapshot.gauge(
+            "threatlens_component_health", "Component health status (1=healthy, 0=unhealthy)", ("component",)
+        )
+        for component, health in health_checker.last_check_results.items():
+            component_health.labels(component).set(1 if health.get('status') == 'healthy' else 0)
         
-        return "\n".join(metrics_lines)
+        return snapshot.render() + REGISTRY.render()
         
     except Exception as e:
         logger.error(f"Failed to generate Prometheus metrics: {e}", exc_info=True)
@@ -13,10 +13,10 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from .models import RawLog
 from .schemas import IngestionRequest, IngestionResponse
-from .database import get_db_session
+from .database import get_write_session, get_read_session
 from .validation import (
     validate_file_upload, 
-    sanitize_log_content, 
+    sanitize_log_content_with_report, 
     sanitize_filename, 
     sanitize_source_identifier,
     validate_request_size
@@ -97,7 +97,9 @@ def validate_text_input(content: str) -> str:
         )
     
     # Use comprehensive sanitization from validation module
-    sanitized = sanitize_log_content(content)
+    sanitized, fired_rules = sanitize_log_content_with_report(content)
+    if fired_rules:
+        logger.debug(f"Sanitization rules fired for text input: {fired_rules}")
     
     if len(sanitized.strip()) < 10:
         raise IngestionError("Content too short to be meaningful (minimum 10 characters)")
@@ -205,7 +207,9 @@ async def ingest_log_file(file: UploadFile, source: Optional[str] = None) -> Ing
                 raise IngestionError("File encoding not supported. Please use UTF-8 or latin-1 encoded files.")
         
         # Additional sanitization (already done in validate_file_upload, but ensure consistency)
-        content = sanitize_log_content(content)
+        content, fired_rules = sanitize_log_content_with_report(content)
+        if fired_rules:
+            logger.debug(f"Sanitization rules fired for {file.filename}: {fired_rules}")
         
         # Use filename as source if not provided, with sanitization
         if not source:
@@ -214,7 +218,7 @@ async def ingest_log_file(file: UploadFile, source: Optional[str] = None) -> Ing
             source = sanitize_source_identifier(source)
         
         # Store in database
-        with get_db_session() as db:
+        with get_write_session() as db:
             raw_log_id = store_raw_log(content, source, db)
         
         # Create response
@@ -256,7 +260,7 @@ def ingest_log_text(request: IngestionRequest) -> IngestionResponse:
         source = sanitize_source_identifier(request.source)
         
         # Store in database
-        with get_db_session() as db:
+        with get_write_session() as db:
             raw_log_id = store_raw_log(content, source, db)
         
         # Create response
@@ -338,7 +342,7 @@ def get_ingestion_stats() -> dict:
     }
     
     try:
-        with get_db_session() as db:
+        with get_read_session() as db:
             # Get total count
             from sqlalchemy import func, text
             
@@ -4,20 +4,38 @@ Comprehensive logging configuration for ThreatLens.
 This module provides structured logging with correlation IDs, JSON formatting,
 and centralized configuration for the entire application.
 """
+import atexit
+import copy
 import logging
 import logging.config
+import logging.handlers
 import json
+import queue
+import threading
 import uuid
 import sys
 import os
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from contextvars import ContextVar
 from pathlib import Path
 
 # Context variable for request correlation IDs
 correlation_id: ContextVar[Optional[str]] = ContextVar('correlation_id', default=None)
 
+# Hand records to a background thread instead of writing on the logging thread
+LOG_ASYNC = os.getenv('LOG_ASYNC', 'true').lower() == 'true'
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+# Comma-separated "logger=records/seconds" limits for noisy loggers
+LOG_RATE_LIMITS = os.getenv('LOG_RATE_LIMITS', 'app.parser=20/60,app.realtime.format_detector=20/60')
+
+# Logger that owns the output handlers when records go through the queue
+SINK_LOGGER_NAME = 'threatlens.log_sinks'
+
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional['DroppingQueueHandler'] = None
+_rate_limit_filter: Optional['LogRateLimitFilter'] = None
+
 
 class CorrelationIdFilter(logging.Filter):
     """Add correlation ID to log records."""
@@ -27,6 +45,121 @@ class CorrelationIdFilter(logging.Filter):
         return True
 
 
+class LogRateLimitFilter(logging.Filter):
+    """
+    Limit how often the same message is logged by noisy loggers.
+    
+    Records are grouped by logger name and unformatted message, so
+    "Failed to parse line %d" is one group however many lines fail. Each
+    group may log `burst` records per `interval` seconds; the rest are
+    dropped and counted, and the first record of the next interval
+    carries the number suppressed in `suppressed_count`. One filter is
+    shared by handlers on every thread, so checks are made under a lock.
+    """
+    
+    MAX_GROUPS = 1000
+    
+    def __init__(self, limits: Optional[Dict[str, Tuple[int, float]]] = None):
+        super().__init__()
+        self.limits = limits or {}
+        self.suppressed_total = 0
+        self._groups: Dict[Tuple[str, Any], List[float]] = {}
+        self._rules: Dict[str, Optional[Tuple[int, float]]] = {}
+        self._last_record = None
+        self._last_result = True
+        self._lock = threading.Lock()
+        
+    def _rule_for(self, name: str) -> Optional[Tuple[int, float]]:
+        """Find the limit for a logger or its nearest configured parent."""
+        if name not in self._rules:
+            rule, candidate = None, name
+            while candidate:
+                if candidate in self.limits:
+                    rule = self.limits[candidate]
+                    break
+                candidate = candidate.rpartition('.')[0]
+            self._rules[name] = rule
+        return self._rules[name]
+        
+    def filter(self, record):
+        # Handlers run on request, worker and scheduler threads alike
+        with self._lock:
+            # The same record reaches every output handler; count it once
+            if record is self._last_record:
+                return self._last_result
+            
+            result = True
+            rule = self._rule_for(record.name)
+            if rule is not None:
+                burst, interval = rule
+                key = (record.name, record.msg)
+                now = record.created
+                group = self._groups.get(key)
+                if group is None or now - group[0] >= interval:
+                    suppressed = int(group[2]) if group is not None else 0
+                    if len(self._groups) >= self.MAX_GROUPS:
+                        self._groups.clear()
+                    self._groups[key] = group = [now, 0, 0]
+                    if suppressed:
+                        record.suppressed_count = suppressed
+                group[1] += 1
+                if group[1] > burst:
+                    group[2] += 1
+                    self.suppressed_total += 1
+                    result = False
+            
+            self._last_record, self._last_result = record, result
+            return result
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that never blocks the logging thread.
+    
+    Message arguments are merged before a record is queued, as
+    QueueHandler does, but formatting and tracebacks are left to the
+    listener thread. When the queue is full the record is dropped and counted, and a
+    summary warning is queued once there is room again.
+    """
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._unreported_drops = 0
+        self._lock = threading.Lock()
+        
+    def prepare(self, record):
+        # Merge msg and args like QueueHandler so args mutated after the call
+        # can't change the output; exc_info stays for the listener's formatter
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+        
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+                self._unreported_drops += 1
+            return
+            
+        if self._unreported_drops:
+            with self._lock:
+                count, self._unreported_drops = self._unreported_drops, 0
+            summary = logging.LogRecord(
+                __name__, logging.WARNING, __file__, 0,
+                "Dropped %d log records because the log queue was full", (count,), None
+            )
+            summary.correlation_id = 'no-correlation-id'
+            try:
+                self.queue.put_nowait(summary)
+            except queue.Full:
+                with self._lock:
+                    self._unreported_drops += count
+
+
 class JSONFormatter(logging.Formatter):
     """JSON formatter for structured logging."""
     
@@ -96,25 +229,64 @@ class ColoredConsoleFormatter(logging.Formatter):
         return f"{color}{formatted}{reset}"
 
 
+def parse_rate_limits(spec: str) -> Dict[str, Tuple[int, float]]:
+    """
+    Parse log rate limits.
+    
+    Args:
+        spec: Comma-separated "logger=records/seconds" entries,
+            e.g. "app.parser=20/60"
+            
+    Returns:
+        Logger names mapped to (records, seconds)
+    """
+    limits = {}
+    for entry in filter(None, (part.strip() for part in spec.split(','))):
+        try:
+            name, rate = entry.split('=', 1)
+            burst, interval = rate.split('/', 1)
+            limits[name.strip()] = (int(burst), float(interval))
+        except ValueError:
+            raise ValueError(f"Invalid log rate limit '{entry}', expected logger=records/seconds")
+    return limits
+
+
 def setup_logging(
     log_level: str = "INFO",
     log_format: str = "json",
     log_file: Optional[str] = None,
-    enable_console: bool = True
+    enable_console: bool = True,
+    use_queue: bool = LOG_ASYNC,
+    queue_size: int = LOG_QUEUE_SIZE,
+    rate_limits: Optional[str] = None
 ) -> None:
     """
     Setup comprehensive logging configuration.
     
+    With use_queue the application loggers only enqueue records; a
+    QueueListener thread formats them and writes to the console and file
+    handlers.
+    
     Args:
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         log_format: Format type ('json' or 'console')
         log_file: Optional log file path
         enable_console: Whether to enable console logging
+        use_queue: Write log output on a background thread
+        queue_size: Maximum queued records before new ones are dropped
+        rate_limits: Per-logger rate limits (defaults to LOG_RATE_LIMITS)
     """
+    global _queue_listener, _queue_handler, _rate_limit_filter
+    
     # Ensure logs directory exists
     if log_file:
         log_path = Path(log_file)
         log_path.parent.mkdir(parents=True, exist_ok=True)
+        
+    use_queue = use_queue and (enable_console or bool(log_file))
+    # Queued records get their correlation ID and rate limiting on the
+    # logging thread, before they are handed to the listener
+    sink_filters = [] if use_queue else ['correlation_id', 'log_rate_limit']
     
     # Configure handlers
     handlers = {}
@@ -125,7 +297,7 @@ def setup_logging(
             'level': log_level,
             'formatter': 'colored_console' if log_format == 'console' else 'json',
             'stream': 'ext://sys.stdout',
-            'filters': ['correlation_id']
+            'filters': sink_filters
         }
     
     if log_file:
@@ -136,8 +308,22 @@ def setup_logging(
             'filename': log_file,
             'maxBytes': 10 * 1024 * 1024,  # 10MB
             'backupCount': 5,
-            'filters': ['correlation_id']
+            'filters': sink_filters
         }
+        
+    sink_names = list(handlers.keys())
+    rate_limit_filter = LogRateLimitFilter(
+        parse_rate_limits(LOG_RATE_LIMITS if rate_limits is None else rate_limits)
+    )
+    queue_handler = None
+    if use_queue:
+        queue_handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        handlers['queue'] = {
+            '()': lambda: queue_handler,
+            'level': log_level,
+            'filters': ['correlation_id', 'log_rate_limit']
+        }
+    attached = ['queue'] if use_queue else sink_names
     
     # Configure formatters
     formatters = {
@@ -155,6 +341,9 @@ def setup_logging(
     filters = {
         'correlation_id': {
             '()': CorrelationIdFilter,
+        },
+        'log_rate_limit': {
+            '()': lambda: rate_limit_filter,
         }
     }
     
@@ -167,45 +356,95 @@ def setup_logging(
         'handlers': handlers,
         'root': {
             'level': log_level,
-            'handlers': list(handlers.keys())
+            'handlers': attached
         },
         'loggers': {
             # Application loggers
             'app': {
                 'level': log_level,
-                'handlers': list(handlers.keys()),
+                'handlers': attached,
                 'propagate': False
             },
             'main': {
                 'level': log_level,
-                'handlers': list(handlers.keys()),
+                'handlers': attached,
                 'propagate': False
             },
             # Third-party loggers (reduce noise)
             'uvicorn': {
                 'level': 'WARNING',
-                'handlers': list(handlers.keys()),
+                'handlers': attached,
                 'propagate': False
             },
             'uvicorn.access': {
                 'level': 'WARNING',
-                'handlers': list(handlers.keys()),
+                'handlers': attached,
                 'propagate': False
             },
             'sqlalchemy': {
                 'level': 'WARNING',
-                'handlers': list(handlers.keys()),
+                'handlers': attached,
                 'propagate': False
             },
             'groq': {
                 'level': 'WARNING',
-                'handlers': list(handlers.keys()),
+                'handlers': attached,
                 'propagate': False
             }
         }
     }
     
+    if use_queue:
+        # Owns the output handlers; nothing logs to it directly
+        config['loggers'][SINK_LOGGER_NAME] = {
+            'level': log_level,
+            'handlers': sink_names,
+            'propagate': False
+        }
+        
+    # Drain the previous listener before its handlers are closed
+    shutdown_logging()
+    
     logging.config.dictConfig(config)
+    _rate_limit_filter = rate_limit_filter
+    
+    if use_queue:
+        sinks = logging.getLogger(SINK_LOGGER_NAME).handlers
+        if sinks and queue_handler in logging.getLogger().handlers:
+            _queue_handler = queue_handler
+            _queue_listener = logging.handlers.QueueListener(
+                queue_handler.queue, *sinks, respect_handler_level=True
+            )
+            _queue_listener.start()
+
+
+def shutdown_logging() -> None:
+    """Stop the background log writer after writing everything queued."""
+    global _queue_listener, _queue_handler
+    
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+        _queue_handler = None
+
+
+def get_logging_statistics() -> Dict[str, Any]:
+    """
+    Get log pipeline statistics.
+    
+    Returns:
+        Queue depth, dropped records and rate-limited records
+    """
+    return {
+        'queued': _queue_listener is not None,
+        'queue_size': _queue_handler.queue.qsize() if _queue_handler else 0,
+        'queue_capacity': _queue_handler.queue.maxsize if _queue_handler else 0,
+        'dropped_records': _queue_handler.dropped if _queue_handler else 0,
+        'rate_limited_records': _rate_limit_filter.suppressed_total if _rate_limit_filter else 0
+    }
+
+
+atexit.register(shutdown_logging)
 
 
 def get_logger(name: str) -> logging.Logger:
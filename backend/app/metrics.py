@@ -0,0 +1,690 @@
+"""
+Metric primitives for ThreatLens components.
+
+Processing metrics are recorded on the hottest paths in the application, so
+every primitive here records in O(1) time and fixed memory:
+
+- RingBuffer keeps the most recent samples in a preallocated NumPy array.
+- DecayingRate estimates an event rate with exponential decay, so recent
+  traffic dominates without keeping per-event timestamps.
+- QuantileSketch estimates p50/p95/p99 over every recorded value from
+  logarithmic buckets with bounded relative error.
+
+Summaries (means, percentiles) are computed with vectorized NumPy calls
+when metrics are read. The primitives are not locked; record from one
+thread or guard them externally.
+
+MetricsRegistry holds labelled Prometheus counters, gauges and histograms.
+REGISTRY and the pipeline metrics defined with it record per-stage counts
+and latencies for the realtime pipeline; these are thread-safe.
+"""
+import bisect
+import math
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from app.profiling import add_stage_time
+
+DEFAULT_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class RingBuffer:
+    """
+    Fixed-size buffer of the most recent numeric samples.
+    
+    Appending overwrites the oldest sample once the buffer is full. Indexing,
+    iteration and np.asarray() see the samples oldest first.
+    """
+    
+    def __init__(self, capacity: int, dtype: Any = np.float64):
+        """
+        Initialize the buffer.
+        
+        Args:
+            capacity: Maximum number of samples kept
+            dtype: NumPy dtype of the samples
+        """
+        if capacity < 1:
+            raise ValueError("RingBuffer capacity must be at least 1")
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=dtype)
+        self._next = 0
+        self._size = 0
+        
+    def append(self, value: float) -> None:
+        """Add a sample, overwriting the oldest one when full."""
+        self._data[self._next] = value
+        self._next += 1
+        if self._next == self.capacity:
+            self._next = 0
+        if self._size < self.capacity:
+            self._size += 1
+            
+    def values(self) -> np.ndarray:
+        """Get a copy of the samples, oldest first."""
+        if self._size < self.capacity:
+            return self._data[:self._size].copy()
+        return np.concatenate((self._data[self._next:], self._data[:self._next]))
+        
+    def clear(self) -> None:
+        """Remove every sample."""
+        self._next = 0
+        self._size = 0
+        
+    def mean(self) -> float:
+        return float(self._data[:self._size].mean()) if self._size else 0.0
+        
+    def min(self) -> float:
+        return float(self._data[:self._size].min()) if self._size else 0.0
+        
+    def max(self) -> float:
+        return float(self._data[:self._size].max()) if self._size else 0.0
+        
+    def count_at_least(self, threshold: float) -> int:
+        """Count samples greater than or equal to threshold."""
+        return int(np.count_nonzero(self._data[:self._size] >= threshold))
+        
+    @property
+    def full(self) -> bool:
+        return self._size == self.capacity
+        
+    def __len__(self) -> int:
+        return self._size
+        
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return self.values()[index]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("RingBuffer index out of range")
+        start = self._next if self._size == self.capacity else 0
+        return self._data[(start + index) % self.capacity].item()
+        
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.values().tolist())
+        
+    def __array__(self, dtype: Any = None, copy: Optional[bool] = None) -> np.ndarray:
+        values = self.values()
+        return values if dtype is None else values.astype(dtype)
+        
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (RingBuffer, list, tuple, np.ndarray)):
+            return bool(np.array_equal(self.values(), np.asarray(other)))
+        return NotImplemented
+        
+    __hash__ = None
+    
+    def __repr__(self) -> str:
+        return f"RingBuffer(capacity={self.capacity}, size={self._size})"
+
+
+class DecayingRate:
+    """
+    Event rate with exponential decay.
+    
+    Each event adds one to a counter that halves every half_life seconds;
+    for a steady stream of r events per second the counter settles at
+    r / ln(2) * half_life, so the rate is read back in O(1). Estimates ramp
+    up over the first few half-lives after the first event.
+    """
+    
+    def __init__(self, half_life: float = 60.0):
+        """
+        Initialize the rate.
+        
+        Args:
+            half_life: Seconds after which an event counts half as much
+        """
+        if half_life <= 0:
+            raise ValueError("DecayingRate half_life must be positive")
+        self.half_life = half_life
+        self._decay = math.log(2) / half_life
+        self._value = 0.0
+        self._updated: Optional[float] = None
+        self.total = 0.0
+        
+    def _decayed(self, now: float) -> float:
+        if self._updated is None:
+            return 0.0
+        return self._value * math.exp(-self._decay * max(0.0, now - self._updated))
+        
+    def add(self, count: float = 1.0, now: Optional[float] = None) -> None:
+        """
+        Record events.
+        
+        Args:
+            count: Number of events
+            now: Monotonic timestamp, defaults to time.monotonic()
+        """
+        now = time.monotonic() if now is None else now
+        self._value = self._decayed(now) + count
+        self._updated = now
+        self.total += count
+        
+    def rate(self, now: Optional[float] = None) -> float:
+        """Get the current rate in events per second."""
+        now = time.monotonic() if now is None else now
+        return self._decayed(now) * self._decay
+        
+    def reset(self) -> None:
+        self._value = 0.0
+        self._updated = None
+        self.total = 0.0
+
+
+class QuantileSketch:
+    """
+    Streaming quantile estimates with bounded relative error.
+    
+    Values are counted in logarithmic buckets (as in DDSketch): bucket k
+    holds values in (gamma^(k-1), gamma^k] with gamma = (1 + a) / (1 - a),
+    so any estimated quantile is within relative_accuracy of a value that
+    was actually recorded at that rank. Recording is O(1); memory is fixed
+    by the value range. Values at or below min_value share one bucket and
+    values above max_value are counted in the top bucket.
+    """
+    
+    def __init__(self, relative_accuracy: float = 0.01,
+                 min_value: float = 1e-6, max_value: float = 1e7):
+        """
+        Initialize the sketch.
+        
+        Args:
+            relative_accuracy: Maximum relative error of estimates
+            min_value: Smallest value distinguished from zero
+            max_value: Largest value resolved accurately
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("QuantileSketch relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.max_value = max_value
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._offset = math.ceil(math.log(min_value) / self._log_gamma)
+        self._top = math.ceil(math.log(max_value) / self._log_gamma) - self._offset + 1
+        self.reset()
+        
+    def reset(self) -> None:
+        """Forget every recorded value."""
+        # A list increments faster than NumPy scalar assignment; reads use np.cumsum
+        self._counts = [0] * (self._top + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        
+    def add(self, value: float) -> None:
+        """Record a value."""
+        if value > self.min_value:
+            index = math.ceil(math.log(value) / self._log_gamma) - self._offset + 1
+            if index > self._top:
+                index = self._top
+        else:
+            index = 0
+        self._counts[index] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+            
+    def merge(self, other: "QuantileSketch") -> None:
+        """Add the values recorded by another sketch with the same settings."""
+        if (other.relative_accuracy, other.min_value, other.max_value) != \
+                (self.relative_accuracy, self.min_value, self.max_value):
+            raise ValueError("Cannot merge sketches with different settings")
+        self._counts = [a + b for a, b in zip(self._counts, other._counts)]
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+        
+    def _estimate(self, cumulative: np.ndarray, q: float) -> float:
+        rank = q * (self.count - 1)
+        index = int(np.searchsorted(cumulative, rank, side="right"))
+        if index == 0:
+            return float(self.min)
+        value = 2 * self._gamma ** (index - 1 + self._offset) / (self._gamma + 1)
+        # The extreme buckets are open-ended; the observed range is exact
+        return float(min(max(value, self.min), self.max))
+        
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile.
+        
+        Args:
+            q: Quantile between 0 and 1
+            
+        Returns:
+            Estimated value, or 0.0 when nothing was recorded
+        """
+        if not self.count:
+            return 0.0
+        return self._estimate(np.cumsum(self._counts), q)
+        
+    def quantiles(self, qs: Sequence[float] = DEFAULT_QUANTILES) -> Dict[str, float]:
+        """
+        Estimate several quantiles at once.
+        
+        Args:
+            qs: Quantiles between 0 and 1
+            
+        Returns:
+            Estimates keyed "p50", "p95", ... (0.0 when nothing was recorded)
+        """
+        names = [f"p{q * 100:g}" for q in qs]
+        if not self.count:
+            return {name: 0.0 for name in names}
+        cumulative = np.cumsum(self._counts)
+        return {name: self._estimate(cumulative, q) for name, q in zip(names, qs)}
+
+
+def summarize(samples: Union[RingBuffer, Iterable[float]]) -> Dict[str, float]:
+    """
+    Summarize samples with vectorized NumPy reductions.
+    
+    Args:
+        samples: RingBuffer or sequence of numbers
+        
+    Returns:
+        count, mean, min and max (zeros when empty)
+    """
+    values = np.asarray(samples if isinstance(samples, RingBuffer) else list(samples), dtype=np.float64)
+    if not values.size:
+        return {"count": 0, "mean": 0.0, "min": 0.0, "max": 0.0}
+    return {
+        "count": int(values.size),
+        "mean": float(values.mean()),
+        "min": float(values.min()),
+        "max": float(values.max())
+    }
+
+
+# Prometheus exposition
+#
+# Counters, gauges and histograms below are updated in place on the hot path
+# and only read when /metrics is scraped, so a scrape costs one pass over the
+# recorded children rather than any recomputation. prometheus_client is not a
+# dependency; the text format (version 0.0.4) is small enough to write here.
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+_METRIC_NAME = re.compile(r"^[a-zA-Z_:][a-zA-Z0-9_:]*$")
+_LABEL_NAME = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if value != value:
+        return "NaN"
+    return repr(float(value))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in labels) + "}"
+
+
+class _CounterValue:
+    __slots__ = ("_value", "_lock")
+    
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+        
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase the counter; amount must not be negative."""
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            self._value += amount
+            
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class _GaugeValue:
+    __slots__ = ("_value", "_lock")
+    
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+        
+    def set(self, value: float) -> None:
+        self._value = float(value)
+        
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+            
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+        
+    @property
+    def value(self) -> float:
+        return self._value
+
+
+class _HistogramValue:
+    __slots__ = ("_bounds", "_counts", "_sum", "_lock")
+    
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._bounds = bounds
+        # One slot per upper bound plus the implicit +Inf bucket
+        self._counts = [0] * (len(bounds) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+        
+    def observe(self, value: float) -> None:
+        """Record an observation in the first bucket whose bound is >= value."""
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            
+    def snapshot(self) -> Tuple[List[int], float]:
+        """Get the cumulative bucket counts and the sum."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = []
+        running = 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return cumulative, total
+
+
+class _MetricFamily:
+    """A named metric with one child per combination of label values."""
+    
+    kind = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        if not _METRIC_NAME.match(name):
+            raise ValueError(f"Invalid metric name: {name}")
+        for label in labelnames:
+            if not _LABEL_NAME.match(label) or label.startswith("__") or label == "le":
+                raise ValueError(f"Invalid label name for {name}: {label}")
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+            
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+        
+    def labels(self, *values: Any, **kwargs: Any) -> Any:
+        """
+        Get the child for a combination of label values.
+        
+        Args:
+            *values: Label values in labelnames order
+            **kwargs: Label values by name, instead of positionally
+            
+        Returns:
+            Child metric, created on first use
+        """
+        if kwargs:
+            if values:
+                raise ValueError("Pass label values either positionally or by name")
+            try:
+                values = tuple(kwargs[name] for name in self.labelnames)
+            except KeyError as e:
+                raise ValueError(f"Missing label {e} for {self.name}") from None
+            if len(kwargs) != len(self.labelnames):
+                raise ValueError(f"Unexpected labels for {self.name}: {sorted(kwargs)}")
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+        
+    def clear(self) -> None:
+        """Remove every child (unlabeled metrics are reset to zero)."""
+        with self._lock:
+            self._children = {(): self._new_child()} if not self.labelnames else {}
+            
+    def _items(self) -> List[Tuple[Tuple[Tuple[str, str], ...], Any]]:
+        with self._lock:
+            items = sorted(self._children.items())
+        return [(tuple(zip(self.labelnames, key)), child) for key, child in items]
+        
+    def _sample_lines(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(labels)} {_format_value(child.value)}"
+            for labels, child in self._items()
+        ]
+        
+    def render(self) -> List[str]:
+        """Render HELP, TYPE and sample lines."""
+        documentation = self.documentation.replace("\\", "\\\\").replace("\n", "\\n")
+        return [
+            f"# HELP {self.name} {documentation}",
+            f"# TYPE {self.name} {self.kind}",
+            *self._sample_lines()
+        ]
+
+
+class Counter(_MetricFamily):
+    """Monotonically increasing count, e.g. items handled by a stage."""
+    
+    kind = "counter"
+    
+    def _new_child(self) -> _CounterValue:
+        return _CounterValue()
+        
+    def inc(self, amount: float = 1.0) -> None:
+        """Increase an unlabeled counter."""
+        self.labels().inc(amount)
+
+
+class Gauge(_MetricFamily):
+    """Value that goes up and down, e.g. queue depth."""
+    
+    kind = "gauge"
+    
+    def _new_child(self) -> _GaugeValue:
+        return _GaugeValue()
+        
+    def set(self, value: float) -> None:
+        """Set an unlabeled gauge."""
+        self.labels().set(value)
+        
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+        
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+
+class Histogram(_MetricFamily):
+    """Distribution of observations in cumulative buckets, e.g. stage latency."""
+    
+    kind = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        bounds = tuple(sorted(float(bound) for bound in buckets if bound != math.inf))
+        if not bounds:
+            raise ValueError(f"Histogram {name} needs at least one bucket")
+        self.buckets = bounds
+        super().__init__(name, documentation, labelnames)
+        
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+        
+    def observe(self, value: float) -> None:
+        """Record an observation on an unlabeled histogram."""
+        self.labels().observe(value)
+        
+    def _sample_lines(self) -> List[str]:
+        lines = []
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for labels, child in self._items():
+            cumulative, total = child.snapshot()
+            for bound, count in zip(bounds, cumulative):
+                lines.append(f"{self.name}_bucket{_format_labels(labels + (('le', bound),))} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {cumulative[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Set of metric families rendered together in Prometheus text format."""
+    
+    def __init__(self):
+        self._families: Dict[str, _MetricFamily] = {}
+        self._lock = threading.Lock()
+        
+    def register(self, family: _MetricFamily) -> _MetricFamily:
+        """
+        Add a metric family.
+        
+        Raises:
+            ValueError: If a family with the same name is already registered
+        """
+        with self._lock:
+            if family.name in self._families:
+                raise ValueError(f"Metric {family.name} is already registered")
+            self._families[family.name] = family
+        return family
+        
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+        
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+        
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+        
+    def get(self, name: str) -> Optional[_MetricFamily]:
+        return self._families.get(name)
+        
+    def render(self) -> str:
+        """Render every family in Prometheus text exposition format."""
+        with self._lock:
+            families = list(self._families.values())
+        lines = []
+        for family in families:
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+# Process-wide registry served by the /metrics/prometheus endpoints
+REGISTRY = MetricsRegistry()
+
+# Stage names used by the realtime pipeline, in processing order
+PIPELINE_STAGES = ("read", "queue", "validate", "parse", "analyze", "db_write", "broadcast", "notify")
+
+PIPELINE_ITEMS = REGISTRY.counter(
+    "threatlens_pipeline_items_total",
+    "Items handled by each realtime pipeline stage, by outcome",
+    ("stage", "source", "outcome")
+)
+PIPELINE_STAGE_SECONDS = REGISTRY.histogram(
+    "threatlens_pipeline_stage_seconds",
+    "Duration of each realtime pipeline stage call in seconds",
+    ("stage", "source")
+)
+EVENTS_PARSED = REGISTRY.counter(
+    "threatlens_events_parsed_total",
+    "Security events parsed from realtime log entries",
+    ("source", "category")
+)
+QUEUE_DEPTH = REGISTRY.gauge(
+    "threatlens_ingestion_queue_depth",
+    "Log entries waiting in the ingestion queue"
+)
+
+
+def observe_stage(stage: str, source: str, seconds: float, outcome: str = "ok", count: int = 1) -> None:
+    """
+    Record one call of a pipeline stage.
+    
+    The time is also added to the batch being profiled, if any (see
+    app.profiling.StageProfiler).
+    
+    Args:
+        stage: Stage name from PIPELINE_STAGES
+        source: Log source name
+        seconds: Duration of the call
+        outcome: "ok", "error" or a stage-specific outcome such as "rejected"
+        count: Number of items the call handled
+    """
+    PIPELINE_STAGE_SECONDS.labels(stage, source).observe(seconds)
+    if count:
+        PIPELINE_ITEMS.labels(stage, source, outcome).inc(count)
+    add_stage_time(stage, seconds)
+
+
+class StageTimer:
+    """
+    Times a block as one pipeline stage call.
+    
+    The block may await; the recorded time is wall-clock. Set outcome or
+    count inside the block to override the defaults; an exception records
+    the outcome "error".
+    
+    Example:
+        with stage_timer("validate", entry.source_name) as stage:
+            result = process_log_entry(entry)
+            if not result.success:
+                stage.outcome = "rejected"
+    """
+    
+    __slots__ = ("stage", "source", "outcome", "count", "started", "seconds")
+    
+    def __init__(self, stage: str, source: str):
+        self.stage = stage
+        self.source = source
+        self.outcome = "ok"
+        self.count = 1
+        self.started = 0.0
+        self.seconds = 0.0
+        
+    def __enter__(self) -> "StageTimer":
+        self.started = time.perf_counter()
+        return self
+        
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.seconds = time.perf_counter() - self.started
+        if exc_type is not None:
+            self.outcome = "error"
+        observe_stage(self.stage, self.source, self.seconds, self.outcome, self.count)
+        return False
+
+
+def stage_timer(stage: str, source: str) -> StageTimer:
+    """Time a pipeline stage call; see StageTimer."""
+    return StageTimer(stage, source)
@@ -3,20 +3,380 @@ Middleware for ThreatLens FastAPI application.
 
 This module provides middleware for request correlation IDs, error handling,
 logging, and other cross-cutting concerns.
+
+RequestPipelineMiddleware runs all of these as a single pure-ASGI layer:
+one pass per request, no extra task per feature, and response bodies are
+passed through untouched so streaming responses are never buffered. The
+individual BaseHTTPMiddleware classes remain for applications that only
+need one feature.
 """
+import os
 import time
 import uuid
 import logging
 import re
-from typing import Callable
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qsl
 from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response as StarletteResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.logging_config import get_logger, set_correlation_id, get_correlation_id
+from app.rate_limit import ExpiringMap, RateLimitBackend, SlidingWindowCounter, create_rate_limit_backend
 
 logger = get_logger(__name__)
 
+# Per-feature toggles for RequestPipelineMiddleware
+MIDDLEWARE_CORRELATION_ID = os.getenv("MIDDLEWARE_CORRELATION_ID", "true").lower() == "true"
+MIDDLEWARE_SECURITY_HEADERS = os.getenv("MIDDLEWARE_SECURITY_HEADERS", "true").lower() == "true"
+MIDDLEWARE_INPUT_VALIDATION = os.getenv("MIDDLEWARE_INPUT_VALIDATION", "true").lower() == "true"
+MIDDLEWARE_RATE_LIMIT = os.getenv("MIDDLEWARE_RATE_LIMIT", "true").lower() == "true"
+MIDDLEWARE_METRICS = os.getenv("MIDDLEWARE_METRICS", "true").lower() == "true"
+MIDDLEWARE_REQUEST_LOGGING = os.getenv("MIDDLEWARE_REQUEST_LOGGING", "true").lower() == "true"
+
+SERVER_HEADER = 'ThreatLens/1.0'
+SENSITIVE_HEADERS = ['X-Powered-By', 'X-AspNet-Version', 'X-AspNetMvc-Version']
+
+
+def build_security_headers(strict_csp: bool = False) -> Dict[str, str]:
+    """
+    Build the security headers added to every response.
+    
+    Args:
+        strict_csp: Use the strict production Content Security Policy
+        
+    Returns:
+        Header names mapped to values
+    """
+    # Base security headers
+    security_headers = {
+        'X-Content-Type-Options': 'nosniff',
+        'X-Frame-Options': 'DENY',
+        'X-XSS-Protection': '1; mode=block',
+        'Referrer-Policy': 'strict-origin-when-cross-origin',
+        'X-Permitted-Cross-Domain-Policies': 'none',
+        'X-Download-Options': 'noopen',
+        'Strict-Transport-Security': 'max-age=31536000; includeSubDomains; preload',
+        'Permissions-Policy': 'geolocation=(), microphone=(), camera=(), payment=(), usb=(), magnetometer=(), gyroscope=()',
+    }
+    
+    # Content Security Policy
+    if strict_csp:
+        # Strict CSP for production
+        security_headers['Content-Security-Policy'] = (
+            "default-src 'self'; "
+            "script-src 'self'; "
+            "style-src 'self'; "
+            "img-src 'self' data:; "
+            "font-src 'self'; "
+            "connect-src 'self' ws: wss:; "
+            "frame-ancestors 'none'; "
+            "base-uri 'self'; "
+            "form-action 'self';"
+        )
+    else:
+        # Relaxed CSP for development
+        security_headers['Content-Security-Policy'] = (
+            "default-src 'self'; "
+            "script-src 'self' 'unsafe-inline' 'unsafe-eval'; "
+            "style-src 'self' 'unsafe-inline'; "
+            "img-src 'self' data: blob:; "
+            "font-src 'self' data:; "
+            "connect-src 'self' ws: wss: http://localhost:* http://127.0.0.1:*; "
+            "frame-ancestors 'none'; "
+            "base-uri 'self';"
+        )
+        
+    return security_headers
+
+
+class RequestValidator:
+    """Check request size, query parameters and headers for dangerous input."""
+    
+    SUSPICIOUS_HEADERS = ('user-agent', 'referer', 'x-forwarded-for')
+    
+    def __init__(self, max_request_size: int = 50 * 1024 * 1024):
+        self.max_request_size = max_request_size
+        self.dangerous_patterns = [
+            r'<script[^>]*>.*?</script>',  # Script tags
+            r'javascript:',               # JavaScript protocol
+            r'vbscript:',                # VBScript protocol
+            r'on\w+\s*=',                # Event handlers
+            r'expression\s*\(',          # CSS expressions
+            r'@import',                  # CSS imports
+            r'<iframe[^>]*>',            # Iframes
+            r'<object[^>]*>',            # Objects
+            r'<embed[^>]*>',             # Embeds
+        ]
+        # One compiled alternation instead of a regex lookup per pattern
+        self._dangerous_re = re.compile(
+            '|'.join(f'(?:{pattern})' for pattern in self.dangerous_patterns),
+            re.IGNORECASE | re.DOTALL
+        )
+        
+    def validate(self, content_length: Optional[str], query_params: Iterable[Tuple[str, str]],
+                 headers: Mapping[str, str], client_ip: str) -> Optional[Tuple[int, str]]:
+        """
+        Validate a request before it reaches the application.
+        
+        Args:
+            content_length: Content-Length header value, if any
+            query_params: Query parameter name/value pairs
+            headers: Request headers (lower-case lookup)
+            client_ip: Client address for logging
+            
+        Returns:
+            (status_code, detail) if the request must be rejected, else None
+        """
+        # Validate request size
+        if content_length:
+            try:
+                size = int(content_length)
+                if size > self.max_request_size:
+                    logger.warning(
+                        f"Request size too large: {size} bytes from {client_ip}",
+                        extra={
+                            'validation_data': {
+                                'client_ip': client_ip,
+                                'request_size': size,
+                                'max_size': self.max_request_size,
+                                'correlation_id': get_correlation_id()
+                            }
+                        }
+                    )
+                    return 413, f"Request too large. Maximum size: {self.max_request_size} bytes"
+            except ValueError:
+                pass  # Invalid content-length header, let it pass
+                
+        # Validate query parameters
+        for param_name, param_value in query_params:
+            if self.contains_dangerous_patterns(param_value):
+                logger.warning(
+                    f"Dangerous pattern detected in query parameter '{param_name}': {param_value[:100]}",
+                    extra={
+                        'validation_data': {
+                            'client_ip': client_ip,
+                            'parameter': param_name,
+                            'correlation_id': get_correlation_id()
+                        }
+                    }
+                )
+                return 400, f"Invalid characters detected in parameter: {param_name}"
+                
+        # Validate headers for suspicious content
+        for header_name in self.SUSPICIOUS_HEADERS:
+            header_value = headers.get(header_name, '')
+            if self.contains_dangerous_patterns(header_value):
+                logger.warning(
+                    f"Dangerous pattern detected in header '{header_name}': {header_value[:100]}",
+                    extra={
+                        'validation_data': {
+                            'client_ip': client_ip,
+                            'header': header_name,
+                            'correlation_id': get_correlation_id()
+                        }
+                    }
+                )
+                # Don't block on headers, just log
+                
+        return None
+        
+    def contains_dangerous_patterns(self, text: str) -> bool:
+        """Check if text contains dangerous patterns."""
+        if not isinstance(text, str) or not text:
+            return False
+            
+        return self._dangerous_re.search(text) is not None
+
+
+class HTTPRateLimiter:
+    """Per-client HTTP rate limiting with burst limits and progressive blocking."""
+    
+    def __init__(self, requests_per_minute: int = 60, burst_limit: int = 10, block_duration: int = 300,
+                 backend: Optional[RateLimitBackend] = None):
+        self.requests_per_minute = requests_per_minute
+        self.burst_limit = burst_limit  # Max requests in 10 seconds
+        self.block_duration = block_duration  # Block duration in seconds for repeated violations
+        
+        # Bounded per-client state; idle clients expire on their own
+        backend = backend or create_rate_limit_backend()
+        self.request_counts = SlidingWindowCounter(60, name="http_minute", backend=backend)
+        self.burst_counts = SlidingWindowCounter(10, name="http_burst", backend=backend)
+        self.violation_counts = SlidingWindowCounter(3600, name="http_violations")  # Violations in the last hour
+        self.blocked_clients: ExpiringMap[float] = ExpiringMap(ttl=block_duration * 2)  # Track blocked clients
+        
+    def check(self, client_ip: str, current_time: Optional[float] = None) -> Optional[Tuple[str, Dict[str, str]]]:
+        """
+        Count a request and decide whether it is allowed.
+        
+        Args:
+            client_ip: Client address
+            current_time: Request time (defaults to now)
+            
+        Returns:
+            (detail, headers) for a 429 response if the request is limited, else None
+        """
+        current_time = time.time() if current_time is None else current_time
+        
+        # Check if client is currently blocked
+        blocked_until = self.blocked_clients.get(client_ip, current_time)
+        if blocked_until is not None:
+            remaining_time = int(blocked_until - current_time)
+            logger.warning(
+                f"Blocked client {client_ip} attempted request",
+                extra={
+                    'blocked_client_data': {
+                        'client_ip': client_ip,
+                        'remaining_block_time': remaining_time,
+                        'correlation_id': get_correlation_id()
+                    }
+                }
+            )
+            return (
+                f"Client blocked due to repeated rate limit violations. Try again in {remaining_time} seconds.",
+                {"Retry-After": str(remaining_time)}
+            )
+            
+        # Check burst limit (requests in a sliding 10 second window)
+        if not self.burst_counts.hit(client_ip, self.burst_limit, current_time):
+            self._handle_rate_limit_violation(client_ip, "burst", current_time)
+            return (
+                "Burst rate limit exceeded. Please slow down your requests.",
+                {"Retry-After": str(max(1, self.burst_counts.retry_after(client_ip, self.burst_limit, current_time)))}
+            )
+            
+        # Check main rate limit (requests in a sliding minute)
+        if not self.request_counts.hit(client_ip, self.requests_per_minute, current_time):
+            self._handle_rate_limit_violation(client_ip, "rate", current_time)
+            return (
+                "Rate limit exceeded. Please try again later.",
+                {"Retry-After": str(max(1, self.request_counts.retry_after(client_ip, self.requests_per_minute, current_time)))}
+            )
+            
+        return None
+        
+    def _handle_rate_limit_violation(self, client_ip: str, violation_type: str, current_time: float):
+        """Handle rate limit violations and implement progressive blocking."""
+        # Track violations
+        violation_count = int(self.violation_counts.add(client_ip, current_time))
+        
+        # Progressive blocking: more violations = longer blocks
+        if violation_count >= 5:
+            block_duration = self.block_duration * 2  # 10 minutes
+        elif violation_count >= 3:
+            block_duration = self.block_duration  # 5 minutes
+        else:
+            block_duration = 0  # No blocking for first few violations
+            
+        if block_duration > 0:
+            self.blocked_clients.set(client_ip, current_time + block_duration, current_time, ttl=block_duration)
+            logger.error(
+                f"Client {client_ip} blocked for {block_duration} seconds due to repeated violations",
+                extra={
+                    'blocking_data': {
+                        'client_ip': client_ip,
+                        'violation_type': violation_type,
+                        'violation_count': violation_count,
+                        'block_duration': block_duration,
+                        'correlation_id': get_correlation_id()
+                    }
+                }
+            )
+            
+        logger.warning(
+            f"Rate limit violation for client {client_ip}: {violation_type}",
+            extra={
+                'rate_limit_data': {
+                    'client_ip': client_ip,
+                    'violation_type': violation_type,
+                    'requests_in_window': int(self.request_counts.count(client_ip, current_time)),
+                    'burst_requests': int(self.burst_counts.count(client_ip, current_time)),
+                    'limit': self.requests_per_minute,
+                    'burst_limit': self.burst_limit,
+                    'violation_count': violation_count,
+                    'correlation_id': get_correlation_id()
+                }
+            }
+        )
+        
+    def get_statistics(self) -> dict:
+        """Get rate limiter statistics."""
+        return {
+            'minute': self.request_counts.get_statistics(),
+            'burst': self.burst_counts.get_statistics(),
+            'blocked_clients': self.blocked_clients.size
+        }
+
+
+class RequestMetrics:
+    """Request counts and timings, overall and per endpoint."""
+    
+    def __init__(self):
+        self.request_count = 0
+        self.error_count = 0
+        self.total_processing_time = 0.0
+        self.endpoint_metrics = {}
+        
+    def record(self, endpoint: str, processing_time: float, status_code: Optional[int] = None):
+        """
+        Record a finished request.
+        
+        Args:
+            endpoint: "METHOD path" key
+            processing_time: Seconds spent handling the request
+            status_code: Response status, or None if the request raised
+        """
+        endpoint_data = self.endpoint_metrics.get(endpoint)
+        if endpoint_data is None:
+            endpoint_data = self.endpoint_metrics[endpoint] = {
+                'count': 0,
+                'errors': 0,
+                'total_time': 0.0,
+                'avg_time': 0.0
+            }
+            
+        if status_code is None:
+            # Update error metrics
+            self.error_count += 1
+            endpoint_data['errors'] += 1
+            return
+            
+        self.request_count += 1
+        self.total_processing_time += processing_time
+        
+        endpoint_data['count'] += 1
+        endpoint_data['total_time'] += processing_time
+        endpoint_data['avg_time'] = endpoint_data['total_time'] / endpoint_data['count']
+        
+        if status_code >= 400:
+            self.error_count += 1
+            endpoint_data['errors'] += 1
+            
+    def get_metrics(self) -> dict:
+        """Get current metrics data."""
+        avg_processing_time = (
+            self.total_processing_time / self.request_count
+            if self.request_count > 0 else 0.0
+        )
+        
+        return {
+            'total_requests': self.request_count,
+            'total_errors': self.error_count,
+            'error_rate': self.error_count / self.request_count if self.request_count > 0 else 0.0,
+            'average_processing_time': avg_processing_time,
+            'endpoint_metrics': self.endpoint_metrics.copy()
+        }
+        
+    def reset_metrics(self):
+        """Reset all metrics."""
+        self.request_count = 0
+        self.error_count = 0
+        self.total_processing_time = 0.0
+        self.endpoint_metrics.clear()
+
 
 class CorrelationIdMiddleware(BaseHTTPMiddleware):
     """Middleware to add correlation IDs to requests."""
@@ -24,13 +384,13 @@ class CorrelationIdMiddleware(BaseHTTPMiddleware):
     def __init__(self, app, header_name: str = "X-Correlation-ID"):
         super().__init__(app)
         self.header_name = header_name
-    
+        
     async def dispatch(self, request: Request, call_next: Callable) -> StarletteResponse:
         # Get correlation ID from header or generate new one
         correlation_id = request.headers.get(self.header_name)
         if not correlation_id:
             correlation_id = str(uuid.uuid4())
-        
+            
         # Set correlation ID in context
         set_correlation_id(correlation_id)
         
@@ -50,7 +410,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
         super().__init__(app)
         self.log_body = log_body
         self.max_body_size = max_body_size
-    
+        
     async def dispatch(self, request: Request, call_next: Callable) -> StarletteResponse:
         start_time = time.time()
         correlation_id = get_correlation_id()
@@ -78,7 +438,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
                     request_data['body_truncated'] = True
             except Exception as e:
                 request_data['body_error'] = str(e)
-        
+                
         logger.info(
             f"Request started: {request.method} {request.url.path}",
             extra={'request_data': request_data}
@@ -104,7 +464,7 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
                 log_level = 'warning'
             else:
                 log_level = 'info'
-            
+                
             getattr(logger, log_level)(
                 f"Request completed: {request.method} {request.url.path} - {response.status_code} ({processing_time:.3f}s)",
                 extra={'response_data': response_data}
@@ -136,193 +496,47 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
     def __init__(self, app, strict_csp: bool = False):
         super().__init__(app)
         self.strict_csp = strict_csp
+        self.security_headers = build_security_headers(strict_csp)
         
-        # Base security headers
-        self.security_headers = {
-            'X-Content-Type-Options': 'nosniff',
-            'X-Frame-Options': 'DENY',
-            'X-XSS-Protection': '1; mode=block',
-            'Referrer-Policy': 'strict-origin-when-cross-origin',
-            'X-Permitted-Cross-Domain-Policies': 'none',
-            'X-Download-Options': 'noopen',
-            'Strict-Transport-Security': 'max-age=31536000; includeSubDomains; preload',
-            'Permissions-Policy': 'geolocation=(), microphone=(), camera=(), payment=(), usb=(), magnetometer=(), gyroscope=()',
-        }
-        
-        # Content Security Policy
-        if strict_csp:
-            # Strict CSP for production
-            self.security_headers['Content-Security-Policy'] = (
-                "default-src 'self'; "
-                "script-src 'self'; "
-                "style-src 'self'; "
-                "img-src 'self' data:; "
-                "font-src 'self'; "
-                "connect-src 'self' ws: wss:; "
-                "frame-ancestors 'none'; "
-                "base-uri 'self'; "
-                "form-action 'self';"
-            )
-        else:
-            # Relaxed CSP for development
-            self.security_headers['Content-Security-Policy'] = (
-                "default-src 'self'; "
-                "script-src 'self' 'unsafe-inline' 'unsafe-eval'; "
-                "style-src 'self' 'unsafe-inline'; "
-                "img-src 'self' data: blob:; "
-                "font-src 'self' data:; "
-                "connect-src 'self' ws: wss: http://localhost:* http://127.0.0.1:*; "
-                "frame-ancestors 'none'; "
-                "base-uri 'self';"
-            )
-    
     async def dispatch(self, request: Request, call_next: Callable) -> StarletteResponse:
         response = await call_next(request)
         
         # Add security headers
         for header, value in self.security_headers.items():
             response.headers[header] = value
-        
+            
         # Add server header obfuscation
-        response.headers['Server'] = 'ThreatLens/1.0'
+        response.headers['Server'] = SERVER_HEADER
         
         # Remove potentially sensitive headers
-        sensitive_headers = ['X-Powered-By', 'X-AspNet-Version', 'X-AspNetMvc-Version']
-        for header in sensitive_headers:
+        for header in SENSITIVE_HEADERS:
             if header in response.headers:
                 del response.headers[header]
-        
+                
         return response
 
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
     """Enhanced rate limiting middleware with multiple strategies."""
     
-    def __init__(self, app, requests_per_minute: int = 60, burst_limit: int = 10, block_duration: int = 300):
+    def __init__(self, app, requests_per_minute: int = 60, burst_limit: int = 10, block_duration: int = 300,
+                 backend: Optional[RateLimitBackend] = None):
         super().__init__(app)
-        self.requests_per_minute = requests_per_minute
-        self.burst_limit = burst_limit  # Max requests in 10 seconds
-        self.block_duration = block_duration  # Block duration in seconds for repeated violations
-        self.request_counts = {}
-        self.window_start = {}
-        self.burst_counts = {}
-        self.burst_window_start = {}
-        self.blocked_clients = {}  # Track blocked clients
-        self.violation_counts = {}  # Track repeated violations
-    
+        self.limiter = HTTPRateLimiter(requests_per_minute, burst_limit, block_duration, backend=backend)
+        
     async def dispatch(self, request: Request, call_next: Callable) -> StarletteResponse:
         client_ip = request.client.host if request.client else 'unknown'
-        current_time = time.time()
-        window_duration = 60  # 1 minute window
-        burst_window = 10  # 10 second burst window
         
-        # Check if client is currently blocked
-        if client_ip in self.blocked_clients:
-            if current_time < self.blocked_clients[client_ip]:
-                remaining_time = int(self.blocked_clients[client_ip] - current_time)
-                logger.warning(
-                    f"Blocked client {client_ip} attempted request",
-                    extra={
-                        'blocked_client_data': {
-                            'client_ip': client_ip,
-                            'remaining_block_time': remaining_time,
-                            'correlation_id': get_correlation_id()
-                        }
-                    }
-                )
-                from fastapi import HTTPException
-                raise HTTPException(
-                    status_code=429,
-                    detail=f"Client blocked due to repeated rate limit violations. Try again in {remaining_time} seconds.",
-                    headers={"Retry-After": str(remaining_time)}
-                )
-            else:
-                # Block expired, remove from blocked list
-                del self.blocked_clients[client_ip]
-        
-        # Initialize or reset burst window for client
-        if client_ip not in self.burst_window_start or current_time - self.burst_window_start[client_ip] >= burst_window:
-            self.burst_window_start[client_ip] = current_time
-            self.burst_counts[client_ip] = 0
-        
-        # Initialize or reset main window for client
-        if client_ip not in self.window_start or current_time - self.window_start[client_ip] >= window_duration:
-            self.window_start[client_ip] = current_time
-            self.request_counts[client_ip] = 0
-        
-        # Check burst limit (10 requests in 10 seconds)
-        self.burst_counts[client_ip] += 1
-        if self.burst_counts[client_ip] > self.burst_limit:
-            self._handle_rate_limit_violation(client_ip, "burst", current_time)
-            from fastapi import HTTPException
-            raise HTTPException(
-                status_code=429,
-                detail="Burst rate limit exceeded. Please slow down your requests.",
-                headers={"Retry-After": "10"}
-            )
-        
-        # Check main rate limit
-        self.request_counts[client_ip] += 1
-        if self.request_counts[client_ip] > self.requests_per_minute:
-            self._handle_rate_limit_violation(client_ip, "rate", current_time)
+        limited = self.limiter.check(client_ip)
+        if limited is not None:
             from fastapi import HTTPException
-            raise HTTPException(
-                status_code=429,
-                detail="Rate limit exceeded. Please try again later.",
-                headers={"Retry-After": "60"}
-            )
-        
+            raise HTTPException(status_code=429, detail=limited[0], headers=limited[1])
+            
         return await call_next(request)
-    
-    def _handle_rate_limit_violation(self, client_ip: str, violation_type: str, current_time: float):
-        """Handle rate limit violations and implement progressive blocking."""
-        # Track violations
-        if client_ip not in self.violation_counts:
-            self.violation_counts[client_ip] = {'count': 0, 'last_violation': 0}
-        
-        self.violation_counts[client_ip]['count'] += 1
-        self.violation_counts[client_ip]['last_violation'] = current_time
         
-        violation_count = self.violation_counts[client_ip]['count']
-        
-        # Progressive blocking: more violations = longer blocks
-        if violation_count >= 5:
-            block_duration = self.block_duration * 2  # 10 minutes
-        elif violation_count >= 3:
-            block_duration = self.block_duration  # 5 minutes
-        else:
-            block_duration = 0  # No blocking for first few violations
-        
-        if block_duration > 0:
-            self.blocked_clients[client_ip] = current_time + block_duration
-            logger.error(
-                f"Client {client_ip} blocked for {block_duration} seconds due to repeated violations",
-                extra={
-                    'blocking_data': {
-                        'client_ip': client_ip,
-                        'violation_type': violation_type,
-                        'violation_count': violation_count,
-                        'block_duration': block_duration,
-                        'correlation_id': get_correlation_id()
-                    }
-                }
-            )
-        
-        logger.warning(
-            f"Rate limit violation for client {client_ip}: {violation_type}",
-            extra={
-                'rate_limit_data': {
-                    'client_ip': client_ip,
-                    'violation_type': violation_type,
-                    'requests_in_window': self.request_counts.get(client_ip, 0),
-                    'burst_requests': self.burst_counts.get(client_ip, 0),
-                    'limit': self.requests_per_minute,
-                    'burst_limit': self.burst_limit,
-                    'violation_count': violation_count,
-                    'correlation_id': get_correlation_id()
-                }
-            }
-        )
+    def get_statistics(self) -> dict:
+        """Get rate limiter statistics."""
+        return self.limiter.get_statistics()
 
 
 class HealthCheckMiddleware(BaseHTTPMiddleware):
@@ -331,7 +545,7 @@ class HealthCheckMiddleware(BaseHTTPMiddleware):
     def __init__(self, app, health_path: str = "/health"):
         super().__init__(app)
         self.health_path = health_path
-    
+        
     async def dispatch(self, request: Request, call_next: Callable) -> StarletteResponse:
         # Quick health check response without full processing
         if request.url.path == self.health_path and request.method == "GET":
@@ -344,158 +558,64 @@ class HealthCheckMiddleware(BaseHTTPMiddleware):
                 },
                 status_code=200
             )
-        
+            
         return await call_next(request)
 
 
+
 class InputValidationMiddleware(BaseHTTPMiddleware):
     """Middleware to validate and sanitize request inputs."""
     
     def __init__(self, app, max_request_size: int = 50 * 1024 * 1024):
         super().__init__(app)
-        self.max_request_size = max_request_size
-        self.dangerous_patterns = [
-            r'<script[^>]*>.*?</script>',  # Script tags
-            r'javascript:',               # JavaScript protocol
-            r'vbscript:',                # VBScript protocol
-            r'on\w+\s*=',                # Event handlers
-            r'expression\s*\(',          # CSS expressions
-            r'@import',                  # CSS imports
-            r'<iframe[^>]*>',            # Iframes
-            r'<object[^>]*>',            # Objects
-            r'<embed[^>]*>',             # Embeds
-        ]
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> StarletteResponse:
-        # Validate request size
-        content_length = request.headers.get('content-length')
-        if content_length:
-            try:
-                size = int(content_length)
-                if size > self.max_request_size:
-                    logger.warning(
-                        f"Request size too large: {size} bytes from {request.client.host if request.client else 'unknown'}",
-                        extra={
-                            'validation_data': {
-                                'client_ip': request.client.host if request.client else 'unknown',
-                                'request_size': size,
-                                'max_size': self.max_request_size,
-                                'correlation_id': get_correlation_id()
-                            }
-                        }
-                    )
-                    from fastapi import HTTPException
-                    raise HTTPException(
-                        status_code=413,
-                        detail=f"Request too large. Maximum size: {self.max_request_size} bytes"
-                    )
-            except ValueError:
-                pass  # Invalid content-length header, let it pass
-        
-        # Validate query parameters
-        for param_name, param_value in request.query_params.items():
-            if self._contains_dangerous_patterns(param_value):
-                logger.warning(
-                    f"Dangerous pattern detected in query parameter '{param_name}': {param_value[:100]}",
-                    extra={
-                        'validation_data': {
-                            'client_ip': request.client.host if request.client else 'unknown',
-                            'parameter': param_name,
-                            'correlation_id': get_correlation_id()
-                        }
-                    }
-                )
-                from fastapi import HTTPException
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Invalid characters detected in parameter: {param_name}"
-                )
+        self.validator = RequestValidator(max_request_size)
         
-        # Validate headers for suspicious content
-        suspicious_headers = ['user-agent', 'referer', 'x-forwarded-for']
-        for header_name in suspicious_headers:
-            header_value = request.headers.get(header_name, '')
-            if self._contains_dangerous_patterns(header_value):
-                logger.warning(
-                    f"Dangerous pattern detected in header '{header_name}': {header_value[:100]}",
-                    extra={
-                        'validation_data': {
-                            'client_ip': request.client.host if request.client else 'unknown',
-                            'header': header_name,
-                            'correlation_id': get_correlation_id()
-                        }
-                    }
-                )
-                # Don't block on headers, just log
+    async def dispatch(self, request: Request, call_next: Callable) -> StarletteResponse:
+        client_ip = request.client.host if request.client else 'unknown'
         
+        error = self.validator.validate(
+            request.headers.get('content-length'),
+            request.query_params.multi_items(),
+            request.headers,
+            client_ip
+        )
+        if error is not None:
+            from fastapi import HTTPException
+            raise HTTPException(status_code=error[0], detail=error[1])
+            
         return await call_next(request)
-    
-    def _contains_dangerous_patterns(self, text: str) -> bool:
-        """Check if text contains dangerous patterns."""
-        if not isinstance(text, str):
-            return False
-        
-        text_lower = text.lower()
-        for pattern in self.dangerous_patterns:
-            if re.search(pattern, text_lower, re.IGNORECASE | re.DOTALL):
-                return True
-        
-        return False
 
 
 class MetricsMiddleware(BaseHTTPMiddleware):
     """Middleware to collect request metrics."""
     
-    def __init__(self, app):
+    def __init__(self, app, metrics: Optional[RequestMetrics] = None):
         super().__init__(app)
-        self.request_count = 0
-        self.error_count = 0
-        self.total_processing_time = 0.0
-        self.endpoint_metrics = {}
-    
+        self.metrics = metrics or RequestMetrics()
+        
     async def dispatch(self, request: Request, call_next: Callable) -> StarletteResponse:
         start_time = time.time()
         endpoint = f"{request.method} {request.url.path}"
         
-        # Initialize endpoint metrics if not exists
-        if endpoint not in self.endpoint_metrics:
-            self.endpoint_metrics[endpoint] = {
-                'count': 0,
-                'errors': 0,
-                'total_time': 0.0,
-                'avg_time': 0.0
-            }
-        
         try:
             response = await call_next(request)
             processing_time = time.time() - start_time
             
             # Update metrics
-            self.request_count += 1
-            self.total_processing_time += processing_time
-            
-            endpoint_data = self.endpoint_metrics[endpoint]
-            endpoint_data['count'] += 1
-            endpoint_data['total_time'] += processing_time
-            endpoint_data['avg_time'] = endpoint_data['total_time'] / endpoint_data['count']
-            
-            if response.status_code >= 400:
-                self.error_count += 1
-                endpoint_data['errors'] += 1
+            self.metrics.record(endpoint, processing_time, response.status_code)
             
             # Add metrics to response headers (for debugging)
             if logger.isEnabledFor(logging.DEBUG):
                 response.headers['X-Processing-Time'] = f"{processing_time:.3f}"
-                response.headers['X-Request-Count'] = str(self.request_count)
-            
+                response.headers['X-Request-Count'] = str(self.metrics.request_count)
+                
             return response
             
         except Exception as e:
             processing_time = time.time() - start_time
             
             # Update error metrics
-            self.error_count += 1
-            self.endpoint_metrics[endpoint]['errors'] += 1
+            self.metrics.record(endpoint, processing_time)
             
             logger.debug(
                 f"Request metrics - Error in {endpoint}: {processing_time:.3f}s",
@@ -504,48 +624,246 @@ class MetricsMiddleware(BaseHTTPMiddleware):
                         'endpoint': endpoint,
                         'processing_time': processing_time,
                         'error_type': type(e).__name__,
-                        'total_requests': self.request_count,
-                        'total_errors': self.error_count
+                        'total_requests': self.metrics.request_count,
+                        'total_errors': self.metrics.error_count
                     }
                 }
             )
             
             raise
-    
+            
     def get_metrics(self) -> dict:
         """Get current metrics data."""
-        avg_processing_time = (
-            self.total_processing_time / self.request_count 
-            if self.request_count > 0 else 0.0
-        )
+        return self.metrics.get_metrics()
         
-        return {
-            'total_requests': self.request_count,
-            'total_errors': self.error_count,
-            'error_rate': self.error_count / self.request_count if self.request_count > 0 else 0.0,
-            'average_processing_time': avg_processing_time,
-            'endpoint_metrics': self.endpoint_metrics.copy()
-        }
-    
     def reset_metrics(self):
         """Reset all metrics."""
-        self.request_count = 0
-        self.error_count = 0
-        self.total_processing_time = 0.0
-        self.endpoint_metrics.clear()
+        self.metrics.reset_metrics()
+
+
+class RequestPipelineMiddleware:
+    """
+    Pure-ASGI middleware that runs every request-level feature in one pass.
+    
+    Correlation IDs, input validation, rate limiting, security headers,
+    metrics and request logging are each enabled by a constructor flag
+    (defaulting to the MIDDLEWARE_* environment settings). Response headers
+    are added when the response starts; body messages are forwarded as-is,
+    so streaming responses are never wrapped or buffered. Requests that
+    fail validation or rate limiting are answered here without reaching
+    the application.
+    """
+    
+    def __init__(self, app: ASGIApp,
+                 correlation_id: bool = MIDDLEWARE_CORRELATION_ID,
+                 correlation_header: str = "X-Correlation-ID",
+                 security_headers: bool = MIDDLEWARE_SECURITY_HEADERS,
+                 strict_csp: bool = False,
+                 input_validation: bool = MIDDLEWARE_INPUT_VALIDATION,
+                 max_request_size: int = 50 * 1024 * 1024,
+                 rate_limit: bool = MIDDLEWARE_RATE_LIMIT,
+                 requests_per_minute: int = 60,
+                 burst_limit: int = 10,
+                 block_duration: int = 300,
+                 rate_limit_backend: Optional[RateLimitBackend] = None,
+                 collect_metrics: bool = MIDDLEWARE_METRICS,
+                 metrics: Optional[RequestMetrics] = None,
+                 request_logging: bool = MIDDLEWARE_REQUEST_LOGGING,
+                 log_body: bool = False,
+                 max_body_size: int = 1024):
+        self.app = app
+        self.correlation_header = correlation_header if correlation_id else None
+        self.validator = RequestValidator(max_request_size) if input_validation else None
+        self.limiter = HTTPRateLimiter(
+            requests_per_minute, burst_limit, block_duration, backend=rate_limit_backend
+        ) if rate_limit else None
+        self.metrics = (metrics or RequestMetrics()) if collect_metrics else None
+        self.request_logging = request_logging
+        self.log_body = log_body
+        self.max_body_size = max_body_size
+        
+        # Response headers are pre-encoded once; the names they replace are
+        # dropped from the application's headers before ours are appended
+        added: List[Tuple[bytes, bytes]] = []
+        if security_headers:
+            added.extend(
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in build_security_headers(strict_csp).items()
+            )
+            added.append((b'server', SERVER_HEADER.encode('latin-1')))
+        self._added_headers = added
+        
+        replaced = {name for name, _ in added}
+        if security_headers:
+            replaced.update(name.lower().encode('latin-1') for name in SENSITIVE_HEADERS)
+        if self.correlation_header:
+            replaced.add(self.correlation_header.lower().encode('latin-1'))
+        self._replaced_headers = frozenset(replaced)
+        
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+            
+        start_time = time.perf_counter()
+        method = scope["method"]
+        path = scope["path"]
+        headers = Headers(scope=scope)
+        client = scope.get("client")
+        client_ip = client[0] if client else 'unknown'
+        
+        # Get correlation ID from header or generate new one
+        correlation_id = None
+        if self.correlation_header:
+            correlation_id = headers.get(self.correlation_header) or str(uuid.uuid4())
+            set_correlation_id(correlation_id)
+        else:
+            correlation_id = get_correlation_id()
+            
+        query_string = scope.get("query_string", b"").decode("latin-1")
+        query_params = parse_qsl(query_string, keep_blank_values=True) if query_string else []
+        log_requests = self.request_logging and logger.isEnabledFor(logging.INFO)
+        
+        if log_requests:
+            logger.info(
+                f"Request started: {method} {path}",
+                extra={'request_data': {
+                    'method': method,
+                    'url': f"{path}?{query_string}" if query_string else path,
+                    'path': path,
+                    'query_params': dict(query_params),
+                    'headers': dict(headers),
+                    'client_host': client[0] if client else None,
+                    'correlation_id': correlation_id
+                }}
+            )
+            
+        # Reject before the application runs. The limiter goes first so that
+        # invalid and oversized requests still count toward the rate limit.
+        rejection: Optional[Response] = None
+        if self.limiter is not None:
+            limited = self.limiter.check(client_ip)
+            if limited is not None:
+                rejection = JSONResponse(status_code=429, content={"detail": limited[0]}, headers=limited[1])
+        if rejection is None and self.validator is not None:
+            error = self.validator.validate(headers.get('content-length'), query_params, headers, client_ip)
+            if error is not None:
+                rejection = JSONResponse(status_code=error[0], content={"detail": error[1]})
+                
+        # Count request body bytes as they stream through, without buffering
+        body_size = 0
+        if self.log_body and log_requests and method not in ('GET', 'HEAD', 'OPTIONS'):
+            inner_receive = receive
+            
+            async def receive() -> Message:
+                nonlocal body_size
+                message = await inner_receive()
+                if message["type"] == "http.request":
+                    body_size += len(message.get("body", b""))
+                return message
+                
+        status_code = None
+        response_headers: List[Tuple[bytes, bytes]] = []
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_headers
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                raw = [
+                    (name, value) for name, value in message.get("headers", ())
+                    if name.lower() not in self._replaced_headers
+                ]
+                raw.extend(self._added_headers)
+                if self.correlation_header:
+                    raw.append((self.correlation_header.lower().encode('latin-1'), correlation_id.encode('latin-1')))
+                    
+                # Add metrics to response headers (for debugging)
+                if self.metrics is not None and logger.isEnabledFor(logging.DEBUG):
+                    raw.append((b'x-processing-time', f"{time.perf_counter() - start_time:.3f}".encode('latin-1')))
+                    raw.append((b'x-request-count', str(self.metrics.request_count + 1).encode('latin-1')))
+                    
+                message["headers"] = response_headers = raw
+            await send(message)
+            
+        try:
+            if rejection is not None:
+                await rejection(scope, receive, send_wrapper)
+            else:
+                await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            processing_time = time.perf_counter() - start_time
+            if self.metrics is not None:
+                self.metrics.record(f"{method} {path}", processing_time)
+                
+            if self.request_logging:
+                logger.error(
+                    f"Request failed: {method} {path} - {type(e).__name__} ({processing_time:.3f}s)",
+                    exc_info=True,
+                    extra={
+                        'error_data': {
+                            'error_type': type(e).__name__,
+                            'error_message': str(e),
+                            'processing_time_seconds': processing_time,
+                            'correlation_id': correlation_id
+                        }
+                    }
+                )
+            raise
+            
+        processing_time = time.perf_counter() - start_time
+        if self.metrics is not None and status_code is not None:
+            self.metrics.record(f"{method} {path}", processing_time, status_code)
+            
+        if log_requests and status_code is not None:
+            # Log level based on status code
+            if status_code >= 500:
+                log_level = 'error'
+            elif status_code >= 400:
+                log_level = 'warning'
+            else:
+                log_level = 'info'
+                
+            response_data = {
+                'status_code': status_code,
+                'processing_time_seconds': processing_time,
+                'response_headers': {
+                    name.decode('latin-1'): value.decode('latin-1') for name, value in response_headers
+                },
+                'correlation_id': correlation_id
+            }
+            if body_size:
+                response_data['body_size'] = body_size
+                if body_size > self.max_body_size:
+                    response_data['body_truncated'] = True
+                    
+            getattr(logger, log_level)(
+                f"Request completed: {method} {path} - {status_code} ({processing_time:.3f}s)",
+                extra={'response_data': response_data}
+            )
+            
+    def get_statistics(self) -> dict:
+        """Get enabled features and their statistics."""
+        return {
+            'correlation_id': self.correlation_header is not None,
+            'security_headers': bool(self._added_headers),
+            'input_validation': self.validator is not None,
+            'rate_limit': self.limiter.get_statistics() if self.limiter is not None else None,
+            'metrics': self.metrics is not None,
+            'request_logging': self.request_logging
+        }
 
 
 # Global metrics instance
 metrics_middleware_instance = None
 
 
-def get_metrics_middleware() -> MetricsMiddleware:
-    """Get the global metrics middleware instance."""
+def get_metrics_middleware() -> Optional[RequestMetrics]:
+    """Get the global request metrics instance."""
     global metrics_middleware_instance
     return metrics_middleware_instance
 
 
-def set_metrics_middleware(instance: MetricsMiddleware):
-    """Set the global metrics middleware instance."""
+def set_metrics_middleware(instance: RequestMetrics):
+    """Set the global request metrics instance."""
     global metrics_middleware_instance
-    metrics_middleware_instance = instance
\ No newline at end of file
+    metrics_middleware_instance = instance
@@ -0,0 +1,33 @@
+"""
+Migration 005: Add notification digests table
+Stores pending notification digests so aggregated events survive restarts.
+"""
+
+VERSION = "005_add_notification_digests"
+DESCRIPTION = "Add table for pending notification digests"
+
+FORWARD_SQL = """
+CREATE TABLE IF NOT EXISTS notification_digests (
+    digest_key VARCHAR(500) PRIMARY KEY,
+    rule_name VARCHAR(255) NOT NULL,
+    source VARCHAR(255) NOT NULL,
+    category VARCHAR(100) NOT NULL,
+    window_end TIMESTAMP NOT NULL,
+    event_count INTEGER NOT NULL DEFAULT 0,
+    max_severity INTEGER NOT NULL DEFAULT 0,
+    first_event_id VARCHAR NOT NULL,
+    last_event_id VARCHAR NOT NULL,
+    first_seen TIMESTAMP NOT NULL,
+    last_seen TIMESTAMP NOT NULL,
+    samples TEXT NOT NULL DEFAULT '[]',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Index for finding digests whose window has closed
+CREATE INDEX IF NOT EXISTS idx_notification_digests_window_end ON notification_digests(window_end);
+"""
+
+ROLLBACK_SQL = """
+DROP INDEX IF EXISTS idx_notification_digests_window_end;
+DROP TABLE IF EXISTS notification_digests;
+"""
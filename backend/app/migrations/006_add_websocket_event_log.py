@@ -0,0 +1,21 @@
+"""
+Migration 006: Add WebSocket event log table
+Keeps the broadcast replay buffer so clients can resume with last_seq after a restart.
+"""
+
+VERSION = "006_add_websocket_event_log"
+DESCRIPTION = "Add table for the WebSocket event replay log"
+
+FORWARD_SQL = """
+CREATE TABLE IF NOT EXISTS websocket_event_log (
+    seq INTEGER PRIMARY KEY,
+    event_type VARCHAR(100) NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 5,
+    data TEXT NOT NULL,
+    timestamp TIMESTAMP NOT NULL
+);
+"""
+
+ROLLBACK_SQL = """
+DROP TABLE IF EXISTS websocket_event_log;
+"""
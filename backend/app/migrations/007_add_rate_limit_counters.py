@@ -0,0 +1,21 @@
+"""
+Migration 007: Add rate limit counters table
+Lets workers share rate limit windows when RATE_LIMIT_BACKEND=database.
+"""
+
+VERSION = "007_add_rate_limit_counters"
+DESCRIPTION = "Add table for shared rate limit counters"
+
+FORWARD_SQL = """
+CREATE TABLE IF NOT EXISTS rate_limit_counters (
+    limiter VARCHAR(100) NOT NULL,
+    client_key VARCHAR(255) NOT NULL,
+    window_index INTEGER NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (limiter, client_key, window_index)
+);
+"""
+
+ROLLBACK_SQL = """
+DROP TABLE IF EXISTS rate_limit_counters;
+"""
@@ -8,7 +8,7 @@ from typing import Dict, Any, Optional
 from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 
-from app.database import get_db_session
+from app.database import get_db_session, create_database_engine
 
 logger = logging.getLogger(__name__)
 
@@ -130,15 +130,16 @@ class DatabaseCleanup:
     
     def vacuum_database(self) -> bool:
         """
-        Run VACUUM on SQLite database to reclaim space and optimize.
+        Run VACUUM on the database to reclaim space and optimize.
         
         Returns:
             True if successful, False otherwise
         """
         try:
-            with get_db_session() as db:
-                # SQLite VACUUM command
-                db.execute(text("VACUUM"))
+            # VACUUM cannot run inside a transaction block on PostgreSQL
+            engine = create_database_engine()
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.execute(text("VACUUM"))
                 logger.info("Database VACUUM completed successfully")
                 return True
                 
@@ -150,14 +151,13 @@ class DatabaseCleanup:
     
     def analyze_database(self) -> bool:
         """
-        Run ANALYZE on SQLite database to update query planner statistics.
+        Run ANALYZE on the database to update query planner statistics.
         
         Returns:
             True if successful, False otherwise
         """
         try:
             with get_db_session() as db:
-                # SQLite ANALYZE command
                 db.execute(text("ANALYZE"))
                 logger.info("Database ANALYZE completed successfully")
                 return True
@@ -222,14 +222,24 @@ class DatabaseCleanup:
         
         try:
             with get_db_session() as db:
-                # Get page count and page size
-                result = db.execute(text("PRAGMA page_count"))
-                size_info["total_pages"] = result.scalar() or 0
-                
-                result = db.execute(text("PRAGMA page_size"))
-                size_info["page_size"] = result.scalar() or 0
-                
-                size_info["total_size_bytes"] = size_info["total_pages"] * size_info["page_size"]
+                if db.get_bind().dialect.name == "postgresql":
+                    result = db.execute(text("SELECT current_setting('block_size')::int"))
+                    size_info["page_size"] = result.scalar() or 0
+                    
+                    result = db.execute(text("SELECT pg_database_size(current_database())"))
+                    size_info["total_size_bytes"] = result.scalar() or 0
+                    
+                    if size_info["page_size"]:
+                        size_info["total_pages"] = size_info["total_size_bytes"] // size_info["page_size"]
+                else:
+                    # Get page count and page size
+                    result = db.execute(text("PRAGMA page_count"))
+                    size_info["total_pages"] = result.scalar() or 0
+                    
+                    result = db.execute(text("PRAGMA page_size"))
+                    size_info["page_size"] = result.scalar() or 0
+                    
+                    size_info["total_size_bytes"] = size_info["total_pages"] * size_info["page_size"]
                 
                 # Get table sizes (approximate)
                 tables = ["raw_logs", "events", "ai_analysis", "reports", 
@@ -3,9 +3,10 @@ Database migration manager for ThreatLens.
 Handles schema migrations with version tracking and rollback capabilities.
 """
 import os
+import re
 import logging
 from typing import List, Dict, Any, Optional
-from sqlalchemy import create_engine, text, MetaData, Table, Column, Integer, String, DateTime
+from sqlalchemy import create_engine, text, inspect, MetaData, Table, Column, Integer, String, DateTime
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -13,6 +14,13 @@ import json
 
 logger = logging.getLogger(__name__)
 
+# SQLite-only syntax used by the migration scripts, rewritten for PostgreSQL
+_POSTGRESQL_REWRITES = [
+    (re.compile(r"\bINTEGER\s+PRIMARY\s+KEY\s+AUTOINCREMENT\b", re.IGNORECASE), "SERIAL PRIMARY KEY"),
+    (re.compile(r"\bINSERT\s+OR\s+IGNORE\s+INTO\b", re.IGNORECASE), "INSERT INTO"),
+]
+_INSERT_OR_IGNORE = re.compile(r"\bINSERT\s+OR\s+IGNORE\b", re.IGNORECASE)
+
 
 class MigrationManager:
     """Manages database schema migrations with version tracking."""
@@ -21,12 +29,29 @@ class MigrationManager:
         self.database_url = database_url
         self.engine = create_engine(database_url)
         self.metadata = MetaData()
+    
+    @property
+    def dialect_name(self) -> str:
+        """Name of the SQL dialect of the target database."""
+        return self.engine.dialect.name
+    
+    def adapt_sql(self, statement: str) -> str:
+        """Rewrite SQLite-specific syntax in a migration statement for the target dialect."""
+        if self.dialect_name != "postgresql":
+            return statement
+        
+        ignore_conflicts = bool(_INSERT_OR_IGNORE.search(statement))
+        for pattern, replacement in _POSTGRESQL_REWRITES:
+            statement = pattern.sub(replacement, statement)
+        if ignore_conflicts:
+            statement = f"{statement.rstrip()} ON CONFLICT DO NOTHING"
+        return statement
         
     def _ensure_migration_table(self):
         """Ensure the migration tracking table exists."""
         try:
             with self.engine.connect() as conn:
-                conn.execute(text("""
+                conn.execute(text(self.adapt_sql("""
                     CREATE TABLE IF NOT EXISTS schema_migrations (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
                         version VARCHAR(50) UNIQUE NOT NULL,
@@ -35,7 +60,7 @@ class MigrationManager:
                         rollback_sql TEXT,
                         checksum VARCHAR(64)
                     )
-                """))
+                """)))
                 conn.commit()
                 logger.info("Migration tracking table ensured")
         except SQLAlchemyError as e:
@@ -79,7 +104,7 @@ class MigrationManager:
                     for statement in forward_sql.split(';'):
                         statement = statement.strip()
                         if statement:
-                            conn.execute(text(statement))
+                            conn.execute(text(self.adapt_sql(statement)))
                     
                     # Record migration
                     conn.execute(text("""
@@ -134,7 +159,7 @@ class MigrationManager:
                     for statement in rollback_sql.split(';'):
                         statement = statement.strip()
                         if statement:
-                            conn.execute(text(statement))
+                            conn.execute(text(self.adapt_sql(statement)))
                     
                     # Remove migration record
                     conn.execute(text("""
@@ -187,21 +212,14 @@ class MigrationManager:
     def table_exists(self, table_name: str) -> bool:
         """Check if a table exists in the database."""
         try:
-            with self.engine.connect() as conn:
-                result = conn.execute(text("""
-                    SELECT name FROM sqlite_master 
-                    WHERE type='table' AND name = :table_name
-                """), {"table_name": table_name})
-                return result.fetchone() is not None
+            return inspect(self.engine).has_table(table_name)
         except SQLAlchemyError:
             return False
     
     def column_exists(self, table_name: str, column_name: str) -> bool:
         """Check if a column exists in a table."""
         try:
-            with self.engine.connect() as conn:
-                result = conn.execute(text(f"PRAGMA table_info({table_name})"))
-                columns = [row[1] for row in result]  # Column name is at index 1
-                return column_name in columns
+            columns = [column["name"] for column in inspect(self.engine).get_columns(table_name)]
+            return column_name in columns
         except SQLAlchemyError:
             return False
\ No newline at end of file
@@ -131,6 +131,46 @@ class NotificationHistory(Base):
     event = relationship("Event")
 
 
+class NotificationDigest(Base):
+    """Pending notification digest aggregating events until its window closes."""
+    __tablename__ = "notification_digests"
+    
+    digest_key = Column(String(500), primary_key=True)  # rule:source:category
+    rule_name = Column(String(255), nullable=False)
+    source = Column(String(255), nullable=False)
+    category = Column(String(100), nullable=False)
+    window_end = Column(DateTime, nullable=False)
+    event_count = Column(Integer, nullable=False, default=0)
+    max_severity = Column(Integer, nullable=False, default=0)
+    first_event_id = Column(String, nullable=False)
+    last_event_id = Column(String, nullable=False)
+    first_seen = Column(DateTime, nullable=False)
+    last_seen = Column(DateTime, nullable=False)
+    samples = Column(Text, nullable=False, default="[]")  # JSON list of sample events
+    updated_at = Column(DateTime, default=func.current_timestamp(), onupdate=func.current_timestamp())
+
+
+class WebSocketEventLog(Base):
+    """Broadcast event kept so reconnecting WebSocket clients can catch up."""
+    __tablename__ = "websocket_event_log"
+    
+    seq = Column(Integer, primary_key=True, autoincrement=False)
+    event_type = Column(String(100), nullable=False)
+    priority = Column(Integer, nullable=False, default=5)
+    data = Column(Text, nullable=False)  # JSON event data
+    timestamp = Column(DateTime, nullable=False)
+
+
+class RateLimitCounter(Base):
+    """Request count for one client in one rate limit window, shared by workers."""
+    __tablename__ = "rate_limit_counters"
+    
+    limiter = Column(String(100), primary_key=True)
+    client_key = Column(String(255), primary_key=True)
+    window_index = Column(Integer, primary_key=True, autoincrement=False)
+    count = Column(Integer, nullable=False, default=0)
+
+
 class AuditLog(Base):
     """Audit log for tracking all configuration changes and security events."""
     __tablename__ = "audit_logs"
@@ -14,6 +14,7 @@ from enum import Enum
 import logging
 
 from app.schemas import ParsedEvent, EventCategory
+from app.profiling import profiled
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -151,7 +152,7 @@ class LogParser:
                     self.stats['categories'][event.category.value] += 1
                 else:
                     self.stats['failed_lines'] += 1
-                    logger.warning(f"Failed to parse line {line_num}: {line[:100]}...")
+                    logger.warning("Failed to parse line %d: %s...", line_num, line[:100])
                     
             except Exception as e:
                 self.stats['failed_lines'] += 1
@@ -443,6 +444,7 @@ class LogParser:
         
         raise ParsingError(f"Unable to parse timestamp: {timestamp_str}")
     
+    @profiled("categorize")
     def _categorize_event(self, message: str, source: str) -> EventCategory:
         """
         Categorize an event based on message content and source.
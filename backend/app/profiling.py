@@ -0,0 +1,362 @@
+"""
+Hot-path profiling for the realtime pipeline.
+
+Two tools, both cheap enough to leave enabled in production:
+
+- Per-batch stage timers. Pipeline stage timers (app.metrics.stage_timer)
+  and the profile_stage()/profiled() hooks add their time to the batch
+  the realtime processor is working on. StageProfiler keeps the stage
+  totals of recent batches, so a drop in throughput can be traced to a
+  stage. Outside a batch the hooks only read a context variable.
+- On-demand sampling profiles. SamplingProfiler snapshots a thread's
+  Python stack at a fixed interval for a bounded time and counts
+  identical stacks in the collapsed format read by flamegraph.pl and
+  speedscope. Nothing is sampled unless a profile is requested.
+"""
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from types import CodeType, FrameType
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "true").lower() == "true"
+PROFILE_BATCH_HISTORY = int(os.getenv("PROFILE_BATCH_HISTORY", "500"))
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.01"))
+
+# Deepest stack recorded by the sampling profiler; deeper frames are cut at the root
+MAX_STACK_DEPTH = 256
+
+# Stage totals of the batch being processed in the current context
+_batch_stages: ContextVar[Optional[Dict[str, float]]] = ContextVar("batch_stages", default=None)
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a sampling profile is requested while another one runs."""
+    pass
+
+
+def add_stage_time(stage: str, seconds: float) -> None:
+    """Add time spent in a stage to the batch being profiled, if any."""
+    stages = _batch_stages.get()
+    if stages is not None:
+        stages[stage] = stages.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def profile_stage(stage: str) -> Iterator[None]:
+    """Time a block as part of a stage of the batch being profiled."""
+    stages = _batch_stages.get()
+    if stages is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[stage] = stages.get(stage, 0.0) + time.perf_counter() - started
+
+
+def profiled(stage: str) -> Callable:
+    """Decorator that times every call of a function as part of a stage."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stages = _batch_stages.get()
+            if stages is None:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stages[stage] = stages.get(stage, 0.0) + time.perf_counter() - started
+        return wrapper
+    return decorator
+
+
+@dataclass
+class BatchProfile:
+    """Time spent per stage while processing one batch."""
+    size: int
+    started_at: float
+    seconds: float = 0.0
+    stages: Dict[str, float] = field(default_factory=dict)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "started_at": self.started_at,
+            "seconds": round(self.seconds, 6),
+            "stages": {stage: round(seconds, 6) for stage, seconds in self.stages.items()}
+        }
+
+
+class StageProfiler:
+    """
+    Keeps per-stage timings of the most recent batches.
+    
+    Stage times are inclusive: parse includes detect_format and
+    categorize. Notifications are delivered in background tasks started
+    by the batch, so their time is added to that batch when they finish
+    and can exceed its wall-clock time.
+    """
+    
+    def __init__(self, history: int = PROFILE_BATCH_HISTORY, enabled: bool = PROFILING_ENABLED):
+        """
+        Initialize the profiler.
+        
+        Args:
+            history: Number of recent batches kept
+            enabled: Whether batches are profiled
+        """
+        self.enabled = enabled
+        self._batches: deque = deque(maxlen=history)
+        self._lock = threading.Lock()
+        self.batches_profiled = 0
+        
+    @contextmanager
+    def batch(self, size: int) -> Iterator[Optional[BatchProfile]]:
+        """
+        Profile the stages run inside the block as one batch.
+        
+        Args:
+            size: Number of entries in the batch
+            
+        Yields:
+            BatchProfile being recorded, or None when profiling is disabled
+        """
+        if not self.enabled:
+            yield None
+            return
+            
+        profile = BatchProfile(size=size, started_at=time.time())
+        token = _batch_stages.set(profile.stages)
+        started = time.perf_counter()
+        try:
+            yield profile
+        finally:
+            profile.seconds = time.perf_counter() - started
+            _batch_stages.reset(token)
+            with self._lock:
+                self._batches.append(profile)
+                self.batches_profiled += 1
+                
+    def get_report(self, last: Optional[int] = None, recent: int = 10) -> Dict[str, Any]:
+        """
+        Summarize stage timings over recent batches.
+        
+        Args:
+            last: Only include this many of the most recent batches
+            recent: Number of individual batches to include
+            
+        Returns:
+            Per-stage totals, per-batch mean/p95/max and share of batch time
+        """
+        with self._lock:
+            batches = list(self._batches)
+            batches_profiled = self.batches_profiled
+        if last:
+            batches = batches[-last:]
+            
+        report: Dict[str, Any] = {
+            "enabled": self.enabled,
+            "batches_profiled": batches_profiled,
+            "window_batches": len(batches),
+            "window_entries": sum(batch.size for batch in batches),
+            "stages": {},
+            "recent_batches": [batch.to_dict() for batch in batches[-recent:]] if recent else []
+        }
+        if not batches:
+            return report
+            
+        batch_seconds = np.array([batch.seconds for batch in batches])
+        total_batch_seconds = float(batch_seconds.sum())
+        report["batch_seconds"] = {
+            "mean": float(batch_seconds.mean()),
+            "p95": float(np.percentile(batch_seconds, 95)),
+            "max": float(batch_seconds.max())
+        }
+        report["entries_per_second"] = (
+            report["window_entries"] / total_batch_seconds if total_batch_seconds else 0.0
+        )
+        
+        names = sorted({stage for batch in batches for stage in list(batch.stages)})
+        stages = {}
+        for name in names:
+            per_batch = np.array([batch.stages.get(name, 0.0) for batch in batches])
+            total = float(per_batch.sum())
+            stages[name] = {
+                "total_seconds": total,
+                "mean_batch_seconds": float(per_batch.mean()),
+                "p95_batch_seconds": float(np.percentile(per_batch, 95)),
+                "max_batch_seconds": float(per_batch.max()),
+                "ms_per_entry": total / report["window_entries"] * 1000 if report["window_entries"] else 0.0,
+                "share_of_batch_time": total / total_batch_seconds if total_batch_seconds else 0.0
+            }
+        report["stages"] = dict(sorted(stages.items(), key=lambda item: item[1]["total_seconds"], reverse=True))
+        return report
+        
+    def reset(self) -> None:
+        with self._lock:
+            self._batches.clear()
+            self.batches_profiled = 0
+
+
+@dataclass
+class SamplingResult:
+    """Stack counts collected by one sampling profile."""
+    stacks: Dict[str, int]
+    samples: int
+    idle_samples: int
+    seconds: float
+    interval: float
+    
+    def collapsed(self) -> str:
+        """
+        Render the stacks in collapsed format.
+        
+        Each line is "root;caller;...;leaf count", as read by
+        flamegraph.pl, inferno and speedscope.
+        """
+        lines = [f"{stack} {count}" for stack, count in
+                 sorted(self.stacks.items(), key=lambda item: item[1], reverse=True)]
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler sampling Python stacks from a background thread.
+    
+    Sampling reads sys._current_frames(), so the profiled thread is not
+    instrumented or slowed down beyond the sampler holding the GIL while
+    it walks a stack. One profile runs at a time and each is capped at
+    max_seconds.
+    """
+    
+    def __init__(self, interval: float = PROFILE_SAMPLE_INTERVAL, max_seconds: float = PROFILE_MAX_SECONDS):
+        """
+        Initialize the profiler.
+        
+        Args:
+            interval: Default seconds between samples
+            max_seconds: Longest profile allowed
+        """
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self._running = threading.Lock()
+        self._labels: Dict[CodeType, str] = {}
+        
+    @property
+    def running(self) -> bool:
+        return self._running.locked()
+        
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            name = getattr(code, "co_qualname", code.co_name)
+            label = f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+        
+    def _stack(self, frame: Optional[FrameType]) -> List[str]:
+        stack = []
+        while frame is not None and len(stack) < MAX_STACK_DEPTH:
+            stack.append(self._label(frame.f_code))
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+        
+    @staticmethod
+    def _is_idle(frame: FrameType) -> bool:
+        # An event loop with nothing to run waits in its selector
+        code = frame.f_code
+        return code.co_name in ("select", "poll", "control") and code.co_filename.endswith("selectors.py")
+        
+    def profile(
+        self,
+        seconds: float,
+        thread_id: Optional[int] = None,
+        interval: Optional[float] = None,
+        include_idle: bool = False
+    ) -> SamplingResult:
+        """
+        Sample stacks for a bounded time. Blocks the calling thread.
+        
+        Args:
+            seconds: Profile duration, capped at max_seconds
+            thread_id: Thread to sample; every other thread when None
+            interval: Seconds between samples
+            include_idle: Keep samples of an event loop waiting for work
+            
+        Returns:
+            SamplingResult with counts per collapsed stack
+            
+        Raises:
+            ProfilerBusyError: If another profile is running
+        """
+        if not self._running.acquire(blocking=False):
+            raise ProfilerBusyError("A sampling profile is already running")
+            
+        try:
+            seconds = min(seconds, self.max_seconds)
+            interval = interval or self.interval
+            sampler_id = threading.get_ident()
+            counts: Counter = Counter()
+            samples = idle_samples = 0
+            thread_names: Dict[int, str] = {}
+            
+            started = time.perf_counter()
+            deadline = started + seconds
+            next_sample = started
+            while time.perf_counter() < deadline:
+                frames = sys._current_frames()
+                if thread_id is not None:
+                    targets = [(thread_id, frames.get(thread_id))]
+                else:
+                    targets = [(ident, frame) for ident, frame in frames.items() if ident != sampler_id]
+                    if len(thread_names) < len(targets):
+                        thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+                        
+                for ident, frame in targets:
+                    if frame is None:
+                        continue
+                    samples += 1
+                    if not include_idle and self._is_idle(frame):
+                        idle_samples += 1
+                        continue
+                    stack = self._stack(frame)
+                    if thread_id is None:
+                        stack.insert(0, thread_names.get(ident, f"thread-{ident}"))
+                    counts[";".join(stack)] += 1
+                # Drop frame references promptly so sampled locals are not kept alive
+                frames = targets = frame = None
+                
+                next_sample += interval
+                delay = next_sample - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_sample = time.perf_counter()
+                    
+            return SamplingResult(
+                stacks=dict(counts),
+                samples=samples,
+                idle_samples=idle_samples,
+                seconds=time.perf_counter() - started,
+                interval=interval
+            )
+        finally:
+            self._running.release()
+
+
+# Global profilers
+stage_profiler = StageProfiler()
+sampling_profiler = SamplingProfiler()
@@ -0,0 +1,420 @@
+"""
+Rate limiting engine for ThreatLens.
+
+Request counts are kept per client in approximate sliding windows: each
+client has a counter for the current fixed window and the previous one,
+and the estimate weights the previous window by how much of it still
+overlaps the sliding window. Checks are O(1) and each client costs a
+fixed amount of memory. Client tables are bounded; idle clients expire
+and the least recently seen client is evicted when the table is full.
+
+An optional shared backend exchanges per-window counts between workers
+in periodic batches, so limits hold across processes without a database
+round trip per request.
+"""
+import asyncio
+import logging
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Optional, Tuple, TypeVar
+
+from sqlalchemy import text
+
+from app.database import get_write_session
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "50000"))
+# "memory" keeps limits per worker; "database" shares them through rate_limit_counters
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_SYNC_INTERVAL = float(os.getenv("RATE_LIMIT_SYNC_INTERVAL", "1.0"))
+
+V = TypeVar("V")
+
+# (client key, window index) -> request count
+WindowCounts = Dict[Tuple[str, int], int]
+
+
+class ExpiringMap(Generic[V]):
+    """
+    Bounded map whose entries expire after a TTL.
+    
+    Entries are kept in update order, so expired and least recently
+    updated entries are dropped from the front in amortized O(1).
+    """
+    
+    def __init__(self, ttl: float, max_size: int = RATE_LIMIT_MAX_CLIENTS):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[V, float]]" = OrderedDict()
+        
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+        
+    def set(self, key: str, value: V, now: Optional[float] = None, ttl: Optional[float] = None) -> None:
+        """Store a value, replacing any previous one."""
+        now = time.time() if now is None else now
+        self._entries[key] = (value, now + (self.ttl if ttl is None else ttl))
+        self._entries.move_to_end(key)
+        self._evict(now)
+        
+    def get(self, key: str, now: Optional[float] = None) -> Optional[V]:
+        """Get a value if it has not expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+            
+        now = time.time() if now is None else now
+        if entry[1] <= now:
+            del self._entries[key]
+            return None
+        return entry[0]
+        
+    def expires_at(self, key: str) -> Optional[float]:
+        """Get the expiry time of a live entry."""
+        entry = self._entries.get(key)
+        return entry[1] if entry is not None and entry[1] > time.time() else None
+        
+    def pop(self, key: str) -> Optional[V]:
+        """Remove an entry."""
+        entry = self._entries.pop(key, None)
+        return entry[0] if entry is not None else None
+        
+    def _evict(self, now: float) -> None:
+        while self._entries:
+            key, (_, expires_at) = next(iter(self._entries.items()))
+            if expires_at > now and len(self._entries) <= self.max_size:
+                break
+            del self._entries[key]
+
+
+class _Window:
+    """Counts for one client in a sliding window counter."""
+    
+    __slots__ = ("index", "current", "previous", "remote_current", "remote_previous",
+                 "pending", "pending_previous", "last_seen")
+                 
+    def __init__(self, index: int, now: float):
+        self.index = index
+        self.current = 0
+        self.previous = 0
+        # Counts from other workers, as of the last sync
+        self.remote_current = 0
+        self.remote_previous = 0
+        # Local counts not yet sent to the shared backend
+        self.pending = 0
+        self.pending_previous = 0
+        self.last_seen = now
+        
+    def roll(self, index: int) -> None:
+        """Advance to a new fixed window."""
+        if index == self.index + 1:
+            self.previous = self.current
+            self.remote_previous = self.remote_current
+            self.pending_previous = self.pending
+        else:
+            self.previous = self.remote_previous = self.pending_previous = 0
+        self.current = self.remote_current = self.pending = 0
+        self.index = index
+
+
+class RateLimitBackend(ABC):
+    """Shared store for per-window request counts."""
+    
+    @abstractmethod
+    def exchange(self, limiter: str, increments: WindowCounts, oldest_index: int) -> WindowCounts:
+        """
+        Add local increments and read the combined counts.
+        
+        Args:
+            limiter: Name of the counter the increments belong to
+            increments: New local counts per client and window
+            oldest_index: Windows older than this are no longer needed
+            
+        Returns:
+            Counts from all workers for the clients in increments
+        """
+        pass
+
+
+class DatabaseRateLimitBackend(RateLimitBackend):
+    """Backend on the rate_limit_counters table, shared by every worker using the database."""
+    
+    LOOKUP_CHUNK_SIZE = 500
+    
+    def exchange(self, limiter: str, increments: WindowCounts, oldest_index: int) -> WindowCounts:
+        keys = sorted({key for key, _ in increments})
+        totals: WindowCounts = {}
+        
+        with get_write_session() as db:
+            db.execute(text(
+                "INSERT INTO rate_limit_counters (limiter, client_key, window_index, count) "
+                "VALUES (:limiter, :client_key, :window_index, :count) "
+                "ON CONFLICT (limiter, client_key, window_index) "
+                "DO UPDATE SET count = rate_limit_counters.count + excluded.count"
+            ), [
+                {"limiter": limiter, "client_key": key, "window_index": index, "count": count}
+                for (key, index), count in increments.items()
+            ])
+            
+            for start in range(0, len(keys), self.LOOKUP_CHUNK_SIZE):
+                chunk = keys[start:start + self.LOOKUP_CHUNK_SIZE]
+                placeholders = ", ".join(f":k{i}" for i in range(len(chunk)))
+                rows = db.execute(text(
+                    "SELECT client_key, window_index, count FROM rate_limit_counters "
+                    f"WHERE limiter = :limiter AND window_index >= :oldest AND client_key IN ({placeholders})"
+                ), {"limiter": limiter, "oldest": oldest_index, **{f"k{i}": key for i, key in enumerate(chunk)}})
+                totals.update({(key, index): count for key, index, count in rows})
+                
+            db.execute(text(
+                "DELETE FROM rate_limit_counters WHERE limiter = :limiter AND window_index < :oldest"
+            ), {"limiter": limiter, "oldest": oldest_index})
+            
+        return totals
+
+
+RATE_LIMIT_BACKENDS = {
+    "memory": None,
+    "database": DatabaseRateLimitBackend
+}
+
+
+def create_rate_limit_backend(name: str = RATE_LIMIT_BACKEND) -> Optional[RateLimitBackend]:
+    """
+    Create a shared rate limit backend by name.
+    
+    Args:
+        name: Backend name (memory or database)
+        
+    Returns:
+        Backend instance, or None for per-worker limits
+    """
+    if name not in RATE_LIMIT_BACKENDS:
+        raise ValueError(f"Unknown rate limit backend {name!r}; expected one of {', '.join(RATE_LIMIT_BACKENDS)}")
+    backend_class = RATE_LIMIT_BACKENDS[name]
+    return backend_class() if backend_class else None
+
+
+class SlidingWindowCounter:
+    """
+    Approximate sliding-window request counter for many clients.
+    
+    The estimate for a client is previous * (1 - elapsed / window) +
+    current, where elapsed is the time into the current fixed window.
+    Clients idle for two windows have a zero estimate and are expired.
+    """
+    
+    def __init__(self, window: float, name: str = "default", max_clients: int = RATE_LIMIT_MAX_CLIENTS,
+                 backend: Optional[RateLimitBackend] = None):
+        """
+        Initialize the counter.
+        
+        Args:
+            window: Window length in seconds
+            name: Name used for this counter in the shared backend
+            max_clients: Maximum number of clients tracked
+            backend: Optional shared backend
+        """
+        self.window = window
+        self.name = name
+        self.max_clients = max_clients
+        self.backend = backend
+        self._clients: "OrderedDict[str, _Window]" = OrderedDict()
+        self._sync_task: Optional[asyncio.Task] = None
+        self.stats = {
+            "allowed": 0,
+            "limited": 0,
+            "evicted": 0,
+            "syncs": 0,
+            "sync_errors": 0
+        }
+        
+    @property
+    def size(self) -> int:
+        return len(self._clients)
+        
+    def _window_for(self, key: str, now: float, create: bool) -> Optional[_Window]:
+        """Get a client's window, advanced to now."""
+        index = int(now // self.window)
+        entry = self._clients.get(key)
+        
+        if entry is None:
+            if not create:
+                return None
+            entry = _Window(index, now)
+            self._clients[key] = entry
+            self._evict(now)
+        elif entry.index != index:
+            entry.roll(index)
+            
+        if create:
+            entry.last_seen = now
+            self._clients.move_to_end(key)
+        return entry
+        
+    def _estimate(self, entry: _Window, now: float) -> float:
+        overlap = 1.0 - (now % self.window) / self.window
+        return (entry.previous + entry.remote_previous) * overlap + entry.current + entry.remote_current
+        
+    def _evict(self, now: float) -> None:
+        idle_cutoff = now - 2 * self.window
+        while self._clients:
+            key, entry = next(iter(self._clients.items()))
+            if entry.last_seen > idle_cutoff and len(self._clients) <= self.max_clients:
+                break
+            del self._clients[key]
+            self.stats["evicted"] += 1
+            
+    def count(self, key: str, now: Optional[float] = None) -> float:
+        """Get a client's estimated request count without recording a request."""
+        now = time.time() if now is None else now
+        entry = self._window_for(key, now, create=False)
+        return self._estimate(entry, now) if entry else 0.0
+        
+    def add(self, key: str, now: Optional[float] = None) -> float:
+        """
+        Record a request unconditionally.
+        
+        Returns:
+            Estimated count including this request
+        """
+        now = time.time() if now is None else now
+        entry = self._window_for(key, now, create=True)
+        entry.current += 1
+        entry.pending += 1
+        self._ensure_sync_task()
+        return self._estimate(entry, now)
+        
+    def hit(self, key: str, limit: float, now: Optional[float] = None) -> bool:
+        """
+        Record a request if the client is under its limit.
+        
+        Args:
+            key: Client identifier
+            limit: Maximum requests per window
+            now: Current time
+            
+        Returns:
+            True if the request is allowed
+        """
+        now = time.time() if now is None else now
+        entry = self._window_for(key, now, create=True)
+        
+        if self._estimate(entry, now) + 1 > limit:
+            self.stats["limited"] += 1
+            return False
+            
+        entry.current += 1
+        entry.pending += 1
+        self.stats["allowed"] += 1
+        self._ensure_sync_task()
+        return True
+        
+    def retry_after(self, key: str, limit: float, now: Optional[float] = None) -> int:
+        """Get the seconds until a limited client can make another request."""
+        now = time.time() if now is None else now
+        entry = self._window_for(key, now, create=False)
+        if entry is None:
+            return 0
+            
+        elapsed = now % self.window
+        current = entry.current + entry.remote_current
+        previous = entry.previous + entry.remote_previous
+        if current + 1 > limit:
+            # The current window alone is over the limit; wait for it to end
+            return math.ceil(self.window - elapsed)
+        if previous <= 0:
+            return 0
+        # Wait until the previous window's weight drops enough
+        overlap_needed = (limit - 1 - current) / previous
+        return max(0, math.ceil((1.0 - overlap_needed) * self.window - elapsed))
+        
+    def reset(self, key: str) -> None:
+        """Forget a client."""
+        self._clients.pop(key, None)
+        
+    def _ensure_sync_task(self) -> None:
+        """Start the background sync with the shared backend."""
+        if self.backend is None or (self._sync_task is not None and not self._sync_task.done()):
+            return
+        try:
+            self._sync_task = asyncio.get_running_loop().create_task(self._sync_loop())
+        except RuntimeError:
+            # No running loop; counts are synced once one is available
+            pass
+            
+    async def _sync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(RATE_LIMIT_SYNC_INTERVAL)
+            await self.sync()
+            
+    async def sync(self) -> None:
+        """Exchange pending counts with the shared backend."""
+        if self.backend is None:
+            return
+            
+        increments: WindowCounts = {}
+        snapshot: Dict[str, int] = {}
+        for key, entry in self._clients.items():
+            if entry.pending:
+                increments[(key, entry.index)] = entry.pending
+            if entry.pending_previous:
+                increments[(key, entry.index - 1)] = entry.pending_previous
+            if entry.pending or entry.pending_previous:
+                snapshot[key] = entry.index
+                entry.pending = entry.pending_previous = 0
+                
+        if not increments:
+            return
+            
+        oldest_index = int(time.time() // self.window) - 1
+        try:
+            totals = await asyncio.to_thread(self.backend.exchange, self.name, increments, oldest_index)
+        except Exception as e:
+            self.stats["sync_errors"] += 1
+            logger.error(f"Rate limit sync failed for {self.name}: {e}")
+            # Keep the counts for the next attempt
+            for (key, index), count in increments.items():
+                entry = self._clients.get(key)
+                if entry is not None and entry.index == index:
+                    entry.pending += count
+                elif entry is not None and entry.index == index + 1:
+                    entry.pending_previous += count
+            return
+            
+        self.stats["syncs"] += 1
+        for key, index in snapshot.items():
+            entry = self._clients.get(key)
+            if entry is None:
+                continue
+            if entry.index == index:
+                entry.remote_current = max(0, totals.get((key, index), 0) - (entry.current - entry.pending))
+                entry.remote_previous = max(0, totals.get((key, index - 1), 0) - (entry.previous - entry.pending_previous))
+            elif entry.index == index + 1:
+                entry.remote_previous = max(0, totals.get((key, index), 0) - (entry.previous - entry.pending_previous))
+                
+    async def close(self) -> None:
+        """Stop background sync and push remaining counts."""
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+        await self.sync()
+        
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get counter statistics."""
+        return {
+            **self.stats,
+            "name": self.name,
+            "window_seconds": self.window,
+            "clients": len(self._clients),
+            "max_clients": self.max_clients,
+            "shared": self.backend is not None
+        }
@@ -5,22 +5,35 @@ This module provides comprehensive audit logging for all configuration changes,
 user actions, and security events in the real-time monitoring system.
 """
 
+import atexit
 import json
 import logging
+import os
+import queue
+import threading
+import time
+import uuid
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any, Union
+from typing import Callable, Dict, List, Optional, Any, Union
 from enum import Enum
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
-from sqlalchemy import text, desc
+from sqlalchemy import text, desc, insert
 
-from ..database import get_db_session
+from ..database import get_db_session, get_write_session
 from ..models import AuditLog as AuditLogModel
 from ..logging_config import get_logger, get_correlation_id
 from .auth import SessionInfo, UserRole
 
 logger = get_logger(__name__)
 
+# Audit entries are written by a background thread in batches
+AUDIT_ASYNC = os.getenv("AUDIT_ASYNC", "true").lower() == "true"
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "200"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1.0"))
+AUDIT_SHUTDOWN_TIMEOUT = float(os.getenv("AUDIT_SHUTDOWN_TIMEOUT", "5.0"))
+
 
 class AuditEventType(str, Enum):
     """Types of audit events."""
@@ -128,6 +141,252 @@ class AuditEntry(BaseModel):
         }
 
 
+# Queue markers for the audit writer thread
+_FLUSH = object()
+_STOP = object()
+
+
+def audit_entry_to_row(entry: AuditEntry) -> Dict[str, Any]:
+    """
+    Convert an audit entry to an audit_logs row.
+    
+    Args:
+        entry: Audit entry
+        
+    Returns:
+        Column values keyed by column name
+    """
+    return {
+        "id": entry.id or str(uuid.uuid4()),
+        "event_type": entry.event_type.value,
+        "severity": entry.severity.value,
+        "timestamp": entry.timestamp,
+        "user_id": entry.user_id,
+        "username": entry.username,
+        "user_role": entry.user_role.value if entry.user_role else None,
+        "session_id": entry.session_id,
+        "client_ip": entry.client_ip,
+        "user_agent": entry.user_agent,
+        "correlation_id": entry.correlation_id,
+        "resource_type": entry.resource_type,
+        "resource_id": entry.resource_id,
+        "action": entry.action,
+        "description": entry.description,
+        "old_values": json.dumps(entry.old_values) if entry.old_values else None,
+        "new_values": json.dumps(entry.new_values) if entry.new_values else None,
+        "changes": json.dumps(entry.changes) if entry.changes else None,
+        "event_metadata": json.dumps(entry.metadata) if entry.metadata else None,
+        "tags": json.dumps(entry.tags) if entry.tags else None,
+        "success": 1 if entry.success else 0,
+        "error_message": entry.error_message
+    }
+
+
+def insert_audit_rows(rows: List[Dict[str, Any]]) -> None:
+    """Insert audit rows with one executemany INSERT on the writer connection."""
+    with get_write_session() as db:
+        db.execute(insert(AuditLogModel.__table__), rows)
+
+
+class AuditWriter:
+    """
+    Background writer that inserts audit rows in batches.
+    
+    log_event is synchronous and runs on the event loop, in thread pool
+    workers and in scripts, so rows reach the writer through a bounded
+    thread-safe queue and are inserted by a dedicated thread. A batch is
+    written once it holds batch_size rows or flush_interval seconds after
+    its first row. When the queue is full new rows are dropped and counted
+    instead of blocking the caller.
+    """
+    
+    def __init__(self, queue_size: int = AUDIT_QUEUE_SIZE,
+                 batch_size: int = AUDIT_BATCH_SIZE,
+                 flush_interval: float = AUDIT_FLUSH_INTERVAL,
+                 write_rows: Optional[Callable[[List[Dict[str, Any]]], None]] = None):
+        """
+        Initialize the writer.
+        
+        Args:
+            queue_size: Maximum rows waiting to be written
+            batch_size: Maximum rows per INSERT
+            flush_interval: Seconds a row may wait for its batch to fill
+            write_rows: Function that persists one batch of rows
+        """
+        self.queue_size = queue_size
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.write_rows = write_rows or insert_audit_rows
+        
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._pending = 0
+        self._exit_hook_registered = False
+        
+        self.stats = {"queued": 0, "written": 0, "dropped": 0, "failed": 0, "batches": 0}
+        
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+        
+    def start(self) -> None:
+        """Start the writer thread if it is not already running."""
+        with self._lock:
+            if self.running:
+                return
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+            if not self._exit_hook_registered:
+                atexit.register(self.stop)
+                self._exit_hook_registered = True
+                
+    def submit(self, row: Dict[str, Any]) -> bool:
+        """
+        Queue a row for writing without blocking.
+        
+        Args:
+            row: audit_logs column values
+            
+        Returns:
+            False if the queue was full and the row was dropped
+        """
+        if not self.running:
+            self.start()
+            
+        with self._lock:
+            self._pending += 1
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            with self._idle:
+                self._pending -= 1
+                self.stats["dropped"] += 1
+                dropped = self.stats["dropped"]
+                self._idle.notify_all()
+            if dropped == 1 or dropped % 1000 == 0:
+                logger.warning(f"Audit queue full, {dropped} entries dropped so far")
+            return False
+            
+        with self._lock:
+            self.stats["queued"] += 1
+        return True
+        
+    def flush(self, timeout: float = AUDIT_SHUTDOWN_TIMEOUT) -> bool:
+        """
+        Write queued rows now and wait until they are written.
+        
+        Args:
+            timeout: Maximum seconds to wait
+            
+        Returns:
+            True if every queued row was written or counted as failed
+        """
+        if not self.running:
+            return self._pending == 0
+        try:
+            self._queue.put_nowait(_FLUSH)
+        except queue.Full:
+            pass  # A full queue already flushes in full batches
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+            
+    def stop(self, timeout: float = AUDIT_SHUTDOWN_TIMEOUT) -> bool:
+        """
+        Write out queued rows and stop the writer thread.
+        
+        Args:
+            timeout: Maximum seconds to wait for the queue to drain
+            
+        Returns:
+            True if the writer stopped with nothing left queued
+        """
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return self._pending == 0
+            
+        deadline = time.monotonic() + timeout
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning(f"Audit writer did not drain within {timeout}s, {self._pending} entries pending")
+            return False
+            
+        thread.join(max(0.0, deadline - time.monotonic()))
+        if thread.is_alive():
+            logger.warning(f"Audit writer did not drain within {timeout}s, {self._pending} entries pending")
+            return False
+        return True
+        
+    def _run(self) -> None:
+        """Collect rows into batches and write them until stopped."""
+        stopping = False
+        while not stopping:
+            batch: List[Dict[str, Any]] = []
+            deadline = None
+            while len(batch) < self.batch_size:
+                timeout = None if deadline is None else deadline - time.monotonic()
+                if timeout is not None and timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                if item is _FLUSH:
+                    break
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+            self._write(batch)
+            
+        # Rows submitted while stopping are written before the thread exits
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not _STOP and item is not _FLUSH:
+                    batch.append(item)
+            if not batch:
+                break
+            self._write(batch)
+            
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        """Insert one batch, counting its rows as written or failed."""
+        written = False
+        if batch:
+            try:
+                self.write_rows(batch)
+                written = True
+            except Exception as e:
+                logger.error(f"Failed to write {len(batch)} audit entries: {e}")
+                
+        with self._idle:
+            if batch:
+                self.stats["written" if written else "failed"] += len(batch)
+                self.stats["batches"] += 1
+            self._pending -= len(batch)
+            self._idle.notify_all()
+            
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth and write counters."""
+        with self._lock:
+            return {
+                "running": self.running,
+                "queue_depth": self._pending,
+                "queue_size": self.queue_size,
+                "batch_size": self.batch_size,
+                "flush_interval": self.flush_interval,
+                **self.stats
+            }
+
+
 class AuditLogger:
     """
     Comprehensive audit logging system for real-time features.
@@ -136,11 +395,20 @@ class AuditLogger:
     and security events with database persistence and querying capabilities.
     """
     
-    def __init__(self):
+    def __init__(self, writer: Optional[AuditWriter] = None):
+        """
+        Initialize the audit logger.
+        
+        Args:
+            writer: Background writer for entries; defaults to a new one
+                unless AUDIT_ASYNC is disabled, in which case entries are
+                written synchronously
+        """
         self.logger = get_logger(f"{__name__}.AuditLogger")
         self.buffer_size = 100
         self.buffer: List[AuditEntry] = []
         self.auto_flush = True
+        self.writer = writer if writer is not None else (AuditWriter() if AUDIT_ASYNC else None)
     
     def log_event(self, event_type: AuditEventType, description: str,
                   session_info: Optional[SessionInfo] = None,
@@ -214,6 +482,7 @@ class AuditLogger:
             
             # Create audit entry
             audit_entry = AuditEntry(
+                id=str(uuid.uuid4()),
                 event_type=event_type,
                 severity=severity,
                 user_id=user_id,
@@ -236,12 +505,13 @@ class AuditLogger:
                 error_message=error_message
             )
             
-            # Add to buffer
-            self.buffer.append(audit_entry)
-            
-            # Auto-flush if enabled
-            if self.auto_flush:
-                self._flush_buffer()
+            # Hand off to the background writer, or buffer for a synchronous flush
+            if self.writer is not None and self.auto_flush:
+                self.writer.submit(audit_entry_to_row(audit_entry))
+            else:
+                self.buffer.append(audit_entry)
+                if self.auto_flush:
+                    self._flush_buffer()
             
             # Log to application logger
             log_level = self._get_log_level(severity)
@@ -592,44 +862,23 @@ class AuditLogger:
             return {"error": str(e)}
     
     def _flush_buffer(self) -> None:
-        """Flush audit entries from buffer to database."""
+        """Write buffered audit entries, through the writer when there is one."""
         if not self.buffer:
             return
         
+        entries, self.buffer = self.buffer, []
+        rows = [audit_entry_to_row(entry) for entry in entries]
+        
+        if self.writer is not None:
+            for row in rows:
+                self.writer.submit(row)
+            return
+        
         try:
-            with get_db_session() as db:
-                for entry in self.buffer:
-                    # Convert to database model
-                    audit_record = AuditLogModel(
-                        event_type=entry.event_type.value,
-                        severity=entry.severity.value,
-                        timestamp=entry.timestamp,
-                        user_id=entry.user_id,
-                        username=entry.username,
-                        user_role=entry.user_role.value if entry.user_role else None,
-                        session_id=entry.session_id,
-                        client_ip=entry.client_ip,
-                        user_agent=entry.user_agent,
-                        correlation_id=entry.correlation_id,
-                        resource_type=entry.resource_type,
-                        resource_id=entry.resource_id,
-                        action=entry.action,
-                        description=entry.description,
-                        old_values=json.dumps(entry.old_values) if entry.old_values else None,
-                        new_values=json.dumps(entry.new_values) if entry.new_values else None,
-                        changes=json.dumps(entry.changes) if entry.changes else None,
-                        event_metadata=json.dumps(entry.metadata) if entry.metadata else None,
-                        tags=json.dumps(entry.tags) if entry.tags else None,
-                        success=entry.success,
-                        error_message=entry.error_message
-                    )
-                    
-                    db.add(audit_record)
-                
-                db.commit()
-                self.buffer.clear()
-                
+            insert_audit_rows(rows)
         except Exception as e:
+            # Keep the entries for the next flush
+            self.buffer = entries + self.buffer
             self.logger.error(f"Failed to flush audit buffer: {e}")
     
     def _get_log_level(self, severity: AuditSeverity) -> int:
@@ -643,8 +892,31 @@ class AuditLogger:
         return level_map.get(severity, logging.INFO)
     
     def flush(self) -> None:
-        """Manually flush the audit buffer."""
+        """Manually flush the audit buffer and wait for queued entries."""
         self._flush_buffer()
+        if self.writer is not None:
+            self.writer.flush()
+    
+    def close(self, timeout: float = AUDIT_SHUTDOWN_TIMEOUT) -> bool:
+        """
+        Write out buffered and queued entries and stop the writer.
+        
+        Args:
+            timeout: Maximum seconds to wait for the writer to drain
+            
+        Returns:
+            True if nothing was left unwritten
+        """
+        self._flush_buffer()
+        if self.writer is None:
+            return not self.buffer
+        return self.writer.stop(timeout)
+    
+    def get_writer_statistics(self) -> Dict[str, Any]:
+        """Get audit writer queue depth and dropped/failed counts."""
+        if self.writer is None:
+            return {"enabled": False, "buffered": len(self.buffer)}
+        return {"enabled": True, "buffered": len(self.buffer), **self.writer.get_stats()}
     
     def set_auto_flush(self, enabled: bool) -> None:
         """Enable or disable automatic buffer flushing."""
@@ -7,13 +7,17 @@ access control for WebSocket connections and real-time configuration management.
 
 import asyncio
 import hashlib
+import heapq
 import hmac
 import json
 import logging
+import os
 import secrets
 import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional, Any, Set, Union
+from typing import Dict, List, Optional, Any, Set, Tuple, Union
 from enum import Enum
 from uuid import uuid4
 from pydantic import BaseModel, Field, ValidationError
@@ -22,13 +26,26 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
-from ..database import get_db_session
+from ..database import get_db_session, get_read_session, get_write_session
 from ..models import User, UserSession, AuditLog
 from ..logging_config import get_logger, get_correlation_id
 from .exceptions import AuthenticationError, AuthorizationError
 
 logger = get_logger(__name__)
 
+# Token signing key; must be the same on every worker that shares sessions
+AUTH_SECRET_KEY = os.getenv("SECRET_KEY")
+
+# Session storage: "memory" (single process) or "database" (user_sessions, shared by workers)
+AUTH_SESSION_STORE = os.getenv("AUTH_SESSION_STORE", "memory")
+
+# Per-worker cache of verified tokens; revocations on other workers apply after the TTL
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096"))
+AUTH_TOKEN_CACHE_TTL = float(os.getenv("AUTH_TOKEN_CACHE_TTL", "5.0"))
+
+# Minimum expiry extension (seconds) worth writing back to the session store
+AUTH_SESSION_TOUCH_INTERVAL = float(os.getenv("AUTH_SESSION_TOUCH_INTERVAL", "60"))
+
 
 class UserRole(str, Enum):
     """User roles for access control."""
@@ -147,6 +164,291 @@ ROLE_PERMISSIONS = {
 }
 
 
+class VerifiedTokenCache:
+    """
+    LRU cache of tokens that already passed signature and session checks.
+    
+    Repeat requests with the same token skip jwt.decode and the session
+    store lookup. Entries live for at most the TTL and never past the
+    token's own expiry.
+    """
+    
+    def __init__(self, max_size: int = AUTH_TOKEN_CACHE_SIZE, ttl: float = AUTH_TOKEN_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[SessionInfo, float]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, token: str) -> Optional[SessionInfo]:
+        """Get the session for a cached token, if still fresh."""
+        entry = self._entries.get(token)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._entries[token]
+            self.misses += 1
+            return None
+        
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return entry[0]
+    
+    def put(self, token: str, session_info: SessionInfo, token_expires_at: Optional[float] = None) -> None:
+        """
+        Cache a verified token.
+        
+        Args:
+            token: Verified token
+            session_info: Session the token belongs to
+            token_expires_at: Token expiry as a Unix timestamp
+        """
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        
+        lifetime = self.ttl
+        if token_expires_at is not None:
+            lifetime = min(lifetime, token_expires_at - time.time())
+        if lifetime <= 0:
+            return
+        
+        self._entries[token] = (session_info, time.monotonic() + lifetime)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def discard(self, token: str) -> None:
+        """Drop a single token."""
+        self._entries.pop(token, None)
+    
+    def discard_session(self, session_id: str) -> None:
+        """Drop every token belonging to a session."""
+        for token in [t for t, (info, _) in self._entries.items() if info.session_id == session_id]:
+            del self._entries[token]
+    
+    def clear(self) -> None:
+        """Drop all cached tokens."""
+        self._entries.clear()
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+class SessionStore(ABC):
+    """Storage backend for authenticated sessions."""
+    
+    # Whether other processes see the same sessions
+    shared = False
+    
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """Backend name reported in statistics."""
+        pass
+    
+    @abstractmethod
+    def add(self, session_info: SessionInfo) -> None:
+        """Store a new session."""
+        pass
+    
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[SessionInfo]:
+        """Get a session by identifier."""
+        pass
+    
+    @abstractmethod
+    def touch(self, session_info: SessionInfo) -> None:
+        """Save a session's refreshed activity and expiry."""
+        pass
+    
+    @abstractmethod
+    def remove(self, session_id: str) -> Optional[SessionInfo]:
+        """Remove a session, returning it if it existed."""
+        pass
+    
+    @abstractmethod
+    def pop_expired(self, now: datetime) -> List[SessionInfo]:
+        """Remove and return sessions that expired before now."""
+        pass
+    
+    @abstractmethod
+    def list_sessions(self) -> List[SessionInfo]:
+        """Get all stored sessions."""
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Per-process session store.
+    
+    Expiry is tracked in a min-heap of (expires_at, session_id), so cleanup
+    only looks at sessions that are due. Entries for sessions whose expiry
+    was extended are pushed back with the new deadline when they surface.
+    """
+    
+    def __init__(self):
+        self.sessions: Dict[str, SessionInfo] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+    
+    @property
+    def name(self) -> str:
+        return "memory"
+    
+    def add(self, session_info: SessionInfo) -> None:
+        self.sessions[session_info.session_id] = session_info
+        heapq.heappush(self._expiry_heap, (session_info.expires_at.timestamp(), session_info.session_id))
+    
+    def get(self, session_id: str) -> Optional[SessionInfo]:
+        return self.sessions.get(session_id)
+    
+    def touch(self, session_info: SessionInfo) -> None:
+        # Sessions are shared by reference; the heap catches up lazily
+        pass
+    
+    def remove(self, session_id: str) -> Optional[SessionInfo]:
+        return self.sessions.pop(session_id, None)
+    
+    def pop_expired(self, now: datetime) -> List[SessionInfo]:
+        cutoff = now.timestamp()
+        expired = []
+        
+        while self._expiry_heap and self._expiry_heap[0][0] < cutoff:
+            _, session_id = heapq.heappop(self._expiry_heap)
+            session_info = self.sessions.get(session_id)
+            if session_info is None:
+                continue
+            
+            expires_at = session_info.expires_at.timestamp()
+            if expires_at >= cutoff:
+                heapq.heappush(self._expiry_heap, (expires_at, session_id))
+            else:
+                expired.append(self.sessions.pop(session_id))
+        
+        return expired
+    
+    def list_sessions(self) -> List[SessionInfo]:
+        return list(self.sessions.values())
+
+
+class DatabaseSessionStore(SessionStore):
+    """
+    Session store on the user_sessions table, shared by all workers.
+    
+    Username and role are read from the users table, so disabling a user
+    or changing their role applies to existing sessions.
+    """
+    
+    shared = True
+    
+    @property
+    def name(self) -> str:
+        return "database"
+    
+    @staticmethod
+    def _to_session_info(session: UserSession, user: User) -> Optional[SessionInfo]:
+        """Build SessionInfo from a session row and its user."""
+        try:
+            role = UserRole(user.role)
+        except ValueError:
+            logger.warning(f"Session {session.id} belongs to user with unknown role {user.role}")
+            return None
+        
+        return SessionInfo(
+            session_id=session.id,
+            user_id=session.user_id,
+            username=user.username,
+            role=role,
+            permissions=ROLE_PERMISSIONS.get(role, set()),
+            created_at=session.created_at.replace(tzinfo=timezone.utc),
+            expires_at=session.expires_at.replace(tzinfo=timezone.utc),
+            last_activity=session.last_activity.replace(tzinfo=timezone.utc),
+            client_ip=session.client_ip,
+            user_agent=session.user_agent
+        )
+    
+    def add(self, session_info: SessionInfo) -> None:
+        with get_write_session() as db:
+            db.add(UserSession(
+                id=session_info.session_id,
+                user_id=session_info.user_id,
+                # Tokens are JWTs that reference the session by id
+                session_token=session_info.session_id,
+                created_at=session_info.created_at.replace(tzinfo=None),
+                expires_at=session_info.expires_at.replace(tzinfo=None),
+                last_activity=session_info.last_activity.replace(tzinfo=None),
+                client_ip=session_info.client_ip,
+                user_agent=session_info.user_agent,
+                is_active=1
+            ))
+    
+    def get(self, session_id: str) -> Optional[SessionInfo]:
+        with get_read_session() as db:
+            row = db.query(UserSession, User).join(User, User.id == UserSession.user_id).filter(
+                UserSession.id == session_id,
+                UserSession.is_active == 1,
+                User.enabled == 1
+            ).first()
+            return self._to_session_info(*row) if row else None
+    
+    def touch(self, session_info: SessionInfo) -> None:
+        with get_write_session() as db:
+            db.query(UserSession).filter(UserSession.id == session_info.session_id).update({
+                UserSession.last_activity: session_info.last_activity.replace(tzinfo=None),
+                UserSession.expires_at: session_info.expires_at.replace(tzinfo=None)
+            }, synchronize_session=False)
+    
+    def remove(self, session_id: str) -> Optional[SessionInfo]:
+        session_info = self.get(session_id)
+        with get_write_session() as db:
+            db.query(UserSession).filter(UserSession.id == session_id).delete(synchronize_session=False)
+        return session_info
+    
+    def pop_expired(self, now: datetime) -> List[SessionInfo]:
+        cutoff = now.replace(tzinfo=None)
+        with get_write_session() as db:
+            rows = db.query(UserSession, User).join(User, User.id == UserSession.user_id).filter(
+                UserSession.expires_at < cutoff
+            ).all()
+            expired = [info for info in (self._to_session_info(*row) for row in rows) if info]
+            db.query(UserSession).filter(UserSession.expires_at < cutoff).delete(synchronize_session=False)
+        return expired
+    
+    def list_sessions(self) -> List[SessionInfo]:
+        with get_read_session() as db:
+            rows = db.query(UserSession, User).join(User, User.id == UserSession.user_id).filter(
+                UserSession.is_active == 1,
+                User.enabled == 1
+            ).all()
+            return [info for info in (self._to_session_info(*row) for row in rows) if info]
+
+
+SESSION_STORES = {
+    "memory": MemorySessionStore,
+    "database": DatabaseSessionStore
+}
+
+
+def create_session_store(name: str = AUTH_SESSION_STORE) -> SessionStore:
+    """
+    Create a session store by name.
+    
+    Args:
+        name: Store name (memory or database)
+        
+    Returns:
+        SessionStore instance
+    """
+    if name not in SESSION_STORES:
+        raise ValueError(f"Unknown session store {name!r}; expected one of {', '.join(SESSION_STORES)}")
+    return SESSION_STORES[name]()
+
+
 class AuthenticationManager:
     """
     Manages authentication and session handling for real-time features.
@@ -155,10 +457,13 @@ class AuthenticationManager:
     with support for both HTTP and WebSocket connections.
     """
     
-    def __init__(self, secret_key: Optional[str] = None, session_timeout: int = 3600):
-        self.secret_key = secret_key or secrets.token_urlsafe(32)
+    def __init__(self, secret_key: Optional[str] = None, session_timeout: int = 3600,
+                 session_store: Optional[SessionStore] = None,
+                 token_cache: Optional[VerifiedTokenCache] = None):
+        self.secret_key = secret_key or AUTH_SECRET_KEY or secrets.token_urlsafe(32)
         self.session_timeout = session_timeout  # seconds
-        self.active_sessions: Dict[str, SessionInfo] = {}
+        self.session_store = session_store or create_session_store()
+        self.token_cache = token_cache or VerifiedTokenCache()
         self.websocket_auth: Dict[str, WebSocketAuthInfo] = {}
         self.failed_attempts: Dict[str, List[datetime]] = {}
         self.max_failed_attempts = 5
@@ -171,6 +476,14 @@ class AuthenticationManager:
         # Start cleanup task
         self._cleanup_task: Optional[asyncio.Task] = None
         self._cleanup_started = False
+        
+        if self.session_store.shared and not (secret_key or AUTH_SECRET_KEY):
+            logger.warning("Shared session store without SECRET_KEY; tokens only validate on the issuing worker")
+    
+    @property
+    def active_sessions(self) -> Dict[str, SessionInfo]:
+        """Sessions currently held by the session store."""
+        return {session.session_id: session for session in self.session_store.list_sessions()}
     
     def _start_cleanup_task(self) -> None:
         """Start background task for session cleanup."""
@@ -195,19 +508,12 @@ class AuthenticationManager:
             logger.error(f"Session cleanup task error: {e}")
     
     async def _remove_expired_sessions(self) -> None:
-        """Remove expired sessions from memory and database."""
+        """Remove expired sessions from the session store."""
         try:
-            current_time = datetime.now(timezone.utc)
-            expired_sessions = []
-            
-            # Find expired sessions
-            for session_id, session_info in self.active_sessions.items():
-                if current_time > session_info.expires_at:
-                    expired_sessions.append(session_id)
+            expired_sessions = await self._call_store(self.session_store.pop_expired, datetime.now(timezone.utc))
             
-            # Remove expired sessions
-            for session_id in expired_sessions:
-                await self._invalidate_session(session_id, "Session expired")
+            for session_info in expired_sessions:
+                self._forget_session(session_info, "Session expired")
             
             if expired_sessions:
                 logger.info(f"Cleaned up {len(expired_sessions)} expired sessions")
@@ -256,7 +562,7 @@ class AuthenticationManager:
             )
             
             # Store session
-            self.active_sessions[session_id] = session_info
+            self.session_store.add(session_info)
             
             # Log session creation
             self._log_auth_event("session_created", {
@@ -285,7 +591,7 @@ class AuthenticationManager:
             SessionInfo if valid, None otherwise
         """
         try:
-            session_info = self.active_sessions.get(session_id)
+            session_info = self.session_store.get(session_id)
             if not session_info:
                 return None
             
@@ -296,16 +602,86 @@ class AuthenticationManager:
                 asyncio.create_task(self._invalidate_session(session_id, "Session expired"))
                 return None
             
-            # Update last activity and extend expiration
-            session_info.last_activity = current_time
-            session_info.expires_at = current_time + timedelta(seconds=self.session_timeout)
+            return self._refresh_session(session_info, current_time)
             
-            return session_info
+        except Exception as e:
+            logger.error(f"Error validating session {session_id}: {e}")
+            return None
+    
+    async def validate_session_async(self, session_id: str) -> Optional[SessionInfo]:
+        """
+        Validate and refresh a session without blocking the event loop.
+        
+        Args:
+            session_id: Session identifier to validate
+            
+        Returns:
+            SessionInfo if valid, None otherwise
+        """
+        try:
+            session_info = await self._call_store(self.session_store.get, session_id)
+            if not session_info:
+                return None
+            
+            current_time = datetime.now(timezone.utc)
+            
+            # Check if session is expired
+            if current_time > session_info.expires_at:
+                asyncio.create_task(self._invalidate_session(session_id, "Session expired"))
+                return None
+            
+            return await self._refresh_session_async(session_info, current_time)
             
         except Exception as e:
             logger.error(f"Error validating session {session_id}: {e}")
             return None
     
+    async def _call_store(self, method, *args):
+        """
+        Call a session store method from the event loop.
+        
+        Shared stores query the database, so their calls run in a worker
+        thread; the memory store is called directly.
+        """
+        if self.session_store.shared:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+    
+    def _slide_expiration(self, session_info: SessionInfo, current_time: datetime) -> bool:
+        """
+        Record activity on a live session and slide its expiration.
+        
+        The new expiration only needs writing to the session store once it
+        has moved by AUTH_SESSION_TOUCH_INTERVAL, so busy sessions do not
+        cost a write per request.
+        
+        Args:
+            session_info: Session that has not expired
+            current_time: Current time
+            
+        Returns:
+            True if the session store should be touched
+        """
+        session_info.last_activity = current_time
+        expires_at = current_time + timedelta(seconds=self.session_timeout)
+        
+        if (expires_at - session_info.expires_at).total_seconds() >= AUTH_SESSION_TOUCH_INTERVAL:
+            session_info.expires_at = expires_at
+            return True
+        return False
+    
+    def _refresh_session(self, session_info: SessionInfo, current_time: datetime) -> SessionInfo:
+        """Slide a live session's expiration, touching the store when due."""
+        if self._slide_expiration(session_info, current_time):
+            self.session_store.touch(session_info)
+        return session_info
+    
+    async def _refresh_session_async(self, session_info: SessionInfo, current_time: datetime) -> SessionInfo:
+        """Slide a live session's expiration without blocking the event loop."""
+        if self._slide_expiration(session_info, current_time):
+            await self._call_store(self.session_store.touch, session_info)
+        return session_info
+    
     async def _invalidate_session(self, session_id: str, reason: str = "Session invalidated") -> None:
         """
         Invalidate a session.
@@ -315,33 +691,46 @@ class AuthenticationManager:
             reason: Reason for invalidation
         """
         try:
-            session_info = self.active_sessions.get(session_id)
+            # Drop cached tokens even if another worker already removed the session
+            self.token_cache.discard_session(session_id)
+            
+            session_info = await self._call_store(self.session_store.remove, session_id)
             if session_info:
-                # Remove from active sessions
-                del self.active_sessions[session_id]
-                
-                # Remove associated WebSocket auth
-                websocket_clients_to_remove = []
-                for client_id, ws_auth in self.websocket_auth.items():
-                    if ws_auth.session_info.session_id == session_id:
-                        websocket_clients_to_remove.append(client_id)
-                
-                for client_id in websocket_clients_to_remove:
-                    del self.websocket_auth[client_id]
-                
-                # Log session invalidation
-                self._log_auth_event("session_invalidated", {
-                    "session_id": session_id,
-                    "user_id": session_info.user_id,
-                    "username": session_info.username,
-                    "reason": reason
-                })
-                
-                logger.info(f"Session invalidated: {session_id} ({reason})")
+                self._forget_session(session_info, reason)
                 
         except Exception as e:
             logger.error(f"Error invalidating session {session_id}: {e}")
     
+    def _forget_session(self, session_info: SessionInfo, reason: str) -> None:
+        """
+        Drop local state for a session that left the session store.
+        
+        Args:
+            session_info: Removed session
+            reason: Reason for removal
+        """
+        session_id = session_info.session_id
+        self.token_cache.discard_session(session_id)
+        
+        # Remove associated WebSocket auth
+        websocket_clients_to_remove = []
+        for client_id, ws_auth in self.websocket_auth.items():
+            if ws_auth.session_info.session_id == session_id:
+                websocket_clients_to_remove.append(client_id)
+        
+        for client_id in websocket_clients_to_remove:
+            del self.websocket_auth[client_id]
+        
+        # Log session invalidation
+        self._log_auth_event("session_invalidated", {
+            "session_id": session_id,
+            "user_id": session_info.user_id,
+            "username": session_info.username,
+            "reason": reason
+        })
+        
+        logger.info(f"Session invalidated: {session_id} ({reason})")
+    
     def generate_token(self, session_info: SessionInfo) -> AuthToken:
         """
         Generate an authentication token for a session.
@@ -386,6 +775,56 @@ class AuthenticationManager:
         """
         Validate an authentication token.
         
+        Recently verified tokens are served from the token cache without
+        decoding the JWT or reading the session store.
+        
+        Args:
+            token: JWT token to validate
+            
+        Returns:
+            SessionInfo if valid, None otherwise
+        """
+        try:
+            session_info = self.token_cache.get(token)
+            if session_info is not None:
+                current_time = datetime.now(timezone.utc)
+                if current_time <= session_info.expires_at:
+                    return self._refresh_session(session_info, current_time)
+                # Another worker may have extended it; check the store
+                self.token_cache.discard(token)
+            
+            import jwt
+            
+            # Decode and validate token
+            payload = jwt.decode(token, self.secret_key, algorithms=[self.token_algorithm])
+            
+            session_id = payload.get("session_id")
+            if not session_id:
+                return None
+            
+            # Validate associated session
+            session_info = self.validate_session(session_id)
+            if session_info is not None:
+                self.token_cache.put(token, session_info, payload.get("exp"))
+            return session_info
+            
+        except jwt.ExpiredSignatureError:
+            logger.debug("Token expired")
+            return None
+        except jwt.InvalidTokenError as e:
+            logger.warning(f"Invalid token: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Error validating token: {e}")
+            return None
+    
+    async def validate_token_async(self, token: str) -> Optional[SessionInfo]:
+        """
+        Validate an authentication token without blocking the event loop.
+        
+        Behaves like validate_token, but session store reads and writes on
+        a cache miss or touch run in a worker thread for the database store.
+        
         Args:
             token: JWT token to validate
             
@@ -393,6 +832,14 @@ class AuthenticationManager:
             SessionInfo if valid, None otherwise
         """
         try:
+            session_info = self.token_cache.get(token)
+            if session_info is not None:
+                current_time = datetime.now(timezone.utc)
+                if current_time <= session_info.expires_at:
+                    return await self._refresh_session_async(session_info, current_time)
+                # Another worker may have extended it; check the store
+                self.token_cache.discard(token)
+            
             import jwt
             
             # Decode and validate token
@@ -403,7 +850,10 @@ class AuthenticationManager:
                 return None
             
             # Validate associated session
-            return self.validate_session(session_id)
+            session_info = await self.validate_session_async(session_id)
+            if session_info is not None:
+                self.token_cache.put(token, session_info, payload.get("exp"))
+            return session_info
             
         except jwt.ExpiredSignatureError:
             logger.debug("Token expired")
@@ -441,7 +891,7 @@ class AuthenticationManager:
                 raise AuthenticationError("Authentication token required for WebSocket connection")
             
             # Validate token
-            session_info = self.validate_token(token)
+            session_info = await self.validate_token_async(token)
             if not session_info:
                 raise AuthenticationError("Invalid or expired authentication token")
             
@@ -591,22 +1041,26 @@ class AuthenticationManager:
         try:
             current_time = datetime.now(timezone.utc)
             
+            sessions = self.session_store.list_sessions()
+            
             # Count sessions by role
             role_counts = {}
             active_count = 0
             
-            for session_info in self.active_sessions.values():
+            for session_info in sessions:
                 if current_time <= session_info.expires_at:
                     active_count += 1
                     role = session_info.role.value
                     role_counts[role] = role_counts.get(role, 0) + 1
             
             return {
-                "total_sessions": len(self.active_sessions),
+                "total_sessions": len(sessions),
                 "active_sessions": active_count,
                 "websocket_connections": len(self.websocket_auth),
                 "sessions_by_role": role_counts,
-                "failed_attempt_sources": len(self.failed_attempts)
+                "failed_attempt_sources": len(self.failed_attempts),
+                "session_store": self.session_store.name,
+                "token_cache": self.token_cache.get_statistics()
             }
             
         except Exception as e:
@@ -649,10 +1103,11 @@ class AuthenticationManager:
                 except asyncio.CancelledError:
                     pass
             
-            # Invalidate all sessions
-            session_ids = list(self.active_sessions.keys())
-            for session_id in session_ids:
-                await self._invalidate_session(session_id, "System shutdown")
+            # Sessions in a shared store stay valid for the other workers
+            if not self.session_store.shared:
+                for session_info in self.session_store.list_sessions():
+                    await self._invalidate_session(session_info.session_id, "System shutdown")
+            self.token_cache.clear()
             
             logger.info("Authentication manager shutdown complete")
             
@@ -850,7 +1305,7 @@ async def get_current_session(credentials: Optional[HTTPAuthorizationCredentials
     if not credentials:
         raise HTTPException(status_code=401, detail="Authentication required")
     
-    session_info = auth_manager.validate_token(credentials.credentials)
+    session_info = await auth_manager.validate_token_async(credentials.credentials)
     if not session_info:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
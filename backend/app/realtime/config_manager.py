@@ -5,13 +5,15 @@ This module provides centralized configuration management for log sources,
 monitoring settings, and notification rules with database persistence.
 """
 
+import asyncio
 import json
 import logging
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import select, text
 
+from ..async_database import async_read_session
 from ..database import get_db_session
 from ..models import MonitoringConfigDB, LogSource as LogSourceDB
 from .models import MonitoringConfig, LogSourceConfig, NotificationRule, LogSourceType, MonitoringStatus
@@ -80,6 +82,49 @@ class ConfigManager:
             # Return default configuration on error
             return MonitoringConfig()
     
+    async def load_config_async(self, force_reload: bool = False) -> MonitoringConfig:
+        """
+        Load monitoring configuration on the async read pool.
+        
+        Used by API handlers so a cache miss does not block the event loop.
+        Creating the default configuration is a write, so that case is
+        handed to load_config on a worker thread.
+        
+        Args:
+            force_reload: Force reload from database, ignoring cache
+            
+        Returns:
+            MonitoringConfig instance
+        """
+        try:
+            if not force_reload and self._is_cache_valid():
+                return self._config_cache
+            
+            async with async_read_session() as db:
+                config_record = (await db.execute(
+                    select(MonitoringConfigDB).order_by(MonitoringConfigDB.updated_at.desc()).limit(1)
+                )).scalars().first()
+                
+                if config_record is None:
+                    return await asyncio.to_thread(self.load_config, force_reload)
+                
+                config = MonitoringConfig.from_dict(json.loads(config_record.config_data))
+                source_records = (await db.execute(select(LogSourceDB))).scalars().all()
+            
+            config.log_sources = [self._log_source_from_record(record) for record in source_records]
+            
+            # Update cache
+            self._config_cache = config
+            self._cache_timestamp = datetime.now(timezone.utc)
+            
+            logger.debug("Configuration loaded successfully")
+            return config
+        
+        except Exception as e:
+            logger.error(f"Failed to load configuration: {e}")
+            # Return default configuration on error
+            return MonitoringConfig()
+    
     def save_config(self, config: MonitoringConfig) -> bool:
         """
         Save monitoring configuration to database.
@@ -348,29 +393,37 @@ class ConfigManager:
             logger.error(f"Failed to update source metrics: {e}")
             return False
     
-    def validate_configuration(self) -> List[str]:
+    def validate_configuration(self, config: Optional[MonitoringConfig] = None) -> List[str]:
         """
         Validate the current configuration.
         
+        Args:
+            config: Already loaded configuration; loaded when omitted
+            
         Returns:
             List of validation issues (empty if valid)
         """
         try:
-            config = self.load_config()
+            if config is None:
+                config = self.load_config()
             return config.validate_configuration()
         except Exception as e:
             logger.error(f"Failed to validate configuration: {e}")
             return [f"Configuration validation failed: {e}"]
     
-    def get_configuration_summary(self) -> Dict[str, Any]:
+    def get_configuration_summary(self, config: Optional[MonitoringConfig] = None) -> Dict[str, Any]:
         """
         Get a summary of the current configuration.
         
+        Args:
+            config: Already loaded configuration; loaded when omitted
+            
         Returns:
             Dictionary with configuration summary
         """
         try:
-            config = self.load_config()
+            if config is None:
+                config = self.load_config()
             
             enabled_sources = config.get_enabled_sources()
             
@@ -399,6 +452,21 @@ class ConfigManager:
         age = (datetime.now(timezone.utc) - self._cache_timestamp).total_seconds()
         return age < self.cache_ttl_seconds
     
+    @staticmethod
+    def _log_source_from_record(record: LogSourceDB) -> LogSourceConfig:
+        """Convert a database record to LogSourceConfig."""
+        return LogSourceConfig(
+            source_name=record.source_name,
+            path=record.path,
+            source_type=LogSourceType.FILE,  # Default, could be stored in DB
+            enabled=bool(record.enabled),
+            status=MonitoringStatus(record.status),
+            last_monitored=record.last_monitored,
+            file_size=record.file_size,
+            last_offset=record.last_offset,
+            error_message=record.error_message
+        )
+    
     def _load_log_sources_from_db(self, db: Session) -> List[LogSourceConfig]:
         """Load log sources from database."""
         sources = []
@@ -407,19 +475,7 @@ class ConfigManager:
             source_records = db.query(LogSourceDB).all()
             
             for record in source_records:
-                # Convert database record to LogSourceConfig
-                source_config = LogSourceConfig(
-                    source_name=record.source_name,
-                    path=record.path,
-                    source_type=LogSourceType.FILE,  # Default, could be stored in DB
-                    enabled=bool(record.enabled),
-                    status=MonitoringStatus(record.status),
-                    last_monitored=record.last_monitored,
-                    file_size=record.file_size,
-                    last_offset=record.last_offset,
-                    error_message=record.error_message
-                )
-                sources.append(source_config)
+                sources.append(self._log_source_from_record(record))
         
         except Exception as e:
             logger.error(f"Failed to load log sources from database: {e}")
@@ -7,19 +7,22 @@ real-time processing of log entries from the ingestion queue.
 
 import asyncio
 import logging
+import os
 import time
 from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional, Callable
+from typing import Dict, Any, List, Optional, Callable, Set
 from contextlib import asynccontextmanager
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
 
-from app.database import get_database_session
+from app.async_database import async_write_session
 from app.models import RawLog, Event, AIAnalysis as AIAnalysisModel
 from app.parser import parse_log_entries, ParsingError
 from app.analyzer import analyze_event, AnalysisError
 from app.schemas import ParsedEvent, EventCategory, EventResponse, AIAnalysis as AIAnalysisSchema
 from app.background_tasks import BackgroundTaskManager
+from app.metrics import DecayingRate, EVENTS_PARSED, QuantileSketch, RingBuffer, stage_timer
+from app.profiling import stage_profiler
 
 from .format_detector import LogFormatDetector, FormatPattern, parse_with_auto_detection
 from .error_handler import ErrorHandler, handle_processing_error
@@ -33,6 +36,9 @@ from .exceptions import ProcessingError
 
 logger = logging.getLogger(__name__)
 
+# Notification fan-outs allowed to run at once; further batches wait for a slot
+NOTIFICATION_MAX_INFLIGHT = int(os.getenv("NOTIFICATION_MAX_INFLIGHT", "32"))
+
 
 class RealtimeProcessingMetrics:
     """Metrics collection for real-time processing."""
@@ -62,12 +68,12 @@ class RealtimeProcessingMetrics:
             'avg_processing_time': 0.0,
             'min_processing_time': float('inf'),
             'max_processing_time': 0.0,
-            'processing_times': [],
+            'processing_times': RingBuffer(1000),
             
             # Queue metrics
             'batches_processed': 0,
             'avg_batch_size': 0.0,
-            'batch_processing_times': [],
+            'batch_processing_times': RingBuffer(100),
             
             # Error tracking
             'parsing_errors': 0,
@@ -80,6 +86,7 @@ class RealtimeProcessingMetrics:
             'notifications_sent': 0,
             'notifications_failed': 0,
             'notification_rules_matched': 0,
+            'notification_backpressure_waits': 0,
             'high_severity_events': 0,
             
             # Timestamps
@@ -87,14 +94,18 @@ class RealtimeProcessingMetrics:
             'last_notification_sent': None,
             'metrics_start_time': datetime.now(timezone.utc)
         }
+        self.processing_time_sketch = QuantileSketch()
+        self.processing_rate = DecayingRate(half_life=60.0)
     
     def record_entry_processed(self, processing_time: float, success: bool):
         """Record processing of an entry."""
         self.metrics['entries_processed'] += 1
+        self.processing_rate.add()
         
         if success:
             self.metrics['total_processing_time'] += processing_time
             self.metrics['processing_times'].append(processing_time)
+            self.processing_time_sketch.add(processing_time)
             
             # Update min/max
             self.metrics['min_processing_time'] = min(
@@ -113,10 +124,6 @@ class RealtimeProcessingMetrics:
             self.metrics['entries_failed'] += 1
         
         self.metrics['last_processed'] = datetime.now(timezone.utc)
-        
-        # Keep only recent processing times
-        if len(self.metrics['processing_times']) > 1000:
-            self.metrics['processing_times'] = self.metrics['processing_times'][-500:]
     
     def record_batch_processed(self, batch_size: int, processing_time: float):
         """Record processing of a batch."""
@@ -127,10 +134,6 @@ class RealtimeProcessingMetrics:
         total_entries = self.metrics['entries_processed']
         if self.metrics['batches_processed'] > 0:
             self.metrics['avg_batch_size'] = total_entries / self.metrics['batches_processed']
-        
-        # Keep only recent batch times
-        if len(self.metrics['batch_processing_times']) > 100:
-            self.metrics['batch_processing_times'] = self.metrics['batch_processing_times'][-50:]
     
     def record_validation_result(self, result: ValidationResult, sanitized: bool):
         """Record validation result."""
@@ -175,6 +178,10 @@ class RealtimeProcessingMetrics:
         if high_severity:
             self.metrics['high_severity_events'] += 1
     
+    def record_notification_backpressure(self):
+        """Record a batch that waited for a notification slot."""
+        self.metrics['notification_backpressure_waits'] += 1
+    
     def record_notification_result(self, success: bool):
         """Record notification delivery result."""
         if success:
@@ -202,6 +209,13 @@ class RealtimeProcessingMetrics:
         # Add uptime
         metrics['uptime_seconds'] = uptime
         
+        # Recent rate and processing time distribution
+        metrics['recent_processing_rate'] = self.processing_rate.rate()
+        for name, value in self.processing_time_sketch.quantiles().items():
+            metrics[f'{name}_processing_time'] = value
+        metrics['recent_avg_processing_time'] = self.metrics['processing_times'].mean()
+        metrics['avg_batch_processing_time'] = self.metrics['batch_processing_times'].mean()
+        
         # Remove raw processing times from output
         del metrics['processing_times']
         del metrics['batch_processing_times']
@@ -270,6 +284,8 @@ class EnhancedBackgroundProcessor(RealtimeComponent, HealthMonitorMixin):
         # Processing control
         self._processing_task: Optional[asyncio.Task] = None
         self._metrics_task: Optional[asyncio.Task] = None
+        self._notification_tasks: Set[asyncio.Task] = set()
+        self._notification_slots = asyncio.Semaphore(max(1, NOTIFICATION_MAX_INFLIGHT))
         
         # Callbacks for processing events
         self._processing_callbacks: List[Callable[[LogEntry, ProcessingResult], None]] = []
@@ -285,6 +301,10 @@ class EnhancedBackgroundProcessor(RealtimeComponent, HealthMonitorMixin):
         # Start metrics collection
         self._metrics_task = asyncio.create_task(self._update_metrics_continuously())
         
+        # Resume notification digests left pending by the previous run
+        if self.notification_manager:
+            await self.notification_manager.load_pending_digests()
+        
         # Initialize health metrics
         self.update_health_metric("processing_rate", 0.0)
         self.update_health_metric("success_rate", 0.0)
@@ -301,6 +321,16 @@ class EnhancedBackgroundProcessor(RealtimeComponent, HealthMonitorMixin):
                 await self._metrics_task
             except asyncio.CancelledError:
                 pass
+        
+        # Let in-flight notification fan-outs finish, then stop channel workers
+        if self._notification_tasks:
+            await asyncio.gather(*self._notification_tasks, return_exceptions=True)
+        if self.notification_manager:
+            await self.notification_manager.shutdown()
+        
+        # Deliver updates still waiting in the coalescing window
+        if self.result_broadcaster:
+            await self.result_broadcaster.close()
     
     def add_processing_callback(self, callback: Callable[[LogEntry, ProcessingResult], None]):
         """Add a callback to be called after processing each entry."""
@@ -317,6 +347,8 @@ class EnhancedBackgroundProcessor(RealtimeComponent, HealthMonitorMixin):
             'notifications_sent': self.metrics.metrics['notifications_sent'],
             'notifications_failed': self.metrics.metrics['notifications_failed'],
             'notification_rules_matched': self.metrics.metrics['notification_rules_matched'],
+            'notifications_in_flight': len(self._notification_tasks),
+            'notification_backpressure_waits': self.metrics.metrics['notification_backpressure_waits'],
             'high_severity_events': self.metrics.metrics['high_severity_events'],
             'last_notification_sent': self.metrics.metrics['last_notification_sent']
         }
@@ -344,9 +376,10 @@ class EnhancedBackgroundProcessor(RealtimeComponent, HealthMonitorMixin):
         batch_start_time = time.time()
         logger.debug(f"Processing batch of {len(batch)} entries")
         
-        # Process each entry in the batch
-        for entry in batch:
-            await self._process_single_entry(entry)
+        # Process each entry in the batch, timing its stages as one batch profile
+        with stage_profiler.batch(len(batch)):
+            for entry in batch:
+                await self._process_single_entry(entry)
         
         # Record batch metrics
         batch_time = time.time() - batch_start_time
@@ -372,7 +405,10 @@ class EnhancedBackgroundProcessor(RealtimeComponent, HealthMonitorMixin):
                 )
             
             # Step 1: Validate and sanitize the entry
-            processing_result = process_log_entry(entry)
+            with stage_timer("validate", entry.source_name) as stage:
+                processing_result = process_log_entry(entry)
+                if not processing_result.success:
+                    stage.outcome = "rejected"
             
             # Record validation metrics
             self.metrics.record_validation_result(
@@ -404,7 +440,10 @@ class EnhancedBackgroundProcessor(RealtimeComponent, HealthMonitorMixin):
             
             # Step 2: Parse the log content
             try:
-                parsed_events = await self._parse_log_content(entry)
+                with stage_timer("parse", entry.source_name) as stage:
+                    parsed_events = await self._parse_log_content(entry)
+                    if not parsed_events:
+                        stage.outcome = "empty"
                 if not parsed_events:
                     self.metrics.record_parsing_result(False)
                     self.metrics.record_entry_processed(time.time() - start_time, False)
@@ -420,6 +459,8 @@ class EnhancedBackgroundProcessor(RealtimeComponent, HealthMonitorMixin):
                     return
                 
                 self.metrics.record_parsing_result(True, len(parsed_events))
+                for event in parsed_events:
+                    EVENTS_PARSED.labels(entry.source_name, event.category.value).inc()
                 
             except Exception as parse_error:
                 self.metrics.record_parsing_result(False)
@@ -607,19 +648,11 @@ class EnhancedBackgroundProcessor(RealtimeComponent, HealthMonitorMixin):
                     # Create a raw unparsed event as last resort
                     parsed_events = self._create_unparsed_event(entry, temp_raw_log_id)
             
-            # Update source information for real-time context
+            # Update source information for real-time context. ParsedEvent
+            # has no free-form fields; the parsing method is reported in the
+            # processing result metadata instead.
             for event in parsed_events:
                 event.source = entry.source_name
-                # Add real-time metadata
-                if not hasattr(event, 'metadata'):
-                    event.metadata = {}
-                event.metadata.update({
-                    'realtime_processed': True,
-                    'source_path': entry.source_path,
-                    'file_offset': entry.file_offset,
-                    'entry_priority': entry.priority.name,
-                    'parsing_method': self._get_parsing_method_used(entry, learned_pattern is not None)
-                })
             
             return parsed_events
             
@@ -652,15 +685,6 @@ class EnhancedBackgroundProcessor(RealtimeComponent, HealthMonitorMixin):
                 parsed_at=datetime.now(timezone.utc)
             )
             
-            # Add metadata indicating this is unparsed
-            if not hasattr(unparsed_event, 'metadata'):
-                unparsed_event.metadata = {}
-            unparsed_event.metadata.update({
-                'unparsed': True,
-                'parsing_failed': True,
-                'original_content_length': len(entry.content)
-            })
-            
             logger.warning(f"Created unparsed event for entry {entry.entry_id}")
             return [unparsed_event]
             
@@ -702,54 +726,64 @@ class EnhancedBackgroundProcessor(RealtimeComponent, HealthMonitorMixin):
             True if successful, False otherwise
         """
         try:
-            with get_database_session() as db:
-                events_with_analysis = []
+            events_with_analysis = []
+            db_rows = []
+            
+            # Run AI analysis before opening the writer session so the single
+            # writer connection is only held for the inserts themselves
+            for event in parsed_events:
+                db_rows.append(Event(
+                    id=event.id,
+                    raw_log_id=f"realtime_{entry.entry_id}",  # Use entry ID as raw log reference
+                    timestamp=event.timestamp,
+                    source=event.source,
+                    message=event.message,
+                    category=event.category.value,
+                    parsed_at=event.parsed_at or datetime.now(timezone.utc)
+                ))
                 
-                for event in parsed_events:
-                    # Store event in database
-                    db_event = Event(
-                        id=event.id,
-                        raw_log_id=f"realtime_{entry.entry_id}",  # Use entry ID as raw log reference
-                        timestamp=event.timestamp,
-                        source=event.source,
-                        message=event.message,
-                        category=event.category.value,
-                        parsed_at=event.parsed_at or datetime.now(timezone.utc)
-                    )
-                    db.add(db_event)
-                    
-                    # Run AI analysis
-                    ai_analysis = None
-                    try:
+                # Run AI analysis
+                try:
+                    with stage_timer("analyze", entry.source_name):
                         ai_analysis = analyze_event(event)
-                        
-                        # Store AI analysis
-                        db_analysis = AIAnalysisModel(
-                            id=ai_analysis.id,
-                            event_id=ai_analysis.event_id,
-                            severity_score=ai_analysis.severity_score,
-                            explanation=ai_analysis.explanation,
-                            recommendations=str(ai_analysis.recommendations),
-                            analyzed_at=ai_analysis.analyzed_at or datetime.now(timezone.utc)
-                        )
-                        db.add(db_analysis)
-                        
-                        # Store for notification processing
-                        events_with_analysis.append((event, ai_analysis))
-                        
-                    except AnalysisError as e:
-                        logger.warning(f"Failed to analyze event {event.id}: {e}")
-                        # Store event without analysis for potential notification
-                        events_with_analysis.append((event, None))
-                        continue
-                
-                # Commit all changes
-                db.commit()
-                
-                # Process notifications after successful database commit
-                await self._process_notifications_for_events(events_with_analysis)
-                
-                return True
+                    
+                    db_rows.append(AIAnalysisModel(
+                        id=ai_analysis.id,
+                        event_id=ai_analysis.event_id,
+                        severity_score=ai_analysis.severity_score,
+                        explanation=ai_analysis.explanation,
+                        recommendations=str(ai_analysis.recommendations),
+                        analyzed_at=ai_analysis.analyzed_at or datetime.now(timezone.utc)
+                    ))
+                    
+                    # Store for notification processing
+                    events_with_analysis.append((event, ai_analysis))
+                    
+                except AnalysisError as e:
+                    logger.warning(f"Failed to analyze event {event.id}: {e}")
+                    # Store event without analysis for potential notification
+                    events_with_analysis.append((event, None))
+            
+            # Store everything in one short write transaction
+            with stage_timer("db_write", entry.source_name) as stage:
+                stage.count = len(parsed_events)
+                async with async_write_session() as db:
+                    db.add_all(db_rows)
+            
+            # Process notifications after successful database commit, without
+            # holding up the batch while channels deliver and retry. Once every
+            # slot is taken the batch waits, pushing back on the ingestion queue
+            if self.notification_manager and events_with_analysis:
+                if self._notification_slots.locked():
+                    self.metrics.record_notification_backpressure()
+                await self._notification_slots.acquire()
+                task = asyncio.create_task(
+                    self._process_notifications_for_events(events_with_analysis, entry.source_name)
+                )
+                self._notification_tasks.add(task)
+                task.add_done_callback(self._notification_done)
+            
+            return True
                 
         except SQLAlchemyError as e:
             self.metrics.record_database_error()
@@ -759,42 +793,63 @@ class EnhancedBackgroundProcessor(RealtimeComponent, HealthMonitorMixin):
             logger.error(f"Unexpected error storing events for entry {entry.entry_id}: {e}")
             return False
     
+    def _notification_done(self, task: asyncio.Task) -> None:
+        """Release the slot held by a finished notification fan-out."""
+        self._notification_tasks.discard(task)
+        self._notification_slots.release()
+    
     async def _process_notifications_for_events(
         self, 
-        events_with_analysis: List[tuple[ParsedEvent, Optional[AIAnalysisSchema]]]
+        events_with_analysis: List[tuple[ParsedEvent, Optional[AIAnalysisSchema]]],
+        source_name: str = "unknown"
     ) -> None:
         """
         Process notifications for events based on AI analysis results.
         
         Args:
             events_with_analysis: List of tuples containing (event, ai_analysis)
+            source_name: Configured log source the events came from, used as
+                the metrics label
         """
         if not self.notification_manager:
             logger.debug("No notification manager configured, skipping notifications")
             return
         
-        for event, ai_analysis in events_with_analysis:
-            try:
-                # Convert ParsedEvent to EventResponse for notification system
-                event_response = EventResponse(
-                    id=event.id,
-                    raw_log_id=f"realtime_{event.id}",
-                    timestamp=event.timestamp,
-                    source=event.source,
-                    message=event.message,
-                    category=event.category.value,
-                    parsed_at=event.parsed_at or datetime.now(timezone.utc)
-                )
-                
-                # Check if this event should trigger notifications
-                should_notify = self._should_trigger_notification(event_response, ai_analysis)
+        # Fan out every event at once; deliveries queue per channel
+        await asyncio.gather(*(
+            self._process_event_notifications(event, ai_analysis, source_name)
+            for event, ai_analysis in events_with_analysis
+        ))
+    
+    async def _process_event_notifications(
+        self,
+        event: ParsedEvent,
+        ai_analysis: Optional[AIAnalysisSchema],
+        source_name: str = "unknown"
+    ) -> None:
+        """Send and record notifications for a single event."""
+        try:
+            # Convert ParsedEvent to EventResponse for notification system
+            event_response = EventResponse(
+                id=event.id,
+                raw_log_id=f"realtime_{event.id}",
+                timestamp=event.timestamp,
+                source=event.source,
+                message=event.message,
+                category=event.category.value,
+                parsed_at=event.parsed_at or datetime.now(timezone.utc)
+            )
+            
+            # Check if this event should trigger notifications
+            should_notify = self._should_trigger_notification(event_response, ai_analysis)
+            
+            if should_notify:
+                # Record notification trigger metrics
+                high_severity = ai_analysis and ai_analysis.severity_score >= 7
+                self.metrics.record_notification_triggered(1, high_severity)
                 
-                if should_notify:
-                    # Record notification trigger metrics
-                    high_severity = ai_analysis and ai_analysis.severity_score >= 7
-                    self.metrics.record_notification_triggered(1, high_severity)
-                    
-                    # Send notifications with retry logic
+                # Send notifications with retry logic
+                with stage_timer("notify", source_name) as stage:
                     notification_results = await self.notification_manager.send_notification_with_retry(
                         event_response, ai_analysis, max_retries=2, retry_delay=0.5
                     )
@@ -802,26 +857,28 @@ class EnhancedBackgroundProcessor(RealtimeComponent, HealthMonitorMixin):
                     # Record notification results
                     successful_notifications = sum(1 for success in notification_results.values() if success)
                     failed_notifications = len(notification_results) - successful_notifications
-                    
-                    for _ in range(successful_notifications):
-                        self.metrics.record_notification_result(True)
-                    for _ in range(failed_notifications):
-                        self.metrics.record_notification_result(False)
-                    
-                    logger.info(
-                        f"Sent notifications for event {event.id}: "
-                        f"{successful_notifications} successful, {failed_notifications} failed"
-                    )
-                    
-                    # Broadcast notification status via WebSocket
-                    if self.websocket_manager:
-                        await self._broadcast_notification_status(
-                            event_response, ai_analysis, notification_results
-                        )
+                    if failed_notifications:
+                        stage.outcome = "failed"
                 
-            except Exception as e:
-                logger.error(f"Error processing notifications for event {event.id}: {e}")
-                self.metrics.record_notification_result(False)
+                for _ in range(successful_notifications):
+                    self.metrics.record_notification_result(True)
+                for _ in range(failed_notifications):
+                    self.metrics.record_notification_result(False)
+                
+                logger.info(
+                    f"Sent notifications for event {event.id}: "
+                    f"{successful_notifications} successful, {failed_notifications} failed"
+                )
+                
+                # Broadcast notification status via WebSocket
+                if self.websocket_manager:
+                    await self._broadcast_notification_status(
+                        event_response, ai_analysis, notification_results
+                    )
+            
+        except Exception as e:
+            logger.error(f"Error processing notifications for event {event.id}: {e}")
+            self.metrics.record_notification_result(False)
     
     def _should_trigger_notification(
         self, 
@@ -7,18 +7,23 @@ subscription management, and message queuing for disconnected clients.
 
 import asyncio
 import logging
-from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional, Any, Set, Callable
-from collections import defaultdict, deque
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Any, Set, Callable, Tuple
+from collections import defaultdict
 from dataclasses import dataclass
 from enum import Enum
 
 from .base import RealtimeComponent, HealthMonitorMixin
-from .websocket_server import EventUpdate, WebSocketManager
+from .websocket_server import EventUpdate, WebSocketManager, encode_message, event_message
+from .event_log import EventLog, EVENT_LOG_CAPACITY, EVENT_LOG_FLUSH_INTERVAL
 from .exceptions import BroadcastError
 
 logger = logging.getLogger(__name__)
 
+# Replayed events are sent in frames of this many events
+EVENT_REPLAY_CHUNK_SIZE = int(os.getenv("EVENT_REPLAY_CHUNK_SIZE", "200"))
+
 
 class EventPriority(int, Enum):
     """Event priority levels."""
@@ -75,14 +80,119 @@ class EventFilter:
         return True
 
 
-@dataclass
-class QueuedMessage:
-    """Queued message for disconnected clients."""
-    client_id: str
-    event: EventUpdate
-    queued_at: datetime
-    attempts: int = 0
-    max_attempts: int = 3
+# EventUpdate.priority is validated to this range
+PRIORITY_LEVELS = (1, 10)
+
+RouteKey = Tuple[Optional[str], Optional[str], int]
+
+
+class SubscriptionIndex:
+    """
+    Routing index from event attributes to the clients that should receive them.
+    
+    Each client is registered under every (event_type, category, priority)
+    combination its subscriptions and filter accept, with None standing in
+    for "any". Routing an event reads at most four buckets, so the cost
+    follows the number of matching clients rather than all clients. Source
+    filters are uncommon and are checked on the matched clients only.
+    """
+    
+    def __init__(self):
+        self._routes: Dict[RouteKey, Set[str]] = defaultdict(set)
+        self._client_keys: Dict[str, List[RouteKey]] = {}
+        self._client_sources: Dict[str, Set[str]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._client_keys)
+    
+    def update_client(self, client_id: str, subscriptions: Optional[Set[str]],
+                      event_filter: Optional[EventFilter]) -> None:
+        """
+        Replace a client's routes.
+        
+        Args:
+            client_id: Client identifier
+            subscriptions: Subscribed event types (empty or None for all types)
+            event_filter: Optional filter criteria
+        """
+        self.remove_client(client_id)
+        
+        event_types = set(subscriptions) if subscriptions else None
+        categories = None
+        low, high = PRIORITY_LEVELS
+        
+        if event_filter:
+            if event_filter.event_types:
+                filter_types = set(event_filter.event_types)
+                event_types = event_types & filter_types if event_types is not None else filter_types
+            if event_filter.categories:
+                categories = set(event_filter.categories)
+            if event_filter.min_priority:
+                low = max(low, event_filter.min_priority)
+            if event_filter.max_priority:
+                high = min(high, event_filter.max_priority)
+            if event_filter.sources:
+                self._client_sources[client_id] = set(event_filter.sources)
+        
+        keys = [
+            (event_type, category, priority)
+            for event_type in (event_types if event_types is not None else (None,))
+            for category in (categories if categories is not None else (None,))
+            for priority in range(low, high + 1)
+        ]
+        for key in keys:
+            self._routes[key].add(client_id)
+        self._client_keys[client_id] = keys
+    
+    def remove_client(self, client_id: str) -> None:
+        """Drop every route for a client."""
+        for key in self._client_keys.pop(client_id, ()):
+            clients = self._routes.get(key)
+            if clients is not None:
+                clients.discard(client_id)
+                if not clients:
+                    del self._routes[key]
+        self._client_sources.pop(client_id, None)
+    
+    def match(self, event: EventUpdate) -> Set[str]:
+        """
+        Find clients whose subscriptions and filters accept an event.
+        
+        Args:
+            event: Event to route
+            
+        Returns:
+            Set of matching client IDs
+        """
+        priority = event.priority
+        keys = [(event.event_type, None, priority), (None, None, priority)]
+        
+        category = event.data.get('category')
+        if category and _is_hashable(category):
+            keys.append((event.event_type, category, priority))
+            keys.append((None, category, priority))
+        
+        matched: Set[str] = set()
+        for key in keys:
+            clients = self._routes.get(key)
+            if clients:
+                matched |= clients
+        
+        if matched and self._client_sources:
+            source = event.data.get('source')
+            for client_id in matched & self._client_sources.keys():
+                if not source or not _is_hashable(source) or source not in self._client_sources[client_id]:
+                    matched.discard(client_id)
+        
+        return matched
+
+
+def _is_hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
 
 
 class EventBroadcaster(RealtimeComponent, HealthMonitorMixin):
@@ -91,23 +201,32 @@ class EventBroadcaster(RealtimeComponent, HealthMonitorMixin):
     
     Provides advanced event distribution capabilities including:
     - Event filtering and subscription management
-    - Message queuing for disconnected clients
+    - Sequence-numbered replay for reconnecting clients
     - Event throttling and rate limiting
     - Broadcasting statistics and monitoring
     """
     
-    def __init__(self, websocket_manager: WebSocketManager, max_queue_size: int = 1000):
-        super().__init__("EventBroadcaster")
+    def __init__(self, websocket_manager: WebSocketManager, max_queue_size: int = EVENT_LOG_CAPACITY):
+        """
+        Initialize the event broadcaster.
+        
+        Args:
+            websocket_manager: WebSocket manager used for delivery
+            max_queue_size: Number of broadcast events kept for reconnect replay
+        """
+        RealtimeComponent.__init__(self, "EventBroadcaster")
+        HealthMonitorMixin.__init__(self)
         self.websocket_manager = websocket_manager
         self.max_queue_size = max_queue_size
         
         # Client subscriptions and filters
         self.client_filters: Dict[str, EventFilter] = {}
         self.client_subscriptions: Dict[str, Set[str]] = defaultdict(set)
+        self.subscription_index = SubscriptionIndex()
         
-        # Message queuing for disconnected clients
-        self.message_queue: Dict[str, deque] = defaultdict(lambda: deque(maxlen=100))
-        self.queue_worker_task: Optional[asyncio.Task] = None
+        # Replay log for clients that reconnect with their last sequence number
+        self.event_log = EventLog(capacity=max_queue_size)
+        self.log_writer_task: Optional[asyncio.Task] = None
         
         # Event throttling
         self.throttle_rules: Dict[str, Dict[str, Any]] = {}
@@ -118,9 +237,10 @@ class EventBroadcaster(RealtimeComponent, HealthMonitorMixin):
             "events_processed": 0,
             "events_filtered": 0,
             "events_throttled": 0,
-            "messages_queued": 0,
             "messages_delivered": 0,
-            "queue_overflows": 0
+            "replays_served": 0,
+            "replays_too_far_behind": 0,
+            "events_replayed": 0
         }
         
         # Event handlers
@@ -130,8 +250,10 @@ class EventBroadcaster(RealtimeComponent, HealthMonitorMixin):
         """Start event broadcaster."""
         logger.info("Starting event broadcaster")
         
-        # Start queue worker
-        self.queue_worker_task = asyncio.create_task(self._queue_worker())
+        # Continue the sequence from the persisted log
+        await self.event_log.load()
+        if self.event_log.persist:
+            self.log_writer_task = asyncio.create_task(self._log_writer())
         
         logger.info("Event broadcaster started")
     
@@ -139,16 +261,14 @@ class EventBroadcaster(RealtimeComponent, HealthMonitorMixin):
         """Stop event broadcaster."""
         logger.info("Stopping event broadcaster")
         
-        # Cancel queue worker
-        if self.queue_worker_task:
-            self.queue_worker_task.cancel()
+        # Stop the log writer and save what it had not written yet
+        if self.log_writer_task:
+            self.log_writer_task.cancel()
             try:
-                await self.queue_worker_task
+                await self.log_writer_task
             except asyncio.CancelledError:
                 pass
-        
-        # Clear queues
-        self.message_queue.clear()
+        await self.event_log.flush()
         
         logger.info("Event broadcaster stopped")
     
@@ -161,6 +281,7 @@ class EventBroadcaster(RealtimeComponent, HealthMonitorMixin):
             event_filter: Filter criteria
         """
         self.client_filters[client_id] = event_filter
+        self._reindex_client(client_id)
         logger.debug(f"Added filter for client {client_id}")
     
     def remove_client_filter(self, client_id: str) -> None:
@@ -172,6 +293,7 @@ class EventBroadcaster(RealtimeComponent, HealthMonitorMixin):
         """
         if client_id in self.client_filters:
             del self.client_filters[client_id]
+            self._reindex_client(client_id)
             logger.debug(f"Removed filter for client {client_id}")
     
     def subscribe_client(self, client_id: str, event_types: List[str]) -> None:
@@ -183,6 +305,7 @@ class EventBroadcaster(RealtimeComponent, HealthMonitorMixin):
             event_types: List of event types to subscribe to
         """
         self.client_subscriptions[client_id].update(event_types)
+        self._reindex_client(client_id)
         logger.debug(f"Client {client_id} subscribed to: {event_types}")
     
     def unsubscribe_client(self, client_id: str, event_types: List[str]) -> None:
@@ -194,8 +317,20 @@ class EventBroadcaster(RealtimeComponent, HealthMonitorMixin):
             event_types: List of event types to unsubscribe from
         """
         self.client_subscriptions[client_id].difference_update(event_types)
+        self._reindex_client(client_id)
         logger.debug(f"Client {client_id} unsubscribed from: {event_types}")
     
+    def _reindex_client(self, client_id: str) -> None:
+        """Rebuild a client's routes after its subscriptions or filter changed."""
+        if client_id in self.client_subscriptions or client_id in self.client_filters:
+            self.subscription_index.update_client(
+                client_id,
+                self.client_subscriptions.get(client_id),
+                self.client_filters.get(client_id)
+            )
+        else:
+            self.subscription_index.remove_client(client_id)
+    
     def add_throttle_rule(self, event_type: str, min_interval_seconds: float) -> None:
         """
         Add throttling rule for specific event type.
@@ -244,11 +379,12 @@ class EventBroadcaster(RealtimeComponent, HealthMonitorMixin):
                     "clients_targeted": 0
                 }
             
-            # Get connected clients
-            connected_clients = set(self.websocket_manager.get_connected_clients())
+            # Record the event so disconnected clients can catch up later
+            seq = self.event_log.append(event)
             
-            # Filter clients based on subscriptions and filters
-            target_clients = self._get_target_clients(event, connected_clients)
+            # Filter connected clients based on subscriptions and filters
+            connected_clients = set(self.websocket_manager.connections)
+            target_clients = self._get_target_clients(event, connected_clients) & connected_clients
             
             if not target_clients:
                 self.stats["events_filtered"] += 1
@@ -256,29 +392,21 @@ class EventBroadcaster(RealtimeComponent, HealthMonitorMixin):
                 return {
                     "status": "filtered",
                     "event_type": event.event_type,
-                    "clients_targeted": 0
+                    "clients_targeted": 0,
+                    "seq": seq
                 }
             
-            # Send to connected clients
+            # Encode once and queue the same frame for every target client
             sent_count = 0
             failed_count = 0
+            frame = encode_message({**event_message(event), "seq": seq})
             
             for client_id in target_clients:
-                if client_id in connected_clients:
-                    # Client is connected, send immediately
-                    success = await self.websocket_manager.send_to_client(client_id, {
-                        "type": event.event_type,
-                        "data": event.data,
-                        "timestamp": event.timestamp.isoformat(),
-                        "priority": event.priority
-                    })
-                    if success:
-                        sent_count += 1
-                    else:
-                        failed_count += 1
+                success = await self.websocket_manager.send_frame(client_id, frame)
+                if success:
+                    sent_count += 1
                 else:
-                    # Client is disconnected, queue message
-                    await self._queue_message(client_id, event)
+                    failed_count += 1
             
             # Update throttling timestamp
             self._update_throttle_timestamp(event)
@@ -296,7 +424,7 @@ class EventBroadcaster(RealtimeComponent, HealthMonitorMixin):
                 "clients_targeted": len(target_clients),
                 "messages_sent": sent_count,
                 "messages_failed": failed_count,
-                "messages_queued": len(target_clients) - len([c for c in target_clients if c in connected_clients])
+                "seq": seq
             }
             
         except Exception as e:
@@ -324,12 +452,7 @@ class EventBroadcaster(RealtimeComponent, HealthMonitorMixin):
             event.client_id = client_id
             
             # Send via WebSocket manager
-            success = await self.websocket_manager.send_to_client(client_id, {
-                "type": event.event_type,
-                "data": event.data,
-                "timestamp": event.timestamp.isoformat(),
-                "priority": event.priority
-            })
+            success = await self.websocket_manager.send_to_client(client_id, event_message(event))
             
             if success:
                 self.stats["messages_delivered"] += 1
@@ -340,136 +463,87 @@ class EventBroadcaster(RealtimeComponent, HealthMonitorMixin):
             self._handle_error(e, f"sending event to client {client_id}")
             return False
     
-    async def _queue_message(self, client_id: str, event: EventUpdate) -> None:
+    async def replay_events(self, client_id: str, last_seq: int) -> Dict[str, Any]:
         """
-        Queue message for disconnected client.
+        Send a reconnecting client the events it missed.
+        
+        Missed events that pass the client's subscriptions and filter are
+        sent in replay frames of up to EVENT_REPLAY_CHUNK_SIZE events,
+        followed by replay_complete. If the events were already evicted
+        from the log, the client gets replay_unavailable and should
+        refetch state over REST.
         
         Args:
             client_id: Client identifier
-            event: Event to queue
-        """
-        try:
-            if len(self.message_queue[client_id]) >= self.max_queue_size:
-                # Remove oldest message
-                self.message_queue[client_id].popleft()
-                self.stats["queue_overflows"] += 1
-            
-            queued_message = QueuedMessage(
-                client_id=client_id,
-                event=event,
-                queued_at=datetime.now(timezone.utc)
-            )
-            
-            self.message_queue[client_id].append(queued_message)
-            self.stats["messages_queued"] += 1
+            last_seq: Last sequence number the client received
             
-            logger.debug(f"Queued message for client {client_id}")
-            
-        except Exception as e:
-            self._handle_error(e, f"queuing message for client {client_id}")
+        Returns:
+            Dictionary with replay results
+        """
+        entries = self.event_log.since(last_seq)
+        oldest_seq, latest_seq = self.event_log.oldest_seq, self.event_log.latest_seq
+        
+        if entries is None:
+            self.stats["replays_too_far_behind"] += 1
+            await self.websocket_manager.send_to_client(client_id, {
+                "type": "replay_unavailable",
+                "data": {
+                    "reason": "too_far_behind",
+                    "last_seq": last_seq,
+                    "oldest_seq": oldest_seq,
+                    "latest_seq": latest_seq
+                },
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            })
+            logger.info(f"Client {client_id} too far behind to replay from seq {last_seq}")
+            return {"status": "too_far_behind", "oldest_seq": oldest_seq, "latest_seq": latest_seq}
+        
+        events = [
+            {**event_message(event), "seq": seq}
+            for seq, event in entries
+            if self._client_should_receive_event(client_id, event)
+        ]
+        
+        for start in range(0, len(events), EVENT_REPLAY_CHUNK_SIZE):
+            await self.websocket_manager.send_to_client(client_id, {
+                "type": "replay",
+                "data": {"events": events[start:start + EVENT_REPLAY_CHUNK_SIZE]},
+                "timestamp": datetime.now(timezone.utc).isoformat()
+            })
+        
+        await self.websocket_manager.send_to_client(client_id, {
+            "type": "replay_complete",
+            "data": {"last_seq": last_seq, "latest_seq": latest_seq, "events_replayed": len(events)},
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        })
+        
+        self.stats["replays_served"] += 1
+        self.stats["events_replayed"] += len(events)
+        self.stats["messages_delivered"] += len(events)
+        logger.debug(f"Replayed {len(events)} events to {client_id} after seq {last_seq}")
+        
+        return {"status": "success", "events_replayed": len(events), "latest_seq": latest_seq}
     
-    async def _queue_worker(self) -> None:
-        """Background worker for processing queued messages."""
-        logger.info("Starting queue worker")
+    async def _log_writer(self) -> None:
+        """Background worker persisting the replay log."""
+        logger.info("Starting event log writer")
         
         try:
             while not self._shutdown_event.is_set():
                 try:
-                    await asyncio.sleep(5)  # Check every 5 seconds
-                    
-                    # Get connected clients
-                    connected_clients = set(client["client_id"] for client in self.websocket_manager.get_connected_clients())
-                    
-                    # Process queued messages for connected clients
-                    for client_id in list(self.message_queue.keys()):
-                        if client_id in connected_clients and self.message_queue[client_id]:
-                            await self._process_client_queue(client_id)
-                    
-                    # Clean up old queued messages
-                    await self._cleanup_old_messages()
+                    await asyncio.sleep(EVENT_LOG_FLUSH_INTERVAL)
+                    await self.event_log.flush()
                     
                 except asyncio.CancelledError:
-                    break
+                    raise
                 except Exception as e:
-                    self._handle_error(e, "in queue worker")
+                    self._handle_error(e, "in event log writer")
                     
         except asyncio.CancelledError:
-            logger.info("Queue worker cancelled")
+            logger.info("Event log writer cancelled")
             raise
-        except Exception as e:
-            logger.error(f"Queue worker error: {e}")
         finally:
-            logger.info("Queue worker stopped")
-    
-    async def _process_client_queue(self, client_id: str) -> None:
-        """
-        Process queued messages for a specific client.
-        
-        Args:
-            client_id: Client identifier
-        """
-        try:
-            queue = self.message_queue[client_id]
-            processed = 0
-            
-            while queue and processed < 10:  # Process up to 10 messages per cycle
-                message = queue.popleft()
-                
-                # Check if message is too old
-                age = datetime.now(timezone.utc) - message.queued_at
-                if age > timedelta(hours=1):  # Discard messages older than 1 hour
-                    logger.debug(f"Discarded old queued message for {client_id}")
-                    continue
-                
-                # Try to send message
-                success = await self.websocket_manager.send_to_client(client_id, {
-                    "type": message.event.event_type,
-                    "data": message.event.data,
-                    "timestamp": message.event.timestamp.isoformat(),
-                    "priority": message.event.priority,
-                    "queued": True,
-                    "queued_at": message.queued_at.isoformat()
-                })
-                
-                if success:
-                    self.stats["messages_delivered"] += 1
-                    processed += 1
-                else:
-                    # Put message back in queue if send failed
-                    message.attempts += 1
-                    if message.attempts < message.max_attempts:
-                        queue.appendleft(message)
-                    break
-            
-            if processed > 0:
-                logger.debug(f"Processed {processed} queued messages for client {client_id}")
-                
-        except Exception as e:
-            self._handle_error(e, f"processing queue for client {client_id}")
-    
-    async def _cleanup_old_messages(self) -> None:
-        """Clean up old queued messages."""
-        try:
-            cutoff_time = datetime.now(timezone.utc) - timedelta(hours=1)
-            cleaned_count = 0
-            
-            for client_id, queue in self.message_queue.items():
-                original_size = len(queue)
-                
-                # Filter out old messages
-                filtered_messages = deque(
-                    [msg for msg in queue if msg.queued_at > cutoff_time],
-                    maxlen=queue.maxlen
-                )
-                
-                self.message_queue[client_id] = filtered_messages
-                cleaned_count += original_size - len(filtered_messages)
-            
-            if cleaned_count > 0:
-                logger.debug(f"Cleaned up {cleaned_count} old queued messages")
-                
-        except Exception as e:
-            self._handle_error(e, "cleaning up old messages")
+            logger.info("Event log writer stopped")
     
     def _get_target_clients(self, event: EventUpdate, connected_clients: Set[str]) -> Set[str]:
         """
@@ -482,16 +556,7 @@ class EventBroadcaster(RealtimeComponent, HealthMonitorMixin):
         Returns:
             Set of target client IDs
         """
-        target_clients = set()
-        
-        # Check all clients with subscriptions or filters
-        all_clients = set(self.client_subscriptions.keys()) | set(self.client_filters.keys())
-        
-        for client_id in all_clients:
-            if self._client_should_receive_event(client_id, event):
-                target_clients.add(client_id)
-        
-        return target_clients
+        return self.subscription_index.match(event)
     
     def _client_should_receive_event(self, client_id: str, event: EventUpdate) -> bool:
         """
@@ -575,15 +640,12 @@ class EventBroadcaster(RealtimeComponent, HealthMonitorMixin):
         Returns:
             Dictionary with statistics
         """
-        total_queued = sum(len(queue) for queue in self.message_queue.values())
-        
         return {
             **self.stats,
             "active_subscriptions": len(self.client_subscriptions),
             "active_filters": len(self.client_filters),
             "throttle_rules": len(self.throttle_rules),
-            "total_queued_messages": total_queued,
-            "clients_with_queued_messages": len([q for q in self.message_queue.values() if q])
+            "event_log": self.event_log.get_statistics()
         }
     
     def get_client_info(self, client_id: str) -> Optional[Dict[str, Any]]:
@@ -603,7 +665,6 @@ class EventBroadcaster(RealtimeComponent, HealthMonitorMixin):
             "client_id": client_id,
             "subscriptions": list(self.client_subscriptions.get(client_id, set())),
             "has_filter": client_id in self.client_filters,
-            "queued_messages": len(self.message_queue.get(client_id, [])),
             "filter_details": self.client_filters.get(client_id).__dict__ if client_id in self.client_filters else None
         }
     
@@ -612,17 +673,14 @@ class EventBroadcaster(RealtimeComponent, HealthMonitorMixin):
         base_status = super().get_health_status()
         
         # Add broadcaster-specific health metrics
-        total_queued = sum(len(queue) for queue in self.message_queue.values())
-        
         base_status.update({
             "subscriptions": {
                 "active": len(self.client_subscriptions),
                 "total_event_types": len(set().union(*self.client_subscriptions.values())) if self.client_subscriptions else 0
             },
-            "message_queue": {
-                "total_queued": total_queued,
-                "clients_with_messages": len([q for q in self.message_queue.values() if q]),
-                "is_healthy": total_queued < self.max_queue_size * 0.8  # 80% threshold
+            "event_log": {
+                **self.event_log.get_statistics(),
+                "is_healthy": self.event_log.get_statistics()["unsaved"] < self.event_log.capacity * 0.8  # 80% threshold
             },
             "throttling": {
                 "active_rules": len(self.throttle_rules),
@@ -0,0 +1,187 @@
+"""
+Replay log for broadcast events.
+
+This module provides a bounded ring buffer of broadcast events with
+monotonic sequence numbers so WebSocket clients can reconnect with the
+last sequence number they saw and receive only what they missed.
+"""
+
+import json
+import logging
+import os
+import time
+from datetime import timezone
+from typing import Dict, List, Optional, Any, Tuple
+
+from sqlalchemy import delete, select
+
+from ..async_database import async_write_session
+from ..models import WebSocketEventLog
+from .websocket_server import EventUpdate
+
+logger = logging.getLogger(__name__)
+
+# Number of events kept for catch-up, and whether they survive restarts
+EVENT_LOG_CAPACITY = int(os.getenv("EVENT_LOG_CAPACITY", "10000"))
+EVENT_LOG_PERSIST = os.getenv("EVENT_LOG_PERSIST", "true").lower() == "true"
+EVENT_LOG_FLUSH_INTERVAL = float(os.getenv("EVENT_LOG_FLUSH_INTERVAL", "2.0"))
+
+LogEntry = Tuple[int, EventUpdate]
+
+
+class EventLog:
+    """
+    Bounded ring buffer of events keyed by sequence number.
+    
+    Sequence numbers are contiguous, so the slot for a sequence number is
+    seq % capacity and a catch-up read costs O(missed events). When the log
+    starts empty the first sequence number is the current time in
+    milliseconds. A client holding a sequence number from an earlier,
+    non-persisted run therefore falls outside the retained range and is
+    told to refetch, instead of receiving unrelated events.
+    """
+    
+    def __init__(self, capacity: int = EVENT_LOG_CAPACITY, persist: bool = EVENT_LOG_PERSIST):
+        self.capacity = max(1, capacity)
+        self.persist = persist
+        self._slots: List[Optional[LogEntry]] = [None] * self.capacity
+        self.next_seq = int(time.time() * 1000)
+        self._size = 0
+        self._unsaved: List[LogEntry] = []
+        
+    def __len__(self) -> int:
+        return self._size
+        
+    @property
+    def latest_seq(self) -> int:
+        """Sequence number of the newest event (oldest_seq - 1 when empty)."""
+        return self.next_seq - 1
+        
+    @property
+    def oldest_seq(self) -> int:
+        """Sequence number of the oldest retained event."""
+        return self.next_seq - self._size
+        
+    def append(self, event: EventUpdate) -> int:
+        """
+        Add an event to the log.
+        
+        Args:
+            event: Event being broadcast
+            
+        Returns:
+            Sequence number assigned to the event
+        """
+        seq = self.next_seq
+        self._slots[seq % self.capacity] = (seq, event)
+        self.next_seq += 1
+        self._size = min(self._size + 1, self.capacity)
+        
+        if self.persist:
+            self._unsaved.append((seq, event))
+            if len(self._unsaved) > self.capacity:
+                del self._unsaved[:-self.capacity]
+        return seq
+        
+    def since(self, last_seq: int) -> Optional[List[LogEntry]]:
+        """
+        Get events newer than a sequence number.
+        
+        Args:
+            last_seq: Last sequence number the client received
+            
+        Returns:
+            Events in sequence order, or None if the client is too far
+            behind (or ahead) for the retained range
+        """
+        if last_seq < self.oldest_seq - 1 or last_seq > self.latest_seq:
+            return None
+        return [self._slots[seq % self.capacity] for seq in range(last_seq + 1, self.next_seq)]
+        
+    async def load(self) -> int:
+        """
+        Restore the newest persisted events and continue their numbering.
+        
+        Returns:
+            Number of events restored
+        """
+        if not self.persist:
+            return 0
+            
+        try:
+            async with async_write_session() as db:
+                records = (await db.execute(
+                    select(WebSocketEventLog).order_by(WebSocketEventLog.seq.desc()).limit(self.capacity)
+                )).scalars().all()
+        except Exception as e:
+            logger.error(f"Failed to load WebSocket event log: {str(e)}")
+            return 0
+            
+        if not records:
+            return 0
+            
+        # Only restore into an empty log; events already broadcast keep their numbers
+        if self._size:
+            logger.warning("WebSocket event log already in use, skipping restore")
+            return 0
+            
+        for record in reversed(records):
+            # A gap means earlier rows were lost; keep only the contiguous tail
+            if record.seq != self.next_seq:
+                self._slots = [None] * self.capacity
+                self._size = 0
+                self.next_seq = record.seq
+            self._slots[record.seq % self.capacity] = (record.seq, EventUpdate(
+                event_type=record.event_type,
+                data=json.loads(record.data),
+                priority=record.priority,
+                timestamp=record.timestamp.replace(tzinfo=timezone.utc)
+            ))
+            self.next_seq = record.seq + 1
+            self._size = min(self._size + 1, self.capacity)
+            
+        logger.info(f"Restored {len(records)} WebSocket events (latest seq {self.latest_seq})")
+        return len(records)
+        
+    async def flush(self) -> int:
+        """
+        Write unsaved events and trim rows that fell out of the buffer.
+        
+        Returns:
+            Number of events written
+        """
+        if not self.persist or not self._unsaved:
+            return 0
+            
+        entries, self._unsaved = self._unsaved, []
+        try:
+            async with async_write_session() as db:
+                db.add_all([
+                    WebSocketEventLog(
+                        seq=seq,
+                        event_type=event.event_type,
+                        priority=event.priority,
+                        data=json.dumps(event.data, default=str),
+                        timestamp=event.timestamp.replace(tzinfo=None)
+                    )
+                    for seq, event in entries
+                ])
+                await db.execute(delete(WebSocketEventLog).where(WebSocketEventLog.seq < self.oldest_seq))
+        except Exception as e:
+            logger.error(f"Failed to persist WebSocket event log: {str(e)}")
+            # Retry on the next flush
+            self._unsaved = (entries + self._unsaved)[-self.capacity:]
+            return 0
+            
+        return len(entries)
+        
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get event log statistics."""
+        return {
+            "capacity": self.capacity,
+            "size": self._size,
+            "oldest_seq": self.oldest_seq,
+            "latest_seq": self.latest_seq,
+            "unsaved": len(self._unsaved),
+            "persist": self.persist
+        }
@@ -53,7 +53,13 @@ class RealtimeManager:
             logger.info(f"Unregistered real-time component: {component_name}")
     
     async def start_all(self) -> None:
-        """Start all registered components."""
+        """
+        Start all registered components.
+        
+        Registered components start concurrently. Only the WebSocket
+        manager and event broadcaster are registered here; the scheduler
+        and health monitoring are started separately by the app lifespan.
+        """
         if self.is_running:
             logger.warning("RealtimeManager is already running")
             return
@@ -67,15 +73,20 @@ class RealtimeManager:
             logger.error(f"Failed to initialize WebSocket components: {e}")
             # Continue with other components
         
-        failed_components = []
+        # Registered components don't depend on each other once constructed
+        names = list(self.components)
+        results = await asyncio.gather(
+            *(self.components[name].start() for name in names),
+            return_exceptions=True
+        )
         
-        for name, component in self.components.items():
-            try:
-                await component.start()
-                logger.info(f"Started component: {name}")
-            except Exception as e:
-                logger.error(f"Failed to start component {name}: {e}")
+        failed_components = []
+        for name, result in zip(names, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Failed to start component {name}: {result}")
                 failed_components.append(name)
+            else:
+                logger.info(f"Started component: {name}")
         
         if failed_components:
             logger.warning(f"Failed to start components: {failed_components}")
@@ -175,10 +186,7 @@ class RealtimeManager:
             self.websocket_manager = WebSocketManager(max_connections=max_connections)
             
             # Create event broadcaster
-            self.event_broadcaster = EventBroadcaster(
-                websocket_manager=self.websocket_manager,
-                max_queue_size=1000  # TODO: Get from config
-            )
+            self.event_broadcaster = EventBroadcaster(websocket_manager=self.websocket_manager)
             
             # Create WebSocket API
             self.websocket_api = WebSocketAPI(
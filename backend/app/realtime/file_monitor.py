@@ -16,6 +16,8 @@ from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler, FileModifiedEvent, FileCreatedEvent
 import fnmatch
 
+from app.metrics import stage_timer
+
 from .base import RealtimeComponent, HealthMonitorMixin
 from .models import LogSourceConfig, LogSourceType, MonitoringStatus
 from .exceptions import MonitoringError
@@ -453,7 +455,9 @@ class LogFileMonitor(HealthMonitorMixin, RealtimeComponent):
             start_time = time.time()
             
             # Read new content from the file
-            new_entries = await self._read_new_content(source_config, file_path)
+            with stage_timer("read", source_config.source_name) as stage:
+                new_entries = await self._read_new_content(source_config, file_path)
+                stage.count = len(new_entries)
             
             # Process each new entry
             for entry in new_entries:
@@ -15,6 +15,7 @@ from dataclasses import dataclass
 
 from app.schemas import ParsedEvent, EventCategory
 from app.parser import LogParser, LogFormat, ParsingError
+from app.profiling import profile_stage
 
 logger = logging.getLogger(__name__)
 
@@ -460,7 +461,8 @@ class LogFormatDetector:
         
         # Auto-detect format if not provided
         if not format_pattern:
-            detected_patterns = self.analyze_log_sample(lines[:20])  # Use first 20 lines for detection
+            with profile_stage("detect_format"):
+                detected_patterns = self.analyze_log_sample(lines[:20])  # Use first 20 lines for detection
             if detected_patterns:
                 format_pattern = max(detected_patterns, key=lambda p: (p.confidence.value, p.frequency))
             else:
@@ -498,7 +500,7 @@ class LogFormatDetector:
                     if fallback_event:
                         events.append(fallback_event)
                 except Exception:
-                    logger.warning(f"Failed to parse line {line_num}: {line[:100]}...")
+                    logger.warning("Failed to parse line %d: %s...", line_num, line[:100])
                     continue
         
         logger.info(f"Parsed {len(events)} events using detected format")
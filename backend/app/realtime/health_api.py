@@ -5,21 +5,36 @@ This module provides REST API endpoints for health status and metrics,
 including Prometheus format export for monitoring integration.
 """
 
+import asyncio
 import logging
+import threading
 from datetime import datetime, timedelta
 from typing import Dict, Any, List, Optional
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 
 from .health_monitor import health_monitor, HealthStatus, SystemMetrics, ComponentMetrics
 from .diagnostics import diagnostic_manager, run_system_diagnostics, run_quick_health_check, get_diagnostic_history
+from .audit import get_audit_logger
+from .auth import Permission, SessionInfo, require_permission
+from ..metrics import REGISTRY, MetricsRegistry
+from ..profiling import PROFILE_MAX_SECONDS, ProfilerBusyError, sampling_profiler, stage_profiler
+from ..startup import startup_timer
 
 logger = logging.getLogger(__name__)
 
 # Create API router
 health_router = APIRouter(prefix="/api/health", tags=["health"])
 
+# Prometheus values for health statuses
+HEALTH_STATUS_VALUES = {
+    HealthStatus.UNKNOWN: 0,
+    HealthStatus.HEALTHY: 1,
+    HealthStatus.WARNING: 2,
+    HealthStatus.CRITICAL: 3
+}
+
 
 class HealthSummaryResponse(BaseModel):
     """Health summary response model."""
@@ -65,6 +80,9 @@ class ComponentMetricsResponse(BaseModel):
     active_connections: int
     uptime_seconds: float
     timestamp: str
+    p50_latency_ms: float = 0.0
+    p95_latency_ms: float = 0.0
+    p99_latency_ms: float = 0.0
 
 
 @health_router.get("/", response_model=HealthSummaryResponse)
@@ -209,7 +227,10 @@ async def get_all_component_metrics() -> Dict[str, ComponentMetricsResponse]:
                 queue_size=metrics.queue_size,
                 active_connections=metrics.active_connections,
                 uptime_seconds=metrics.uptime_seconds,
-                timestamp=metrics.timestamp.isoformat()
+                timestamp=metrics.timestamp.isoformat(),
+                p50_latency_ms=metrics.p50_latency_ms,
+                p95_latency_ms=metrics.p95_latency_ms,
+                p99_latency_ms=metrics.p99_latency_ms
             )
         return components
     except Exception as e:
@@ -241,7 +262,10 @@ async def get_component_metrics(component_name: str) -> ComponentMetricsResponse
             queue_size=metrics.queue_size,
             active_connections=metrics.active_connections,
             uptime_seconds=metrics.uptime_seconds,
-            timestamp=metrics.timestamp.isoformat()
+            timestamp=metrics.timestamp.isoformat(),
+            p50_latency_ms=metrics.p50_latency_ms,
+            p95_latency_ms=metrics.p95_latency_ms,
+            p99_latency_ms=metrics.p99_latency_ms
         )
     except HTTPException:
         raise
@@ -256,87 +280,64 @@ async def get_prometheus_metrics() -> str:
     Export metrics in Prometheus format.
     
     Returns metrics in Prometheus text format for scraping
-    by Prometheus monitoring systems.
+    by Prometheus monitoring systems: health and resource gauges from
+    the latest health monitor snapshot, followed by the pipeline
+    counters and histograms recorded in the process-wide registry.
+    Nothing is measured or recomputed during a scrape.
     """
     try:
-        metrics_lines = []
-        timestamp = int(datetime.now().timestamp() * 1000)
-        
-        # Overall health status (0=unknown, 1=healthy, 2=warning, 3=critical)
-        overall_status = health_monitor.get_overall_health()
-        status_value = {
-            HealthStatus.UNKNOWN: 0,
-            HealthStatus.HEALTHY: 1,
-            HealthStatus.WARNING: 2,
-            HealthStatus.CRITICAL: 3
-        }.get(overall_status, 0)
-        
-        metrics_lines.append("# HELP threatlens_health_status Overall system health status")
-        metrics_lines.append("# TYPE threatlens_health_status gauge")
-        metrics_lines.append(f"threatlens_health_status {status_value} {timestamp}")
-        
-        # Component health status
-        metrics_lines.append("# HELP threatlens_component_health Component health status")
-        metrics_lines.append("# TYPE threatlens_component_health gauge")
+        snapshot = MetricsRegistry()
+        
+        # Health status values: 0=unknown, 1=healthy, 2=warning, 3=critical
+        snapshot.gauge(
+            "threatlens_health_status", "Overall system health status"
+        ).set(HEALTH_STATUS_VALUES.get(health_monitor.get_overall_health(), 0))
+        
+        component_health = snapshot.gauge(
+            "threatlens_component_health", "Component health status", ("component",)
+        )
         for component_name, health_check in health_monitor.health_checks.items():
-            component_status_value = {
-                HealthStatus.UNKNOWN: 0,
-                HealthStatus.HEALTHY: 1,
-                HealthStatus.WARNING: 2,
-                HealthStatus.CRITICAL: 3
-            }.get(health_check.status, 0)
-            metrics_lines.append(
-                f'threatlens_component_health{{component="{component_name}"}} {component_status_value} {timestamp}'
-            )
+            component_health.labels(component_name).set(HEALTH_STATUS_VALUES.get(health_check.status, 0))
         
         # System metrics
         if health_monitor.system_metrics_history:
             latest_system = health_monitor.system_metrics_history[-1]
             
-            metrics_lines.append("# HELP threatlens_cpu_percent CPU usage percentage")
-            metrics_lines.append("# TYPE threatlens_cpu_percent gauge")
-            metrics_lines.append(f"threatlens_cpu_percent {latest_system.cpu_percent} {timestamp}")
-            
-            metrics_lines.append("# HELP threatlens_memory_percent Memory usage percentage")
-            metrics_lines.append("# TYPE threatlens_memory_percent gauge")
-            metrics_lines.append(f"threatlens_memory_percent {latest_system.memory_percent} {timestamp}")
-            
-            metrics_lines.append("# HELP threatlens_disk_percent Disk usage percentage")
-            metrics_lines.append("# TYPE threatlens_disk_percent gauge")
-            metrics_lines.append(f"threatlens_disk_percent {latest_system.disk_percent} {timestamp}")
-            
+            snapshot.gauge("threatlens_cpu_percent", "CPU usage percentage").set(latest_system.cpu_percent)
+            snapshot.gauge("threatlens_memory_percent", "Memory usage percentage").set(latest_system.memory_percent)
+            snapshot.gauge("threatlens_disk_percent", "Disk usage percentage").set(latest_system.disk_percent)
             if latest_system.load_average:
-                metrics_lines.append("# HELP threatlens_load_average System load average (1 minute)")
-                metrics_lines.append("# TYPE threatlens_load_average gauge")
-                metrics_lines.append(f"threatlens_load_average {latest_system.load_average[0]} {timestamp}")
+                snapshot.gauge(
+                    "threatlens_load_average", "System load average (1 minute)"
+                ).set(latest_system.load_average[0])
         
         # Component performance metrics
-        for component_name, metrics in health_monitor.component_metrics.items():
-            metrics_lines.append("# HELP threatlens_processing_rate Processing rate (items per second)")
-            metrics_lines.append("# TYPE threatlens_processing_rate gauge")
-            metrics_lines.append(
-                f'threatlens_processing_rate{{component="{component_name}"}} {metrics.processing_rate} {timestamp}'
-            )
-            
-            metrics_lines.append("# HELP threatlens_average_latency Average processing latency (milliseconds)")
-            metrics_lines.append("# TYPE threatlens_average_latency gauge")
-            metrics_lines.append(
-                f'threatlens_average_latency{{component="{component_name}"}} {metrics.average_latency_ms} {timestamp}'
-            )
-            
-            metrics_lines.append("# HELP threatlens_error_rate Error rate (errors per minute)")
-            metrics_lines.append("# TYPE threatlens_error_rate gauge")
-            metrics_lines.append(
-                f'threatlens_error_rate{{component="{component_name}"}} {metrics.error_rate} {timestamp}'
-            )
-            
-            metrics_lines.append("# HELP threatlens_queue_size Current queue size")
-            metrics_lines.append("# TYPE threatlens_queue_size gauge")
-            metrics_lines.append(
-                f'threatlens_queue_size{{component="{component_name}"}} {metrics.queue_size} {timestamp}'
+        component_gauges = {
+            "processing_rate": snapshot.gauge(
+                "threatlens_processing_rate", "Processing rate (items per second)", ("component",)
+            ),
+            "average_latency_ms": snapshot.gauge(
+                "threatlens_average_latency", "Average processing latency (milliseconds)", ("component",)
+            ),
+            "error_rate": snapshot.gauge(
+                "threatlens_error_rate", "Error rate (errors per minute)", ("component",)
+            ),
+            "queue_size": snapshot.gauge(
+                "threatlens_queue_size", "Current queue size", ("component",)
             )
+        }
+        latency_quantiles = snapshot.gauge(
+            "threatlens_latency_milliseconds", "Processing latency quantiles (milliseconds)",
+            ("component", "quantile")
+        )
+        for component_name, metrics in health_monitor.component_metrics.items():
+            for attribute, gauge in component_gauges.items():
+                gauge.labels(component_name).set(getattr(metrics, attribute))
+            for quantile, attribute in (("0.5", "p50_latency_ms"), ("0.95", "p95_latency_ms"),
+                                        ("0.99", "p99_latency_ms")):
+                latency_quantiles.labels(component_name, quantile).set(getattr(metrics, attribute))
         
-        return "\n".join(metrics_lines) + "\n"
+        return snapshot.render() + REGISTRY.render()
         
     except Exception as e:
         logger.error(f"Failed to generate Prometheus metrics: {e}")
@@ -371,6 +372,90 @@ async def get_uptime() -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail="Failed to retrieve uptime information")
 
 
+@health_router.get("/startup")
+async def get_startup_report() -> Dict[str, Any]:
+    """
+    Get the startup timing report.
+    
+    Lists the slowest module imports, dependencies loaded on first use,
+    and how long each startup phase took.
+    """
+    return {
+        "ready": startup_timer.ready_seconds is not None,
+        **startup_timer.get_report(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@health_router.get("/audit")
+async def get_audit_writer_status() -> Dict[str, Any]:
+    """
+    Get the audit writer status.
+    
+    Reports queue depth and how many audit entries were written, dropped
+    because the queue was full, or lost to failed inserts.
+    """
+    return {
+        **get_audit_logger().get_writer_statistics(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@health_router.get("/profile/stages")
+async def get_stage_profile(
+    last: Optional[int] = Query(None, ge=1, description="Only include this many recent batches")
+) -> Dict[str, Any]:
+    """
+    Get per-stage timings of recent realtime processing batches.
+    
+    Shows where batch time goes (validate, detect_format, parse,
+    categorize, analyze, db_write, broadcast, notify) as totals,
+    per-batch mean/p95/max and share of batch time.
+    """
+    return {
+        **stage_profiler.get_report(last=last),
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+@health_router.post("/profile/sample", response_class=PlainTextResponse)
+async def sample_profile(
+    seconds: float = Query(10.0, gt=0, le=PROFILE_MAX_SECONDS, description="Profile duration"),
+    interval_ms: float = Query(10.0, ge=1, le=1000, description="Milliseconds between samples"),
+    all_threads: bool = Query(False, description="Sample every thread instead of the event loop"),
+    include_idle: bool = Query(False, description="Keep samples of the event loop waiting for work"),
+    session_info: SessionInfo = Depends(require_permission(Permission.SYSTEM_ADMIN))
+) -> PlainTextResponse:
+    """
+    Run a time-boxed sampling profile (admin only).
+    
+    By default samples the event loop thread, which runs the realtime
+    processor, and returns the stacks in collapsed format for
+    flamegraph.pl, inferno or speedscope. The request returns after
+    the profile finishes; only one profile runs at a time.
+    """
+    # This handler runs on the event loop thread, which is the one to profile
+    worker_thread = None if all_threads else threading.get_ident()
+    logger.info(f"Sampling profile for {seconds}s requested by {session_info.username}")
+    
+    try:
+        result = await asyncio.to_thread(
+            sampling_profiler.profile, seconds, worker_thread, interval_ms / 1000, include_idle
+        )
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    return PlainTextResponse(
+        result.collapsed(),
+        headers={
+            "Content-Disposition": 'attachment; filename="threatlens-profile.folded"',
+            "X-Profile-Samples": str(result.samples),
+            "X-Profile-Idle-Samples": str(result.idle_samples),
+            "X-Profile-Seconds": f"{result.seconds:.3f}"
+        }
+    )
+
+
 # Health check endpoint for load balancers
 @health_router.get("/ping")
 async def ping() -> Dict[str, str]:
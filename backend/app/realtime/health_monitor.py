@@ -14,8 +14,17 @@ from typing import Dict, Any, List, Optional, Callable
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from ..metrics import DecayingRate, QuantileSketch, RingBuffer
+
 logger = logging.getLogger(__name__)
 
+# Per-component sample retention; enough timestamps for a one-minute rate
+# window up to about 160 events per second, beyond which the rate is
+# extrapolated from the span the buffer covers
+PROCESSING_TIMESTAMP_SAMPLES = 10000
+LATENCY_SAMPLES = 1000
+RATE_WINDOW_SECONDS = 60
+
 
 class HealthStatus(Enum):
     """Health status enumeration."""
@@ -61,6 +70,9 @@ class ComponentMetrics:
     active_connections: int
     uptime_seconds: float
     timestamp: datetime
+    p50_latency_ms: float = 0.0
+    p95_latency_ms: float = 0.0
+    p99_latency_ms: float = 0.0
 
 
 class HealthMonitor:
@@ -86,9 +98,11 @@ class HealthMonitor:
         self.start_time = datetime.now()
         
         # Performance tracking
-        self.processing_rates: Dict[str, List[float]] = {}
-        self.latency_samples: Dict[str, List[float]] = {}
+        self.processing_rates: Dict[str, RingBuffer] = {}  # Event timestamps
+        self.latency_samples: Dict[str, RingBuffer] = {}
+        self.latency_sketches: Dict[str, QuantileSketch] = {}
         self.error_counts: Dict[str, int] = {}
+        self.error_rates: Dict[str, DecayingRate] = {}
         
     async def start_monitoring(self) -> None:
         """Start the health monitoring system."""
@@ -115,25 +129,15 @@ class HealthMonitor:
         
     def record_processing_event(self, component: str, latency_ms: float) -> None:
         """Record a processing event for metrics calculation."""
-        current_time = time.time()
-        
-        # Initialize tracking lists if needed
-        if component not in self.processing_rates:
-            self.processing_rates[component] = []
-            self.latency_samples[component] = []
+        timestamps = self.processing_rates.get(component)
+        if timestamps is None:
+            timestamps = self.processing_rates[component] = RingBuffer(PROCESSING_TIMESTAMP_SAMPLES)
+            self.latency_samples[component] = RingBuffer(LATENCY_SAMPLES)
+            self.latency_sketches[component] = QuantileSketch()
             
-        # Record processing rate (events per second)
-        self.processing_rates[component].append(current_time)
-        
-        # Record latency
+        timestamps.append(time.time())
         self.latency_samples[component].append(latency_ms)
-        
-        # Clean old samples (keep last 5 minutes)
-        cutoff_time = current_time - 300
-        self.processing_rates[component] = [
-            t for t in self.processing_rates[component] if t > cutoff_time
-        ]
-        self.latency_samples[component] = self.latency_samples[component][-1000:]
+        self.latency_sketches[component].add(latency_ms)
         
     def record_error(self, component: str) -> None:
         """Record an error for a component."""
@@ -141,6 +145,10 @@ class HealthMonitor:
             self.error_counts[component] = 0
         self.error_counts[component] += 1
         
+        if component not in self.error_rates:
+            self.error_rates[component] = DecayingRate(half_life=RATE_WINDOW_SECONDS)
+        self.error_rates[component].add()
+        
     async def _monitoring_loop(self) -> None:
         """Main monitoring loop."""
         while self.monitoring_active:
@@ -239,22 +247,24 @@ class HealthMonitor:
         """Update component-specific performance metrics."""
         current_time = time.time()
         
-        for component in self.processing_rates.keys():
+        for component in list(self.processing_rates.keys()):
             try:
-                # Calculate processing rate (events per second)
-                recent_events = [
-                    t for t in self.processing_rates[component] 
-                    if t > current_time - 60  # Last minute
-                ]
-                processing_rate = len(recent_events) / 60.0
+                # Calculate processing rate (events per second) over the last minute
+                timestamps = self.processing_rates[component]
+                window_start = current_time - RATE_WINDOW_SECONDS
+                if timestamps.full and timestamps[0] > window_start:
+                    # Buffer covers less than the window; use the span it does cover
+                    processing_rate = len(timestamps) / max(current_time - timestamps[0], 1e-6)
+                else:
+                    processing_rate = timestamps.count_at_least(window_start) / RATE_WINDOW_SECONDS
                 
-                # Calculate average latency
-                recent_latencies = self.latency_samples[component][-100:]  # Last 100 samples
-                avg_latency = sum(recent_latencies) / len(recent_latencies) if recent_latencies else 0.0
+                # Calculate average latency over the last 100 samples
+                recent_latencies = self.latency_samples[component][-100:]
+                avg_latency = float(recent_latencies.mean()) if recent_latencies.size else 0.0
+                latency_quantiles = self.latency_sketches[component].quantiles()
                 
-                # Calculate error rate (errors per minute)
-                error_count = self.error_counts.get(component, 0)
-                error_rate = error_count / max(1, (current_time - self.start_time.timestamp()) / 60)
+                # Calculate error rate (errors per minute, decaying)
+                error_rate = self.error_rates[component].rate() * 60 if component in self.error_rates else 0.0
                 
                 # Get component-specific metrics from health checks
                 health_check = self.health_checks.get(component, {})
@@ -272,7 +282,10 @@ class HealthMonitor:
                     queue_size=queue_size,
                     active_connections=active_connections,
                     uptime_seconds=uptime_seconds,
-                    timestamp=datetime.now()
+                    timestamp=datetime.now(),
+                    p50_latency_ms=latency_quantiles['p50'],
+                    p95_latency_ms=latency_quantiles['p95'],
+                    p99_latency_ms=latency_quantiles['p99']
                 )
                 
                 self.component_metrics[component] = component_metrics
@@ -293,6 +306,8 @@ class HealthMonitor:
         # Reset error counts periodically (every hour)
         if len(self.system_metrics_history) % 120 == 0:  # Every 120 checks (1 hour at 30s intervals)
             self.error_counts.clear()
+            for sketch in self.latency_sketches.values():
+                sketch.reset()
             
     def get_overall_health(self) -> HealthStatus:
         """Get overall system health status."""
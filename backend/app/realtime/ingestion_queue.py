@@ -16,6 +16,8 @@ from collections import defaultdict
 import heapq
 import json
 
+from app.metrics import PIPELINE_ITEMS, QUEUE_DEPTH, observe_stage
+
 from .base import RealtimeComponent, HealthMonitorMixin
 from .exceptions import QueueError, ProcessingError
 
@@ -341,6 +343,7 @@ class RealtimeIngestionQueue(RealtimeComponent, HealthMonitorMixin):
             if current_size >= self.max_queue_size:
                 # Queue is full - reject entry
                 self._dropped_entries += 1
+                PIPELINE_ITEMS.labels("queue", entry.source_name, "dropped").inc()
                 logger.warning(f"Queue full, dropping entry from {entry.source_name}")
                 return False
             
@@ -354,6 +357,7 @@ class RealtimeIngestionQueue(RealtimeComponent, HealthMonitorMixin):
                 # For backpressure, only accept high priority entries
                 if entry.priority.value > LogEntryPriority.HIGH.value:
                     self._dropped_entries += 1
+                    PIPELINE_ITEMS.labels("queue", entry.source_name, "dropped").inc()
                     logger.debug(f"Backpressure: dropping low priority entry from {entry.source_name}")
                     return False
             
@@ -371,6 +375,7 @@ class RealtimeIngestionQueue(RealtimeComponent, HealthMonitorMixin):
             
             # Update metrics
             self.update_health_metric("queue_size", len(self._queue))
+            QUEUE_DEPTH.set(len(self._queue))
             
             logger.debug(f"Enqueued entry {entry.entry_id} from {entry.source_name} "
                         f"(priority: {entry.priority.name}, queue size: {len(self._queue)})")
@@ -460,6 +465,13 @@ class RealtimeIngestionQueue(RealtimeComponent, HealthMonitorMixin):
                 entry.mark_processing_started()
                 self._entries_by_status[ProcessingStatus.PENDING].remove(entry)
                 self._entries_by_status[ProcessingStatus.PROCESSING].append(entry)
+                QUEUE_DEPTH.set(len(self._queue))
+            
+            # Time spent waiting in the queue is the latency of the queue stage
+            observe_stage(
+                "queue", entry.source_name,
+                (entry.processing_started_at - entry.created_at).total_seconds()
+            )
             
             # Check timeout
             if time.time() - batch_start_time >= self.batch_timeout:
@@ -285,6 +285,10 @@ class NotificationRule(BaseModel):
         le=1440,
         description="Minutes to wait before sending duplicate notifications"
     )
+    digest: bool = Field(
+        default=False,
+        description="Send events held back by throttling as one digest when the window closes"
+    )
     
     # Channel-specific configuration
     email_recipients: List[str] = Field(
@@ -620,6 +620,7 @@ async def create_notification_rule(
             sources=request.sources,
             channels=channels,
             throttle_minutes=request.throttle_minutes,
+            digest=request.digest,
             email_recipients=request.email_recipients,
             webhook_url=request.webhook_url,
             slack_channel=request.slack_channel
@@ -647,6 +648,7 @@ async def create_notification_rule(
             sources=notification_rule.sources,
             channels=[ch.value for ch in notification_rule.channels],
             throttle_minutes=notification_rule.throttle_minutes,
+            digest=notification_rule.digest,
             email_recipients=notification_rule.email_recipients,
             webhook_url=notification_rule.webhook_url,
             slack_channel=notification_rule.slack_channel
@@ -698,6 +700,7 @@ async def list_notification_rules(
                 sources=rule.sources,
                 channels=[ch.value for ch in rule.channels],
                 throttle_minutes=rule.throttle_minutes,
+                digest=rule.digest,
                 email_recipients=rule.email_recipients,
                 webhook_url=rule.webhook_url,
                 slack_channel=rule.slack_channel
@@ -753,6 +756,7 @@ async def get_notification_rule(
             sources=rule.sources,
             channels=[ch.value for ch in rule.channels],
             throttle_minutes=rule.throttle_minutes,
+            digest=rule.digest,
             email_recipients=rule.email_recipients,
             webhook_url=rule.webhook_url,
             slack_channel=rule.slack_channel
@@ -823,6 +827,7 @@ async def update_notification_rule(
             sources=request.sources,
             channels=channels,
             throttle_minutes=request.throttle_minutes,
+            digest=request.digest,
             email_recipients=request.email_recipients,
             webhook_url=request.webhook_url,
             slack_channel=request.slack_channel
@@ -849,6 +854,7 @@ async def update_notification_rule(
             sources=updated_rule.sources,
             channels=[ch.value for ch in updated_rule.channels],
             throttle_minutes=updated_rule.throttle_minutes,
+            digest=updated_rule.digest,
             email_recipients=updated_rule.email_recipients,
             webhook_url=updated_rule.webhook_url,
             slack_channel=updated_rule.slack_channel
@@ -1286,6 +1292,7 @@ async def get_monitoring_config(
                 sources=rule.sources,
                 channels=[ch.value for ch in rule.channels],
                 throttle_minutes=rule.throttle_minutes,
+                digest=rule.digest,
                 email_recipients=rule.email_recipients,
                 webhook_url=rule.webhook_url,
                 slack_channel=rule.slack_channel
@@ -409,6 +409,7 @@ def create_sample_config() -> Dict[str, Any]:
                 "sources": [],
                 "channels": ["email", "webhook", "slack"],
                 "throttle_minutes": 10,
+                "digest": True,
                 "email_recipients": ["security@yourdomain.com"],
                 "webhook_url": "https://your-webhook-endpoint.com/security-alerts",
                 "slack_channel": "#security-incidents"
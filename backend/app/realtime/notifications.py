@@ -7,27 +7,53 @@ through multiple channels (email, webhook, Slack) based on configurable rules.
 import asyncio
 import json
 import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Set
+from typing import Dict, List, Optional, Any, Set, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 
-import aiohttp
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, delete, select
 
+from ..async_database import async_write_session
 from ..database import get_db_session
-from ..models import NotificationHistory, Event, AIAnalysis
+from ..models import NotificationHistory, NotificationDigest, Event, AIAnalysis
 from ..schemas import EventResponse, AIAnalysis as AIAnalysisSchema
+from ..startup import lazy_import
 
+# aiohttp is imported when the first webhook session is created
+aiohttp = lazy_import("aiohttp")
 
 logger = logging.getLogger(__name__)
 
+# Per-channel delivery queue sizing
+NOTIFICATION_QUEUE_SIZE = int(os.getenv("NOTIFICATION_QUEUE_SIZE", "1000"))
+NOTIFICATION_CHANNEL_WORKERS = int(os.getenv("NOTIFICATION_CHANNEL_WORKERS", "4"))
+NOTIFICATION_ENQUEUE_TIMEOUT = float(os.getenv("NOTIFICATION_ENQUEUE_TIMEOUT", "5.0"))
+
+# Connection reuse for channel transports
+NOTIFICATION_HTTP_POOL_SIZE = int(os.getenv("NOTIFICATION_HTTP_POOL_SIZE", "10"))
+NOTIFICATION_HTTP_KEEPALIVE = float(os.getenv("NOTIFICATION_HTTP_KEEPALIVE", "30"))
+NOTIFICATION_SMTP_POOL_SIZE = int(os.getenv("NOTIFICATION_SMTP_POOL_SIZE", "2"))
+NOTIFICATION_SMTP_IDLE_TIMEOUT = float(os.getenv("NOTIFICATION_SMTP_IDLE_TIMEOUT", "60"))
+
+# Digest rules: sample events kept per digest and how often closed windows are flushed
+NOTIFICATION_DIGEST_SAMPLES = int(os.getenv("NOTIFICATION_DIGEST_SAMPLES", "5"))
+NOTIFICATION_DIGEST_CHECK_INTERVAL = float(os.getenv("NOTIFICATION_DIGEST_CHECK_INTERVAL", "5.0"))
+
+# Distinct (category, source, severity) lookups remembered by the rule index
+NOTIFICATION_RULE_CACHE_SIZE = int(os.getenv("NOTIFICATION_RULE_CACHE_SIZE", "4096"))
+
 
 class NotificationStatus(str, Enum):
     """Status of notification delivery."""
@@ -35,6 +61,7 @@ class NotificationStatus(str, Enum):
     SENT = "sent"
     FAILED = "failed"
     THROTTLED = "throttled"
+    REJECTED = "rejected"
 
 
 class NotificationChannelType(str, Enum):
@@ -58,6 +85,7 @@ class NotificationRule:
     email_recipients: List[str] = None
     webhook_url: Optional[str] = None
     slack_channel: Optional[str] = None
+    digest: bool = False  # Aggregate throttled repeats into one message per throttle window
     
     def __post_init__(self):
         """Initialize default values for mutable fields."""
@@ -71,6 +99,85 @@ class NotificationRule:
             self.email_recipients = []
 
 
+def _index_value(value: Any) -> Any:
+    """Normalize enum members to their values so str-enums and strings share index keys."""
+    return value.value if isinstance(value, Enum) else value
+
+
+class RuleIndex:
+    """Index of notification rules by category, source and severity.
+    
+    Each dimension maps a value to the positions of the rules that accept
+    it, plus the rules that accept any value. A lookup intersects the three
+    position sets and is memoized per (category, source, severity), so
+    matching an event does not scale with the number of rules. Results keep
+    the configured rule order. Enabled flags are checked by the caller, but
+    changing a rule's filters in place requires rebuilding the index.
+    """
+    
+    def __init__(self, rules: List[NotificationRule]):
+        """Build the index.
+        
+        Args:
+            rules: Rules in evaluation order
+        """
+        self.rules = list(rules)
+        
+        self._by_category: Dict[Any, Set[int]] = defaultdict(set)
+        self._by_source: Dict[Any, Set[int]] = defaultdict(set)
+        self._any_category: Set[int] = set()
+        self._any_source: Set[int] = set()
+        self._by_severity: Dict[int, frozenset] = {}
+        self._matches: Dict[Tuple[Any, Any, int], Tuple[NotificationRule, ...]] = {}
+        
+        for position, rule in enumerate(self.rules):
+            if rule.categories:
+                for category in rule.categories:
+                    self._by_category[_index_value(category)].add(position)
+            else:
+                self._any_category.add(position)
+            
+            if rule.sources:
+                for source in rule.sources:
+                    self._by_source[_index_value(source)].add(position)
+            else:
+                self._any_source.add(position)
+    
+    def _severity_positions(self, severity: int) -> frozenset:
+        positions = self._by_severity.get(severity)
+        if positions is None:
+            positions = self._by_severity[severity] = frozenset(
+                position for position, rule in enumerate(self.rules)
+                if rule.min_severity <= severity <= rule.max_severity
+            )
+        return positions
+    
+    def candidates(self, category: Any, source: Any, severity: int) -> Tuple[NotificationRule, ...]:
+        """Get the rules whose category, source and severity filters accept an event.
+        
+        Args:
+            category: Event category
+            source: Event source
+            severity: Event severity score
+            
+        Returns:
+            Matching rules in configured order, including disabled ones
+        """
+        key = (_index_value(category), _index_value(source), severity)
+        matches = self._matches.get(key)
+        
+        if matches is None:
+            positions = self._severity_positions(severity)
+            positions = positions & (self._by_category.get(key[0], set()) | self._any_category)
+            positions = positions & (self._by_source.get(key[1], set()) | self._any_source)
+            
+            if len(self._matches) >= NOTIFICATION_RULE_CACHE_SIZE:
+                self._matches.clear()
+            matches = self._matches[key] = tuple(self.rules[position] for position in sorted(positions))
+        
+        return matches
+
+
 @dataclass
 class NotificationContext:
     """Context information for notifications."""
@@ -86,6 +193,122 @@ class NotificationContext:
             self.additional_data = {}
 
 
+@dataclass
+class PendingDigest:
+    """Events held back by a digest rule until its throttle window closes."""
+    digest_key: str
+    rule_name: str
+    source: str
+    category: str
+    window_end: datetime
+    first_event_id: str
+    first_seen: datetime
+    last_event_id: str = ""
+    last_seen: Optional[datetime] = None
+    event_count: int = 0
+    max_severity: int = 0
+    samples: List[Dict[str, Any]] = None
+    
+    def __post_init__(self):
+        """Initialize default values for mutable fields."""
+        if self.samples is None:
+            self.samples = []
+    
+    def add(self, event: EventResponse, ai_analysis: Optional[AIAnalysisSchema]) -> None:
+        """Aggregate an event into the digest.
+        
+        Args:
+            event: Event held back by the rule
+            ai_analysis: Optional AI analysis of the event
+        """
+        severity = ai_analysis.severity_score if ai_analysis else 5
+        
+        self.event_count += 1
+        self.max_severity = max(self.max_severity, severity)
+        self.last_event_id = event.id
+        self.last_seen = event.timestamp
+        
+        if len(self.samples) < NOTIFICATION_DIGEST_SAMPLES:
+            self.samples.append({
+                'event_id': event.id,
+                'timestamp': event.timestamp.isoformat(),
+                'message': event.message,
+                'severity': severity
+            })
+    
+    def summary(self) -> Dict[str, Any]:
+        """Get the digest contents for notification payloads."""
+        return {
+            'event_count': self.event_count,
+            'max_severity': self.max_severity,
+            'first_seen': self.first_seen.isoformat(),
+            'last_seen': self.last_seen.isoformat() if self.last_seen else None,
+            'samples': self.samples
+        }
+    
+    def to_event(self) -> Tuple[EventResponse, AIAnalysisSchema]:
+        """Build the event and analysis a digest notification is formatted from."""
+        lines = [
+            f"{self.event_count} more events matched rule '{self.rule_name}' for "
+            f"{self.source} ({self.category}) during the throttle window."
+        ]
+        lines.extend(f"- [{sample['severity']}] {sample['message']}" for sample in self.samples)
+        if self.event_count > len(self.samples):
+            lines.append(f"... and {self.event_count - len(self.samples)} more")
+        
+        event = EventResponse(
+            id=self.last_event_id,
+            raw_log_id=f"digest_{self.digest_key}",
+            timestamp=self.last_seen or self.first_seen,
+            source=self.source,
+            message='\n'.join(lines),
+            category=self.category,
+            parsed_at=datetime.now()
+        )
+        analysis = AIAnalysisSchema(
+            id=f"digest_{self.digest_key}",
+            event_id=self.last_event_id,
+            severity_score=min(max(self.max_severity, 1), 10),
+            explanation=f"Digest of {self.event_count} events; highest severity {self.max_severity}/10",
+            recommendations=[f"Review the {self.event_count} aggregated events from {self.source}"],
+            analyzed_at=datetime.now()
+        )
+        return event, analysis
+    
+    def to_record(self) -> NotificationDigest:
+        return NotificationDigest(
+            digest_key=self.digest_key,
+            rule_name=self.rule_name,
+            source=self.source,
+            category=self.category,
+            window_end=self.window_end,
+            event_count=self.event_count,
+            max_severity=self.max_severity,
+            first_event_id=self.first_event_id,
+            last_event_id=self.last_event_id,
+            first_seen=self.first_seen,
+            last_seen=self.last_seen or self.first_seen,
+            samples=json.dumps(self.samples)
+        )
+    
+    @classmethod
+    def from_record(cls, record: NotificationDigest) -> 'PendingDigest':
+        return cls(
+            digest_key=record.digest_key,
+            rule_name=record.rule_name,
+            source=record.source,
+            category=record.category,
+            window_end=record.window_end,
+            first_event_id=record.first_event_id,
+            first_seen=record.first_seen,
+            last_event_id=record.last_event_id,
+            last_seen=record.last_seen,
+            event_count=record.event_count,
+            max_severity=record.max_severity,
+            samples=json.loads(record.samples or "[]")
+        )
+
+
 class NotificationChannel(ABC):
     """Abstract base class for notification channels."""
     
@@ -121,6 +344,10 @@ class NotificationChannel(ABC):
         """
         pass
     
+    async def close(self) -> None:
+        """Release pooled connections held by this channel."""
+        pass
+    
     def format_message(self, context: NotificationContext) -> Dict[str, str]:
         """Format notification message for this channel.
         
@@ -251,6 +478,181 @@ class NotificationChannel(ABC):
             return "#6f42c1"  # Purple
 
 
+class PooledClientSession:
+    """Long-lived aiohttp session with a keep-alive connection pool.
+    
+    The session is created lazily on the running event loop and recreated
+    if it was closed or belongs to a different loop.
+    """
+    
+    def __init__(self, pool_size: int = NOTIFICATION_HTTP_POOL_SIZE,
+                 keepalive_timeout: float = NOTIFICATION_HTTP_KEEPALIVE):
+        """Initialize pooled session.
+        
+        Args:
+            pool_size: Maximum open connections
+            keepalive_timeout: Seconds an idle connection is kept open
+        """
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    def get(self) -> "aiohttp.ClientSession":
+        """Get the session for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=self.keepalive_timeout)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._loop = loop
+        return self._session
+    
+    async def close(self) -> None:
+        """Close the session if it belongs to the running event loop."""
+        session, self._session = self._session, None
+        if session and not session.closed and self._loop is asyncio.get_running_loop():
+            await session.close()
+        self._loop = None
+
+
+class SMTPConnectionPool:
+    """Thread-safe pool of persistent, authenticated SMTP connections.
+    
+    Connections stay open between messages and are dropped once idle for
+    longer than idle_timeout. A message that fails on a reused connection
+    because the server hung up is resent once on a fresh connection.
+    """
+    
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str = '',
+        password: str = '',
+        use_tls: bool = True,
+        max_connections: int = NOTIFICATION_SMTP_POOL_SIZE,
+        idle_timeout: float = NOTIFICATION_SMTP_IDLE_TIMEOUT,
+        timeout: float = 30
+    ):
+        """Initialize SMTP connection pool.
+        
+        Args:
+            host: SMTP server host
+            port: SMTP server port
+            username: Optional login username
+            password: Optional login password
+            use_tls: Whether to upgrade connections with STARTTLS
+            max_connections: Maximum concurrently open connections
+            idle_timeout: Seconds before an idle connection is closed
+            timeout: Socket timeout in seconds
+        """
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.max_connections = max(1, max_connections)
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        
+        self._idle: deque = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_connections)
+        self.stats = {'connections_opened': 0, 'messages_sent': 0, 'reconnects': 0}
+    
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            
+            if self.username and self.password:
+                server.login(self.username, self.password)
+        except Exception:
+            self._discard(server)
+            raise
+        
+        with self._lock:
+            self.stats['connections_opened'] += 1
+        return server
+    
+    def _checkout(self) -> Tuple[smtplib.SMTP, bool]:
+        """Get an idle connection, or a new one if none is fresh enough.
+        
+        Returns:
+            Tuple of (connection, whether it was reused)
+        """
+        now = time.monotonic()
+        reusable, stale = None, []
+        with self._lock:
+            while self._idle:
+                server, last_used = self._idle.pop()
+                if now - last_used <= self.idle_timeout:
+                    reusable = server
+                    break
+                stale.append(server)
+        
+        # QUIT is a round-trip to the server; don't hold the lock for it
+        for server in stale:
+            self._discard(server)
+        
+        if reusable is not None:
+            return reusable, True
+        return self._connect(), False
+    
+    def _checkin(self, server: smtplib.SMTP) -> None:
+        with self._lock:
+            self.stats['messages_sent'] += 1
+            self._idle.append((server, time.monotonic()))
+    
+    @staticmethod
+    def _discard(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+    
+    def send(self, msg: MIMEMultipart, recipients: List[str]) -> None:
+        """Send a message to all recipients over a pooled connection.
+        
+        Args:
+            msg: Message to send
+            recipients: Envelope recipient addresses
+        """
+        with self._slots:
+            server, reused = self._checkout()
+            try:
+                server.send_message(msg, to_addrs=recipients)
+            except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+                self._discard(server)
+                if not reused:
+                    raise
+                
+                # The server closed the idle connection; reconnect and resend
+                logger.debug(f"Reconnecting to SMTP server {self.host}: {str(e)}")
+                with self._lock:
+                    self.stats['reconnects'] += 1
+                server = self._connect()
+                try:
+                    server.send_message(msg, to_addrs=recipients)
+                except Exception:
+                    self._discard(server)
+                    raise
+            except Exception:
+                self._discard(server)
+                raise
+            
+            self._checkin(server)
+    
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        
+        for server, _ in idle:
+            self._discard(server)
+
+
 class EmailNotifier(NotificationChannel):
     """Email notification channel."""
     
@@ -268,6 +670,29 @@ class EmailNotifier(NotificationChannel):
         self.smtp_use_tls = config.get('smtp_use_tls', True)
         self.from_email = config.get('from_email', 'threatlens@localhost')
         self.from_name = config.get('from_name', 'ThreatLens')
+        
+        pool_size = config.get('pool_size', NOTIFICATION_SMTP_POOL_SIZE)
+        self.smtp_pool = SMTPConnectionPool(
+            self.smtp_host,
+            self.smtp_port,
+            self.smtp_username,
+            self.smtp_password,
+            self.smtp_use_tls,
+            max_connections=pool_size,
+            idle_timeout=config.get('idle_timeout', NOTIFICATION_SMTP_IDLE_TIMEOUT),
+            timeout=config.get('timeout', 30)
+        )
+        # Dedicated threads so slow SMTP servers cannot starve the default
+        # executor; created on first send and shut down by close()
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the SMTP thread pool, starting it after a close."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.smtp_pool.max_connections, thread_name_prefix="smtp"
+            )
+        return self._executor
     
     async def send_notification(self, context: NotificationContext) -> bool:
         """Send email notification.
@@ -318,19 +743,25 @@ class EmailNotifier(NotificationChannel):
     
     async def _send_email_async(self, msg: MIMEMultipart, recipients: List[str]):
         """Send email asynchronously."""
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, self._send_email_sync, msg, recipients)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._get_executor(), self._send_email_sync, msg, recipients)
     
     def _send_email_sync(self, msg: MIMEMultipart, recipients: List[str]):
-        """Send email synchronously."""
-        with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-            if self.smtp_use_tls:
-                server.starttls()
-            
-            if self.smtp_username and self.smtp_password:
-                server.login(self.smtp_username, self.smtp_password)
-            
-            server.send_message(msg, to_addrs=recipients)
+        """Send email synchronously over a pooled SMTP connection."""
+        self.smtp_pool.send(msg, recipients)
+    
+    async def close(self) -> None:
+        """Close pooled SMTP connections and stop the SMTP threads."""
+        executor, self._executor = self._executor, None
+        if executor is None:
+            self.smtp_pool.close()
+            return
+        
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(executor, self.smtp_pool.close)
+        finally:
+            executor.shutdown(wait=False)
     
     def validate_config(self) -> bool:
         """Validate email configuration."""
@@ -365,6 +796,10 @@ class WebhookNotifier(NotificationChannel):
         self.timeout = config.get('timeout', 30)
         self.retry_count = config.get('retry_count', 3)
         self.retry_delay = config.get('retry_delay', 1)
+        self.http = PooledClientSession(
+            config.get('pool_size', NOTIFICATION_HTTP_POOL_SIZE),
+            config.get('keepalive_timeout', NOTIFICATION_HTTP_KEEPALIVE)
+        )
     
     async def send_notification(self, context: NotificationContext) -> bool:
         """Send webhook notification.
@@ -406,19 +841,18 @@ class WebhookNotifier(NotificationChannel):
             # Send webhook with retries
             for attempt in range(self.retry_count):
                 try:
-                    async with aiohttp.ClientSession() as session:
-                        async with session.post(
-                            self.webhook_url,
-                            json=payload,
-                            headers=self.headers,
-                            timeout=aiohttp.ClientTimeout(total=self.timeout)
-                        ) as response:
-                            if response.status < 400:
-                                logger.info(f"Webhook notification sent successfully to {self.webhook_url}")
-                                return True
-                            else:
-                                logger.warning(f"Webhook returned status {response.status}: {await response.text()}")
-                                
+                    async with self.http.get().post(
+                        self.webhook_url,
+                        json=payload,
+                        headers=self.headers,
+                        timeout=aiohttp.ClientTimeout(total=self.timeout)
+                    ) as response:
+                        if response.status < 400:
+                            logger.info(f"Webhook notification sent successfully to {self.webhook_url}")
+                            return True
+                        else:
+                            logger.warning(f"Webhook returned status {response.status}: {await response.text()}")
+                            
                 except aiohttp.ClientError as e:
                     logger.warning(f"Webhook attempt {attempt + 1} failed: {str(e)}")
                     if attempt < self.retry_count - 1:
@@ -431,6 +865,10 @@ class WebhookNotifier(NotificationChannel):
             logger.error(f"Failed to send webhook notification: {str(e)}")
             return False
     
+    async def close(self) -> None:
+        """Close the pooled HTTP session."""
+        await self.http.close()
+    
     def validate_config(self) -> bool:
         """Validate webhook configuration."""
         if not self.webhook_url:
@@ -462,6 +900,10 @@ class SlackNotifier(NotificationChannel):
         self.username = config.get('username', 'ThreatLens')
         self.icon_emoji = config.get('icon_emoji', ':warning:')
         self.timeout = config.get('timeout', 30)
+        self.http = PooledClientSession(
+            config.get('pool_size', NOTIFICATION_HTTP_POOL_SIZE),
+            config.get('keepalive_timeout', NOTIFICATION_HTTP_KEEPALIVE)
+        )
     
     async def send_notification(self, context: NotificationContext) -> bool:
         """Send Slack notification.
@@ -488,19 +930,18 @@ class SlackNotifier(NotificationChannel):
             }
             
             # Send to Slack
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.webhook_url,
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=self.timeout)
-                ) as response:
-                    if response.status == 200:
-                        logger.info(f"Slack notification sent successfully to {self.channel}")
-                        return True
-                    else:
-                        logger.error(f"Slack webhook returned status {response.status}: {await response.text()}")
-                        return False
-                        
+            async with self.http.get().post(
+                self.webhook_url,
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            ) as response:
+                if response.status == 200:
+                    logger.info(f"Slack notification sent successfully to {self.channel}")
+                    return True
+                else:
+                    logger.error(f"Slack webhook returned status {response.status}: {await response.text()}")
+                    return False
+                    
         except Exception as e:
             logger.error(f"Failed to send Slack notification: {str(e)}")
             return False
@@ -569,6 +1010,10 @@ class SlackNotifier(NotificationChannel):
         
         return attachment
     
+    async def close(self) -> None:
+        """Close the pooled HTTP session."""
+        await self.http.close()
+    
     def validate_config(self) -> bool:
         """Validate Slack configuration."""
         if not self.webhook_url:
@@ -585,6 +1030,214 @@ class SlackNotifier(NotificationChannel):
         return True
 
 
+@dataclass
+class DeliveryJob:
+    """A single rule/channel delivery waiting in a channel queue."""
+    context: NotificationContext
+    event_id: str
+    rule_name: str
+    channel_name: str
+    future: asyncio.Future
+    max_retries: int = 0
+    retry_delay: float = 1.0
+    attempt: int = 0
+    last_error: Optional[str] = None
+
+
+class ChannelDispatcher:
+    """Bounded delivery queue with its own worker pool for one channel.
+    
+    Slow or failing channels only back up their own queue. Failed deliveries
+    are re-queued after an exponential backoff without holding a worker, and
+    each job's future resolves once it is finally delivered or given up on.
+    """
+    
+    def __init__(
+        self,
+        name: str,
+        channel: NotificationChannel,
+        manager: 'NotificationManager',
+        queue_size: int = NOTIFICATION_QUEUE_SIZE,
+        worker_count: int = NOTIFICATION_CHANNEL_WORKERS
+    ):
+        """Initialize channel dispatcher.
+        
+        Args:
+            name: Channel name/identifier
+            channel: NotificationChannel to deliver through
+            manager: Owning manager, used to record delivery history
+            queue_size: Maximum queued deliveries
+            worker_count: Number of concurrent senders
+        """
+        self.name = name
+        self.channel = channel
+        self.manager = manager
+        self.queue_size = queue_size
+        self.worker_count = max(1, worker_count)
+        
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: Set[asyncio.Task] = set()
+        self._retry_tasks: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+        self.stats = {'delivered': 0, 'failed': 0, 'retried': 0, 'rejected': 0}
+    
+    def _ensure_queue(self) -> None:
+        """Create the queue on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # First use, or the manager outlived the loop it last ran on
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._workers = set()
+    
+    async def submit(self, job: DeliveryJob) -> None:
+        """Queue a delivery, failing it if the queue stays full.
+        
+        Args:
+            job: Delivery to queue
+        """
+        self._ensure_queue()
+        
+        try:
+            await asyncio.wait_for(self._queue.put(job), timeout=NOTIFICATION_ENQUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            job.last_error = f"Delivery queue for channel {self.name} is full"
+            logger.error(job.last_error)
+            await self._finish(job, NotificationStatus.REJECTED)
+            return
+        
+        if len(self._workers) < self.worker_count:
+            self._workers.add(asyncio.create_task(self._worker(), name=f"notify-{self.name}"))
+    
+    async def _worker(self) -> None:
+        """Deliver queued jobs until the queue is drained."""
+        current = asyncio.current_task()
+        
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                # Idle workers exit; submit starts new ones on demand
+                self._workers.discard(current)
+                return
+            
+            try:
+                await self._deliver(job)
+            except asyncio.CancelledError:
+                if not job.future.done():
+                    job.future.set_result(False)
+                raise
+            except Exception as e:
+                logger.error(f"Notification worker error on channel {self.name}: {str(e)}")
+                if not job.future.done():
+                    job.future.set_result(False)
+    
+    async def _deliver(self, job: DeliveryJob) -> None:
+        """Attempt one delivery and schedule a retry or finish the job."""
+        try:
+            success = await self.channel.send_notification(job.context)
+            if not success:
+                job.last_error = "Channel returned failure status"
+        except Exception as e:
+            success = False
+            job.last_error = str(e)
+            logger.warning(f"Notification attempt {job.attempt + 1} failed for {self.name}: {job.last_error}")
+        
+        if success:
+            await self._finish(job, NotificationStatus.SENT)
+        elif job.attempt < job.max_retries:
+            delay = job.retry_delay * (2 ** job.attempt)  # Exponential backoff
+            job.attempt += 1
+            self.stats['retried'] += 1
+            
+            # Back off outside the worker so other deliveries keep flowing
+            task = asyncio.create_task(self._retry_later(job, delay))
+            self._retry_tasks.add(task)
+            task.add_done_callback(self._retry_tasks.discard)
+        else:
+            if job.max_retries:
+                logger.error(
+                    f"Failed to send notification via {self.name} after {job.attempt + 1} attempts: {job.last_error}"
+                )
+            await self._finish(job, NotificationStatus.FAILED)
+    
+    async def _retry_later(self, job: DeliveryJob, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self.submit(job)
+    
+    async def _finish(self, job: DeliveryJob, status: NotificationStatus) -> None:
+        """Record the final delivery result and resolve the job.
+        
+        Args:
+            job: Finished delivery
+            status: SENT, FAILED after the last retry, or REJECTED when the
+                queue stayed full
+        """
+        success = status == NotificationStatus.SENT
+        self.stats[{
+            NotificationStatus.SENT: 'delivered',
+            NotificationStatus.REJECTED: 'rejected'
+        }.get(status, 'failed')] += 1
+        
+        await self.manager._record_notification_history(
+            job.event_id,
+            job.rule_name,
+            self.name,
+            status,
+            None if success else job.last_error
+        )
+        
+        if not job.future.done():
+            job.future.set_result(success)
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get queue depth and delivery counters."""
+        return {
+            'queue_depth': self._queue.qsize() if self._queue else 0,
+            'queue_size': self.queue_size,
+            'workers': self.worker_count,
+            'pending_retries': len(self._retry_tasks),
+            **self.stats
+        }
+    
+    def cancel(self) -> List[asyncio.Task]:
+        """Stop the workers and fail every delivery still queued or backing off.
+        
+        Returns:
+            Cancelled tasks, for callers that want to await them
+        """
+        tasks = list(self._workers) + list(self._retry_tasks)
+        for task in tasks:
+            task.cancel()
+        
+        while self._queue is not None and not self._queue.empty():
+            job = self._queue.get_nowait()
+            if not job.future.done():
+                job.future.set_result(False)
+        
+        self._workers = set()
+        self._retry_tasks = set()
+        self._queue = None
+        self._loop = None
+        return tasks
+    
+    async def close(self) -> None:
+        """Stop the workers, wait for them to exit and release channel connections."""
+        tasks = self.cancel()
+        
+        # Tasks from an earlier, closed loop cannot be awaited here
+        running = asyncio.get_running_loop()
+        tasks = [task for task in tasks if task.get_loop() is running]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        
+        try:
+            await self.channel.close()
+        except Exception as e:
+            logger.warning(f"Error closing notification channel {self.name}: {str(e)}")
+
+
 class NotificationManager:
     """Central manager for notification system."""
     
@@ -593,6 +1246,10 @@ class NotificationManager:
         self.channels: Dict[str, NotificationChannel] = {}
         self.rules: List[NotificationRule] = []
         self.throttle_cache: Dict[str, datetime] = {}
+        self.dispatchers: Dict[str, ChannelDispatcher] = {}
+        self.pending_digests: Dict[str, PendingDigest] = {}
+        self._dirty_digests: Set[str] = set()
+        self._digest_task: Optional[asyncio.Task] = None
         self._lock = asyncio.Lock()
     
     def add_channel(self, name: str, channel: NotificationChannel) -> None:
@@ -603,7 +1260,9 @@ class NotificationManager:
             channel: NotificationChannel instance
         """
         if channel.validate_config():
+            self._drop_dispatcher(name)
             self.channels[name] = channel
+            self.dispatchers[name] = ChannelDispatcher(name, channel, self)
             logger.info(f"Added notification channel: {name} ({channel.channel_type})")
         else:
             logger.error(f"Failed to add notification channel {name}: invalid configuration")
@@ -616,8 +1275,19 @@ class NotificationManager:
         """
         if name in self.channels:
             del self.channels[name]
+            self._drop_dispatcher(name)
             logger.info(f"Removed notification channel: {name}")
     
+    @property
+    def rules(self) -> List[NotificationRule]:
+        """Configured notification rules, in evaluation order."""
+        return self._rules
+    
+    @rules.setter
+    def rules(self, rules: List[NotificationRule]) -> None:
+        self._rules = rules
+        self._rule_index = RuleIndex(rules)
+    
     def configure_rules(self, rules: List[NotificationRule]) -> None:
         """Configure notification rules.
         
@@ -633,7 +1303,7 @@ class NotificationManager:
         Args:
             rule: NotificationRule to add
         """
-        self.rules.append(rule)
+        self.rules = self.rules + [rule]
         logger.info(f"Added notification rule: {rule.rule_name}")
     
     def remove_rule(self, rule_name: str) -> None:
@@ -645,6 +1315,29 @@ class NotificationManager:
         self.rules = [r for r in self.rules if r.rule_name != rule_name]
         logger.info(f"Removed notification rule: {rule_name}")
     
+    def _drop_dispatcher(self, name: str) -> None:
+        """Stop the dispatcher of a replaced or removed channel."""
+        dispatcher = self.dispatchers.pop(name, None)
+        if dispatcher is None:
+            return
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        
+        if loop is not None:
+            loop.create_task(dispatcher.close())
+            return
+        
+        # No running loop, so nothing is in flight; the channel still holds
+        # connections that need closing
+        dispatcher.cancel()
+        try:
+            asyncio.run(dispatcher.channel.close())
+        except Exception as e:
+            logger.warning(f"Error closing notification channel {name}: {str(e)}")
+    
     async def send_notification(self, event: EventResponse, ai_analysis: Optional[AIAnalysisSchema] = None) -> Dict[str, bool]:
         """Send notifications for an event based on configured rules.
         
@@ -655,82 +1348,326 @@ class NotificationManager:
         Returns:
             Dictionary mapping channel names to success status
         """
-        async with self._lock:
-            results = {}
-            
-            # Find matching rules
-            matching_rules = self._find_matching_rules(event, ai_analysis)
-            
-            if not matching_rules:
-                logger.debug(f"No notification rules matched for event {event.id}")
-                return results
+        return await self._dispatch(event, ai_analysis, max_retries=0, retry_delay=0.0)
+    
+    async def _dispatch(
+        self,
+        event: EventResponse,
+        ai_analysis: Optional[AIAnalysisSchema],
+        max_retries: int,
+        retry_delay: float
+    ) -> Dict[str, bool]:
+        """Fan an event out to the channel queues of every matching rule.
+        
+        Throttle checks and updates happen under the lock; deliveries do not.
+        A rule's throttle slot is claimed before its deliveries are queued so
+        concurrent events cannot both pass the check, and released again if
+        no channel delivered.
+        
+        Args:
+            event: Event that triggered the notification
+            ai_analysis: Optional AI analysis results
+            max_retries: Retry attempts per channel after the first failure
+            retry_delay: Base delay between retries in seconds
             
-            # Process each matching rule
+        Returns:
+            Dictionary mapping rule:channel keys to final success status
+        """
+        # Find matching rules
+        matching_rules = self._find_matching_rules(event, ai_analysis)
+        
+        if not matching_rules:
+            logger.debug(f"No notification rules matched for event {event.id}")
+            return {}
+        
+        claimed: Dict[str, Optional[datetime]] = {}
+        async with self._lock:
+            rules = []
             for rule in matching_rules:
                 if not rule.enabled:
                     continue
                 
                 # Check throttling
                 if self._is_throttled(rule, event):
-                    logger.info(f"Notification throttled for rule {rule.rule_name}")
+                    if rule.digest:
+                        self._add_to_digest(rule, event, ai_analysis)
+                    else:
+                        logger.info(f"Notification throttled for rule {rule.rule_name}")
                     continue
                 
-                # Send notifications for each configured channel
-                for channel_name in rule.channels:
-                    if channel_name not in self.channels:
-                        logger.warning(f"Channel {channel_name} not found for rule {rule.rule_name}")
-                        continue
-                    
-                    channel = self.channels[channel_name]
-                    if not channel.enabled:
-                        continue
-                    
-                    # Create notification context
-                    context = NotificationContext(
-                        event=event,
-                        ai_analysis=ai_analysis,
-                        rule_name=rule.rule_name,
-                        channel_type=channel.channel_type.value
-                    )
-                    
-                    # Add rule-specific configuration to context
-                    if channel.channel_type == NotificationChannelType.EMAIL and rule.email_recipients:
-                        context.additional_data['recipients'] = rule.email_recipients
-                    elif channel.channel_type == NotificationChannelType.WEBHOOK and rule.webhook_url:
-                        context.additional_data['webhook_url'] = rule.webhook_url
-                    elif channel.channel_type == NotificationChannelType.SLACK and rule.slack_channel:
-                        context.additional_data['slack_channel'] = rule.slack_channel
-                    
-                    # Send notification
-                    try:
-                        success = await channel.send_notification(context)
-                        results[f"{rule.rule_name}:{channel_name}"] = success
-                        
-                        # Record notification history
-                        await self._record_notification_history(
-                            event.id,
-                            rule.rule_name,
-                            channel_name,
-                            NotificationStatus.SENT if success else NotificationStatus.FAILED
-                        )
-                        
-                        if success:
-                            # Update throttle cache
-                            self._update_throttle_cache(rule, event)
-                        
-                    except Exception as e:
-                        logger.error(f"Error sending notification via {channel_name}: {str(e)}")
-                        results[f"{rule.rule_name}:{channel_name}"] = False
-                        
-                        await self._record_notification_history(
-                            event.id,
-                            rule.rule_name,
-                            channel_name,
-                            NotificationStatus.FAILED,
-                            str(e)
-                        )
+                claimed[rule.rule_name] = self.throttle_cache.get(self._throttle_key(rule, event))
+                self._update_throttle_cache(rule, event)
+                rules.append(rule)
+        
+        results = await self._deliver(rules, event, ai_analysis, max_retries, retry_delay)
+        
+        async with self._lock:
+            for rule in rules:
+                if any(results.get(f"{rule.rule_name}:{name}") for name in rule.channels):
+                    continue
+                
+                # Nothing was delivered, so the rule must not stay throttled
+                throttle_key = self._throttle_key(rule, event)
+                previous = claimed.get(rule.rule_name)
+                if previous is None:
+                    self.throttle_cache.pop(throttle_key, None)
+                else:
+                    self.throttle_cache[throttle_key] = previous
+        
+        return results
+    
+    async def _deliver(
+        self,
+        rules: List[NotificationRule],
+        event: EventResponse,
+        ai_analysis: Optional[AIAnalysisSchema],
+        max_retries: int,
+        retry_delay: float,
+        additional_data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, bool]:
+        """Queue an event on every channel of the given rules and wait for the results.
+        
+        Args:
+            rules: Rules whose channels should deliver the event
+            event: Event to deliver
+            ai_analysis: Optional AI analysis results
+            max_retries: Retry attempts per channel after the first failure
+            retry_delay: Base delay between retries in seconds
+            additional_data: Extra context data for every channel
+            
+        Returns:
+            Dictionary mapping rule:channel keys to final success status
+        """
+        loop = asyncio.get_running_loop()
+        deliveries: Dict[str, asyncio.Future] = {}
+        submissions = []
+        
+        for rule in rules:
+            for channel_name in rule.channels:
+                if channel_name not in self.channels:
+                    logger.warning(f"Channel {channel_name} not found for rule {rule.rule_name}")
+                    continue
+                
+                channel = self.channels[channel_name]
+                if not channel.enabled:
+                    continue
+                
+                dispatcher = self.dispatchers.get(channel_name)
+                if dispatcher is None:
+                    dispatcher = self.dispatchers[channel_name] = ChannelDispatcher(channel_name, channel, self)
+                
+                context = self._build_context(rule, channel, event, ai_analysis)
+                if additional_data:
+                    context.additional_data.update(additional_data)
+                
+                job = DeliveryJob(
+                    context=context,
+                    event_id=event.id,
+                    rule_name=rule.rule_name,
+                    channel_name=channel_name,
+                    future=loop.create_future(),
+                    max_retries=max_retries,
+                    retry_delay=retry_delay
+                )
+                deliveries[f"{rule.rule_name}:{channel_name}"] = job.future
+                submissions.append(dispatcher.submit(job))
+        
+        # Channels deliver concurrently, each through its own queue
+        await asyncio.gather(*submissions)
+        outcomes = await asyncio.gather(*deliveries.values())
+        return dict(zip(deliveries, outcomes))
+    
+    def _add_to_digest(
+        self,
+        rule: NotificationRule,
+        event: EventResponse,
+        ai_analysis: Optional[AIAnalysisSchema]
+    ) -> None:
+        """Aggregate a throttled event into its digest. Must be called under the lock."""
+        digest_key = self._throttle_key(rule, event)
+        digest = self.pending_digests.get(digest_key)
+        
+        if digest is None:
+            window_end = self.throttle_cache[digest_key] + timedelta(minutes=rule.throttle_minutes)
+            digest = self.pending_digests[digest_key] = PendingDigest(
+                digest_key=digest_key,
+                rule_name=rule.rule_name,
+                source=event.source,
+                category=getattr(event.category, 'value', event.category),
+                window_end=window_end,
+                first_event_id=event.id,
+                first_seen=event.timestamp
+            )
+        
+        digest.add(event, ai_analysis)
+        self._dirty_digests.add(digest_key)
+        self._ensure_digest_task()
+        logger.debug(f"Added event {event.id} to digest {digest_key} ({digest.event_count} events)")
+    
+    def _ensure_digest_task(self) -> None:
+        """Start the digest flusher on the running loop if it is not running."""
+        loop = asyncio.get_running_loop()
+        if self._digest_task is None or self._digest_task.done() or self._digest_task.get_loop() is not loop:
+            self._digest_task = loop.create_task(self._run_digests(), name="notification-digests")
+    
+    async def _run_digests(self) -> None:
+        """Persist and flush digests until none are pending."""
+        while True:
+            await asyncio.sleep(NOTIFICATION_DIGEST_CHECK_INTERVAL)
+            try:
+                await self.flush_digests()
+            except Exception as e:
+                logger.error(f"Error flushing notification digests: {str(e)}")
+            
+            if not self.pending_digests:
+                return
+    
+    async def flush_digests(self, now: Optional[datetime] = None) -> int:
+        """Persist changed digests and send those whose window has closed.
+        
+        Args:
+            now: Time to compare windows against (defaults to now)
+            
+        Returns:
+            Number of digests sent
+        """
+        now = now or datetime.now()
+        
+        async with self._lock:
+            due = [d for d in self.pending_digests.values() if d.window_end <= now]
+            for digest in due:
+                del self.pending_digests[digest.digest_key]
+            
+            changed = [self.pending_digests[key] for key in self._dirty_digests if key in self.pending_digests]
+            self._dirty_digests.clear()
+        
+        if changed:
+            await self._persist_digests(changed)
+        
+        if not due:
+            return 0
+        
+        await asyncio.gather(*(self._send_digest(digest) for digest in due))
+        
+        # Remove only after sending, so a crash mid-send resends on restart
+        await self._delete_digests([digest.digest_key for digest in due])
+        return len(due)
+    
+    async def _send_digest(self, digest: PendingDigest) -> None:
+        rule = next((r for r in self.rules if r.rule_name == digest.rule_name), None)
+        if rule is None or not rule.enabled:
+            logger.warning(f"Dropping digest {digest.digest_key}: rule {digest.rule_name} is not active")
+            return
+        
+        event, analysis = digest.to_event()
+        results = await self._deliver(
+            [rule], event, analysis, max_retries=2, retry_delay=1.0,
+            additional_data={'digest': digest.summary()}
+        )
+        
+        sent = sum(1 for success in results.values() if success)
+        logger.info(
+            f"Sent digest of {digest.event_count} events for {digest.digest_key}: "
+            f"{sent} of {len(results)} channels succeeded"
+        )
+    
+    async def _persist_digests(self, digests: List[PendingDigest]) -> None:
+        try:
+            async with async_write_session() as db:
+                for digest in digests:
+                    await db.merge(digest.to_record())
+        except Exception as e:
+            logger.error(f"Failed to persist notification digests: {str(e)}")
+    
+    async def _delete_digests(self, digest_keys: List[str]) -> None:
+        try:
+            async with async_write_session() as db:
+                await db.execute(delete(NotificationDigest).where(NotificationDigest.digest_key.in_(digest_keys)))
+        except Exception as e:
+            logger.error(f"Failed to delete sent notification digests: {str(e)}")
+    
+    async def load_pending_digests(self) -> int:
+        """Restore digests persisted before a restart and schedule them.
+        
+        Returns:
+            Number of digests restored
+        """
+        if not any(rule.digest for rule in self.rules):
+            return 0
+        
+        try:
+            async with async_write_session() as db:
+                records = (await db.execute(select(NotificationDigest))).scalars().all()
+        except Exception as e:
+            logger.error(f"Failed to load pending notification digests: {str(e)}")
+            return 0
+        
+        async with self._lock:
+            for record in records:
+                digest = PendingDigest.from_record(record)
+                pending = self.pending_digests.get(digest.digest_key)
+                if pending is None:
+                    self.pending_digests[digest.digest_key] = digest
+                    continue
+                
+                # Events arrived before the restore; fold the stored counts in
+                pending.event_count += digest.event_count
+                pending.max_severity = max(pending.max_severity, digest.max_severity)
+                pending.first_event_id, pending.first_seen = digest.first_event_id, digest.first_seen
+                pending.samples = (digest.samples + pending.samples)[:NOTIFICATION_DIGEST_SAMPLES]
+                pending.window_end = min(pending.window_end, digest.window_end)
+                self._dirty_digests.add(digest.digest_key)
             
-            return results
+            if self.pending_digests:
+                self._ensure_digest_task()
+        
+        if records:
+            logger.info(f"Restored {len(records)} pending notification digests")
+        return len(records)
+    
+    def _build_context(
+        self,
+        rule: NotificationRule,
+        channel: NotificationChannel,
+        event: EventResponse,
+        ai_analysis: Optional[AIAnalysisSchema]
+    ) -> NotificationContext:
+        """Create the notification context for a rule and channel."""
+        context = NotificationContext(
+            event=event,
+            ai_analysis=ai_analysis,
+            rule_name=rule.rule_name,
+            channel_type=channel.channel_type.value
+        )
+        
+        # Add rule-specific configuration to context
+        if channel.channel_type == NotificationChannelType.EMAIL and rule.email_recipients:
+            context.additional_data['recipients'] = rule.email_recipients
+        elif channel.channel_type == NotificationChannelType.WEBHOOK and rule.webhook_url:
+            context.additional_data['webhook_url'] = rule.webhook_url
+        elif channel.channel_type == NotificationChannelType.SLACK and rule.slack_channel:
+            context.additional_data['slack_channel'] = rule.slack_channel
+        
+        return context
+    
+    async def shutdown(self) -> None:
+        """Stop all channel workers and close their pooled connections.
+        
+        Pending digests are persisted so they are sent after a restart.
+        Deliveries that are still queued are failed.
+        """
+        if self._digest_task and self._digest_task.get_loop() is asyncio.get_running_loop():
+            self._digest_task.cancel()
+            await asyncio.gather(self._digest_task, return_exceptions=True)
+        self._digest_task = None
+        
+        async with self._lock:
+            changed = [self.pending_digests[key] for key in self._dirty_digests if key in self.pending_digests]
+            self._dirty_digests.clear()
+        if changed:
+            await self._persist_digests(changed)
+        
+        await asyncio.gather(*(dispatcher.close() for dispatcher in self.dispatchers.values()))
     
     def _find_matching_rules(self, event: EventResponse, ai_analysis: Optional[AIAnalysisSchema]) -> List[NotificationRule]:
         """Find notification rules that match the given event.
@@ -742,28 +1679,10 @@ class NotificationManager:
         Returns:
             List of matching notification rules
         """
-        matching_rules = []
+        severity = ai_analysis.severity_score if ai_analysis else 5
+        candidates = self._rule_index.candidates(event.category, event.source, severity)
         
-        for rule in self.rules:
-            if not rule.enabled:
-                continue
-            
-            # Check severity range
-            severity = ai_analysis.severity_score if ai_analysis else 5
-            if not (rule.min_severity <= severity <= rule.max_severity):
-                continue
-            
-            # Check categories
-            if rule.categories and event.category not in rule.categories:
-                continue
-            
-            # Check sources
-            if rule.sources and event.source not in rule.sources:
-                continue
-            
-            matching_rules.append(rule)
-        
-        return matching_rules
+        return [rule for rule in candidates if rule.enabled]
     
     def _is_throttled(self, rule: NotificationRule, event: EventResponse) -> bool:
         """Check if notifications for this rule are throttled.
@@ -778,7 +1697,7 @@ class NotificationManager:
         if rule.throttle_minutes <= 0:
             return False
         
-        throttle_key = f"{rule.rule_name}:{event.source}:{event.category}"
+        throttle_key = self._throttle_key(rule, event)
         
         if throttle_key in self.throttle_cache:
             last_sent = self.throttle_cache[throttle_key]
@@ -797,8 +1716,11 @@ class NotificationManager:
             event: Event that was processed
         """
         if rule.throttle_minutes > 0:
-            throttle_key = f"{rule.rule_name}:{event.source}:{event.category}"
-            self.throttle_cache[throttle_key] = datetime.now()
+            self.throttle_cache[self._throttle_key(rule, event)] = datetime.now()
+    
+    @staticmethod
+    def _throttle_key(rule: NotificationRule, event: EventResponse) -> str:
+        return f"{rule.rule_name}:{event.source}:{event.category}"
     
     async def _record_notification_history(
         self,
@@ -883,6 +1805,10 @@ class NotificationManager:
                 'enabled': channel.enabled,
                 'config_valid': channel.validate_config()
             }
+            
+            dispatcher = self.dispatchers.get(name)
+            if dispatcher:
+                status[name]['delivery'] = dispatcher.get_status()
         
         return status
     
@@ -901,7 +1827,8 @@ class NotificationManager:
                 'categories': rule.categories,
                 'sources': rule.sources,
                 'channels': rule.channels,
-                'throttle_minutes': rule.throttle_minutes
+                'throttle_minutes': rule.throttle_minutes,
+                'digest': rule.digest
             }
             for rule in self.rules
         ]
@@ -924,103 +1851,7 @@ class NotificationManager:
         Returns:
             Dictionary mapping channel names to final success status
         """
-        async with self._lock:
-            results = {}
-            
-            # Find matching rules
-            matching_rules = self._find_matching_rules(event, ai_analysis)
-            
-            if not matching_rules:
-                logger.debug(f"No notification rules matched for event {event.id}")
-                return results
-            
-            # Process each matching rule
-            for rule in matching_rules:
-                if not rule.enabled:
-                    continue
-                
-                # Check throttling
-                if self._is_throttled(rule, event):
-                    logger.info(f"Notification throttled for rule {rule.rule_name}")
-                    continue
-                
-                # Send notifications for each configured channel with retry
-                for channel_name in rule.channels:
-                    if channel_name not in self.channels:
-                        logger.warning(f"Channel {channel_name} not found for rule {rule.rule_name}")
-                        continue
-                    
-                    channel = self.channels[channel_name]
-                    if not channel.enabled:
-                        continue
-                    
-                    # Create notification context
-                    context = NotificationContext(
-                        event=event,
-                        ai_analysis=ai_analysis,
-                        rule_name=rule.rule_name,
-                        channel_type=channel.channel_type.value
-                    )
-                    
-                    # Add rule-specific configuration to context
-                    if channel.channel_type == NotificationChannelType.EMAIL and rule.email_recipients:
-                        context.additional_data['recipients'] = rule.email_recipients
-                    elif channel.channel_type == NotificationChannelType.WEBHOOK and rule.webhook_url:
-                        context.additional_data['webhook_url'] = rule.webhook_url
-                    elif channel.channel_type == NotificationChannelType.SLACK and rule.slack_channel:
-                        context.additional_data['slack_channel'] = rule.slack_channel
-                    
-                    # Attempt delivery with retries
-                    success = False
-                    last_error = None
-                    
-                    for attempt in range(max_retries + 1):  # +1 for initial attempt
-                        try:
-                            success = await channel.send_notification(context)
-                            
-                            if success:
-                                # Record successful delivery
-                                await self._record_notification_history(
-                                    event.id,
-                                    rule.rule_name,
-                                    channel_name,
-                                    NotificationStatus.SENT
-                                )
-                                
-                                # Update throttle cache
-                                self._update_throttle_cache(rule, event)
-                                break
-                            else:
-                                last_error = "Channel returned failure status"
-                                
-                        except Exception as e:
-                            last_error = str(e)
-                            logger.warning(
-                                f"Notification attempt {attempt + 1} failed for {channel_name}: {last_error}"
-                            )
-                        
-                        # Wait before retry (except on last attempt)
-                        if attempt < max_retries:
-                            await asyncio.sleep(retry_delay * (2 ** attempt))  # Exponential backoff
-                    
-                    # Record final result
-                    results[f"{rule.rule_name}:{channel_name}"] = success
-                    
-                    if not success:
-                        # Record failed delivery
-                        await self._record_notification_history(
-                            event.id,
-                            rule.rule_name,
-                            channel_name,
-                            NotificationStatus.FAILED,
-                            last_error
-                        )
-                        
-                        logger.error(
-                            f"Failed to send notification via {channel_name} after {max_retries + 1} attempts: {last_error}"
-                        )
-            
-            return results
+        return await self._dispatch(event, ai_analysis, max_retries=max_retries, retry_delay=retry_delay)
     
     def get_notification_stats(self) -> Dict[str, Any]:
         """Get notification delivery statistics.
@@ -1043,6 +1874,11 @@ class NotificationManager:
                     NotificationHistory.status == NotificationStatus.PENDING.value
                 ).count()
                 
+                # Deliveries dropped because a channel queue stayed full
+                total_rejected = db.query(NotificationHistory).filter(
+                    NotificationHistory.status == NotificationStatus.REJECTED.value
+                ).count()
+                
                 # Get counts by channel
                 channel_stats = {}
                 for channel_name in self.channels.keys():
@@ -1060,17 +1896,26 @@ class NotificationManager:
                         )
                     ).count()
                     
+                    rejected_count = db.query(NotificationHistory).filter(
+                        and_(
+                            NotificationHistory.channel == channel_name,
+                            NotificationHistory.status == NotificationStatus.REJECTED.value
+                        )
+                    ).count()
+                    
                     channel_stats[channel_name] = {
                         'sent': sent_count,
                         'failed': failed_count,
-                        'success_rate': sent_count / max(sent_count + failed_count, 1)
+                        'rejected': rejected_count,
+                        'success_rate': sent_count / max(sent_count + failed_count + rejected_count, 1)
                     }
                 
                 return {
                     'total_sent': total_sent,
                     'total_failed': total_failed,
                     'total_pending': total_pending,
-                    'overall_success_rate': total_sent / max(total_sent + total_failed, 1),
+                    'total_rejected': total_rejected,
+                    'overall_success_rate': total_sent / max(total_sent + total_failed + total_rejected, 1),
                     'channel_stats': channel_stats,
                     'active_rules': len([r for r in self.rules if r.enabled]),
                     'active_channels': len([c for c in self.channels.values() if c.enabled])
@@ -1082,6 +1927,7 @@ class NotificationManager:
                 'total_sent': 0,
                 'total_failed': 0,
                 'total_pending': 0,
+                'total_rejected': 0,
                 'overall_success_rate': 0.0,
                 'channel_stats': {},
                 'active_rules': len([r for r in self.rules if r.enabled]),
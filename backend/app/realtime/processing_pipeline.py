@@ -13,11 +13,26 @@ from typing import Dict, Any, List, Optional, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 
+from ..metrics import QuantileSketch, RingBuffer
 from .ingestion_queue import LogEntry, ProcessingStatus, LogEntryPriority
 from .exceptions import ProcessingError, ValidationError
 
 logger = logging.getLogger(__name__)
 
+# Printable ASCII plus tab, LF and CR
+_ALLOWED_CHAR_BYTES = bytes([9, 10, 13, *range(32, 127)])
+_INVALID_CHAR_RUN = re.compile(r'[^\t\n\r\x20-\x7e]+')
+
+
+def has_only_allowed_chars(content: str) -> bool:
+    """
+    Check that content contains only printable ASCII, tabs and line breaks.
+    
+    Anything non-ASCII is disallowed, so the check is an isascii() flag test
+    plus a byte-level translate that deletes every allowed byte.
+    """
+    return content.isascii() and not content.encode('ascii').translate(None, _ALLOWED_CHAR_BYTES)
+
 
 class ValidationResult(str, Enum):
     """Result of log entry validation."""
@@ -60,39 +75,38 @@ class LogEntryValidator:
     
     def __init__(self):
         """Initialize the validator with security patterns."""
-        # Suspicious patterns that might indicate attacks or malicious content
-        self.suspicious_patterns = [
+        # Suspicious patterns that might indicate attacks or malicious content,
+        # keyed by rule name
+        self.suspicious_patterns = {
             # SQL injection patterns
-            r'(?i)(union\s+select|drop\s+table|delete\s+from|insert\s+into)',
-            r'(?i)(or\s+1\s*=\s*1|and\s+1\s*=\s*1)',
+            'sql_injection': r'(?i:union\s+select|drop\s+table|delete\s+from|insert\s+into)',
+            'sql_tautology': r'(?i:or\s+1\s*=\s*1|and\s+1\s*=\s*1)',
             
             # XSS patterns
-            r'(?i)(<script|javascript:|on\w+\s*=)',
-            r'(?i)(alert\s*\(|confirm\s*\(|prompt\s*\()',
+            'xss_markup': r'(?i:<script|javascript:|on\w+\s*=)',
+            'xss_dialog': r'(?i:alert\s*\(|confirm\s*\(|prompt\s*\()',
             
             # Path traversal
-            r'\.\.[\\/]',
-            r'(?i)(etc[\\/]passwd|windows[\\/]system32)',
+            'path_traversal': r'\.\.[\\/]',
+            'sensitive_path': r'(?i:etc[\\/]passwd|windows[\\/]system32)',
             
             # Command injection
-            r'(?i)(\|\s*\w+|\&\&\s*\w+|\;\s*\w+)',
-            r'(?i)(curl\s+|wget\s+|nc\s+|netcat\s+)',
+            'command_chaining': r'(?i:\|\s*\w+|\&\&\s*\w+|\;\s*\w+)',
+            'network_tool': r'(?i:curl\s+|wget\s+|nc\s+|netcat\s+)',
             
             # Encoded attacks
-            r'%[0-9a-fA-F]{2}',  # URL encoding
-            r'\\x[0-9a-fA-F]{2}',  # Hex encoding
-        ]
+            'url_encoding': r'%[0-9a-fA-F]{2}',
+            'hex_encoding': r'\\x[0-9a-fA-F]{2}',
+        }
         
-        # Compile patterns for efficiency
-        self.compiled_patterns = [re.compile(pattern) for pattern in self.suspicious_patterns]
+        # Single combined pattern; the named group of a match identifies the rule
+        self.compiled_pattern = re.compile('|'.join(
+            f'(?P<{name}>{pattern})' for name, pattern in self.suspicious_patterns.items()
+        ))
         
         # Content size limits
         self.max_content_length = 1024 * 1024  # 1MB
         self.max_line_length = 32768  # 32KB per line
-        
-        # Character validation
-        self.allowed_chars = set(range(32, 127))  # Printable ASCII
-        self.allowed_chars.update([9, 10, 13])  # Tab, LF, CR
     
     def validate_entry(self, entry: LogEntry) -> ValidationResult:
         """
@@ -115,11 +129,12 @@ class LogEntryValidator:
                 return ValidationResult.INVALID
             
             # Line length validation
-            lines = entry.content.split('\n')
-            for i, line in enumerate(lines):
-                if len(line) > self.max_line_length:
-                    logger.warning(f"Entry {entry.entry_id} line {i+1} exceeds maximum length")
-                    return ValidationResult.REQUIRES_SANITIZATION
+            if len(entry.content) > self.max_line_length:
+                lines = entry.content.split('\n')
+                for i, line in enumerate(lines):
+                    if len(line) > self.max_line_length:
+                        logger.warning(f"Entry {entry.entry_id} line {i+1} exceeds maximum length")
+                        return ValidationResult.REQUIRES_SANITIZATION
             
             # Character validation
             if not self._validate_characters(entry.content):
@@ -127,8 +142,10 @@ class LogEntryValidator:
                 return ValidationResult.REQUIRES_SANITIZATION
             
             # Security pattern detection
-            if self._detect_suspicious_patterns(entry.content):
-                logger.warning(f"Entry {entry.entry_id} contains suspicious patterns")
+            suspicious_rule = self._detect_suspicious_patterns(entry.content)
+            if suspicious_rule:
+                logger.warning(f"Entry {entry.entry_id} contains suspicious patterns ({suspicious_rule})")
+                entry.metadata['suspicious_pattern'] = suspicious_rule
                 return ValidationResult.SUSPICIOUS
             
             # Source validation
@@ -143,17 +160,17 @@ class LogEntryValidator:
     
     def _validate_characters(self, content: str) -> bool:
         """Validate that content contains only allowed characters."""
-        for char in content:
-            if ord(char) not in self.allowed_chars:
-                return False
-        return True
+        return has_only_allowed_chars(content)
     
-    def _detect_suspicious_patterns(self, content: str) -> bool:
-        """Detect suspicious patterns in content."""
-        for pattern in self.compiled_patterns:
-            if pattern.search(content):
-                return True
-        return False
+    def _detect_suspicious_patterns(self, content: str) -> Optional[str]:
+        """
+        Detect suspicious patterns in content.
+        
+        Returns:
+            Name of the first matching rule, or None if nothing matched
+        """
+        match = self.compiled_pattern.search(content)
+        return match.lastgroup if match else None
     
     def _validate_source_info(self, entry: LogEntry) -> bool:
         """Validate source information."""
@@ -252,24 +269,15 @@ class LogEntrySanitizer:
     
     def _sanitize_characters(self, content: str) -> Tuple[str, bool]:
         """Sanitize invalid characters."""
-        sanitized = []
-        was_modified = False
-        consecutive_replacements = 0
+        if has_only_allowed_chars(content):
+            return content, False
         
-        allowed_chars = set(range(32, 127))  # Printable ASCII
-        allowed_chars.update([9, 10, 13])  # Tab, LF, CR
+        # Each run of invalid characters becomes up to max_consecutive_replacements
+        # replacement characters
+        def replace_run(match: re.Match) -> str:
+            return self.replacement_char * min(len(match.group()), self.max_consecutive_replacements)
         
-        for char in content:
-            if ord(char) in allowed_chars:
-                sanitized.append(char)
-                consecutive_replacements = 0
-            else:
-                if consecutive_replacements < self.max_consecutive_replacements:
-                    sanitized.append(self.replacement_char)
-                    consecutive_replacements += 1
-                was_modified = True
-        
-        return ''.join(sanitized), was_modified
+        return _INVALID_CHAR_RUN.sub(replace_run, content), True
     
     def _sanitize_line_lengths(self, content: str) -> Tuple[str, bool]:
         """Sanitize overly long lines."""
@@ -326,8 +334,9 @@ class ProcessingStatusTracker:
             'validation_failures': 0,
             'sanitization_count': 0,
             'avg_processing_time': 0.0,
-            'processing_times': []
+            'processing_times': RingBuffer(1000)
         }
+        self.processing_time_sketch = QuantileSketch()
     
     def start_processing(self, entry: LogEntry) -> None:
         """Mark entry as processing started."""
@@ -399,18 +408,9 @@ class ProcessingStatusTracker:
         if result.sanitized:
             self.performance_metrics['sanitization_count'] += 1
         
-        # Update processing time metrics
+        # Update processing time metrics; averages are computed when read
         self.performance_metrics['processing_times'].append(result.processing_time)
-        
-        # Keep only recent processing times
-        if len(self.performance_metrics['processing_times']) > 1000:
-            self.performance_metrics['processing_times'] = \
-                self.performance_metrics['processing_times'][-500:]
-        
-        # Calculate average processing time
-        times = self.performance_metrics['processing_times']
-        if times:
-            self.performance_metrics['avg_processing_time'] = sum(times) / len(times)
+        self.processing_time_sketch.add(result.processing_time)
     
     def get_processing_status(self, entry_id: str) -> Optional[Dict[str, Any]]:
         """Get processing status for an entry."""
@@ -454,16 +454,17 @@ class ProcessingStatusTracker:
             metrics['validation_failure_rate'] = 0.0
             metrics['sanitization_rate'] = 0.0
         
-        # Processing time statistics
+        # Processing time statistics over the recent samples
         times = metrics['processing_times']
-        if times:
-            metrics['min_processing_time'] = min(times)
-            metrics['max_processing_time'] = max(times)
-            metrics['median_processing_time'] = sorted(times)[len(times) // 2]
-        else:
-            metrics['min_processing_time'] = 0.0
-            metrics['max_processing_time'] = 0.0
-            metrics['median_processing_time'] = 0.0
+        metrics['avg_processing_time'] = times.mean()
+        metrics['min_processing_time'] = times.min()
+        metrics['max_processing_time'] = times.max()
+        
+        # Distribution over every processed entry
+        quantiles = self.processing_time_sketch.quantiles()
+        metrics['median_processing_time'] = quantiles['p50']
+        metrics['p95_processing_time'] = quantiles['p95']
+        metrics['p99_processing_time'] = quantiles['p99']
         
         # Remove raw processing times from output
         del metrics['processing_times']
@@ -576,6 +577,7 @@ def process_log_entry(entry: LogEntry) -> ProcessingResult:
         
         if validation_result == ValidationResult.SUSPICIOUS:
             result.warnings.append("Entry contains suspicious patterns")
+            result.metadata['suspicious_pattern'] = entry.metadata.get('suspicious_pattern')
         
         # Complete processing tracking
         status_tracker.complete_processing(sanitized_entry, result)
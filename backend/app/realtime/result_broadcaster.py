@@ -7,19 +7,31 @@ including success notifications, error alerts, and status updates.
 
 import asyncio
 import logging
+import os
+from collections import Counter
 from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Set, Union
 from enum import Enum
 from dataclasses import dataclass
 
+from app.metrics import observe_stage
+
 from .ingestion_queue import LogEntry, ProcessingStatus
 from .processing_pipeline import ProcessingResult, ValidationResult
-from .websocket_server import EventUpdate, WebSocketManager
+from .websocket_server import EventUpdate, WebSocketManager, encode_message
 from .error_handler import ErrorHandler, ErrorRecord, ErrorSeverity
 from .exceptions import BroadcastError
 
 logger = logging.getLogger(__name__)
 
+# Processing updates are merged into one frame per client per interval (0 sends every update)
+RESULT_COALESCE_INTERVAL = float(os.getenv("RESULT_COALESCE_INTERVAL", "0.25"))
+RESULT_COALESCE_MAX_ENTRIES = int(os.getenv("RESULT_COALESCE_MAX_ENTRIES", "5000"))
+RESULT_DELTA_ENCODING = os.getenv("RESULT_DELTA_ENCODING", "false").lower() == "true"
+
+STATUS_EVENT_TYPE = 'processing_status_update'
+BATCH_EVENT_TYPE = 'processing_batch'
+
 
 class ResultType(str, Enum):
     """Types of processing results."""
@@ -51,6 +63,193 @@ class BroadcastResult:
     error: Optional[str] = None
 
 
+class UpdateCoalescer:
+    """
+    Merges processing status and result updates into periodic batch frames.
+    
+    Within a window only the latest status and the latest result per entry
+    are kept, and every raw update is counted by event type. When the window
+    closes, each client gets one processing_batch frame holding the updates
+    for the event types it subscribes to. Clients with identical
+    subscriptions share a single encoded frame.
+    
+    With delta encoding, results are sent as a key list plus value rows
+    (null where a key is absent) instead of repeating every key per entry,
+    and statuses are sent as [entry_id, status] pairs.
+    """
+    
+    def __init__(
+        self,
+        websocket_manager: WebSocketManager,
+        interval: float = RESULT_COALESCE_INTERVAL,
+        max_entries: int = RESULT_COALESCE_MAX_ENTRIES,
+        delta_encoding: bool = RESULT_DELTA_ENCODING
+    ):
+        self.websocket_manager = websocket_manager
+        self.interval = interval
+        self.max_entries = max_entries
+        self.delta_encoding = delta_encoding
+        
+        self._statuses: Dict[str, Dict[str, Any]] = {}
+        self._results: Dict[str, EventUpdate] = {}
+        self._counts: Counter = Counter()
+        self._priority = 0
+        self._window_start: Optional[datetime] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        
+        self.stats = {
+            'updates_received': 0,
+            'updates_merged': 0,
+            'frames_sent': 0,
+            'batches_flushed': 0
+        }
+    
+    @property
+    def pending(self) -> int:
+        """Number of entries waiting in the current window."""
+        return len(self._statuses) + len(self._results)
+    
+    async def add(self, event: EventUpdate) -> None:
+        """
+        Add a status or result update to the current window.
+        
+        Args:
+            event: Status update or processing result event
+        """
+        entry_id = event.data.get('entry_id')
+        if self._window_start is None:
+            self._window_start = datetime.now(timezone.utc)
+        
+        self.stats['updates_received'] += 1
+        self._counts[event.event_type] += 1
+        self._priority = max(self._priority, event.priority)
+        
+        if event.event_type == STATUS_EVENT_TYPE:
+            # A result already supersedes any status for the same entry
+            if entry_id in self._results or entry_id in self._statuses:
+                self.stats['updates_merged'] += 1
+            if entry_id not in self._results:
+                self._statuses[entry_id] = event.data
+        else:
+            if self._statuses.pop(entry_id, None) is not None or entry_id in self._results:
+                self.stats['updates_merged'] += 1
+            self._results[entry_id] = event
+        
+        if self.pending >= self.max_entries:
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_after_interval())
+    
+    async def _flush_after_interval(self) -> None:
+        """Flush once the current window has elapsed."""
+        await asyncio.sleep(self.interval)
+        await self.flush()
+    
+    async def flush(self) -> int:
+        """
+        Send the pending window to subscribed clients.
+        
+        Returns:
+            Number of frames queued
+        """
+        async with self._flush_lock:
+            if not self._counts:
+                return 0
+            
+            statuses, results, counts = self._statuses, self._results, self._counts
+            window_start, priority = self._window_start, self._priority
+            self._statuses, self._results, self._counts = {}, {}, Counter()
+            self._window_start, self._priority = None, 0
+            
+            # Group clients by the subset of event types they accept
+            accepted: Dict[str, Set[str]] = {}
+            for event_type in counts:
+                for client_id in self.websocket_manager.get_subscribed_clients(event_type):
+                    accepted.setdefault(client_id, set()).add(event_type)
+            
+            groups: Dict[frozenset, List[str]] = {}
+            for client_id, event_types in accepted.items():
+                groups.setdefault(frozenset(event_types), []).append(client_id)
+            
+            window_end = datetime.now(timezone.utc)
+            frames_sent = 0
+            for event_types, client_ids in groups.items():
+                frame = encode_message({
+                    "type": BATCH_EVENT_TYPE,
+                    "data": self._build_batch(event_types, statuses, results, counts, window_start, window_end),
+                    "timestamp": window_end.isoformat(),
+                    "priority": priority
+                })
+                for client_id in client_ids:
+                    if await self.websocket_manager.send_frame(client_id, frame):
+                        frames_sent += 1
+            
+            self.stats['batches_flushed'] += 1
+            self.stats['frames_sent'] += frames_sent
+            return frames_sent
+    
+    def _build_batch(
+        self,
+        event_types: frozenset,
+        statuses: Dict[str, Dict[str, Any]],
+        results: Dict[str, EventUpdate],
+        counts: Counter,
+        window_start: Optional[datetime],
+        window_end: datetime
+    ) -> Dict[str, Any]:
+        """Build the batch payload for clients accepting the given event types."""
+        result_rows = [
+            {**event.data, 'result_type': event.event_type[len('processing_'):]}
+            for event in results.values() if event.event_type in event_types
+        ]
+        status_rows = list(statuses.values()) if STATUS_EVENT_TYPE in event_types else []
+        
+        batch = {
+            'window_start': window_start.isoformat() if window_start else window_end.isoformat(),
+            'window_end': window_end.isoformat(),
+            'counts': {event_type: counts[event_type] for event_type in event_types},
+            'encoding': 'delta' if self.delta_encoding else 'full'
+        }
+        
+        if self.delta_encoding:
+            batch['statuses'] = [[row['entry_id'], row['status']] for row in status_rows]
+            keys: List[str] = []
+            seen = set()
+            for row in result_rows:
+                for key in row:
+                    if key not in seen:
+                        seen.add(key)
+                        keys.append(key)
+            batch['results'] = {
+                'keys': keys,
+                'rows': [[row.get(key) for key in keys] for row in result_rows]
+            }
+        else:
+            batch['statuses'] = status_rows
+            batch['results'] = result_rows
+        
+        return batch
+    
+    async def close(self) -> None:
+        """Flush pending updates and stop the flush timer."""
+        await self.flush()
+        
+        task = self._flush_task
+        if task and not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get coalescing statistics."""
+        return {
+            **self.stats,
+            'pending_entries': self.pending,
+            'interval': self.interval,
+            'delta_encoding': self.delta_encoding
+        }
+
+
 class ProcessingResultBroadcaster:
     """
     Comprehensive broadcaster for processing results and status updates.
@@ -62,7 +261,9 @@ class ProcessingResultBroadcaster:
     def __init__(
         self,
         websocket_manager: WebSocketManager,
-        error_handler: ErrorHandler
+        error_handler: ErrorHandler,
+        coalesce_interval: float = RESULT_COALESCE_INTERVAL,
+        delta_encoding: bool = RESULT_DELTA_ENCODING
     ):
         """
         Initialize the result broadcaster.
@@ -70,9 +271,14 @@ class ProcessingResultBroadcaster:
         Args:
             websocket_manager: WebSocket manager for broadcasting
             error_handler: Error handler for error broadcasting
+            coalesce_interval: Seconds to batch status and result updates (0 sends each one)
+            delta_encoding: Use the compact delta encoding for batch frames
         """
         self.websocket_manager = websocket_manager
         self.error_handler = error_handler
+        self.coalescer = UpdateCoalescer(
+            websocket_manager, coalesce_interval, delta_encoding=delta_encoding
+        ) if coalesce_interval > 0 else None
         
         # Broadcasting statistics
         self.stats = {
@@ -118,6 +324,8 @@ class ProcessingResultBroadcaster:
             # Check if broadcast should be throttled
             if self._should_throttle_broadcast(entry, result_type):
                 logger.debug(f"Throttled broadcast for entry {entry.entry_id}")
+                observe_stage("broadcast", entry.source_name,
+                              (datetime.now(timezone.utc) - start_time).total_seconds(), "throttled")
                 return BroadcastResult(
                     success=True,
                     message_id="throttled",
@@ -138,7 +346,7 @@ class ProcessingResultBroadcaster:
             
             # Broadcast the event
             broadcast_start = datetime.now(timezone.utc)
-            clients_reached = await self.websocket_manager.broadcast_event(event_update)
+            clients_reached = await self._publish(event_update)
             broadcast_time = (datetime.now(timezone.utc) - broadcast_start).total_seconds()
             
             # Update statistics
@@ -149,6 +357,8 @@ class ProcessingResultBroadcaster:
             
             logger.debug(f"Broadcast processing result for entry {entry.entry_id}: "
                         f"{result_type.value} to {clients_reached} clients")
+            observe_stage("broadcast", entry.source_name,
+                          (datetime.now(timezone.utc) - start_time).total_seconds())
             
             return BroadcastResult(
                 success=True,
@@ -162,6 +372,7 @@ class ProcessingResultBroadcaster:
             broadcast_time = (datetime.now(timezone.utc) - start_time).total_seconds()
             error_msg = f"Failed to broadcast processing result: {str(e)}"
             logger.error(error_msg)
+            observe_stage("broadcast", entry.source_name, broadcast_time, "error")
             
             # Handle broadcast error
             await self.error_handler.handle_error(
@@ -223,12 +434,12 @@ class ProcessingResultBroadcaster:
             
             # Create and broadcast event
             event_update = EventUpdate(
-                event_type='processing_status_update',
+                event_type=STATUS_EVENT_TYPE,
                 data=message_data,
                 priority=priority.value
             )
             
-            clients_reached = await self.websocket_manager.broadcast_event(event_update)
+            clients_reached = await self._publish(event_update)
             
             logger.debug(f"Broadcast status update for entry {entry.entry_id}: "
                         f"{status.value} to {clients_reached} clients")
@@ -392,6 +603,25 @@ class ProcessingResultBroadcaster:
                 error=error_msg
             )
     
+    async def _publish(self, event_update: EventUpdate) -> int:
+        """
+        Send a status or result update, through the coalescer when enabled.
+        
+        Returns:
+            Number of clients reached now; 0 when the update was queued for a
+            batch, whose frames are counted in the coalescing statistics
+        """
+        if self.coalescer is None:
+            return await self.websocket_manager.broadcast_event(event_update)
+        
+        await self.coalescer.add(event_update)
+        return 0
+    
+    async def close(self) -> None:
+        """Flush any coalesced updates."""
+        if self.coalescer is not None:
+            await self.coalescer.close()
+    
     def _determine_result_type(self, result: ProcessingResult) -> ResultType:
         """Determine result type from processing result."""
         if not result.success:
@@ -547,6 +777,7 @@ class ProcessingResultBroadcaster:
         # Add throttle information
         stats['active_throttle_rules'] = len(self.throttle_rules)
         stats['throttle_rules'] = list(self.throttle_rules.keys())
+        stats['coalescing'] = self.coalescer.get_statistics() if self.coalescer is not None else None
         
         # Remove raw broadcast times
         del stats['broadcast_times']
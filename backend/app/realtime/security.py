@@ -10,7 +10,7 @@ import re
 import time
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Set, Union
+from typing import Dict, List, Optional, Any, Union
 from datetime import datetime, timezone, timedelta
 from enum import Enum
 from pydantic import BaseModel, Field, validator
@@ -18,6 +18,7 @@ from fastapi import HTTPException, Request
 from ipaddress import ip_address, ip_network, AddressValueError
 
 from ..logging_config import get_logger
+from ..rate_limit import ExpiringMap, RateLimitBackend, SlidingWindowCounter, create_rate_limit_backend
 from .audit import get_audit_logger, AuditEventType, AuditSeverity
 
 logger = get_logger(__name__)
@@ -587,15 +588,19 @@ class RateLimiter:
     """
     Advanced rate limiting for API endpoints and WebSocket connections.
     
-    Provides multiple rate limiting strategies including token bucket,
-    sliding window, and adaptive rate limiting based on client behavior.
+    Provides multiple rate limiting strategies including sliding windows
+    and adaptive rate limiting based on client behavior. Per-client state
+    is bounded and expires when clients go idle.
     """
     
-    def __init__(self):
-        self.client_buckets: Dict[str, Dict[str, Any]] = {}
-        self.client_history: Dict[str, List[datetime]] = {}
-        self.blocked_clients: Dict[str, datetime] = {}
-        self.suspicious_clients: Set[str] = set()
+    def __init__(self, backend: Optional[RateLimitBackend] = None):
+        backend = backend or create_rate_limit_backend()
+        self.request_counts = SlidingWindowCounter(60, name="api_minute", backend=backend)
+        self.burst_counts = SlidingWindowCounter(10, name="api_burst", backend=backend)
+        self.recent_requests = SlidingWindowCounter(300, name="api_recent")
+        self.violation_counts = SlidingWindowCounter(600, name="api_violations")
+        self.blocked_clients: ExpiringMap[datetime] = ExpiringMap(ttl=1800)
+        self.suspicious_clients: ExpiringMap[bool] = ExpiringMap(ttl=3600)
         self.audit_logger = get_audit_logger()
         
         # Rate limiting configuration
@@ -614,6 +619,10 @@ class RateLimiter:
             'config_changes_per_hour': 5
         }
     
+    def _limits_for(self, client_id: str) -> Dict[str, int]:
+        """Get limits based on client status."""
+        return self.suspicious_limits if self.suspicious_clients.get(client_id) else self.default_limits
+    
     def check_rate_limit(self, client_id: str, endpoint: str, request: Optional[Request] = None) -> bool:
         """
         Check if client is within rate limits.
@@ -627,67 +636,26 @@ class RateLimiter:
             True if within limits, False if rate limited
         """
         try:
-            current_time = datetime.now(timezone.utc)
+            now = time.time()
             
             # Check if client is blocked
-            if client_id in self.blocked_clients:
-                if current_time < self.blocked_clients[client_id]:
-                    return False
-                else:
-                    # Unblock client
-                    del self.blocked_clients[client_id]
-            
-            # Get limits based on client status
-            limits = self.suspicious_limits if client_id in self.suspicious_clients else self.default_limits
-            
-            # Initialize client bucket if not exists
-            if client_id not in self.client_buckets:
-                self.client_buckets[client_id] = {
-                    'tokens': limits['requests_per_minute'],
-                    'last_refill': current_time,
-                    'request_count': 0,
-                    'window_start': current_time
-                }
-            
-            bucket = self.client_buckets[client_id]
-            
-            # Refill tokens (token bucket algorithm)
-            time_passed = (current_time - bucket['last_refill']).total_seconds()
-            tokens_to_add = time_passed * (limits['requests_per_minute'] / 60.0)
-            bucket['tokens'] = min(limits['requests_per_minute'], bucket['tokens'] + tokens_to_add)
-            bucket['last_refill'] = current_time
-            
-            # Check if tokens available
-            if bucket['tokens'] < 1:
-                self._handle_rate_limit_violation(client_id, endpoint, "Token bucket exhausted")
+            if self.blocked_clients.get(client_id, now) is not None:
                 return False
             
-            # Check burst limit (sliding window)
-            window_duration = timedelta(seconds=10)
-            if current_time - bucket['window_start'] > window_duration:
-                bucket['request_count'] = 0
-                bucket['window_start'] = current_time
+            limits = self._limits_for(client_id)
             
-            if bucket['request_count'] >= limits['burst_limit']:
+            # Check burst limit (sliding 10 second window)
+            if not self.burst_counts.hit(client_id, limits['burst_limit'], now):
                 self._handle_rate_limit_violation(client_id, endpoint, "Burst limit exceeded")
                 return False
             
-            # Consume token and increment request count
-            bucket['tokens'] -= 1
-            bucket['request_count'] += 1
-            
-            # Track request history
-            if client_id not in self.client_history:
-                self.client_history[client_id] = []
+            # Check per-minute limit (sliding minute window)
+            if not self.request_counts.hit(client_id, limits['requests_per_minute'], now):
+                self._handle_rate_limit_violation(client_id, endpoint, "Rate limit exceeded")
+                return False
             
-            self.client_history[client_id].append(current_time)
-            
-            # Clean old history (keep last hour)
-            cutoff_time = current_time - timedelta(hours=1)
-            self.client_history[client_id] = [
-                req_time for req_time in self.client_history[client_id] 
-                if req_time > cutoff_time
-            ]
+            # Track request volume for behavior checks
+            self.recent_requests.add(client_id, now)
             
             # Check for suspicious behavior
             self._check_suspicious_behavior(client_id, endpoint, request)
@@ -711,7 +679,7 @@ class RateLimiter:
         try:
             # This would need to be integrated with WebSocket manager
             # to track active connections per IP
-            limits = self.suspicious_limits if client_ip in self.suspicious_clients else self.default_limits
+            limits = self._limits_for(client_ip)
             
             # For now, return True - would need WebSocket manager integration
             return True
@@ -735,23 +703,17 @@ class RateLimiter:
                 }
             )
             
-            # Mark client as suspicious after multiple violations
-            if client_id not in self.client_history:
-                self.client_history[client_id] = []
-            
-            recent_violations = len([
-                req_time for req_time in self.client_history[client_id]
-                if req_time > datetime.now(timezone.utc) - timedelta(minutes=10)
-            ])
+            # Mark client as suspicious after multiple violations in 10 minutes
+            recent_violations = int(self.violation_counts.add(client_id))
             
             if recent_violations > 5:
-                self.suspicious_clients.add(client_id)
+                self.suspicious_clients.set(client_id, True)
                 logger.warning(f"Client marked as suspicious: {client_id}")
             
             # Block client after excessive violations
             if recent_violations > 20:
                 block_until = datetime.now(timezone.utc) + timedelta(minutes=30)
-                self.blocked_clients[client_id] = block_until
+                self.blocked_clients.set(client_id, block_until)
                 
                 self.audit_logger.log_security_event(
                     AuditEventType.SUSPICIOUS_ACTIVITY,
@@ -772,25 +734,17 @@ class RateLimiter:
     def _check_suspicious_behavior(self, client_id: str, endpoint: str, request: Optional[Request]) -> None:
         """Check for suspicious client behavior patterns."""
         try:
-            if client_id not in self.client_history:
-                return
-            
-            current_time = datetime.now(timezone.utc)
-            recent_requests = [
-                req_time for req_time in self.client_history[client_id]
-                if req_time > current_time - timedelta(minutes=5)
-            ]
-            
-            # Check for rapid-fire requests
-            if len(recent_requests) > 50:
-                self.suspicious_clients.add(client_id)
+            # Check for rapid-fire requests in the last 5 minutes
+            recent_requests = int(self.recent_requests.count(client_id))
+            if recent_requests > 50 and not self.suspicious_clients.get(client_id):
+                self.suspicious_clients.set(client_id, True)
                 self.audit_logger.log_security_event(
                     AuditEventType.SUSPICIOUS_ACTIVITY,
                     f"Rapid-fire requests detected from client: {client_id}",
                     AuditSeverity.MEDIUM,
                     metadata={
                         'client_id': client_id,
-                        'request_count': len(recent_requests),
+                        'request_count': recent_requests,
                         'endpoint': endpoint
                     }
                 )
@@ -802,7 +756,7 @@ class RateLimiter:
                 # Check for bot-like user agents
                 bot_patterns = ['bot', 'crawler', 'spider', 'scraper', 'curl', 'wget']
                 if any(pattern in user_agent.lower() for pattern in bot_patterns):
-                    self.suspicious_clients.add(client_id)
+                    self.suspicious_clients.set(client_id, True)
                     logger.info(f"Bot-like user agent detected: {client_id} - {user_agent}")
             
         except Exception as e:
@@ -811,33 +765,18 @@ class RateLimiter:
     def get_client_status(self, client_id: str) -> Dict[str, Any]:
         """Get status information for a client."""
         try:
-            current_time = datetime.now(timezone.utc)
+            limits = self._limits_for(client_id)
+            block_until = self.blocked_clients.get(client_id)
             
-            status = {
+            return {
                 'client_id': client_id,
-                'is_suspicious': client_id in self.suspicious_clients,
-                'is_blocked': client_id in self.blocked_clients,
-                'block_expires': None,
-                'tokens_remaining': 0,
-                'recent_requests': 0
+                'is_suspicious': bool(self.suspicious_clients.get(client_id)),
+                'is_blocked': block_until is not None,
+                'block_expires': block_until.isoformat() if block_until else None,
+                'tokens_remaining': max(0, int(limits['requests_per_minute'] - self.request_counts.count(client_id))),
+                'recent_requests': int(self.recent_requests.count(client_id))
             }
             
-            if client_id in self.blocked_clients:
-                status['block_expires'] = self.blocked_clients[client_id].isoformat()
-            
-            if client_id in self.client_buckets:
-                bucket = self.client_buckets[client_id]
-                status['tokens_remaining'] = int(bucket['tokens'])
-            
-            if client_id in self.client_history:
-                recent_requests = [
-                    req_time for req_time in self.client_history[client_id]
-                    if req_time > current_time - timedelta(minutes=5)
-                ]
-                status['recent_requests'] = len(recent_requests)
-            
-            return status
-            
         except Exception as e:
             logger.error(f"Error getting client status: {e}")
             return {'error': str(e)}
@@ -845,21 +784,25 @@ class RateLimiter:
     def clear_client_history(self, client_id: str) -> None:
         """Clear history for a client (admin function)."""
         try:
-            if client_id in self.client_buckets:
-                del self.client_buckets[client_id]
-            
-            if client_id in self.client_history:
-                del self.client_history[client_id]
-            
-            if client_id in self.blocked_clients:
-                del self.blocked_clients[client_id]
+            for counter in (self.request_counts, self.burst_counts, self.recent_requests, self.violation_counts):
+                counter.reset(client_id)
             
-            self.suspicious_clients.discard(client_id)
+            self.blocked_clients.pop(client_id)
+            self.suspicious_clients.pop(client_id)
             
             logger.info(f"Cleared rate limit history for client: {client_id}")
             
         except Exception as e:
             logger.error(f"Error clearing client history: {e}")
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get rate limiter statistics."""
+        return {
+            'minute': self.request_counts.get_statistics(),
+            'burst': self.burst_counts.get_statistics(),
+            'blocked_clients': self.blocked_clients.size,
+            'suspicious_clients': self.suspicious_clients.size
+        }
 
 
 # Global instances
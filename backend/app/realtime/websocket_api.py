@@ -30,6 +30,7 @@ class MessageType(str, Enum):
     CLEAR_FILTER = "clear_filter"
     PING = "ping"
     GET_STATUS = "get_status"
+    REPLAY = "replay"
     
     # Server to client messages
     CONNECTION_ESTABLISHED = "connection_established"
@@ -135,6 +136,9 @@ class WebSocketAPI:
         self.event_broadcaster = event_broadcaster
         self.active_connections: Dict[str, WebSocket] = {}
         
+        # last_seq of reconnecting clients, replayed once they resubscribe
+        self._pending_replays: Dict[str, int] = {}
+        
         # Message handlers
         self.message_handlers = {
             MessageType.SUBSCRIBE: self._handle_subscribe,
@@ -142,11 +146,12 @@ class WebSocketAPI:
             MessageType.SET_FILTER: self._handle_set_filter,
             MessageType.CLEAR_FILTER: self._handle_clear_filter,
             MessageType.PING: self._handle_ping,
-            MessageType.GET_STATUS: self._handle_get_status
+            MessageType.GET_STATUS: self._handle_get_status,
+            MessageType.REPLAY: self._handle_replay
         }
     
     async def handle_websocket_connection(self, websocket: WebSocket, client_id: Optional[str] = None,
-                                        token: Optional[str] = None) -> None:
+                                        token: Optional[str] = None, last_seq: Optional[int] = None) -> None:
         """
         Handle WebSocket connection lifecycle with authentication.
         
@@ -154,6 +159,9 @@ class WebSocketAPI:
             websocket: WebSocket connection
             client_id: Optional client identifier
             token: Optional authentication token
+            last_seq: Last event sequence number a reconnecting client received.
+                Missed events are replayed after the client's first subscribe
+                message, so they are filtered by its restored subscriptions.
         """
         actual_client_id = None
         
@@ -164,6 +172,10 @@ class WebSocketAPI:
             
             logger.info(f"WebSocket client connected: {actual_client_id}")
             
+            # Catch up on missed events once subscriptions are restored
+            if last_seq is not None:
+                self._pending_replays[actual_client_id] = last_seq
+            
             # Handle messages
             await self._message_loop(websocket, actual_client_id)
             
@@ -181,6 +193,7 @@ class WebSocketAPI:
                 await self.websocket_manager.disconnect(actual_client_id, "Connection closed")
                 if actual_client_id in self.active_connections:
                     del self.active_connections[actual_client_id]
+                self._pending_replays.pop(actual_client_id, None)
     
     async def _message_loop(self, websocket: WebSocket, client_id: str) -> None:
         """
@@ -265,6 +278,10 @@ class WebSocketAPI:
             
             logger.debug(f"Client {client_id} subscribed to: {request.event_types}")
             
+            last_seq = self._pending_replays.pop(client_id, None)
+            if last_seq is not None:
+                await self.event_broadcaster.replay_events(client_id, last_seq)
+            
         except ValidationError as e:
             await self._send_error(websocket, f"Invalid subscription request: {e}")
         except Exception as e:
@@ -376,6 +393,19 @@ class WebSocketAPI:
         except Exception as e:
             await self._send_error(websocket, f"Status request failed: {e}")
     
+    async def _handle_replay(self, websocket: WebSocket, client_id: str, message: WebSocketMessage) -> None:
+        """Handle replay request."""
+        try:
+            last_seq = int(message.data["last_seq"])
+        except (KeyError, TypeError, ValueError):
+            await self._send_error(websocket, "Replay request requires an integer last_seq")
+            return
+        
+        try:
+            await self.event_broadcaster.replay_events(client_id, last_seq)
+        except Exception as e:
+            await self._send_error(websocket, f"Replay failed: {e}")
+    
     async def _send_response(self, websocket: WebSocket, message_type: str, data: Dict[str, Any]) -> None:
         """
         Send response message to client.
@@ -8,6 +8,8 @@ and real-time communication with frontend clients with authentication support.
 import asyncio
 import json
 import logging
+import os
+from collections import deque
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any, Set
 from uuid import uuid4
@@ -19,8 +21,56 @@ from .exceptions import WebSocketError, AuthenticationError, AuthorizationError
 from .auth import get_auth_manager, WebSocketAuthInfo, SessionInfo
 from .audit import get_audit_logger, AuditEventType
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Per-client send queue settings
+WEBSOCKET_SEND_QUEUE_SIZE = int(os.getenv("WEBSOCKET_SEND_QUEUE_SIZE", "256"))
+WEBSOCKET_SLOW_CLIENT_POLICY = os.getenv("WEBSOCKET_SLOW_CLIENT_POLICY", "drop_oldest")
+WEBSOCKET_SEND_TIMEOUT = float(os.getenv("WEBSOCKET_SEND_TIMEOUT", "10.0"))
+
+SLOW_CLIENT_POLICIES = ("drop_oldest", "disconnect")
+
+
+def encode_message(message: Dict[str, Any]) -> str:
+    """
+    Serialize a message to a JSON text frame.
+    
+    Uses orjson when it is installed and falls back to the standard library
+    for anything orjson rejects. Both paths render unknown types with str().
+    
+    Args:
+        message: Message to serialize
+        
+    Returns:
+        JSON text frame
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                message,
+                default=str,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+            ).decode()
+        except TypeError:
+            pass
+    return json.dumps(message, default=str)
+
+
+def event_message(event: "EventUpdate") -> Dict[str, Any]:
+    """Build the wire message for an event update."""
+    return {
+        "type": event.event_type,
+        "data": event.data,
+        "timestamp": event.timestamp.isoformat(),
+        "priority": event.priority
+    }
+
+
 
 class EventUpdate(BaseModel):
     """Model for WebSocket event updates."""
@@ -55,6 +105,62 @@ class ClientConnection(BaseModel):
         }
 
 
+class ClientSendQueue:
+    """
+    Bounded queue of pre-encoded frames for a single client.
+    
+    Frames are drained by a dedicated writer task so a slow client only
+    delays its own messages. When the queue is full the oldest frame is
+    evicted.
+    """
+    
+    def __init__(self, max_size: int = WEBSOCKET_SEND_QUEUE_SIZE):
+        self.max_size = max(1, max_size)
+        self.frames: deque = deque()
+        self.dropped = 0
+        self.writer_task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+    
+    def __len__(self) -> int:
+        return len(self.frames)
+    
+    def is_full(self) -> bool:
+        """Check whether the next put would evict a frame."""
+        return len(self.frames) >= self.max_size
+    
+    def put(self, frame: str) -> bool:
+        """
+        Append a frame, evicting the oldest one when the queue is full.
+        
+        Returns:
+            False if a frame had to be dropped, True otherwise
+        """
+        dropped = False
+        if self.is_full():
+            self.frames.popleft()
+            self.dropped += 1
+            dropped = True
+        
+        self.frames.append(frame)
+        self._ready.set()
+        return not dropped
+    
+    async def get(self) -> str:
+        """Wait for and remove the oldest frame."""
+        while not self.frames:
+            self._ready.clear()
+            await self._ready.wait()
+        return self.frames.popleft()
+    
+    async def close(self) -> None:
+        """Discard pending frames and stop the writer task."""
+        self.frames.clear()
+        task = self.writer_task
+        if task and not task.done() and task is not asyncio.current_task():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
 class WebSocketManager(RealtimeComponent, HealthMonitorMixin):
     """
     Manages WebSocket connections and handles real-time communication.
@@ -63,11 +169,25 @@ class WebSocketManager(RealtimeComponent, HealthMonitorMixin):
     and client subscription handling.
     """
     
-    def __init__(self, max_connections: int = 100, require_auth: bool = True):
-        super().__init__("WebSocketManager")
+    def __init__(self, max_connections: int = 100, require_auth: bool = True,
+                 send_queue_size: int = WEBSOCKET_SEND_QUEUE_SIZE,
+                 slow_client_policy: str = WEBSOCKET_SLOW_CLIENT_POLICY):
+        RealtimeComponent.__init__(self, "WebSocketManager")
+        HealthMonitorMixin.__init__(self)
+        if slow_client_policy not in SLOW_CLIENT_POLICIES:
+            raise ValueError(f"Unknown slow client policy: {slow_client_policy}")
+        
         self.max_connections = max_connections
         self.require_auth = require_auth
+        self.send_queue_size = send_queue_size
+        self.slow_client_policy = slow_client_policy
         self.connections: Dict[str, ClientConnection] = {}
+        self.send_queues: Dict[str, ClientSendQueue] = {}
+        
+        # Routing index: event type -> subscribed clients, plus clients without subscriptions
+        self._type_routes: Dict[str, Set[str]] = {}
+        self._all_event_clients: Set[str] = set()
+        self._routed_types: Dict[str, frozenset] = {}
         self.message_queue: asyncio.Queue = asyncio.Queue()
         self.broadcast_task: Optional[asyncio.Task] = None
         self.ping_task: Optional[asyncio.Task] = None
@@ -80,6 +200,8 @@ class WebSocketManager(RealtimeComponent, HealthMonitorMixin):
             "messages_sent": 0,
             "messages_failed": 0,
             "broadcasts_sent": 0,
+            "messages_dropped": 0,
+            "slow_client_disconnects": 0,
             "auth_failures": 0
         }
     
@@ -191,6 +313,12 @@ class WebSocketManager(RealtimeComponent, HealthMonitorMixin):
             )
             
             self.connections[client_id] = connection
+            send_queue = ClientSendQueue(self.send_queue_size)
+            send_queue.writer_task = asyncio.create_task(
+                self._client_writer(client_id, websocket, send_queue)
+            )
+            self.send_queues[client_id] = send_queue
+            self._update_routing(client_id)
             self.stats["total_connections"] += 1
             self.stats["active_connections"] = len(self.connections)
             
@@ -255,14 +383,21 @@ class WebSocketManager(RealtimeComponent, HealthMonitorMixin):
                 self.auth_manager.remove_websocket_auth(client_id)
                 self.stats["authenticated_connections"] = max(0, self.stats["authenticated_connections"] - 1)
             
+            # Stop the writer before closing the socket underneath it
+            send_queue = self.send_queues.pop(client_id, None)
+            if send_queue is not None:
+                await send_queue.close()
+            
             # Close WebSocket connection
             try:
-                await connection.websocket.close()
+                async with asyncio.timeout(WEBSOCKET_SEND_TIMEOUT):
+                    await connection.websocket.close()
             except Exception as e:
                 logger.warning(f"Error closing WebSocket for {client_id}: {e}")
             
             # Remove from connections
             del self.connections[client_id]
+            self._update_routing(client_id)
             self.stats["active_connections"] = len(self.connections)
             
             logger.info(f"WebSocket client disconnected: {client_id} ({reason})")
@@ -289,6 +424,7 @@ class WebSocketManager(RealtimeComponent, HealthMonitorMixin):
         try:
             connection = self.connections[client_id]
             connection.subscriptions.update(event_types)
+            self._update_routing(client_id)
             
             # Send subscription confirmation
             await self._send_to_client(client_id, {
@@ -322,6 +458,7 @@ class WebSocketManager(RealtimeComponent, HealthMonitorMixin):
         try:
             connection = self.connections[client_id]
             connection.subscriptions.difference_update(event_types)
+            self._update_routing(client_id)
             
             # Send subscription confirmation
             await self._send_to_client(client_id, {
@@ -337,6 +474,49 @@ class WebSocketManager(RealtimeComponent, HealthMonitorMixin):
             self._handle_error(e, f"unsubscribing client {client_id}")
             return False
     
+    def _update_routing(self, client_id: str) -> None:
+        """
+        Sync a client's entries in the event type routing index.
+        
+        Args:
+            client_id: Client whose subscriptions changed or who connected/disconnected
+        """
+        previous = self._routed_types.pop(client_id, None)
+        if previous is not None:
+            if not previous:
+                self._all_event_clients.discard(client_id)
+            for event_type in previous:
+                clients = self._type_routes.get(event_type)
+                if clients is not None:
+                    clients.discard(client_id)
+                    if not clients:
+                        del self._type_routes[event_type]
+        
+        connection = self.connections.get(client_id)
+        if connection is None:
+            return
+        
+        event_types = frozenset(connection.subscriptions)
+        self._routed_types[client_id] = event_types
+        if not event_types:
+            self._all_event_clients.add(client_id)
+        for event_type in event_types:
+            self._type_routes.setdefault(event_type, set()).add(client_id)
+    
+    def get_subscribed_clients(self, event_type: str) -> Set[str]:
+        """
+        Get clients that receive an event type.
+        
+        Clients without subscriptions receive every event type.
+        
+        Args:
+            event_type: Event type
+            
+        Returns:
+            Set of client IDs
+        """
+        return self._all_event_clients | self._type_routes.get(event_type, set())
+    
     async def send_to_client(self, client_id: str, message: Dict[str, Any]) -> bool:
         """
         Send a message to a specific client.
@@ -369,6 +549,19 @@ class WebSocketManager(RealtimeComponent, HealthMonitorMixin):
             self._handle_error(e, "broadcasting event")
             return 0
     
+    async def send_frame(self, client_id: str, frame: str) -> bool:
+        """
+        Queue a pre-encoded frame for a specific client.
+        
+        Args:
+            client_id: Target client identifier
+            frame: JSON text frame produced by encode_message
+            
+        Returns:
+            True if the frame was queued, False otherwise
+        """
+        return await self._enqueue_frame(client_id, frame)
+    
     async def _send_to_client(self, client_id: str, message: Dict[str, Any]) -> bool:
         """
         Internal method to send message to a specific client.
@@ -378,30 +571,76 @@ class WebSocketManager(RealtimeComponent, HealthMonitorMixin):
             message: Message to send
             
         Returns:
-            True if message sent successfully, False otherwise
+            True if message was queued for delivery, False otherwise
         """
         if client_id not in self.connections:
             logger.warning(f"Attempted to send message to unknown client: {client_id}")
             return False
         
-        try:
-            connection = self.connections[client_id]
-            message_json = json.dumps(message, default=str)
-            
-            await connection.websocket.send_text(message_json)
-            self.stats["messages_sent"] += 1
-            
-            return True
+        return await self._enqueue_frame(client_id, encode_message(message))
+    
+    async def _enqueue_frame(self, client_id: str, frame: str) -> bool:
+        """
+        Push a frame onto a client's send queue, applying the slow client policy.
+        
+        Args:
+            client_id: Target client identifier
+            frame: Encoded frame
             
+        Returns:
+            True if the frame was queued, False otherwise
+        """
+        send_queue = self.send_queues.get(client_id)
+        if send_queue is None:
+            logger.warning(f"Attempted to send message to unknown client: {client_id}")
+            return False
+        
+        if send_queue.is_full() and self.slow_client_policy == "disconnect":
+            self.stats["messages_failed"] += 1
+            self.stats["slow_client_disconnects"] += 1
+            logger.warning(f"Client {client_id} send queue full ({len(send_queue)} frames), disconnecting")
+            await self.disconnect(client_id, "Send queue overflow")
+            return False
+        
+        if not send_queue.put(frame):
+            self.stats["messages_dropped"] += 1
+        return True
+    
+    async def _client_writer(self, client_id: str, websocket: WebSocket, send_queue: ClientSendQueue) -> None:
+        """
+        Background writer draining one client's send queue.
+        
+        Args:
+            client_id: Client identifier
+            websocket: Client WebSocket connection
+            send_queue: Queue owned by this writer
+        """
+        reason = None
+        try:
+            while True:
+                frame = await send_queue.get()
+                async with asyncio.timeout(WEBSOCKET_SEND_TIMEOUT):
+                    await websocket.send_text(frame)
+                self.stats["messages_sent"] += 1
+                
+        except asyncio.CancelledError:
+            raise
         except WebSocketDisconnect:
             logger.info(f"Client {client_id} disconnected during message send")
-            await self.disconnect(client_id, "WebSocket disconnected")
-            return False
+            reason = "WebSocket disconnected"
+        except asyncio.TimeoutError:
+            self.stats["messages_failed"] += 1
+            self.stats["slow_client_disconnects"] += 1
+            logger.warning(f"Send to client {client_id} timed out after {WEBSOCKET_SEND_TIMEOUT}s")
+            reason = "Send timed out"
         except Exception as e:
             self.stats["messages_failed"] += 1
             self._handle_error(e, f"sending message to client {client_id}")
-            await self.disconnect(client_id, f"Send error: {e}")
-            return False
+            reason = f"Send error: {e}"
+        
+        # Only tear down the connection this writer belongs to
+        if reason and self.send_queues.get(client_id) is send_queue:
+            await self.disconnect(client_id, reason)
     
     async def _broadcast_worker(self) -> None:
         """Background worker for processing broadcast messages."""
@@ -437,6 +676,9 @@ class WebSocketManager(RealtimeComponent, HealthMonitorMixin):
         """
         Process a broadcast event and send to subscribed clients.
         
+        The event is encoded once and the same frame is queued for every
+        target client.
+        
         Args:
             event: Event to process and broadcast
         """
@@ -446,31 +688,18 @@ class WebSocketManager(RealtimeComponent, HealthMonitorMixin):
             
             # If event has specific client_id, send only to that client
             if event.client_id:
-                success = await self._send_to_client(event.client_id, {
-                    "type": event.event_type,
-                    "data": event.data,
-                    "timestamp": event.timestamp.isoformat(),
-                    "priority": event.priority
-                })
-                if success:
-                    sent_count = 1
-                else:
-                    failed_count = 1
+                target_clients = [event.client_id]
             else:
                 # Broadcast to all subscribed clients
-                for client_id, connection in list(self.connections.items()):
-                    # Check if client is subscribed to this event type
-                    if not connection.subscriptions or event.event_type in connection.subscriptions:
-                        success = await self._send_to_client(client_id, {
-                            "type": event.event_type,
-                            "data": event.data,
-                            "timestamp": event.timestamp.isoformat(),
-                            "priority": event.priority
-                        })
-                        if success:
-                            sent_count += 1
-                        else:
-                            failed_count += 1
+                target_clients = list(self.get_subscribed_clients(event.event_type))
+            
+            if target_clients:
+                frame = encode_message(event_message(event))
+                for client_id in target_clients:
+                    if await self._enqueue_frame(client_id, frame):
+                        sent_count += 1
+                    else:
+                        failed_count += 1
             
             self.stats["broadcasts_sent"] += 1
             
@@ -500,8 +729,9 @@ class WebSocketManager(RealtimeComponent, HealthMonitorMixin):
                         "timestamp": datetime.now(timezone.utc).isoformat()
                     }
                     
+                    ping_frame = encode_message(ping_message)
                     for client_id in list(self.connections.keys()):
-                        await self._send_to_client(client_id, ping_message)
+                        await self._enqueue_frame(client_id, ping_frame)
                     
                     logger.debug(f"Sent ping to {len(self.connections)} clients")
                     
@@ -539,7 +769,8 @@ class WebSocketManager(RealtimeComponent, HealthMonitorMixin):
                 "connected_at": connection.connected_at.isoformat(),
                 "subscriptions": list(connection.subscriptions),
                 "user_agent": connection.user_agent,
-                "last_ping": connection.last_ping.isoformat() if connection.last_ping else None
+                "last_ping": connection.last_ping.isoformat() if connection.last_ping else None,
+                "send_queue_size": len(self.send_queues[client_id]) if client_id in self.send_queues else 0
             })
         return clients
     
@@ -553,7 +784,10 @@ class WebSocketManager(RealtimeComponent, HealthMonitorMixin):
         return {
             **self.stats,
             "max_connections": self.max_connections,
-            "queue_size": self.message_queue.qsize()
+            "queue_size": self.message_queue.qsize(),
+            "send_queue_frames": sum(len(q) for q in self.send_queues.values()),
+            "slow_client_policy": self.slow_client_policy,
+            "json_encoder": "orjson" if orjson is not None else "json"
         }
     
     def get_health_status(self) -> Dict[str, Any]:
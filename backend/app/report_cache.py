@@ -0,0 +1,304 @@
+"""
+Daily report cache for ThreatLens.
+
+Generated PDFs in the reports directory are reused as long as the data for
+their date has not changed. Each PDF gets a small metadata sidecar recording
+the data version it was rendered from (event/analysis counts and the latest
+parsed_at / analyzed_at for the day).
+"""
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.database import get_read_session
+from app.models import Event, AIAnalysis
+from app.report_generator import ReportGenerator, generate_daily_report_file
+
+logger = logging.getLogger(__name__)
+
+# Bump when report layout changes so cached files are re-rendered
+REPORT_FORMAT_VERSION = 1
+REPORT_BACKFILL_MAX_WORKERS = int(os.getenv("REPORT_BACKFILL_MAX_WORKERS", str(min(4, os.cpu_count() or 1))))
+REPORT_BACKFILL_MAX_DAYS = int(os.getenv("REPORT_BACKFILL_MAX_DAYS", "366"))
+
+
+@dataclass
+class CachedReport:
+    """Result of a cached report lookup or generation."""
+    report_date: date
+    file_path: str
+    data_version: Optional[str]
+    cache_hit: bool
+    
+    @property
+    def file_size(self) -> int:
+        return Path(self.file_path).stat().st_size
+
+
+def get_report_data_version(db: Session, report_date: date) -> str:
+    """
+    Get a version string for the report data of a date.
+    
+    Changes whenever events or AI analyses for the day are added, re-parsed,
+    re-analyzed or deleted.
+    """
+    day_filter = ReportGenerator._day_filter(report_date)
+    
+    event_count, max_parsed_at = db.query(
+        func.count(Event.id), func.max(Event.parsed_at)
+    ).filter(day_filter).one()
+    
+    analysis_count, max_analyzed_at = db.query(
+        func.count(AIAnalysis.id), func.max(AIAnalysis.analyzed_at)
+    ).join(Event, AIAnalysis.event_id == Event.id).filter(day_filter).one()
+    
+    return f"v{REPORT_FORMAT_VERSION}:{event_count}:{max_parsed_at}:{analysis_count}:{max_analyzed_at}"
+
+
+def _render_report(report_date_iso: str, output_path: str) -> str:
+    """Process pool worker: render one daily report to a file."""
+    return generate_daily_report_file(date.fromisoformat(report_date_iso), output_path)
+
+
+class ReportCache:
+    """Cache of rendered daily reports keyed by date and data version."""
+    
+    def __init__(self, reports_dir: str = "data/reports"):
+        """
+        Initialize the report cache.
+        
+        Args:
+            reports_dir: Directory holding generated reports
+        """
+        self.reports_dir = Path(reports_dir)
+        self.reports_dir.mkdir(parents=True, exist_ok=True)
+        
+    def report_path(self, report_date: date) -> Path:
+        """Get the PDF path for a report date."""
+        return self.reports_dir / f"security_report_{report_date.strftime('%Y%m%d')}.pdf"
+        
+    def _metadata_path(self, report_date: date) -> Path:
+        return self.reports_dir / f"security_report_{report_date.strftime('%Y%m%d')}.meta.json"
+        
+    def get_data_version(self, report_date: date) -> Optional[str]:
+        """Get the current data version for a date, or None if it cannot be read."""
+        try:
+            with get_read_session() as db:
+                return get_report_data_version(db, report_date)
+        except Exception as e:
+            logger.warning(f"Could not determine report data version for {report_date}: {e}")
+            return None
+            
+    def lookup(self, report_date: date, data_version: Optional[str]) -> Optional[str]:
+        """
+        Get the cached report path if it was rendered from the given data version.
+        
+        Returns:
+            Path of the cached PDF, or None on a cache miss
+        """
+        if data_version is None:
+            return None
+            
+        report_path = self.report_path(report_date)
+        try:
+            metadata = json.loads(self._metadata_path(report_date).read_text())
+        except (OSError, ValueError):
+            return None
+            
+        if metadata.get("data_version") != data_version or not report_path.exists():
+            return None
+            
+        return str(report_path)
+        
+    def store(self, report_date: date, data_version: Optional[str]) -> None:
+        """Record the data version a freshly rendered report was built from."""
+        metadata_path = self._metadata_path(report_date)
+        
+        if data_version is None:
+            # Unknown version: make sure a stale entry cannot produce a hit
+            self.invalidate(report_date, remove_report=False)
+            return
+            
+        tmp_path = self._new_tmp_path(metadata_path)
+        tmp_path.write_text(json.dumps({
+            "report_date": report_date.isoformat(),
+            "data_version": data_version
+        }))
+        os.replace(tmp_path, metadata_path)
+        
+    def invalidate(self, report_date: date, remove_report: bool = True) -> None:
+        """Drop the cache entry (and optionally the PDF) for a date."""
+        paths = [self._metadata_path(report_date)]
+        if remove_report:
+            paths.append(self.report_path(report_date))
+            
+        for path in paths:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+                
+    def get_or_generate(self, report_date: date) -> CachedReport:
+        """
+        Return the cached report for a date, rendering it only if the data changed.
+        
+        Args:
+            report_date: Date of the report
+            
+        Returns:
+            CachedReport describing the file and whether it came from the cache
+        """
+        data_version = self.get_data_version(report_date)
+        
+        cached_path = self.lookup(report_date, data_version)
+        if cached_path:
+            logger.info(f"Report cache hit for {report_date}")
+            return CachedReport(report_date, cached_path, data_version, cache_hit=True)
+            
+        tmp_path = self._new_tmp_path(self.report_path(report_date))
+        try:
+            generate_daily_report_file(report_date, str(tmp_path))
+        except Exception:
+            self._discard_tmp_report(tmp_path)
+            raise
+            
+        report_path = self._commit_render(report_date, data_version, tmp_path)
+        return CachedReport(report_date, report_path, data_version, cache_hit=False)
+        
+    def backfill(self, start_date: date, end_date: date,
+                 max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Render reports for a date range in parallel, skipping days whose cached report is current.
+        
+        Args:
+            start_date: First date to render (inclusive)
+            end_date: Last date to render (inclusive)
+            max_workers: Worker processes to use (1 renders in this process)
+            
+        Returns:
+            List of per-date results ordered by date
+        """
+        if end_date < start_date:
+            raise ValueError("end_date must not be before start_date")
+            
+        day_count = (end_date - start_date).days + 1
+        if day_count > REPORT_BACKFILL_MAX_DAYS:
+            raise ValueError(f"Backfill range too large: {day_count} days (maximum {REPORT_BACKFILL_MAX_DAYS})")
+            
+        max_workers = max_workers or REPORT_BACKFILL_MAX_WORKERS
+        results: Dict[date, Dict[str, Any]] = {}
+        pending: Dict[date, Optional[str]] = {}
+        
+        for offset in range(day_count):
+            report_date = start_date + timedelta(days=offset)
+            data_version = self.get_data_version(report_date)
+            cached_path = self.lookup(report_date, data_version)
+            
+            if cached_path:
+                results[report_date] = self._backfill_result(report_date, cached_path, cache_hit=True)
+            else:
+                pending[report_date] = data_version
+                
+        if pending and max_workers == 1:
+            for report_date, data_version in pending.items():
+                results[report_date] = self._render_pending(report_date, data_version)
+        elif pending:
+            # Spawned workers open their own database connections instead of
+            # inheriting this process's pools
+            with ProcessPoolExecutor(
+                max_workers=min(max_workers, len(pending)),
+                mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                futures = {}
+                for report_date in pending:
+                    tmp_path = self._new_tmp_path(self.report_path(report_date))
+                    future = executor.submit(_render_report, report_date.isoformat(), str(tmp_path))
+                    futures[future] = (report_date, tmp_path)
+                
+                for future in as_completed(futures):
+                    report_date, tmp_path = futures[future]
+                    results[report_date] = self._finish_render(report_date, pending[report_date], tmp_path, future)
+                    
+        return [results[report_date] for report_date in sorted(results)]
+        
+    def _new_tmp_path(self, target: Path) -> Path:
+        """Create an empty temp file next to target, unique to this render."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.reports_dir, prefix=f"{target.name}.", suffix=".tmp")
+        os.close(fd)
+        return Path(tmp_path)
+        
+    @staticmethod
+    def _discard_tmp_report(tmp_path: Path) -> None:
+        try:
+            tmp_path.unlink()
+        except FileNotFoundError:
+            pass
+            
+    def _commit_render(self, report_date: date, data_version: Optional[str], tmp_path: Path) -> str:
+        """Move a freshly rendered report into place and record its data version."""
+        report_path = self.report_path(report_date)
+        os.replace(tmp_path, report_path)
+        self.store(report_date, data_version)
+        return str(report_path)
+        
+    def _render_pending(self, report_date: date, data_version: Optional[str]) -> Dict[str, Any]:
+        """Render a single backfill date in this process."""
+        tmp_path = self._new_tmp_path(self.report_path(report_date))
+        try:
+            _render_report(report_date.isoformat(), str(tmp_path))
+        except Exception as e:
+            return self._backfill_failure(report_date, e, tmp_path)
+            
+        report_path = self._commit_render(report_date, data_version, tmp_path)
+        return self._backfill_result(report_date, report_path, cache_hit=False)
+        
+    def _finish_render(self, report_date: date, data_version: Optional[str], tmp_path: Path, future) -> Dict[str, Any]:
+        """Collect a backfill result from the process pool."""
+        try:
+            future.result()
+        except Exception as e:
+            return self._backfill_failure(report_date, e, tmp_path)
+            
+        report_path = self._commit_render(report_date, data_version, tmp_path)
+        return self._backfill_result(report_date, report_path, cache_hit=False)
+        
+    def _backfill_failure(self, report_date: date, error: Exception, tmp_path: Path) -> Dict[str, Any]:
+        logger.error(f"Report backfill failed for {report_date}: {error}")
+        self._discard_tmp_report(tmp_path)
+        return {
+            "success": False,
+            "report_date": report_date,
+            "error": str(error)
+        }
+        
+    @staticmethod
+    def _backfill_result(report_date: date, file_path: str, cache_hit: bool) -> Dict[str, Any]:
+        return {
+            "success": True,
+            "report_date": report_date,
+            "file_path": file_path,
+            "file_size": Path(file_path).stat().st_size,
+            "cache_hit": cache_hit
+        }
+
+
+# Global report cache for the default reports directory
+_report_cache: Optional[ReportCache] = None
+
+
+def get_report_cache() -> ReportCache:
+    """Get the global report cache instance."""
+    global _report_cache
+    if _report_cache is None:
+        _report_cache = ReportCache()
+    return _report_cache
@@ -2,31 +2,70 @@
 PDF report generation module for ThreatLens security analysis reports.
 """
 import io
+import os
+import ast
 import json
-from datetime import datetime, date, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+import functools
+import time as time_module
+from datetime import datetime, date, time, timedelta
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator
 from pathlib import Path
+from types import SimpleNamespace
 
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from matplotlib.figure import Figure
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, PageBreak
-from reportlab.platypus.flowables import HRFlowable
-from reportlab.graphics.shapes import Drawing
-from reportlab.graphics.charts.barcharts import VerticalBarChart
-from reportlab.graphics.charts.piecharts import Pie
-from reportlab.lib.colors import HexColor
+from sqlalchemy import and_, func
 from sqlalchemy.orm import Session
 
-from app.database import get_db_session
+from app.database import get_read_session
 from app.models import Event, AIAnalysis, Report
 from app.schemas import EventCategory, SeverityLevel
+from app.startup import startup_timer
+
+# Report size limits; summary sections are aggregated in SQL so only the
+# capped detail and recommendation sections are ever materialized
+REPORT_DETAIL_LIMIT = int(os.getenv("REPORT_DETAIL_LIMIT", "20"))
+REPORT_DETAIL_CHUNK_SIZE = int(os.getenv("REPORT_DETAIL_CHUNK_SIZE", "500"))
+REPORT_RECOMMENDATION_LIMIT = int(os.getenv("REPORT_RECOMMENDATION_LIMIT", "10"))
+REPORT_TOP_N = int(os.getenv("REPORT_TOP_N", "10"))
+REPORT_CHART_DPI = int(os.getenv("REPORT_CHART_DPI", "150"))
+HIGH_SEVERITY_THRESHOLD = 7
+
+@functools.lru_cache(maxsize=None)
+def _load_rendering_libraries() -> SimpleNamespace:
+    """
+    Import matplotlib and ReportLab on first use.
+    
+    Together they take most of a second to import, which the API process
+    should not pay until it renders a report. The imported names are
+    returned as one namespace, built once and shared by every generator.
+    """
+    started = time_module.perf_counter()
+    import matplotlib
+    matplotlib.use('Agg')  # Use non-interactive backend
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+    from reportlab.platypus.flowables import HRFlowable
+    startup_timer.record_lazy_import("matplotlib+reportlab", time_module.perf_counter() - started)
+    return SimpleNamespace(
+        FigureCanvasAgg=FigureCanvasAgg,
+        Figure=Figure,
+        colors=colors,
+        A4=A4,
+        getSampleStyleSheet=getSampleStyleSheet,
+        ParagraphStyle=ParagraphStyle,
+        inch=inch,
+        SimpleDocTemplate=SimpleDocTemplate,
+        Paragraph=Paragraph,
+        Spacer=Spacer,
+        Table=Table,
+        TableStyle=TableStyle,
+        Image=Image,
+        HRFlowable=HRFlowable,
+    )
 
 
 class ReportGenerator:
@@ -34,7 +73,8 @@ class ReportGenerator:
     
     def __init__(self):
         """Initialize the report generator with styles and configuration."""
-        self.styles = getSampleStyleSheet()
+        self.lib = _load_rendering_libraries()
+        self.styles = self.lib.getSampleStyleSheet()
         self._setup_custom_styles()
         self.severity_colors = {
             1: '#2E8B57',  # Sea Green
@@ -52,40 +92,40 @@ class ReportGenerator:
     def _setup_custom_styles(self):
         """Set up custom paragraph styles for the report."""
         # Title style
-        self.styles.add(ParagraphStyle(
+        self.styles.add(self.lib.ParagraphStyle(
             name='ReportTitle',
             parent=self.styles['Title'],
             fontSize=24,
             spaceAfter=30,
-            textColor=colors.darkblue,
+            textColor=self.lib.colors.darkblue,
             alignment=1  # Center alignment
         ))
         
         # Section header style
-        self.styles.add(ParagraphStyle(
+        self.styles.add(self.lib.ParagraphStyle(
             name='SectionHeader',
             parent=self.styles['Heading1'],
             fontSize=16,
             spaceBefore=20,
             spaceAfter=12,
-            textColor=colors.darkblue,
+            textColor=self.lib.colors.darkblue,
             borderWidth=1,
-            borderColor=colors.darkblue,
+            borderColor=self.lib.colors.darkblue,
             borderPadding=5
         ))
         
         # Subsection header style
-        self.styles.add(ParagraphStyle(
+        self.styles.add(self.lib.ParagraphStyle(
             name='SubsectionHeader',
             parent=self.styles['Heading2'],
             fontSize=14,
             spaceBefore=15,
             spaceAfter=8,
-            textColor=colors.darkslategray
+            textColor=self.lib.colors.darkslategray
         ))
         
         # Event detail style
-        self.styles.add(ParagraphStyle(
+        self.styles.add(self.lib.ParagraphStyle(
             name='EventDetail',
             parent=self.styles['Normal'],
             fontSize=10,
@@ -95,16 +135,16 @@ class ReportGenerator:
         ))
         
         # Summary style
-        self.styles.add(ParagraphStyle(
+        self.styles.add(self.lib.ParagraphStyle(
             name='Summary',
             parent=self.styles['Normal'],
             fontSize=12,
             spaceBefore=10,
             spaceAfter=10,
-            textColor=colors.darkslategray,
-            backColor=colors.lightgrey,
+            textColor=self.lib.colors.darkslategray,
+            backColor=self.lib.colors.lightgrey,
             borderWidth=1,
-            borderColor=colors.grey,
+            borderColor=self.lib.colors.grey,
             borderPadding=10
         ))
     
@@ -119,17 +159,33 @@ class ReportGenerator:
         Returns:
             Tuple of (file_path, pdf_bytes)
         """
+        file_path = self.generate_daily_report_file(report_date, output_path)
+        return file_path, Path(file_path).read_bytes()
+    
+    def generate_daily_report_file(self, report_date: date, output_path: Optional[str] = None) -> str:
+        """
+        Generate a daily security report straight to disk.
+        
+        Summary, severity and top-N sections come from SQL aggregates and the
+        event detail section is streamed in chunks up to REPORT_DETAIL_LIMIT,
+        so memory use does not grow with the number of events for the day.
+        
+        Args:
+            report_date: Date for which to generate the report
+            output_path: Optional custom output path for the PDF file
+            
+        Returns:
+            Path of the written PDF file
+        """
         # Set up output path
         if output_path is None:
             reports_dir = Path("data/reports")
             reports_dir.mkdir(parents=True, exist_ok=True)
             output_path = reports_dir / f"security_report_{report_date.strftime('%Y%m%d')}.pdf"
         
-        # Create PDF buffer
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(
-            buffer,
-            pagesize=A4,
+        doc = self.lib.SimpleDocTemplate(
+            str(output_path),
+            pagesize=self.lib.A4,
             rightMargin=72,
             leftMargin=72,
             topMargin=72,
@@ -139,56 +195,138 @@ class ReportGenerator:
         # Build report content
         story = []
         
-        # Get events for the specified date
-        with get_db_session() as db:
-            events_data = self._get_events_for_date(db, report_date)
-        
-        # Add title and header
-        story.extend(self._create_report_header(report_date, len(events_data)))
-        
-        # Add executive summary
-        story.extend(self._create_executive_summary(events_data))
-        
-        # Add severity distribution chart
-        if events_data:
-            chart_image = self._create_severity_chart(events_data)
+        with get_read_session() as db:
+            summary = self._get_report_summary(db, report_date)
+            
+            # Add title and header
+            story.extend(self._create_report_header(report_date, summary['total_events']))
+            
+            # Add executive summary
+            story.extend(self._create_executive_summary(summary))
+            
+            # Add severity distribution chart
+            chart_image = self._create_severity_chart(summary['severity_counts'])
             if chart_image:
-                story.append(Paragraph("Severity Distribution", self.styles['SectionHeader']))
+                story.append(self.lib.Paragraph("Severity Distribution", self.styles['SectionHeader']))
                 story.append(chart_image)
-                story.append(Spacer(1, 12))
+                story.append(self.lib.Spacer(1, 12))
+            
+            # Add top sources and categories
+            story.extend(self._create_top_n_section(summary))
+            
+            # Add event details
+            story.extend(self._create_event_details_section(
+                self._iter_top_events(db, report_date), summary['total_events']
+            ))
+            
+            # Add recommendations
+            story.extend(self._create_recommendations_section(
+                summary, self._get_top_recommendations(db, report_date)
+            ))
         
-        # Add event details
-        story.extend(self._create_event_details_section(events_data))
+        # Build PDF directly into the output file
+        doc.build(story)
         
-        # Add recommendations
-        story.extend(self._create_recommendations_section(events_data))
+        return str(output_path)
+    
+    @staticmethod
+    def _day_filter(report_date: date):
+        """Build the half-open timestamp range filter for a report date."""
+        start_datetime = datetime.combine(report_date, time.min)
+        end_datetime = start_datetime + timedelta(days=1)
+        return and_(Event.timestamp >= start_datetime, Event.timestamp < end_datetime)
+    
+    @staticmethod
+    def _parse_recommendations(raw: Optional[str]) -> List[str]:
+        """Decode stored recommendations (JSON, or the repr written by older ingest paths)."""
+        if not raw:
+            return []
+        try:
+            recommendations = json.loads(raw)
+        except ValueError:
+            try:
+                recommendations = ast.literal_eval(raw)
+            except (ValueError, SyntaxError):
+                return [raw]
+        if isinstance(recommendations, (list, tuple)):
+            return [str(rec) for rec in recommendations]
+        return [str(recommendations)]
+    
+    def _get_report_summary(self, db: Session, report_date: date) -> Dict[str, Any]:
+        """
+        Compute the report summary for a date using SQL aggregates.
         
-        # Build PDF
-        doc.build(story)
+        Returns:
+            Dictionary with total_events, events_with_analysis, avg_severity,
+            high_severity_count, severity_counts, category_counts and top_sources
+        """
+        day_filter = self._day_filter(report_date)
+        
+        total_events = db.query(func.count(Event.id)).filter(day_filter).scalar() or 0
         
-        # Get PDF bytes
-        pdf_bytes = buffer.getvalue()
-        buffer.close()
+        severity_counts = {
+            int(severity): count
+            for severity, count in db.query(AIAnalysis.severity_score, func.count(AIAnalysis.id))
+            .join(Event, AIAnalysis.event_id == Event.id)
+            .filter(day_filter)
+            .group_by(AIAnalysis.severity_score)
+            .all()
+        }
         
-        # Write to file if path provided
-        if isinstance(output_path, (str, Path)):
-            with open(output_path, 'wb') as f:
-                f.write(pdf_bytes)
+        category_counts = dict(
+            db.query(Event.category, func.count(Event.id))
+            .filter(day_filter)
+            .group_by(Event.category)
+            .all()
+        )
         
-        return str(output_path), pdf_bytes
+        source_count = func.count(Event.id).label('event_count')
+        top_sources = [
+            (source, count)
+            for source, count in db.query(Event.source, source_count)
+            .filter(day_filter)
+            .group_by(Event.source)
+            .order_by(source_count.desc(), Event.source)
+            .limit(REPORT_TOP_N)
+            .all()
+        ]
+        
+        events_with_analysis = sum(severity_counts.values())
+        avg_severity = 0
+        if events_with_analysis:
+            avg_severity = sum(sev * count for sev, count in severity_counts.items()) / events_with_analysis
+        
+        return {
+            'total_events': total_events,
+            'events_with_analysis': events_with_analysis,
+            'avg_severity': avg_severity,
+            'high_severity_count': sum(
+                count for sev, count in severity_counts.items() if sev >= HIGH_SEVERITY_THRESHOLD
+            ),
+            'severity_counts': severity_counts,
+            'category_counts': category_counts,
+            'top_sources': top_sources
+        }
     
-    def _get_events_for_date(self, db: Session, report_date: date) -> List[Dict[str, Any]]:
-        """Retrieve events and their AI analysis for a specific date."""
-        start_datetime = datetime.combine(report_date, datetime.min.time())
-        end_datetime = datetime.combine(report_date, datetime.max.time())
-        
-        events = db.query(Event).filter(
-            Event.timestamp >= start_datetime,
-            Event.timestamp <= end_datetime
-        ).all()
-        
-        events_data = []
-        for event in events:
+    def _iter_top_events(self, db: Session, report_date: date,
+                         limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the highest-severity events for a date, fetching rows in chunks.
+        
+        Events are ordered by severity (highest first, unanalyzed last), then by timestamp.
+        """
+        limit = REPORT_DETAIL_LIMIT if limit is None else limit
+        
+        query = (
+            db.query(Event, AIAnalysis)
+            .outerjoin(AIAnalysis, AIAnalysis.event_id == Event.id)
+            .filter(self._day_filter(report_date))
+            .order_by(func.coalesce(AIAnalysis.severity_score, 0).desc(), Event.timestamp.asc())
+            .limit(limit)
+            .yield_per(REPORT_DETAIL_CHUNK_SIZE)
+        )
+        
+        for event, analysis in query:
             event_dict = {
                 'id': event.id,
                 'timestamp': event.timestamp,
@@ -198,16 +336,43 @@ class ReportGenerator:
                 'ai_analysis': None
             }
             
-            if event.ai_analysis:
+            if analysis is not None:
                 event_dict['ai_analysis'] = {
-                    'severity_score': event.ai_analysis.severity_score,
-                    'explanation': event.ai_analysis.explanation,
-                    'recommendations': json.loads(event.ai_analysis.recommendations)
+                    'severity_score': analysis.severity_score,
+                    'explanation': analysis.explanation,
+                    'recommendations': self._parse_recommendations(analysis.recommendations)
                 }
             
-            events_data.append(event_dict)
+            yield event_dict
+    
+    def _get_top_recommendations(self, db: Session, report_date: date,
+                                 limit: Optional[int] = None) -> List[str]:
+        """
+        Collect unique recommendations, highest-severity events first.
         
-        return events_data
+        Stops reading as soon as enough unique recommendations are found.
+        """
+        limit = REPORT_RECOMMENDATION_LIMIT if limit is None else limit
+        unique_recommendations = []
+        seen = set()
+        
+        query = (
+            db.query(AIAnalysis.recommendations)
+            .join(Event, AIAnalysis.event_id == Event.id)
+            .filter(self._day_filter(report_date))
+            .order_by(AIAnalysis.severity_score.desc(), Event.timestamp.asc())
+            .yield_per(REPORT_DETAIL_CHUNK_SIZE)
+        )
+        
+        for (raw_recommendations,) in query:
+            for recommendation in self._parse_recommendations(raw_recommendations):
+                if recommendation not in seen:
+                    seen.add(recommendation)
+                    unique_recommendations.append(recommendation)
+                    if len(unique_recommendations) >= limit:
+                        return unique_recommendations
+        
+        return unique_recommendations
     
     def _create_report_header(self, report_date: date, event_count: int) -> List:
         """Create the report header section."""
@@ -215,7 +380,7 @@ class ReportGenerator:
         
         # Title
         title = f"ThreatLens Security Report"
-        story.append(Paragraph(title, self.styles['ReportTitle']))
+        story.append(self.lib.Paragraph(title, self.styles['ReportTitle']))
         
         # Date and summary info
         date_str = report_date.strftime("%B %d, %Y")
@@ -224,81 +389,49 @@ class ReportGenerator:
         <b>Events Analyzed:</b> {event_count}<br/>
         <b>Generated:</b> {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
         """
-        story.append(Paragraph(summary_text, self.styles['Normal']))
-        story.append(Spacer(1, 20))
-        story.append(HRFlowable(width="100%", thickness=1, color=colors.darkblue))
-        story.append(Spacer(1, 20))
+        story.append(self.lib.Paragraph(summary_text, self.styles['Normal']))
+        story.append(self.lib.Spacer(1, 20))
+        story.append(self.lib.HRFlowable(width="100%", thickness=1, color=self.lib.colors.darkblue))
+        story.append(self.lib.Spacer(1, 20))
         
         return story
     
-    def _create_executive_summary(self, events_data: List[Dict[str, Any]]) -> List:
-        """Create the executive summary section."""
+    def _create_executive_summary(self, summary: Dict[str, Any]) -> List:
+        """Create the executive summary section from aggregated statistics."""
         story = []
-        story.append(Paragraph("Executive Summary", self.styles['SectionHeader']))
+        story.append(self.lib.Paragraph("Executive Summary", self.styles['SectionHeader']))
         
-        if not events_data:
-            story.append(Paragraph(
+        if not summary['total_events']:
+            story.append(self.lib.Paragraph(
                 "No security events were recorded for this date.",
                 self.styles['Summary']
             ))
             return story
         
-        # Calculate summary statistics
-        total_events = len(events_data)
-        events_with_analysis = sum(1 for e in events_data if e['ai_analysis'])
-        
-        severity_counts = {}
-        category_counts = {}
-        high_severity_events = []
-        
-        for event in events_data:
-            # Count categories
-            category = event['category']
-            category_counts[category] = category_counts.get(category, 0) + 1
-            
-            if event['ai_analysis']:
-                severity = event['ai_analysis']['severity_score']
-                severity_counts[severity] = severity_counts.get(severity, 0) + 1
-                
-                # Track high severity events (7+)
-                if severity >= 7:
-                    high_severity_events.append(event)
-        
-        # Create summary text
-        avg_severity = 0
-        if severity_counts:
-            total_severity = sum(sev * count for sev, count in severity_counts.items())
-            avg_severity = total_severity / sum(severity_counts.values())
-        
-        high_severity_count = len(high_severity_events)
+        category_counts = summary['category_counts']
         
         summary_text = f"""
-        <b>Total Events:</b> {total_events}<br/>
-        <b>Events with AI Analysis:</b> {events_with_analysis}<br/>
-        <b>Average Severity Score:</b> {avg_severity:.1f}/10<br/>
-        <b>High Severity Events (7+):</b> {high_severity_count}<br/>
+        <b>Total Events:</b> {summary['total_events']}<br/>
+        <b>Events with AI Analysis:</b> {summary['events_with_analysis']}<br/>
+        <b>Average Severity Score:</b> {summary['avg_severity']:.1f}/10<br/>
+        <b>High Severity Events (7+):</b> {summary['high_severity_count']}<br/>
         <b>Most Common Category:</b> {max(category_counts, key=category_counts.get) if category_counts else 'N/A'}
         """
         
-        story.append(Paragraph(summary_text, self.styles['Summary']))
-        story.append(Spacer(1, 15))
+        story.append(self.lib.Paragraph(summary_text, self.styles['Summary']))
+        story.append(self.lib.Spacer(1, 15))
         
         return story
     
-    def _create_severity_chart(self, events_data: List[Dict[str, Any]]) -> Optional[Image]:
-        """Create a severity distribution chart."""
-        # Count events by severity
-        severity_counts = {}
-        for event in events_data:
-            if event['ai_analysis']:
-                severity = event['ai_analysis']['severity_score']
-                severity_counts[severity] = severity_counts.get(severity, 0) + 1
-        
+    def _create_severity_chart(self, severity_counts: Dict[int, int]) -> Optional[Any]:
+        """Create a severity distribution chart from the severity histogram."""
         if not severity_counts:
             return None
         
-        # Create matplotlib figure
-        fig, ax = plt.subplots(figsize=(10, 6))
+        # Use a standalone figure so nothing is left registered in pyplot's global state
+        fig = self.lib.Figure(figsize=(10, 6))
+        self.lib.FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
         
         severities = list(range(1, 11))
         counts = [severity_counts.get(sev, 0) for sev in severities]
@@ -318,49 +451,80 @@ class ReportGenerator:
                 ax.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1,
                        str(count), ha='center', va='bottom', fontsize=10)
         
-        plt.tight_layout()
+        fig.tight_layout()
         
         # Save to buffer
         img_buffer = io.BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=300, bbox_inches='tight')
+        fig.savefig(img_buffer, format='png', dpi=REPORT_CHART_DPI, bbox_inches='tight')
         img_buffer.seek(0)
-        plt.close(fig)
         
         # Create ReportLab Image
-        return Image(img_buffer, width=6*inch, height=3.6*inch)
+        return self.lib.Image(img_buffer, width=6*self.lib.inch, height=3.6*self.lib.inch)
     
-    def _create_event_details_section(self, events_data: List[Dict[str, Any]]) -> List:
-        """Create the detailed events section."""
+    def _create_top_n_section(self, summary: Dict[str, Any]) -> List:
+        """Create the top sources and categories section."""
         story = []
-        story.append(Paragraph("Event Details", self.styles['SectionHeader']))
         
-        if not events_data:
-            story.append(Paragraph("No events to display.", self.styles['Normal']))
+        if not summary['total_events']:
             return story
         
-        # Sort events by severity (highest first), then by timestamp
-        sorted_events = sorted(
-            events_data,
-            key=lambda x: (
-                -(x['ai_analysis']['severity_score'] if x['ai_analysis'] else 0),
-                x['timestamp']
-            )
+        story.append(self.lib.Paragraph("Top Sources and Categories", self.styles['SectionHeader']))
+        
+        top_categories = sorted(
+            summary['category_counts'].items(), key=lambda item: (-item[1], item[0])
+        )[:REPORT_TOP_N]
+        
+        sections = (
+            ("Top Sources", "Source", summary['top_sources']),
+            ("Top Categories", "Category", top_categories)
         )
         
-        # Show top 20 events to keep report manageable
-        top_events = sorted_events[:20]
+        for title, label, rows in sections:
+            data = [[label, "Events"]]
+            data.extend([str(name), str(count)] for name, count in rows)
+            
+            table = self.lib.Table(data, colWidths=[4.5*self.lib.inch, 1.5*self.lib.inch])
+            table.setStyle(self.lib.TableStyle([
+                ('ALIGN', (0, 0), (0, -1), 'LEFT'),
+                ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 10),
+                ('GRID', (0, 0), (-1, -1), 0.5, self.lib.colors.grey),
+                ('BACKGROUND', (0, 0), (-1, 0), self.lib.colors.lightgrey),
+            ]))
+            
+            story.append(self.lib.Paragraph(title, self.styles['SubsectionHeader']))
+            story.append(table)
+            story.append(self.lib.Spacer(1, 10))
+        
+        return story
+    
+    def _create_event_details_section(self, events: Iterable[Dict[str, Any]], total_events: int) -> List:
+        """
+        Create the detailed events section.
+        
+        Args:
+            events: Events already ordered by severity and capped to the detail limit
+            total_events: Total number of events for the day
+        """
+        story = []
+        story.append(self.lib.Paragraph("Event Details", self.styles['SectionHeader']))
         
-        if len(sorted_events) > 20:
-            story.append(Paragraph(
-                f"Showing top 20 events (out of {len(sorted_events)} total)",
+        if not total_events:
+            story.append(self.lib.Paragraph("No events to display.", self.styles['Normal']))
+            return story
+        
+        if total_events > REPORT_DETAIL_LIMIT:
+            story.append(self.lib.Paragraph(
+                f"Showing top {REPORT_DETAIL_LIMIT} events (out of {total_events} total)",
                 self.styles['Normal']
             ))
-            story.append(Spacer(1, 10))
+            story.append(self.lib.Spacer(1, 10))
         
-        for i, event in enumerate(top_events, 1):
+        for i, event in enumerate(events, 1):
+            if i > 1:
+                story.append(self.lib.Spacer(1, 10))
             story.extend(self._create_event_detail(event, i))
-            if i < len(top_events):
-                story.append(Spacer(1, 10))
         
         return story
     
@@ -376,7 +540,7 @@ class ReportGenerator:
             severity_str = f" (Severity: {severity}/10)"
         
         header_text = f"<b>Event #{index}</b> - {timestamp_str}{severity_str}"
-        story.append(Paragraph(header_text, self.styles['SubsectionHeader']))
+        story.append(self.lib.Paragraph(header_text, self.styles['SubsectionHeader']))
         
         # Event details table
         data = [
@@ -392,66 +556,51 @@ class ReportGenerator:
                 ['Recommendations:', '; '.join(analysis['recommendations'][:3])]  # Show first 3 recommendations
             ])
         
-        table = Table(data, colWidths=[1.5*inch, 4.5*inch])
-        table.setStyle(TableStyle([
+        table = self.lib.Table(data, colWidths=[1.5*self.lib.inch, 4.5*self.lib.inch])
+        table.setStyle(self.lib.TableStyle([
             ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
             ('VALIGN', (0, 0), (-1, -1), 'TOP'),
             ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
             ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+            ('GRID', (0, 0), (-1, -1), 0.5, self.lib.colors.grey),
+            ('BACKGROUND', (0, 0), (0, -1), self.lib.colors.lightgrey),
         ]))
         
         story.append(table)
         
         return story
     
-    def _create_recommendations_section(self, events_data: List[Dict[str, Any]]) -> List:
+    def _create_recommendations_section(self, summary: Dict[str, Any], recommendations: List[str]) -> List:
         """Create the recommendations section."""
         story = []
-        story.append(Paragraph("Security Recommendations", self.styles['SectionHeader']))
-        
-        # Collect all recommendations
-        all_recommendations = []
-        high_severity_count = 0
-        
-        for event in events_data:
-            if event['ai_analysis']:
-                severity = event['ai_analysis']['severity_score']
-                if severity >= 7:
-                    high_severity_count += 1
-                
-                recommendations = event['ai_analysis']['recommendations']
-                all_recommendations.extend(recommendations)
+        story.append(self.lib.Paragraph("Security Recommendations", self.styles['SectionHeader']))
         
         # Generate general recommendations based on analysis
         general_recommendations = []
         
+        high_severity_count = summary['high_severity_count']
         if high_severity_count > 0:
             general_recommendations.append(
                 f"Immediate attention required: {high_severity_count} high-severity events detected."
             )
         
-        if len(events_data) > 50:
+        if summary['total_events'] > 50:
             general_recommendations.append(
                 "High volume of security events detected. Consider reviewing log sources and filtering rules."
             )
         
-        # Get unique specific recommendations (top 10)
-        unique_recommendations = list(set(all_recommendations))[:10]
-        
         # Combine recommendations
-        final_recommendations = general_recommendations + unique_recommendations
+        final_recommendations = general_recommendations + list(recommendations)
         
         if not final_recommendations:
-            story.append(Paragraph(
+            story.append(self.lib.Paragraph(
                 "No specific recommendations available. Continue monitoring security events.",
                 self.styles['Normal']
             ))
         else:
             for i, rec in enumerate(final_recommendations, 1):
-                story.append(Paragraph(f"{i}. {rec}", self.styles['Normal']))
-                story.append(Spacer(1, 5))
+                story.append(self.lib.Paragraph(f"{i}. {rec}", self.styles['Normal']))
+                story.append(self.lib.Spacer(1, 5))
         
         return story
 
@@ -471,6 +620,21 @@ def generate_daily_report(report_date: date, output_path: Optional[str] = None)
     return generator.generate_daily_report(report_date, output_path)
 
 
+def generate_daily_report_file(report_date: date, output_path: Optional[str] = None) -> str:
+    """
+    Convenience function to generate a daily report without loading it into memory.
+    
+    Args:
+        report_date: Date for which to generate the report
+        output_path: Optional custom output path for the PDF file
+        
+    Returns:
+        Path of the written PDF file
+    """
+    generator = ReportGenerator()
+    return generator.generate_daily_report_file(report_date, output_path)
+
+
 def save_report_record(db: Session, report_date: date, file_path: str) -> str:
     """
     Save a report record to the database.
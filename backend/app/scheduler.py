@@ -17,7 +17,8 @@ from sqlalchemy.orm import Session
 
 from app.database import get_db_session
 from app.models import Report
-from app.report_generator import generate_daily_report, save_report_record
+from app.report_generator import save_report_record
+from app.report_cache import ReportCache
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -36,6 +37,7 @@ class ScheduledReportManager:
         """
         self.reports_dir = Path(reports_dir)
         self.max_reports = max_reports
+        self.report_cache = ReportCache(reports_dir)
         self.scheduler = AsyncIOScheduler()
         self.audit_log = []
         
@@ -107,12 +109,12 @@ class ScheduledReportManager:
             
             logger.info(f"Starting scheduled daily report generation for {report_date}")
             
-            # Generate the report
-            file_path, pdf_bytes = generate_daily_report(report_date)
+            # Generate the report (reused if the day's data has not changed)
+            cached_report = self.report_cache.get_or_generate(report_date)
+            file_path = cached_report.file_path
             
             # Save report record to database
-            with get_db_session() as db:
-                report_id = save_report_record(db, report_date, file_path)
+            report_id = self._record_report(report_date, file_path, cached_report.cache_hit)
             
             # Log success
             logger.info(f"Scheduled daily report generated successfully: {report_id} at {file_path}")
@@ -125,7 +127,8 @@ class ScheduledReportManager:
                     "report_id": report_id,
                     "report_date": report_date.isoformat(),
                     "file_path": str(file_path),
-                    "file_size": len(pdf_bytes)
+                    "file_size": cached_report.file_size,
+                    "cache_hit": cached_report.cache_hit
                 }
             )
             
@@ -179,6 +182,7 @@ class ScheduledReportManager:
                 if i >= self.max_reports:
                     try:
                         file_path.unlink()
+                        self.report_cache.invalidate(report_date, remove_report=False)
                         files_removed += 1
                         logger.info(f"Removed old report file: {file_path}")
                         
@@ -327,12 +331,13 @@ class ScheduledReportManager:
         try:
             logger.info(f"Manually triggering report generation for {report_date}")
             
-            # Generate the report
-            file_path, pdf_bytes = generate_daily_report(report_date)
+            # Generate the report (reused if the day's data has not changed)
+            cached_report = self.report_cache.get_or_generate(report_date)
+            file_path = cached_report.file_path
+            file_size = cached_report.file_size
             
             # Save report record to database
-            with get_db_session() as db:
-                report_id = save_report_record(db, report_date, file_path)
+            report_id = self._record_report(report_date, file_path, cached_report.cache_hit)
             
             # Add audit entry
             self._add_audit_entry(
@@ -342,7 +347,8 @@ class ScheduledReportManager:
                     "report_id": report_id,
                     "report_date": report_date.isoformat(),
                     "file_path": str(file_path),
-                    "file_size": len(pdf_bytes)
+                    "file_size": file_size,
+                    "cache_hit": cached_report.cache_hit
                 }
             )
             
@@ -353,7 +359,8 @@ class ScheduledReportManager:
                 "report_id": report_id,
                 "report_date": report_date,
                 "file_path": str(file_path),
-                "file_size": len(pdf_bytes)
+                "file_size": file_size,
+                "cache_hit": cached_report.cache_hit
             }
             
         except Exception as e:
@@ -373,6 +380,71 @@ class ScheduledReportManager:
                 "report_date": report_date
             }
     
+    def backfill_reports(self, start_date: date, end_date: date,
+                         max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Render reports for a range of past dates in parallel.
+        
+        Days whose cached report is still current are not re-rendered.
+        
+        Args:
+            start_date: First date to render (inclusive)
+            end_date: Last date to render (inclusive)
+            max_workers: Optional number of worker processes
+            
+        Returns:
+            Dictionary with per-date results and counts
+        """
+        logger.info(f"Backfilling reports from {start_date} to {end_date}")
+        
+        results = self.report_cache.backfill(start_date, end_date, max_workers=max_workers)
+        
+        for result in results:
+            if result["success"]:
+                result["report_id"] = self._record_report(
+                    result["report_date"], result["file_path"], result["cache_hit"]
+                )
+        
+        summary = {
+            "start_date": start_date,
+            "end_date": end_date,
+            "generated": sum(1 for r in results if r["success"] and not r["cache_hit"]),
+            "cached": sum(1 for r in results if r["success"] and r["cache_hit"]),
+            "failed": sum(1 for r in results if not r["success"]),
+            "reports": results
+        }
+        
+        self._add_audit_entry(
+            "report_backfill_completed",
+            f"Report backfill completed for {start_date} to {end_date}",
+            {key: summary[key] for key in ("generated", "cached", "failed")}
+        )
+        
+        return summary
+    
+    def _record_report(self, report_date: date, file_path: str, cache_hit: bool) -> str:
+        """
+        Save a report record, reusing the existing one for cached files.
+        
+        Args:
+            report_date: Date of the report
+            file_path: Path to the PDF file
+            cache_hit: Whether the file was served from the report cache
+            
+        Returns:
+            Report ID
+        """
+        with get_db_session() as db:
+            if cache_hit:
+                existing = db.query(Report).filter(
+                    Report.report_date == report_date,
+                    Report.file_path == str(file_path)
+                ).first()
+                if existing:
+                    return existing.id
+            
+            return save_report_record(db, report_date, file_path)
+    
     def get_report_files_info(self) -> List[Dict[str, Any]]:
         """
         Get information about existing report files.
@@ -439,6 +511,11 @@ def trigger_manual_report(report_date: Optional[date] = None) -> Dict[str, Any]:
     return scheduler_manager.trigger_manual_report_generation(report_date)
 
 
+def backfill_reports(start_date: date, end_date: date, max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """Render reports for a range of dates in parallel."""
+    return scheduler_manager.backfill_reports(start_date, end_date, max_workers)
+
+
 def get_report_files_info() -> List[Dict[str, Any]]:
     """Get information about existing report files."""
     return scheduler_manager.get_report_files_info()
\ No newline at end of file
@@ -270,6 +270,7 @@ class NotificationRuleRequest(BaseModel):
     sources: List[str] = Field(default_factory=list)
     channels: List[str] = Field(default_factory=list)
     throttle_minutes: int = Field(default=0, ge=0, le=1440)
+    digest: bool = Field(default=False)
     email_recipients: List[str] = Field(default_factory=list)
     webhook_url: Optional[str] = Field(default=None)
     slack_channel: Optional[str] = Field(default=None)
@@ -285,6 +286,7 @@ class NotificationRuleResponse(BaseModel):
     sources: List[str]
     channels: List[str]
     throttle_minutes: int
+    digest: bool = False
     email_recipients: List[str]
     webhook_url: Optional[str]
     slack_channel: Optional[str]
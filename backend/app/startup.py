@@ -0,0 +1,248 @@
+"""
+Startup timing and lazy imports for ThreatLens.
+
+The API process records how long each application module takes to import
+and how long each startup phase takes, so slow cold starts can be traced
+to a module or component. Heavy optional dependencies (the Groq SDK,
+aiohttp, matplotlib, ReportLab) are imported on first use through
+LazyModule instead of when the application is imported; their load time
+is recorded in the same report.
+"""
+import importlib
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Record per-module import times for these package prefixes during startup
+STARTUP_TIMING = os.getenv("STARTUP_TIMING", "true").lower() == "true"
+STARTUP_TIMING_MODULES = tuple(
+    name.strip() for name in os.getenv("STARTUP_TIMING_MODULES", "app").split(",") if name.strip()
+)
+STARTUP_REPORT_TOP_N = int(os.getenv("STARTUP_REPORT_TOP_N", "15"))
+
+
+class _ImportTimer:
+    """
+    Meta path finder that times module execution for selected packages.
+    
+    It finds the module spec through the remaining finders and wraps the
+    loader's exec_module, so the loader and module are otherwise
+    unchanged. Inclusive time covers everything a module imports; self
+    time excludes nested modules that are also timed.
+    """
+    
+    def __init__(self, timer: "StartupTimer", prefixes: Tuple[str, ...]):
+        self.timer = timer
+        self.prefixes = prefixes
+        self._local = threading.local()
+        
+    def _tracked(self, fullname: str) -> bool:
+        return any(fullname == prefix or fullname.startswith(prefix + ".") for prefix in self.prefixes)
+        
+    def find_spec(self, fullname, path, target=None):
+        if not self._tracked(fullname) or getattr(self._local, "finding", False):
+            return None
+            
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.finding = False
+            
+        loader = spec.loader
+        if loader is not None and hasattr(loader, "exec_module"):
+            try:
+                loader.exec_module = self._timed(fullname, loader.exec_module)
+            except AttributeError:
+                pass  # Loader does not allow instance attributes; leave it untimed
+        return spec
+        
+    def _timed(self, fullname: str, exec_module):
+        def timed_exec_module(module):
+            stack = self._local.__dict__.setdefault("stack", [])
+            stack.append(0.0)
+            started = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - started
+                nested = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+                self.timer.record_import(fullname, elapsed, elapsed - nested)
+        return timed_exec_module
+
+
+class StartupTimer:
+    """Collects import and initialization timings for the startup report."""
+    
+    def __init__(self):
+        self.created = time.perf_counter()
+        self.imports: Dict[str, Tuple[float, float]] = {}
+        self.lazy_imports: Dict[str, float] = {}
+        self.phases: Dict[str, float] = {}
+        self.failed_phases: List[str] = []
+        self.ready_seconds: Optional[float] = None
+        self.process_ready_seconds: Optional[float] = None
+        self._finder: Optional[_ImportTimer] = None
+        self._lock = threading.Lock()
+        
+    def track_imports(self, prefixes: Tuple[str, ...] = STARTUP_TIMING_MODULES) -> None:
+        """Start timing imports of modules under the given package prefixes."""
+        if self._finder is None and prefixes:
+            self._finder = _ImportTimer(self, prefixes)
+            sys.meta_path.insert(0, self._finder)
+            
+    def stop_tracking_imports(self) -> None:
+        """Remove the import timer from the import system."""
+        if self._finder is not None:
+            try:
+                sys.meta_path.remove(self._finder)
+            except ValueError:
+                pass
+            self._finder = None
+            
+    def record_import(self, module: str, seconds: float, self_seconds: float) -> None:
+        """Record the inclusive and self import time of a module."""
+        with self._lock:
+            self.imports[module] = (seconds, self_seconds)
+            
+    def record_lazy_import(self, module: str, seconds: float) -> None:
+        """Record a dependency imported on first use."""
+        with self._lock:
+            self.lazy_imports[module] = seconds
+            
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Time a startup phase.
+        
+        Usable around awaits; the recorded time is wall-clock time.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.failed_phases.append(name)
+            raise
+        finally:
+            self.phases[name] = time.perf_counter() - started
+            
+    def finish(self) -> Dict[str, Any]:
+        """
+        Mark the application ready and stop timing imports.
+        
+        Returns:
+            Startup report
+        """
+        self.stop_tracking_imports()
+        self.ready_seconds = time.perf_counter() - self.created
+        try:
+            import psutil
+            self.process_ready_seconds = time.time() - psutil.Process().create_time()
+        except Exception:
+            self.process_ready_seconds = None
+        return self.get_report()
+        
+    def get_report(self, top_n: int = STARTUP_REPORT_TOP_N) -> Dict[str, Any]:
+        """
+        Get the startup timing report.
+        
+        Args:
+            top_n: Number of slowest modules to include
+            
+        Returns:
+            Slowest module imports, lazy imports and startup phases in seconds
+        """
+        with self._lock:
+            imports = sorted(self.imports.items(), key=lambda item: item[1][1], reverse=True)
+            lazy_imports = dict(self.lazy_imports)
+            
+        return {
+            "ready_seconds": self.ready_seconds,
+            "process_ready_seconds": self.process_ready_seconds,
+            "modules_timed": len(imports),
+            "module_import_seconds": round(sum(self_seconds for _, (_, self_seconds) in imports), 4),
+            "slowest_imports": [
+                {"module": module, "seconds": round(seconds, 4), "self_seconds": round(self_seconds, 4)}
+                for module, (seconds, self_seconds) in imports[:top_n]
+            ],
+            "lazy_imports": {module: round(seconds, 4) for module, seconds in lazy_imports.items()},
+            "phases": {name: round(seconds, 4) for name, seconds in self.phases.items()},
+            "failed_phases": list(self.failed_phases)
+        }
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access.
+    
+    Example:
+        aiohttp = LazyModule("aiohttp")
+        session = aiohttp.ClientSession()  # imports aiohttp here
+    """
+    
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+        
+    def _load(self):
+        if self._module is None:
+            started = time.perf_counter()
+            self._module = importlib.import_module(self._name)
+            startup_timer.record_lazy_import(self._name, time.perf_counter() - started)
+            logger.debug(f"Loaded {self._name} on first use")
+        return self._module
+        
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+        
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+class LazyAttribute:
+    """Callable stand-in for a class or function of a lazily imported module."""
+    
+    def __init__(self, module: LazyModule, attr: str):
+        self._module = module
+        self._attr = attr
+        
+    def __call__(self, *args, **kwargs):
+        return getattr(self._module._load(), self._attr)(*args, **kwargs)
+        
+    def __repr__(self) -> str:
+        return f"<LazyAttribute {self._module._name}.{self._attr}>"
+
+
+def lazy_import(name: str, attr: Optional[str] = None):
+    """
+    Import a module, or one of its callables, on first use.
+    
+    Args:
+        name: Module name
+        attr: Optional attribute of the module to stand in for
+        
+    Returns:
+        LazyModule, or LazyAttribute when attr is given
+    """
+    module = LazyModule(name)
+    return LazyAttribute(module, attr) if attr else module
+
+
+# Global startup timer
+startup_timer = StartupTimer()
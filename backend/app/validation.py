@@ -288,6 +288,34 @@ def validate_ai_analysis_data(analysis_data: Dict[str, Any]) -> Tuple[bool, List
     return len(errors) == 0, errors
 
 
+# Character classes removed by sanitize_log_content, as str.translate deletion tables
+_CONTROL_CHAR_TABLE = dict.fromkeys([0, *range(0x01, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), 0x7F])
+_SHELL_METACHAR_TABLE = dict.fromkeys(map(ord, ';&|`$(){}[]\\'))
+
+_EQUALS_SIGN = re.compile(r'=')
+_DIGIT_COMPARISON = re.compile(r'=\s*\d')
+
+# Injection patterns removed by sanitize_log_content, in the order they are
+# applied (a removal can join text into a match for a later pattern). Each
+# entry lists lower-case literals one of which every match contains, and
+# optionally a cheap pattern every match contains, so passes that cannot fire
+# are skipped without running the full regex.
+_SANITIZE_PASSES = [
+    ('html_tag', re.compile(r'<[^>]*>'), ('<',), None),
+    ('javascript_uri', re.compile(r'javascript:', re.IGNORECASE), ('javascript:',), None),
+    ('event_handler', re.compile(r'on\w+\s*=', re.IGNORECASE), ('on',), _EQUALS_SIGN),
+    ('sql_keyword', re.compile(
+        r'\b(?=[usidcae])(?:union|select|insert|update|delete|drop|create|alter|exec|execute)\b',
+        re.IGNORECASE
+    ), ('union', 'select', 'insert', 'update', 'delete', 'drop', 'create', 'alter', 'exec'), None),
+    ('sql_comment', re.compile(r'--|#|/\*|\*/'), ('--', '#', '/*', '*/'), None),
+    ('sql_or_tautology', re.compile(r'\bor\b\s+\d+\s*=\s*\d+', re.IGNORECASE), ('or',), _DIGIT_COMPARISON),
+    ('sql_and_tautology', re.compile(r'\band\b\s+\d+\s*=\s*\d+', re.IGNORECASE), ('and',), _DIGIT_COMPARISON),
+]
+
+_INNER_WHITESPACE = re.compile(r'[ \t]{2,}|\t')
+
+
 def sanitize_log_content(content: str) -> str:
     """
     Sanitize log content by removing or replacing potentially harmful characters.
@@ -298,55 +326,60 @@ def sanitize_log_content(content: str) -> str:
     Returns:
         Sanitized log content
     """
-    if not isinstance(content, str):
-        return ""
+    sanitized, _ = sanitize_log_content_with_report(content)
+    return sanitized
+
+
+def sanitize_log_content_with_report(content: str) -> Tuple[str, Dict[str, int]]:
+    """
+    Sanitize log content and report which sanitization rules fired.
     
-    # Remove null bytes
-    content = content.replace('\x00', '')
+    Produces exactly the output of sanitize_log_content. Control characters
+    and shell metacharacters are deleted with str.translate; each injection
+    pattern runs only when the literals it needs are present.
     
-    # Remove other control characters except newlines, tabs, and carriage returns
-    sanitized = re.sub(r'[\x01-\x08\x0B\x0C\x0E-\x1F\x7F]', '', content)
+    Args:
+        content: Raw log content
+        
+    Returns:
+        Tuple of (sanitized content, number of removals per rule that fired)
+    """
+    if not isinstance(content, str):
+        return "", {}
     
-    # Remove potential script injection patterns
-    # Remove HTML/XML tags
-    sanitized = re.sub(r'<[^>]*>', '', sanitized)
+    fired: Dict[str, int] = {}
     
-    # Remove JavaScript-like patterns
-    sanitized = re.sub(r'javascript:', '', sanitized, flags=re.IGNORECASE)
-    sanitized = re.sub(r'on\w+\s*=', '', sanitized, flags=re.IGNORECASE)
+    # Null bytes and other control characters except newlines, tabs and carriage returns
+    sanitized = content.translate(_CONTROL_CHAR_TABLE)
+    if len(sanitized) != len(content):
+        fired['control_char'] = len(content) - len(sanitized)
     
-    # Remove SQL injection patterns
-    sql_patterns = [
-        r'(\b(union|select|insert|update|delete|drop|create|alter|exec|execute)\b)',
-        r'(--|#|/\*|\*/)',
-        r'(\bor\b\s+\d+\s*=\s*\d+)',
-        r'(\band\b\s+\d+\s*=\s*\d+)'
-    ]
-    for pattern in sql_patterns:
-        sanitized = re.sub(pattern, '', sanitized, flags=re.IGNORECASE)
-    
-    # Remove potential command injection patterns
-    cmd_patterns = [
-        r'[;&|`$(){}[\]\\]',  # Shell metacharacters
-        r'\$\([^)]*\)',       # Command substitution
-        r'`[^`]*`'            # Backtick command substitution
-    ]
-    for pattern in cmd_patterns:
-        sanitized = re.sub(pattern, '', sanitized)
-    
-    # Normalize line endings
-    sanitized = re.sub(r'\r\n|\r', '\n', sanitized)
-    
-    # Remove excessive whitespace but preserve log structure
-    lines = sanitized.split('\n')
-    cleaned_lines = []
-    for line in lines:
-        # Keep the line structure but trim excessive spaces
-        cleaned_line = re.sub(r'[ \t]+', ' ', line.strip())
-        if cleaned_line:  # Only keep non-empty lines
-            cleaned_lines.append(cleaned_line)
-    
-    return '\n'.join(cleaned_lines)
+    # Literal pre-checks need case-folding that keeps character positions;
+    # IGNORECASE also folds some non-ASCII letters onto ASCII ones
+    folded = sanitized.lower() if sanitized.isascii() else None
+    
+    for rule, pattern, literals, hint in _SANITIZE_PASSES:
+        if folded is not None and not any(literal in folded for literal in literals):
+            continue
+        if hint is not None and not hint.search(sanitized):
+            continue
+        
+        sanitized, count = pattern.subn('', sanitized)
+        if count:
+            fired[rule] = count
+            if folded is not None:
+                folded = sanitized.lower()
+    
+    # Shell metacharacters. Command substitution patterns need '$(' or '`',
+    # which this removes, so they never need a separate pass.
+    stripped = sanitized.translate(_SHELL_METACHAR_TABLE)
+    if len(stripped) != len(sanitized):
+        fired['shell_metachar'] = len(sanitized) - len(stripped)
+    
+    # Normalize line endings, collapse spaces/tabs and drop empty lines
+    stripped = stripped.replace('\r\n', '\n').replace('\r', '\n')
+    stripped = _INNER_WHITESPACE.sub(' ', stripped)
+    return '\n'.join(filter(None, map(str.strip, stripped.split('\n')))), fired
 
 
 def sanitize_filename(filename: str) -> str:
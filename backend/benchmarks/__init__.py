@@ -0,0 +1,18 @@
+"""
+Reproducible benchmarks for the log processing pipeline.
+
+Micro-benchmarks time the parser, event categorization, sanitizers,
+format detection and the ingestion queue on seeded synthetic corpora.
+Macro-benchmarks append a corpus to a watched log file and measure lines
+per second and append-to-commit latency through the realtime pipeline.
+
+Run from the backend directory:
+
+    python -m benchmarks run --suite micro
+    python -m benchmarks run --suite macro --lines 5000
+    python -m benchmarks compare results/baseline.json results/current.json
+
+Results are saved as JSON under benchmarks/results/ unless --output is
+given. compare exits with status 1 when a benchmark regressed by more
+than --threshold.
+"""
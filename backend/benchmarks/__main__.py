@@ -0,0 +1,105 @@
+"""
+Command line entry point: python -m benchmarks {run,compare}.
+"""
+import argparse
+import logging
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from .corpus import DEFAULT_SEED
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def _print_progress(name, result) -> None:
+    from .harness import format_report
+    print(format_report({"benchmarks": {name: result}}), flush=True)
+
+
+def run(args: argparse.Namespace) -> int:
+    # app.logging_config reads LOG_LEVEL if an app module imports it; modules
+    # that only use the logging package log through the basic config
+    os.environ["LOG_LEVEL"] = args.log_level.upper()
+    logging.basicConfig(level=args.log_level.upper(), format="%(levelname)s %(name)s: %(message)s")
+    
+    from .harness import BenchmarkRunner, build_results, registered_benchmarks, save_results
+    
+    benchmarks = {}
+    if args.suite in ("micro", "all"):
+        from . import micro  # noqa: F401 - registers the micro-benchmarks
+        runner = BenchmarkRunner(rounds=args.rounds, min_round_time=args.min_round_time)
+        benchmarks.update(runner.run(registered_benchmarks(args.filter), progress=_print_progress))
+    if args.suite in ("macro", "all"):
+        from .macro import run_scenarios, select_scenarios
+        benchmarks.update(run_scenarios(
+            select_scenarios(args.filter), lines=args.lines, seed=args.seed, rate=args.rate,
+            progress=_print_progress
+        ))
+        
+    if not benchmarks:
+        print(f"No benchmarks match {args.filter!r}", file=sys.stderr)
+        return 1
+        
+    config = {
+        "suite": args.suite,
+        "filter": args.filter,
+        "seed": args.seed,
+        "rounds": args.rounds,
+        "min_round_time": args.min_round_time,
+        "lines": args.lines,
+        "rate": args.rate
+    }
+    output = args.output or RESULTS_DIR / f"{args.suite}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    path = save_results(build_results(args.suite, benchmarks, config), output)
+    print(f"\nResults written to {path}")
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    from .harness import compare_results, format_comparison, load_results
+    
+    rows = compare_results(load_results(args.baseline), load_results(args.current), args.threshold)
+    if not rows:
+        print("No benchmarks in common")
+        return 0
+    print(format_comparison(rows))
+    regressions = [row for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="ThreatLens benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    run_parser = commands.add_parser("run", help="Run benchmarks and save results as JSON")
+    run_parser.add_argument("--suite", choices=("micro", "macro", "all"), default="micro")
+    run_parser.add_argument("--filter", help="Only run benchmarks whose name contains this text")
+    run_parser.add_argument("--output", type=Path, help="Results file (default: benchmarks/results/)")
+    run_parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Corpus seed")
+    run_parser.add_argument("--rounds", type=int, default=7, help="Timed rounds per micro-benchmark")
+    run_parser.add_argument("--min-round-time", type=float, default=0.1,
+                            help="Minimum seconds per micro-benchmark round")
+    run_parser.add_argument("--lines", type=int, default=2000, help="Lines per pipeline scenario")
+    run_parser.add_argument("--rate", type=float,
+                            help="Append rate in lines/s for every pipeline scenario (0 for burst)")
+    run_parser.add_argument("--log-level", default="ERROR", help="Application log level during the run")
+    run_parser.set_defaults(handler=run)
+    
+    compare_parser = commands.add_parser("compare", help="Compare two results files")
+    compare_parser.add_argument("baseline", type=Path)
+    compare_parser.add_argument("current", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="Relative change reported as a regression (default 0.1)")
+    compare_parser.set_defaults(handler=compare)
+    
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
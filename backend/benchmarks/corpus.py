@@ -0,0 +1,203 @@
+"""
+Synthetic log corpora for benchmarks.
+
+Every generator is seeded, so a corpus is identical across runs and
+machines for the same kind, size and seed. Lines follow the formats
+LogParser recognizes: macOS system.log, macOS auth/secure logs, macOS
+Console (log show) output and generic syslog. Message templates mix the
+event categories the parser and analyzer distinguish, with addresses
+from the documentation ranges (RFC 5737).
+"""
+import random
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Tuple
+
+DEFAULT_SEED = 1337
+
+# Corpus timestamps start here and advance by a random gap per line
+BASE_TIME = datetime(2024, 1, 15, 8, 0, 0)
+
+HOSTS = ("MacBook-Pro", "build-mac-02", "studio-ops")
+USERS = ("alice", "bob", "admin", "root", "deploy", "guest", "jenkins")
+IPS = tuple(f"{prefix}.{suffix}" for prefix in ("192.0.2", "198.51.100", "203.0.113") for suffix in (7, 23, 45, 88, 142))
+
+# (process, message template, weight) per corpus kind
+MACOS_SYSTEM_TEMPLATES = (
+    ("kernel", "Sandbox: {app}({pid}) deny(1) file-read-data /private/var/db/{file}", 3),
+    ("kernel", "AppleUSBHostController: device attached on port {port}", 1),
+    ("com.apple.xpc.launchd", "Service exited with abnormal code: {code} (com.apple.{app})", 2),
+    ("loginwindow", "loginwindow SessionAgentNotificationCenter: sending notification for user {user}", 2),
+    ("WindowServer", "Display {port} changed mode to 2560x1600 @ 60Hz", 1),
+    ("mDNSResponder", "mDNSResponder: DNS query for {domain} timed out after {ms} ms", 2),
+    ("configd", "network changed: DNS* Proxy interface en0 address {ip}", 2),
+    ("socketfilterfw", "Deny {app} connecting from {ip}:{port} to port {dport} proto=6", 2),
+    ("syspolicyd", "Security policy would not allow process: {pid}, /Applications/{app}.app", 1),
+    ("diskarbitrationd", "unable to mount disk{port}s1 (status code 0x{code})", 1),
+)
+
+MACOS_AUTH_TEMPLATES = (
+    ("sshd", "Failed password for invalid user {user} from {ip} port {port} ssh2", 4),
+    ("sshd", "Accepted publickey for {user} from {ip} port {port} ssh2", 2),
+    ("sshd", "Connection closed by authenticating user {user} {ip} port {port} [preauth]", 1),
+    ("sudo", "{user} : TTY=ttys00{digit} ; PWD=/Users/{user} ; USER=root ; COMMAND=/usr/bin/{command}", 3),
+    ("sudo", "{user} : 3 incorrect password attempts ; TTY=ttys00{digit} ; USER=root", 1),
+    ("authorizationhost", "Failed to authenticate user <{user}> (error: 9)", 2),
+    ("securityd", "Session {pid} created for user {user}", 1),
+    ("loginwindow", "User {user} logged in with session token {code}", 1),
+    ("su", "BAD SU {user} to root on /dev/ttys00{digit}", 1),
+)
+
+MACOS_CONSOLE_TEMPLATES = (
+    ("kernel", "Sandbox: {app} deny(1) network-outbound {ip}:{dport}", 2),
+    ("trustd", "could not evaluate certificate chain for {domain}: revoked", 1),
+    ("mDNSResponder", "Resolved {domain} to {ip} in {ms} ms", 2),
+    ("loginwindow", "-[SessionAgent logout] user {user} session ended", 1),
+    ("XProtect", "Malware detected and quarantined in /Users/{user}/Downloads/{file}", 1),
+    ("runningboardd", "Acquiring assertion for {app}({pid}) reason=finishTask", 3),
+    ("tccd", "Access denied for {app} to kTCCServiceCamera for user {user}", 1),
+    ("sharingd", "Wi-Fi interface en0 scan found {port} networks", 1),
+)
+
+SYSLOG_TEMPLATES = (
+    ("sshd[{pid}]", "Invalid user {user} from {ip} port {port}", 3),
+    ("CRON[{pid}]", "({user}) CMD (/usr/local/bin/{command} --quiet)", 2),
+    ("systemd[1]", "Started Session {pid} of user {user}.", 2),
+    ("kernel", "[UFW BLOCK] IN=eth0 OUT= SRC={ip} DST=10.0.0.5 PROTO=TCP SPT={port} DPT={dport}", 3),
+    ("nginx[{pid}]", "upstream timed out (110: Connection timed out) while reading from {ip}", 2),
+    ("postfix/smtpd[{pid}]", "warning: unknown[{ip}]: SASL LOGIN authentication failed", 1),
+    ("dockerd[{pid}]", "container {code} exited with code {digit}", 1),
+    ("fail2ban", "WARNING [sshd] Ban {ip}", 1),
+)
+
+APPS = ("Safari", "Slack", "Xcode", "Terminal", "zoom.us", "Docker", "Dropbox")
+COMMANDS = ("ls", "launchctl", "pfctl", "dscl", "backup.sh", "rsync", "softwareupdate")
+DOMAINS = ("updates.example.com", "api.example.net", "cdn.example.org", "login.example.com")
+FILES = ("invoice.pdf.app", "setup.dmg", "report.xlsx", "update.pkg", "cache.db")
+
+
+def _fields(rng: random.Random) -> Dict[str, object]:
+    return {
+        "app": rng.choice(APPS),
+        "code": f"{rng.randrange(16 ** 6):06x}",
+        "command": rng.choice(COMMANDS),
+        "digit": rng.randrange(10),
+        "domain": rng.choice(DOMAINS),
+        "dport": rng.choice((22, 80, 443, 3389, 5900, 8080)),
+        "file": rng.choice(FILES),
+        "ip": rng.choice(IPS),
+        "ms": rng.randrange(5, 5000),
+        "pid": rng.randrange(100, 99999),
+        "port": rng.randrange(1024, 65535),
+        "user": rng.choice(USERS),
+    }
+
+
+def _messages(templates: Tuple[Tuple[str, str, int], ...], count: int,
+              rng: random.Random) -> List[Tuple[datetime, str, str]]:
+    weights = [weight for _, _, weight in templates]
+    chosen = rng.choices(templates, weights=weights, k=count)
+    timestamp = BASE_TIME
+    messages = []
+    for process, template, _ in chosen:
+        timestamp += timedelta(microseconds=rng.randrange(1, 2_000_000))
+        fields = _fields(rng)
+        messages.append((timestamp, process.format(**fields), template.format(**fields)))
+    return messages
+
+
+def _syslog_timestamp(timestamp: datetime) -> str:
+    # "Jan 15 08:00:01" with the day space-padded, as syslogd writes it
+    return f"{timestamp:%b} {timestamp.day:2d} {timestamp:%H:%M:%S}"
+
+
+def macos_system_lines(count: int, seed: int = DEFAULT_SEED) -> List[str]:
+    """Generate macOS system.log lines ("Jan 15 08:00:01 host process[pid]: message")."""
+    rng = random.Random(seed)
+    host = rng.choice(HOSTS)
+    return [
+        f"{_syslog_timestamp(timestamp)} {host} {process}[{rng.randrange(100, 99999)}]: {message}"
+        for timestamp, process, message in _messages(MACOS_SYSTEM_TEMPLATES, count, rng)
+    ]
+
+
+def macos_auth_lines(count: int, seed: int = DEFAULT_SEED) -> List[str]:
+    """Generate macOS authentication log lines in system.log format."""
+    rng = random.Random(seed)
+    host = rng.choice(HOSTS)
+    return [
+        f"{_syslog_timestamp(timestamp)} {host} {process}[{rng.randrange(100, 99999)}]: {message}"
+        for timestamp, process, message in _messages(MACOS_AUTH_TEMPLATES, count, rng)
+    ]
+
+
+def macos_console_lines(count: int, seed: int = DEFAULT_SEED) -> List[str]:
+    """Generate macOS Console lines ("08:00:01.123456+0200 process message")."""
+    rng = random.Random(seed)
+    return [
+        f"{timestamp:%H:%M:%S.%f}+0200 {process} {message}"
+        for timestamp, process, message in _messages(MACOS_CONSOLE_TEMPLATES, count, rng)
+    ]
+
+
+def syslog_lines(count: int, seed: int = DEFAULT_SEED) -> List[str]:
+    """Generate generic Linux syslog lines ("Jan 15 08:00:01 host process[pid]: message")."""
+    rng = random.Random(seed)
+    host = rng.choice(("web-01", "db-02", "bastion"))
+    return [
+        f"{_syslog_timestamp(timestamp)} {host} {process}: {message}"
+        for timestamp, process, message in _messages(SYSLOG_TEMPLATES, count, rng)
+    ]
+
+
+CORPORA: Dict[str, Callable[[int, int], List[str]]] = {
+    "macos_system": macos_system_lines,
+    "macos_auth": macos_auth_lines,
+    "macos_console": macos_console_lines,
+    "syslog": syslog_lines,
+}
+
+
+def generate_corpus(kind: str, count: int, seed: int = DEFAULT_SEED) -> List[str]:
+    """
+    Generate a synthetic log corpus.
+    
+    Args:
+        kind: Corpus kind (macos_system, macos_auth, macos_console, syslog)
+        count: Number of lines
+        seed: Random seed; the same seed always gives the same lines
+        
+    Returns:
+        List of log lines without trailing newlines
+        
+    Raises:
+        ValueError: If the corpus kind is unknown
+    """
+    if kind not in CORPORA:
+        raise ValueError(f"Unknown corpus kind: {kind}. Available: {', '.join(CORPORA)}")
+    return CORPORA[kind](count, seed)
+
+
+# Fragments the sanitizers rewrite: control characters, ANSI escapes, markup
+NOISE = ("\x00", "\x07\x08", "\x1b[31m", "<script>alert(1)</script>", "\x1b]0;title\x07", "‮")
+
+
+def with_noise(lines: List[str], ratio: float = 0.1, seed: int = DEFAULT_SEED) -> List[str]:
+    """
+    Insert characters the sanitizers rewrite into a fraction of lines.
+    
+    Args:
+        lines: Clean log lines
+        ratio: Fraction of lines to alter
+        seed: Random seed
+        
+    Returns:
+        New list with the same number of lines
+    """
+    rng = random.Random(seed)
+    noisy = []
+    for line in lines:
+        if rng.random() < ratio:
+            position = rng.randrange(len(line) + 1)
+            line = line[:position] + rng.choice(NOISE) + line[position:]
+        noisy.append(line)
+    return noisy
@@ -0,0 +1,359 @@
+"""
+Benchmark runner, results files and regression comparison.
+
+Micro-benchmarks are plain functions registered with @benchmark. Each
+one is calibrated like timeit: the number of calls per round doubles
+until a round takes at least min_round_time, then rounds are repeated
+with the garbage collector paused and timed with perf_counter. Macro
+benchmarks measure themselves and report their own metrics.
+
+Results are written as JSON with the environment they ran in, so two
+files can be compared with compare_results() or "python -m benchmarks
+compare".
+"""
+import asyncio
+import gc
+import inspect
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+RESULTS_SCHEMA_VERSION = 1
+
+# Metric compared for each result and whether a lower value is better
+DEFAULT_COMPARED_METRICS = {"median": True}
+
+
+@dataclass
+class BenchmarkCase:
+    """A registered micro-benchmark."""
+    name: str
+    group: str
+    func: Callable[[], Any]
+    items: int = 1
+
+
+_REGISTRY: Dict[str, BenchmarkCase] = {}
+
+
+def benchmark(name: str, group: str, items: int = 1) -> Callable:
+    """
+    Register a micro-benchmark function.
+    
+    The function takes no arguments and may be a coroutine function.
+    
+    Args:
+        name: Unique benchmark name, e.g. "parser.parse_log_entries[syslog]"
+        group: Group shown in reports, e.g. "parser"
+        items: Number of items (lines, entries) one call handles
+    """
+    def decorator(func: Callable[[], Any]) -> Callable[[], Any]:
+        if name in _REGISTRY:
+            raise ValueError(f"Benchmark {name} is already registered")
+        _REGISTRY[name] = BenchmarkCase(name=name, group=group, func=func, items=items)
+        return func
+    return decorator
+
+
+def registered_benchmarks(name_filter: Optional[str] = None) -> List[BenchmarkCase]:
+    """Get registered benchmarks whose name contains name_filter."""
+    return [case for name, case in _REGISTRY.items() if not name_filter or name_filter in name]
+
+
+def summarize_timings(per_call: Sequence[float], items: int = 1) -> Dict[str, float]:
+    """
+    Summarize per-call timings of a benchmark.
+    
+    Args:
+        per_call: Seconds per call, one value per round
+        items: Number of items one call handles
+        
+    Returns:
+        min, max, mean, median, stddev and iqr in seconds, plus call and
+        item rates derived from the median
+    """
+    values = np.asarray(per_call, dtype=np.float64)
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    return {
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "mean": float(values.mean()),
+        "median": float(median),
+        "stddev": float(values.std(ddof=1)) if values.size > 1 else 0.0,
+        "iqr": float(q3 - q1),
+        "ops_per_second": float(1.0 / median) if median else 0.0,
+        "items_per_second": float(items / median) if median else 0.0
+    }
+
+
+def latency_summary(latencies: Sequence[float]) -> Dict[str, float]:
+    """
+    Summarize latencies in milliseconds.
+    
+    Args:
+        latencies: Latencies in seconds
+        
+    Returns:
+        p50, p95, p99, max and mean in milliseconds (zeros when empty)
+    """
+    values = np.asarray(latencies, dtype=np.float64) * 1000
+    if not values.size:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0, "mean": 0.0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "max": float(values.max()),
+        "mean": float(values.mean())
+    }
+
+
+class BenchmarkRunner:
+    """Calibrates and times registered micro-benchmarks."""
+    
+    def __init__(self, rounds: int = 7, warmup_rounds: int = 1, min_round_time: float = 0.1,
+                 max_calls_per_round: int = 1_000_000, disable_gc: bool = True):
+        """
+        Initialize the runner.
+        
+        Args:
+            rounds: Timed rounds per benchmark
+            warmup_rounds: Untimed rounds run first
+            min_round_time: Seconds a calibrated round must take at least
+            max_calls_per_round: Upper bound for calibration
+            disable_gc: Pause the garbage collector during timed rounds
+        """
+        self.rounds = rounds
+        self.warmup_rounds = warmup_rounds
+        self.min_round_time = min_round_time
+        self.max_calls_per_round = max_calls_per_round
+        self.disable_gc = disable_gc
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+    def _caller(self, case: BenchmarkCase) -> Callable[[], Any]:
+        if not inspect.iscoroutinefunction(case.func):
+            return case.func
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+        loop = self._loop
+        return lambda: loop.run_until_complete(case.func())
+        
+    def _time_round(self, call: Callable[[], Any], calls: int) -> float:
+        gc_was_enabled = gc.isenabled()
+        if self.disable_gc:
+            gc.disable()
+        try:
+            started = time.perf_counter()
+            for _ in range(calls):
+                call()
+            return time.perf_counter() - started
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+                
+    def calibrate(self, call: Callable[[], Any]) -> int:
+        """Find the number of calls per round that takes at least min_round_time."""
+        calls = 1
+        while calls < self.max_calls_per_round:
+            if self._time_round(call, calls) >= self.min_round_time:
+                break
+            calls *= 2
+        return calls
+        
+    def run_case(self, case: BenchmarkCase) -> Dict[str, Any]:
+        """
+        Run one benchmark.
+        
+        Returns:
+            Result dictionary with timing summary and run settings
+        """
+        call = self._caller(case)
+        calls = self.calibrate(call)
+        for _ in range(self.warmup_rounds):
+            self._time_round(call, calls)
+        per_call = [self._time_round(call, calls) / calls for _ in range(self.rounds)]
+        return {
+            "group": case.group,
+            "kind": "micro",
+            "unit": "seconds",
+            "rounds": self.rounds,
+            "calls_per_round": calls,
+            "items": case.items,
+            **summarize_timings(per_call, case.items)
+        }
+        
+    def run(self, cases: Sequence[BenchmarkCase],
+            progress: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Dict[str, Any]]:
+        """Run benchmarks in order and return their results by name."""
+        results = {}
+        try:
+            for case in cases:
+                results[case.name] = self.run_case(case)
+                if progress:
+                    progress(case.name, results[case.name])
+        finally:
+            if self._loop is not None:
+                self._loop.close()
+                self._loop = None
+        return results
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=Path(__file__).resolve().parent
+        )
+        return output.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment_info() -> Dict[str, Any]:
+    """Describe the machine and interpreter the benchmarks ran on."""
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "git_revision": _git_revision()
+    }
+
+
+def build_results(suite: str, benchmarks: Dict[str, Dict[str, Any]], config: Dict[str, Any]) -> Dict[str, Any]:
+    """Wrap benchmark results with the run configuration and environment."""
+    return {
+        "schema_version": RESULTS_SCHEMA_VERSION,
+        "suite": suite,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": environment_info(),
+        "config": config,
+        "benchmarks": benchmarks
+    }
+
+
+def save_results(results: Dict[str, Any], path: Path) -> Path:
+    """Write results as JSON, creating parent directories."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+    return path
+
+
+def load_results(path: Path) -> Dict[str, Any]:
+    """
+    Read a results file.
+    
+    Raises:
+        ValueError: If the file was written with another schema version
+    """
+    results = json.loads(Path(path).read_text())
+    if results.get("schema_version") != RESULTS_SCHEMA_VERSION:
+        raise ValueError(f"Unsupported benchmark results schema in {path}: {results.get('schema_version')}")
+    return results
+
+
+def _metric(result: Dict[str, Any], path: str) -> Optional[float]:
+    value: Any = result
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return float(value) if isinstance(value, (int, float)) else None
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = 0.1) -> List[Dict[str, Any]]:
+    """
+    Compare two results files benchmark by benchmark.
+    
+    Each result names the metrics to compare in "compare" as
+    {metric path: lower is better}; micro-benchmarks compare the median.
+    
+    Args:
+        baseline: Results loaded from the reference run
+        current: Results loaded from the run being checked
+        threshold: Relative change counted as a regression or improvement
+        
+    Returns:
+        One row per benchmark metric present in both runs, with the
+        relative change (positive is worse) and a status of
+        "regression", "improvement" or "unchanged"
+    """
+    rows = []
+    for name, result in current["benchmarks"].items():
+        reference = baseline["benchmarks"].get(name)
+        if reference is None:
+            continue
+        for metric, lower_is_better in result.get("compare", DEFAULT_COMPARED_METRICS).items():
+            before, after = _metric(reference, metric), _metric(result, metric)
+            if before is None or after is None or before == 0:
+                continue
+            change = (after - before) / before
+            if not lower_is_better:
+                change = -change
+            if change > threshold:
+                status = "regression"
+            elif change < -threshold:
+                status = "improvement"
+            else:
+                status = "unchanged"
+            rows.append({
+                "benchmark": name,
+                "metric": metric,
+                "baseline": before,
+                "current": after,
+                "change": change,
+                "status": status
+            })
+    return rows
+
+
+def format_seconds(seconds: float) -> str:
+    """Format a duration with a readable unit."""
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def format_report(results: Dict[str, Any]) -> str:
+    """Render results as a plain-text table."""
+    lines = []
+    width = max((len(name) for name in results["benchmarks"]), default=0)
+    for name, result in results["benchmarks"].items():
+        if result.get("kind") == "micro":
+            lines.append(
+                f"{name:<{width}}  median {format_seconds(result['median']):>10}  "
+                f"iqr {format_seconds(result['iqr']):>10}  {result['items_per_second']:>12,.0f} items/s"
+            )
+        else:
+            latency = result.get("latency_ms", {})
+            lines.append(
+                f"{name:<{width}}  {result.get('lines_per_second', 0.0):>10,.0f} lines/s  "
+                f"p50 {latency.get('p50', 0.0):>8.1f} ms  p99 {latency.get('p99', 0.0):>8.1f} ms  "
+                f"lost {result.get('lines_lost', 0)}"
+            )
+    return "\n".join(lines)
+
+
+def format_comparison(rows: Sequence[Dict[str, Any]]) -> str:
+    """Render compare_results() rows as a plain-text table."""
+    width = max((len(row["benchmark"]) for row in rows), default=0)
+    return "\n".join(
+        f"{row['benchmark']:<{width}}  {row['metric']:<14} {row['baseline']:>12.6g} -> {row['current']:>12.6g}  "
+        f"{row['change']:+7.1%}  {row['status']}"
+        for row in rows
+    )
@@ -0,0 +1,193 @@
+"""
+End-to-end pipeline benchmarks.
+
+A scenario appends a seeded corpus to a log file watched by
+LogFileMonitor and follows every line through the ingestion queue and
+the enhanced processor until its events are committed to a scratch
+SQLite database. Each line carries a sequence tag, so the latency from
+append to commit is measured per line.
+
+AI analysis uses the rule-based fallback: GROQ_API_KEY is unset for the
+run so results do not depend on a remote API.
+"""
+import asyncio
+import os
+import re
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.realtime.enhanced_processor import create_enhanced_processor
+from app.realtime.file_monitor import LogFileMonitor
+from app.realtime.ingestion_queue import LogEntry, RealtimeIngestionQueue
+from app.realtime.models import LogSourceConfig, LogSourceType
+from app.realtime.processing_pipeline import ProcessingResult
+
+from .corpus import DEFAULT_SEED, generate_corpus
+from .harness import latency_summary
+from .scratch import ScratchDatabase
+
+# Tag appended to every line to match commits with appends
+SEQUENCE_TAG = re.compile(r" bench-seq=(\d+)$")
+
+# Metrics compared between runs and whether a lower value is better
+MACRO_COMPARED_METRICS = {"lines_per_second": False, "latency_ms.p99": True}
+
+
+@dataclass
+class PipelineScenario:
+    """An end-to-end run over one corpus."""
+    name: str
+    kind: str
+    rate: float = 0.0  # lines per second; 0 appends as fast as possible
+
+
+SCENARIOS = [
+    PipelineScenario("pipeline.macos_system.burst", "macos_system"),
+    PipelineScenario("pipeline.macos_auth.burst", "macos_auth"),
+    PipelineScenario("pipeline.macos_console.burst", "macos_console"),
+    PipelineScenario("pipeline.syslog.burst", "syslog"),
+    PipelineScenario("pipeline.syslog.paced", "syslog", rate=500.0),
+]
+
+
+def select_scenarios(name_filter: Optional[str] = None) -> List[PipelineScenario]:
+    """Get scenarios whose name contains name_filter."""
+    return [scenario for scenario in SCENARIOS if not name_filter or name_filter in scenario.name]
+
+
+async def run_pipeline_benchmark(
+    kind: str,
+    lines: int = 2000,
+    rate: float = 0.0,
+    seed: int = DEFAULT_SEED,
+    chunk_lines: int = 50,
+    timeout: float = 120.0
+) -> Dict[str, Any]:
+    """
+    Append a corpus to a watched file and time it through to the database.
+    
+    Args:
+        kind: Corpus kind
+        lines: Number of lines to append
+        rate: Lines per second to append at; 0 appends as fast as possible
+        seed: Corpus seed
+        chunk_lines: Lines written per append
+        timeout: Seconds to wait for the pipeline to drain
+        
+    Returns:
+        Result dictionary with throughput, append-to-commit latency and
+        the number of lines that were not committed
+    """
+    corpus = generate_corpus(kind, lines, seed)
+    appended_at: List[float] = [0.0] * lines
+    latencies: List[float] = []
+    failed = 0
+    done = asyncio.Event()
+    
+    def on_processed(entry: LogEntry, result: ProcessingResult) -> None:
+        nonlocal failed
+        match = SEQUENCE_TAG.search(entry.content)
+        if not match:
+            return
+        if result.success:
+            latencies.append(time.perf_counter() - appended_at[int(match.group(1))])
+        else:
+            failed += 1
+        if len(latencies) + failed >= lines:
+            done.set()
+            
+    saved_api_key = os.environ.pop("GROQ_API_KEY", None)
+    try:
+        with tempfile.TemporaryDirectory(prefix="threatlens-bench-") as directory, ScratchDatabase(directory, "benchmark.db"):
+            log_path = Path(directory) / f"{kind}.log"
+            log_path.touch()
+            
+            queue = RealtimeIngestionQueue(max_queue_size=max(10000, lines * 2), batch_size=100, batch_timeout=0.5)
+            monitor = LogFileMonitor()
+            monitor.add_log_source(LogSourceConfig(
+                source_name=f"bench-{kind}", path=str(log_path), source_type=LogSourceType.FILE
+            ))
+            monitor.add_log_entry_callback(queue.enqueue_log_entry)
+            
+            await queue.start()
+            processor = await create_enhanced_processor(queue)
+            processor.add_processing_callback(on_processed)
+            await monitor.start()
+            try:
+                started = time.perf_counter()
+                with open(log_path, "a", encoding="utf-8") as log_file:
+                    for first in range(0, lines, chunk_lines):
+                        if rate:
+                            delay = started + first / rate - time.perf_counter()
+                            if delay > 0:
+                                await asyncio.sleep(delay)
+                        chunk = range(first, min(first + chunk_lines, lines))
+                        log_file.write("".join(f"{corpus[seq]} bench-seq={seq}\n" for seq in chunk))
+                        log_file.flush()
+                        now = time.perf_counter()
+                        for seq in chunk:
+                            appended_at[seq] = now
+                        # Let the monitor and processor run between appends
+                        await asyncio.sleep(0)
+                try:
+                    await asyncio.wait_for(done.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                duration = time.perf_counter() - started
+            finally:
+                await monitor.stop()
+                await processor.stop()
+                await queue.stop()
+    finally:
+        if saved_api_key is not None:
+            os.environ["GROQ_API_KEY"] = saved_api_key
+            
+    committed = len(latencies)
+    return {
+        "group": "pipeline",
+        "kind": "macro",
+        "corpus": kind,
+        "seed": seed,
+        "rate": rate,
+        "lines": lines,
+        "lines_committed": committed,
+        "lines_failed": failed,
+        "lines_lost": lines - committed - failed,
+        "duration": duration,
+        "lines_per_second": committed / duration if duration else 0.0,
+        "latency_ms": latency_summary(latencies),
+        "compare": MACRO_COMPARED_METRICS
+    }
+
+
+def run_scenarios(
+    scenarios: List[PipelineScenario],
+    lines: int = 2000,
+    seed: int = DEFAULT_SEED,
+    rate: Optional[float] = None,
+    progress=None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Run pipeline scenarios one after another, each on a fresh event loop.
+    
+    Args:
+        scenarios: Scenarios to run
+        lines: Lines per scenario
+        seed: Corpus seed
+        rate: Override the append rate of every scenario
+        progress: Called with (name, result) after each scenario
+        
+    Returns:
+        Results by scenario name
+    """
+    results = {}
+    for scenario in scenarios:
+        results[scenario.name] = asyncio.run(run_pipeline_benchmark(
+            scenario.kind, lines=lines, rate=scenario.rate if rate is None else rate, seed=seed
+        ))
+        if progress:
+            progress(scenario.name, results[scenario.name])
+    return results
@@ -0,0 +1,108 @@
+"""
+Micro-benchmarks for the log processing hot paths.
+
+Each benchmark handles MICRO_LINES lines of a seeded corpus per call, so
+items_per_second reads as lines per second. Importing this module
+registers the benchmarks with the harness.
+"""
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+from app.parser import LogParser
+from app.realtime.format_detector import LogFormatDetector
+from app.realtime.ingestion_queue import LogEntry, ProcessingStatus, RealtimeIngestionQueue
+from app.realtime.processing_pipeline import sanitize_log_entry, validate_log_entry
+from app.validation import sanitize_log_content
+
+from .corpus import CORPORA, DEFAULT_SEED, generate_corpus, with_noise
+from .harness import benchmark
+
+MICRO_LINES = 1000
+
+# format_detector reads this many lines to detect a format
+DETECTION_SAMPLE_LINES = 20
+
+CORPUS = {kind: generate_corpus(kind, MICRO_LINES, DEFAULT_SEED) for kind in CORPORA}
+CONTENT = {kind: "\n".join(lines) for kind, lines in CORPUS.items()}
+NOISY_LINES = with_noise(CORPUS["syslog"], ratio=0.2, seed=DEFAULT_SEED)
+
+
+def _entries(lines: List[str], source_name: str) -> List[LogEntry]:
+    timestamp = datetime.now(timezone.utc)
+    return [
+        LogEntry(content=line, source_path=f"/var/log/{source_name}.log", source_name=source_name,
+                 timestamp=timestamp, file_offset=offset)
+        for offset, line in enumerate(lines)
+    ]
+
+
+def _categorize_inputs() -> List[Tuple[str, str]]:
+    # (message, source) pairs as the parsers pass them to _categorize_event
+    events = LogParser().parse_log_entries(CONTENT["macos_system"], "benchmark")
+    events += LogParser().parse_log_entries(CONTENT["syslog"], "benchmark")
+    return [(event.message, event.source) for event in events]
+
+
+CATEGORIZE_INPUTS = _categorize_inputs()
+NOISY_ENTRIES = _entries(NOISY_LINES, "noisy")
+QUEUE_ENTRIES = _entries(CORPUS["syslog"], "syslog")
+
+
+def _register_parser_benchmarks(kind: str) -> None:
+    content = CONTENT[kind]
+    lines = CORPUS[kind]
+    
+    @benchmark(f"parser.parse_log_entries[{kind}]", group="parser", items=MICRO_LINES)
+    def parse_log_entries():
+        LogParser().parse_log_entries(content, "benchmark")
+        
+    @benchmark(f"format_detector.analyze_log_sample[{kind}]", group="format_detector",
+               items=DETECTION_SAMPLE_LINES)
+    def analyze_log_sample():
+        LogFormatDetector().analyze_log_sample(lines[:DETECTION_SAMPLE_LINES])
+        
+    @benchmark(f"format_detector.parse_with_detected_format[{kind}]", group="format_detector",
+               items=MICRO_LINES)
+    def parse_with_detected_format():
+        LogFormatDetector().parse_with_detected_format(content, "benchmark")
+
+
+for _kind in CORPORA:
+    _register_parser_benchmarks(_kind)
+
+
+@benchmark("parser.categorize_event", group="parser", items=len(CATEGORIZE_INPUTS))
+def categorize_event():
+    categorize = LogParser()._categorize_event
+    for message, source in CATEGORIZE_INPUTS:
+        categorize(message, source)
+
+
+@benchmark("validation.sanitize_log_content[noisy]", group="sanitizers", items=MICRO_LINES)
+def sanitize_content():
+    sanitize_log_content("\n".join(NOISY_LINES))
+
+
+@benchmark("processing_pipeline.validate_log_entry[noisy]", group="sanitizers", items=MICRO_LINES)
+def validate_entries():
+    for entry in NOISY_ENTRIES:
+        validate_log_entry(entry)
+
+
+@benchmark("processing_pipeline.sanitize_log_entry[noisy]", group="sanitizers", items=MICRO_LINES)
+def sanitize_entries():
+    for entry in NOISY_ENTRIES:
+        sanitize_log_entry(entry)
+
+
+@benchmark("ingestion_queue.enqueue_and_collect", group="queue", items=MICRO_LINES)
+async def enqueue_and_collect():
+    # Enqueue and batch collection without the background processing loop
+    queue = RealtimeIngestionQueue(max_queue_size=MICRO_LINES * 2, batch_size=100)
+    queue.is_running = True
+    for entry in QUEUE_ENTRIES:
+        entry.status = ProcessingStatus.PENDING
+        await queue.enqueue_log_entry(entry)
+    while await queue._collect_batch():
+        pass
+
@@ -0,0 +1,46 @@
+"""
+Scratch SQLite database for benchmarks and tests.
+"""
+import os
+from typing import Any, Dict
+
+import app.async_database as async_database
+import app.database as database
+from app.models import Base
+
+_DATABASE_GLOBALS = ("engine", "SessionLocal", "write_engine", "read_engine",
+                     "WriteSessionLocal", "ReadSessionLocal")
+_ASYNC_DATABASE_GLOBALS = ("async_read_engine", "async_write_engine",
+                           "AsyncReadSessionLocal", "AsyncWriteSessionLocal")
+
+
+class ScratchDatabase:
+    """Points the database modules at a fresh SQLite file and restores them.
+    
+    Async engines opened inside the block are not disposed on exit; close
+    them with close_async_database_connections on the loop that used them.
+    """
+    
+    def __init__(self, directory: str, filename: str = "scratch.db"):
+        self.path = os.path.join(directory, filename)
+        self.url = f"sqlite:///{self.path}"
+        self._saved: Dict[Any, Dict[str, Any]] = {}
+        
+    def __enter__(self) -> "ScratchDatabase":
+        self._saved = {
+            database: {name: getattr(database, name) for name in ("DATABASE_URL",) + _DATABASE_GLOBALS},
+            async_database: {name: getattr(async_database, name) for name in _ASYNC_DATABASE_GLOBALS}
+        }
+        database.DATABASE_URL = self.url
+        for name in _DATABASE_GLOBALS:
+            setattr(database, name, None)
+        for name in _ASYNC_DATABASE_GLOBALS:
+            setattr(async_database, name, None)
+        Base.metadata.create_all(bind=database.create_database_engine())
+        return self
+        
+    def __exit__(self, *exc_info) -> None:
+        database.close_database_connections()
+        for module, values in self._saved.items():
+            for name, value in values.items():
+                setattr(module, name, value)
@@ -4,6 +4,7 @@ ThreatLens FastAPI Application
 Main FastAPI application providing REST API endpoints for security log analysis.
 Includes log ingestion, event retrieval, and automated processing capabilities.
 """
+import asyncio
 import logging
 import os
 import time
@@ -12,12 +13,14 @@ from datetime import datetime, timezone, date
 from typing import List, Optional, Dict, Any
 from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Query, BackgroundTasks, WebSocket, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, Response
+from fastapi.responses import JSONResponse, FileResponse
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import text, and_, or_, desc, asc
+from sqlalchemy import text, and_, or_, desc, asc, select, func
+from sqlalchemy.orm import contains_eager
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Import error handling and logging
 from app.logging_config import setup_logging, get_logger, set_correlation_id, generate_correlation_id
@@ -28,24 +31,27 @@ from app.error_handling import (
     ThreatLensError
 )
 from app.middleware import (
-    CorrelationIdMiddleware,
-    RequestLoggingMiddleware,
-    SecurityHeadersMiddleware,
-    RateLimitMiddleware,
-    InputValidationMiddleware,
-    MetricsMiddleware,
+    RequestPipelineMiddleware,
+    RequestMetrics,
     set_metrics_middleware
 )
 from app.health_endpoints import health_router
+from app.startup import startup_timer
 
 from app.database import (
     get_database_session, 
+    get_read_database_session,
     get_db_session,
     init_database, 
     check_database_health,
-    get_database_stats,
     close_database_connections
 )
+from app.async_database import (
+    get_async_read_session,
+    async_read_session,
+    get_database_stats_async,
+    close_async_database_connections
+)
 from app.models import RawLog, Event, AIAnalysis as AIAnalysisModel
 from app.schemas import (
     IngestionRequest, 
@@ -62,16 +68,19 @@ from app.schemas import (
 from app.ingestion import ingest_log_file, ingest_log_text, IngestionError
 from app.parser import parse_log_entries, ParsingError
 from app.analyzer import analyze_event, AnalysisError
-from app.report_generator import generate_daily_report, save_report_record
+from app.report_generator import save_report_record
+from app.report_cache import get_report_cache
 from app.scheduler import (
     start_scheduled_reports, 
     stop_scheduled_reports, 
     get_scheduler_status,
     get_audit_log,
     trigger_manual_report,
+    backfill_reports,
     get_report_files_info
 )
 from app.realtime.event_loop import realtime_manager
+from app.realtime.audit import get_audit_logger
 from app.realtime.config_manager import get_config_manager
 from app.realtime.models import LogSourceConfig, LogSourceType, MonitoringStatus
 from app.realtime.websocket_api import WebSocketAPI
@@ -92,30 +101,12 @@ setup_logging(
 logger = get_logger(__name__)
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Application lifespan manager for startup and shutdown events."""
-    # Startup
-    logger.info("Starting ThreatLens API server...")
-    
-    # Initialize database
-    if not init_database():
-        logger.error("Failed to initialize database")
-        raise RuntimeError("Database initialization failed")
-    
-    logger.info("Database initialized successfully")
-    
-    # Start scheduled report generation
-    try:
-        start_scheduled_reports()
-        logger.info("Scheduled report generation started")
-    except Exception as e:
-        logger.error(f"Failed to start scheduled reports: {str(e)}")
-        # Don't fail startup if scheduler fails
-    
+async def _start_realtime_and_health_monitoring() -> None:
+    """Start real-time components, then health monitoring for them."""
     # Start real-time components
     try:
-        await realtime_manager.start_all()
+        with startup_timer.phase("realtime_components"):
+            await realtime_manager.start_all()
         logger.info("Real-time components started")
     except Exception as e:
         logger.error(f"Failed to start real-time components: {str(e)}")
@@ -123,30 +114,74 @@ async def lifespan(app: FastAPI):
     
     # Start health monitoring
     try:
-        from app.realtime.health_monitor import health_monitor
-        from app.realtime.health_checks import register_all_health_checks
-        
-        # Register health checks for real-time components
-        components = {
-            'file_monitor': getattr(realtime_manager, 'file_monitor', None),
-            'ingestion_queue': getattr(realtime_manager, 'ingestion_queue', None),
-            'websocket_manager': getattr(realtime_manager, 'websocket_manager', None),
-            'enhanced_processor': getattr(realtime_manager, 'enhanced_processor', None)
-        }
-        
-        # Filter out None components
-        available_components = {k: v for k, v in components.items() if v is not None}
-        
-        if available_components:
-            register_all_health_checks(health_monitor, available_components)
-            await health_monitor.start_monitoring()
-            logger.info("Health monitoring started")
-        else:
-            logger.warning("No real-time components available for health monitoring")
+        with startup_timer.phase("health_monitoring"):
+            from app.realtime.health_monitor import health_monitor
+            from app.realtime.health_checks import register_all_health_checks
+            
+            # Register health checks for real-time components
+            components = {
+                'file_monitor': getattr(realtime_manager, 'file_monitor', None),
+                'ingestion_queue': getattr(realtime_manager, 'ingestion_queue', None),
+                'websocket_manager': getattr(realtime_manager, 'websocket_manager', None),
+                'enhanced_processor': getattr(realtime_manager, 'enhanced_processor', None)
+            }
             
+            # Filter out None components
+            available_components = {k: v for k, v in components.items() if v is not None}
+            
+            if available_components:
+                register_all_health_checks(health_monitor, available_components)
+                await health_monitor.start_monitoring()
+                logger.info("Health monitoring started")
+            else:
+                logger.warning("No real-time components available for health monitoring")
+                
     except Exception as e:
         logger.error(f"Failed to start health monitoring: {str(e)}")
         # Don't fail startup if health monitoring fails
+
+
+def _start_scheduler() -> None:
+    """
+    Start scheduled report generation.
+    
+    AsyncIOScheduler.start only registers its jobs on the running loop, so
+    this is quick and must run on the event loop thread.
+    """
+    try:
+        with startup_timer.phase("scheduler"):
+            start_scheduled_reports()
+        logger.info("Scheduled report generation started")
+    except Exception as e:
+        logger.error(f"Failed to start scheduled reports: {str(e)}")
+        # Don't fail startup if scheduler fails
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan manager for startup and shutdown events."""
+    # Startup
+    logger.info("Starting ThreatLens API server...")
+    
+    # Initialize database; everything else depends on the schema
+    with startup_timer.phase("database"):
+        database_ready = init_database()
+    if not database_ready:
+        logger.error("Failed to initialize database")
+        raise RuntimeError("Database initialization failed")
+    
+    logger.info("Database initialized successfully")
+    
+    # These phases run in order; only the realtime components registered
+    # with realtime_manager start concurrently with each other
+    _start_scheduler()
+    await _start_realtime_and_health_monitoring()
+    
+    startup_report = startup_timer.finish()
+    logger.info(
+        f"ThreatLens API ready in {startup_report['ready_seconds']:.2f}s",
+        extra={'startup_report': startup_report}
+    )
     
     yield
     
@@ -175,6 +210,14 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"Error stopping health monitoring: {str(e)}")
     
+    # Write out queued audit entries before the database connections close
+    try:
+        await asyncio.to_thread(get_audit_logger().close)
+        logger.info("Audit writer stopped")
+    except Exception as e:
+        logger.error(f"Error stopping audit writer: {str(e)}")
+    
+    await close_async_database_connections()
     close_database_connections()
 
 
@@ -193,18 +236,21 @@ app.add_exception_handler(Exception, global_exception_handler)
 app.add_exception_handler(HTTPException, http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 
-# Add middleware (order matters - first added is outermost)
-app.add_middleware(SecurityHeadersMiddleware, strict_csp=False)  # Set to True for production
-app.add_middleware(InputValidationMiddleware, max_request_size=50 * 1024 * 1024)
-app.add_middleware(RateLimitMiddleware, requests_per_minute=1000, burst_limit=100, block_duration=60)
-
-# Create and add metrics middleware
-metrics_middleware = MetricsMiddleware(app)
-app.add_middleware(MetricsMiddleware)
-set_metrics_middleware(metrics_middleware)
-
-app.add_middleware(RequestLoggingMiddleware, log_body=False, max_body_size=1024)
-app.add_middleware(CorrelationIdMiddleware)
+# Correlation IDs, security headers, input validation, rate limiting, metrics
+# and request logging run in one pure-ASGI pass (toggled via MIDDLEWARE_*)
+request_metrics = RequestMetrics()
+set_metrics_middleware(request_metrics)
+app.add_middleware(
+    RequestPipelineMiddleware,
+    strict_csp=False,  # Set to True for production
+    max_request_size=50 * 1024 * 1024,
+    requests_per_minute=1000,
+    burst_limit=100,
+    block_duration=60,
+    metrics=request_metrics,
+    log_body=False,
+    max_body_size=1024
+)
 
 # Configure CORS middleware
 app.add_middleware(
@@ -415,7 +461,7 @@ async def get_events(
     source: Optional[str] = Query(None, description="Filter by source"),
     sort_by: str = Query("timestamp", description="Sort field (timestamp, severity, source, category)"),
     sort_order: str = Query("desc", description="Sort order (asc, desc)"),
-    db: Session = Depends(get_database_session)
+    db: AsyncSession = Depends(get_async_read_session)
 ):
     """
     Retrieve paginated list of security events with filtering and sorting.
@@ -469,7 +515,7 @@ async def get_events(
             )
         
         # Build base query
-        query = db.query(Event).outerjoin(AIAnalysisModel)
+        query = select(Event).outerjoin(AIAnalysisModel).options(contains_eager(Event.ai_analysis))
         
         # Apply filters
         filters = []
@@ -493,10 +539,12 @@ async def get_events(
             filters.append(AIAnalysisModel.severity_score <= max_severity)
         
         if filters:
-            query = query.filter(and_(*filters))
+            query = query.where(and_(*filters))
         
         # Get total count for pagination
-        total = query.count()
+        total = (await db.execute(
+            select(func.count()).select_from(query.order_by(None).subquery())
+        )).scalar_one()
         
         # Apply sorting
         if sort_by == "timestamp":
@@ -515,7 +563,7 @@ async def get_events(
         
         # Apply pagination
         offset = (page - 1) * per_page
-        events = query.offset(offset).limit(per_page).all()
+        events = (await db.execute(query.offset(offset).limit(per_page))).unique().scalars().all()
         
         # Convert to response format
         event_responses = []
@@ -571,7 +619,7 @@ async def get_events(
 @app.get("/event/{event_id}", response_model=EventResponse)
 async def get_event_detail(
     event_id: str,
-    db: Session = Depends(get_database_session)
+    db: AsyncSession = Depends(get_async_read_session)
 ):
     """
     Retrieve detailed information for a specific event.
@@ -588,7 +636,13 @@ async def get_event_detail(
     """
     try:
         # Query event with AI analysis
-        event = db.query(Event).outerjoin(AIAnalysisModel).filter(Event.id == event_id).first()
+        result = await db.execute(
+            select(Event)
+            .outerjoin(AIAnalysisModel)
+            .options(contains_eager(Event.ai_analysis))
+            .where(Event.id == event_id)
+        )
+        event = result.unique().scalars().first()
         
         if not event:
             raise HTTPException(
@@ -641,7 +695,7 @@ async def get_system_stats():
         Dictionary with system statistics
     """
     try:
-        db_stats = get_database_stats()
+        db_stats = await get_database_stats_async()
         processing_stats = get_processing_stats()
         
         # Add additional stats
@@ -770,6 +824,38 @@ async def trigger_manual_report_endpoint(
         raise HTTPException(status_code=500, detail=f"Failed to trigger manual report: {str(e)}")
 
 
+@app.post("/scheduler/backfill-reports", response_model=Dict[str, Any])
+async def backfill_reports_endpoint(
+    start_date: date = Query(..., description="First date to render (inclusive)"),
+    end_date: date = Query(..., description="Last date to render (inclusive)"),
+    max_workers: Optional[int] = Query(None, ge=1, le=32, description="Worker processes to use")
+):
+    """
+    Render daily reports for a range of past dates in parallel.
+    
+    Days whose stored report is still current are returned from the cache.
+    
+    Args:
+        start_date: First date to render
+        end_date: Last date to render
+        max_workers: Optional number of worker processes
+        
+    Returns:
+        Backfill results per date
+    """
+    if end_date > date.today():
+        raise HTTPException(status_code=400, detail="Report date cannot be in the future")
+    
+    try:
+        return await asyncio.to_thread(backfill_reports, start_date, end_date, max_workers)
+        
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to backfill reports: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to backfill reports: {str(e)}")
+
+
 @app.get("/reports/files", response_model=List[Dict[str, Any]])
 async def get_report_files():
     """
@@ -806,6 +892,14 @@ async def get_realtime_status():
 
 # WebSocket endpoints
 
+def _parse_last_seq(query_params: Dict[str, str]) -> Optional[int]:
+    """Read the replay position a reconnecting client sent, if any."""
+    try:
+        return int(query_params["last_seq"])
+    except (KeyError, ValueError):
+        return None
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """
@@ -823,9 +917,10 @@ async def websocket_endpoint(websocket: WebSocket):
         # Extract token from query parameters
         query_params = dict(websocket.query_params)
         token = query_params.get("token")
+        last_seq = _parse_last_seq(query_params)
         
         # Handle connection with authentication
-        await websocket_api.handle_websocket_connection(websocket, token=token)
+        await websocket_api.handle_websocket_connection(websocket, token=token, last_seq=last_seq)
         
     except Exception as e:
         logger.error(f"WebSocket endpoint error: {e}")
@@ -859,9 +954,10 @@ async def websocket_endpoint_with_id(websocket: WebSocket, client_id: str):
         # Extract token from query parameters
         query_params = dict(websocket.query_params)
         token = query_params.get("token")
+        last_seq = _parse_last_seq(query_params)
         
         # Handle connection with specific client ID and authentication
-        await websocket_api.handle_websocket_connection(websocket, client_id, token)
+        await websocket_api.handle_websocket_connection(websocket, client_id, token, last_seq)
         
     except Exception as e:
         logger.error(f"WebSocket endpoint error for client {client_id}: {e}")
@@ -926,24 +1022,25 @@ async def generate_daily_report_endpoint(
         
         logger.info(f"Generating daily report for {report_date}")
         
-        # Generate the report
-        file_path, pdf_bytes = generate_daily_report(report_date)
-        
-        # Save report record to database
-        report_id = save_report_record(db, report_date, file_path)
+        # Reuse the stored report unless the day's data changed; the response
+        # streams it back from the file
+        cached_report = get_report_cache().get_or_generate(report_date)
+        file_path = cached_report.file_path
         
-        logger.info(f"Daily report generated successfully: {report_id}")
+        if cached_report.cache_hit:
+            logger.info(f"Serving cached daily report for {report_date}")
+        else:
+            # Save report record to database
+            report_id = save_report_record(db, report_date, file_path)
+            logger.info(f"Daily report generated successfully: {report_id}")
         
         # Return PDF as response
         filename = f"security_report_{report_date.strftime('%Y%m%d')}.pdf"
         
-        return Response(
-            content=pdf_bytes,
+        return FileResponse(
+            file_path,
             media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}",
-                "Content-Type": "application/pdf"
-            }
+            filename=filename
         )
         
     except HTTPException:
@@ -989,7 +1086,7 @@ async def get_api_metrics():
 
 
 @app.get("/demo/status", response_model=Dict[str, Any])
-async def get_demo_status(db: Session = Depends(get_database_session)):
+async def get_demo_status(db: Session = Depends(get_read_database_session)):
     """
     Get demo mode status and available demo data.
     
@@ -1039,7 +1136,7 @@ async def get_demo_status(db: Session = Depends(get_database_session)):
 @app.get("/demo/comparison/{event_id}", response_model=Dict[str, Any])
 async def get_demo_comparison(
     event_id: str,
-    db: Session = Depends(get_database_session)
+    db: Session = Depends(get_read_database_session)
 ):
     """
     Get raw vs analyzed comparison for a specific event.
@@ -1241,7 +1338,7 @@ async def get_monitoring_config():
     """
     try:
         config_manager = get_config_manager()
-        config = config_manager.load_config()
+        config = await config_manager.load_config_async()
         
         # Convert to response format
         log_sources = []
@@ -1276,6 +1373,7 @@ async def get_monitoring_config():
                 sources=rule.sources,
                 channels=[ch.value for ch in rule.channels],
                 throttle_minutes=rule.throttle_minutes,
+                digest=rule.digest,
                 email_recipients=rule.email_recipients,
                 webhook_url=rule.webhook_url,
                 slack_channel=rule.slack_channel
@@ -1313,7 +1411,7 @@ async def get_config_summary():
     """
     try:
         config_manager = get_config_manager()
-        summary = config_manager.get_configuration_summary()
+        summary = config_manager.get_configuration_summary(await config_manager.load_config_async())
         return summary
         
     except Exception as e:
@@ -1331,7 +1429,7 @@ async def get_log_sources():
     """
     try:
         config_manager = get_config_manager()
-        sources = config_manager.get_log_sources()
+        sources = (await config_manager.load_config_async()).log_sources
         
         response_sources = []
         for source in sources:
@@ -1374,7 +1472,7 @@ async def get_log_source(source_name: str):
     """
     try:
         config_manager = get_config_manager()
-        source = config_manager.get_log_source(source_name)
+        source = (await config_manager.load_config_async()).get_log_source(source_name)
         
         if not source:
             raise HTTPException(status_code=404, detail=f"Log source '{source_name}' not found")
@@ -1435,13 +1533,13 @@ async def create_log_source(request: LogSourceConfigRequest):
         )
         
         # Add the source
-        success = config_manager.add_log_source(source_config)
+        success = await asyncio.to_thread(config_manager.add_log_source, source_config)
         
         if not success:
             raise HTTPException(status_code=400, detail="Failed to add log source")
         
         # Return the created source
-        created_source = config_manager.get_log_source(request.source_name)
+        created_source = (await config_manager.load_config_async()).get_log_source(request.source_name)
         
         return LogSourceConfigResponse(
             source_name=created_source.source_name,
@@ -1500,13 +1598,13 @@ async def update_log_source(source_name: str, request: LogSourceConfigRequest):
         )
         
         # Update the source
-        success = config_manager.update_log_source(source_name, updated_config)
+        success = await asyncio.to_thread(config_manager.update_log_source, source_name, updated_config)
         
         if not success:
             raise HTTPException(status_code=404, detail=f"Log source '{source_name}' not found")
         
         # Return the updated source
-        updated_source = config_manager.get_log_source(request.source_name)
+        updated_source = (await config_manager.load_config_async()).get_log_source(request.source_name)
         
         return LogSourceConfigResponse(
             source_name=updated_source.source_name,
@@ -1548,7 +1646,7 @@ async def delete_log_source(source_name: str):
     try:
         config_manager = get_config_manager()
         
-        success = config_manager.remove_log_source(source_name)
+        success = await asyncio.to_thread(config_manager.remove_log_source, source_name)
         
         if not success:
             raise HTTPException(status_code=404, detail=f"Log source '{source_name}' not found")
@@ -1577,7 +1675,7 @@ async def test_log_source(source_name: str):
         config_manager = get_config_manager()
         
         # Get the log source configuration
-        log_sources = config_manager.get_log_sources()
+        log_sources = (await config_manager.load_config_async()).log_sources
         source_config = None
         for source in log_sources:
             if source.source_name == source_name:
@@ -1679,7 +1777,7 @@ async def validate_config():
     """
     try:
         config_manager = get_config_manager()
-        issues = config_manager.validate_configuration()
+        issues = config_manager.validate_configuration(await config_manager.load_config_async())
         
         return {
             "valid": len(issues) == 0,
@@ -1705,7 +1803,7 @@ async def get_notification_rules():
     """
     try:
         config_manager = get_config_manager()
-        config = config_manager.load_config()
+        config = await config_manager.load_config_async()
         
         return config.notification_rules
         
@@ -1727,7 +1825,7 @@ async def get_notification_rule(rule_name: str):
     """
     try:
         config_manager = get_config_manager()
-        config = config_manager.load_config()
+        config = await config_manager.load_config_async()
         
         for rule in config.notification_rules:
             if rule.rule_name == rule_name:
@@ -1755,7 +1853,7 @@ async def create_notification_rule(request: NotificationRuleRequest):
     """
     try:
         config_manager = get_config_manager()
-        config = config_manager.load_config()
+        config = await config_manager.load_config_async()
         
         # Check if rule name already exists
         for existing_rule in config.notification_rules:
@@ -1773,6 +1871,7 @@ async def create_notification_rule(request: NotificationRuleRequest):
             sources=request.sources,
             channels=request.channels,
             throttle_minutes=request.throttle_minutes,
+            digest=request.digest,
             email_recipients=request.email_recipients,
             webhook_url=request.webhook_url,
             slack_channel=request.slack_channel
@@ -1782,7 +1881,7 @@ async def create_notification_rule(request: NotificationRuleRequest):
         config.notification_rules.append(new_rule)
         
         # Save configuration
-        success = config_manager.save_config(config)
+        success = await asyncio.to_thread(config_manager.save_config, config)
         if not success:
             raise HTTPException(status_code=500, detail="Failed to save notification rule configuration")
         
@@ -1810,7 +1909,7 @@ async def update_notification_rule(rule_name: str, request: NotificationRuleRequ
     """
     try:
         config_manager = get_config_manager()
-        config = config_manager.load_config()
+        config = await config_manager.load_config_async()
         
         # Find the rule to update
         rule_index = None
@@ -1839,6 +1938,7 @@ async def update_notification_rule(rule_name: str, request: NotificationRuleRequ
             sources=request.sources,
             channels=request.channels,
             throttle_minutes=request.throttle_minutes,
+            digest=request.digest,
             email_recipients=request.email_recipients,
             webhook_url=request.webhook_url,
             slack_channel=request.slack_channel
@@ -1847,7 +1947,7 @@ async def update_notification_rule(rule_name: str, request: NotificationRuleRequ
         config.notification_rules[rule_index] = updated_rule
         
         # Save configuration
-        success = config_manager.save_config(config)
+        success = await asyncio.to_thread(config_manager.save_config, config)
         if not success:
             raise HTTPException(status_code=500, detail="Failed to save notification rule configuration")
         
@@ -1874,7 +1974,7 @@ async def delete_notification_rule(rule_name: str):
     """
     try:
         config_manager = get_config_manager()
-        config = config_manager.load_config()
+        config = await config_manager.load_config_async()
         
         # Find and remove the rule
         original_count = len(config.notification_rules)
@@ -1884,7 +1984,7 @@ async def delete_notification_rule(rule_name: str):
             raise HTTPException(status_code=404, detail=f"Notification rule '{rule_name}' not found")
         
         # Save configuration
-        success = config_manager.save_config(config)
+        success = await asyncio.to_thread(config_manager.save_config, config)
         if not success:
             raise HTTPException(status_code=500, detail="Failed to save notification rule configuration")
         
@@ -1912,7 +2012,7 @@ async def test_notification_rule(rule_name: str, test_data: Dict[str, Any]):
     """
     try:
         config_manager = get_config_manager()
-        config = config_manager.load_config()
+        config = await config_manager.load_config_async()
         
         # Find the rule
         rule = None
@@ -1984,13 +2084,15 @@ async def get_notification_history(limit: int = 50):
     """
     try:
         # Get notification history from database
-        with get_db_session() as db:
+        async with async_read_session() as db:
             from app.models import NotificationHistory
             
-            history_records = db.query(NotificationHistory)\
-                .order_by(NotificationHistory.sent_at.desc())\
-                .limit(limit)\
-                .all()
+            result = await db.execute(
+                select(NotificationHistory)
+                .order_by(NotificationHistory.sent_at.desc())
+                .limit(limit)
+            )
+            history_records = result.scalars().all()
             
             history_data = []
             for record in history_records:
@@ -2019,11 +2121,14 @@ if __name__ == "__main__":
     host = os.getenv("HOST", "127.0.0.1")
     port = int(os.getenv("PORT", "8000"))
     debug = os.getenv("DEBUG", "false").lower() == "true"
+    # Compress WebSocket frames; batched processing updates are highly repetitive JSON
+    ws_deflate = os.getenv("WS_PER_MESSAGE_DEFLATE", "true").lower() == "true"
     
     uvicorn.run(
         "main:app",
         host=host,
         port=port,
         reload=debug,
-        log_level="info"
+        log_level="info",
+        ws_per_message_deflate=ws_deflate
     )
\ No newline at end of file
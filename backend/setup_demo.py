@@ -28,7 +28,7 @@ class DemoSetup:
         checks = {}
         
         # Check Python version
-        checks["python_version"] = sys.version_info >= (3, 8)
+        checks["python_version"] = sys.version_info >= (3, 11)
         
         # Check if virtual environment is active
         checks["virtual_env"] = hasattr(sys, 'real_prefix') or (
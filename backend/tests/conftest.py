@@ -0,0 +1,13 @@
+"""
+Shared fixtures for the backend tests.
+"""
+import pytest
+
+from benchmarks.scratch import ScratchDatabase
+
+
+@pytest.fixture
+def scratch_db(tmp_path):
+    """Point the database modules at a fresh SQLite file with empty engine globals."""
+    with ScratchDatabase(str(tmp_path)) as scratch:
+        yield scratch
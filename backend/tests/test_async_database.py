@@ -0,0 +1,146 @@
+"""
+Tests for the async database access layer.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+
+import app.async_database as async_database
+import app.database as database
+from app.models import RawLog
+from app.realtime.config_manager import ConfigManager
+from app.realtime.models import LogSourceConfig
+
+
+class TestAsyncUrl:
+    """Test conversion of sync URLs to async driver URLs."""
+    
+    def test_to_async_url(self):
+        assert async_database.to_async_url("sqlite:///./data/threatlens.db") == "sqlite+aiosqlite:///./data/threatlens.db"
+        assert async_database.to_async_url("postgresql://u:p@host/db") == "postgresql+asyncpg://u:p@host/db"
+        assert async_database.to_async_url("postgresql+psycopg2://u@host/db") == "postgresql+asyncpg://u@host/db"
+        assert async_database.to_async_url("mysql://u@host/db") == "mysql://u@host/db"
+
+
+class TestAsyncSessions:
+    """Test the async reader and writer sessions."""
+    
+    @pytest.mark.asyncio
+    async def test_write_then_read(self, scratch_db):
+        async with async_database.async_write_session() as db:
+            db.add(RawLog(id="a1", content="content", source="async"))
+            
+        async with async_database.async_read_session() as db:
+            result = await db.execute(select(RawLog).where(RawLog.id == "a1"))
+            assert result.scalars().one().source == "async"
+            
+        stats = await async_database.get_database_stats_async()
+        assert stats["raw_logs_count"] == 1
+        assert stats["error"] is None
+        
+        await async_database.close_async_database_connections()
+        
+    @pytest.mark.asyncio
+    async def test_read_session_is_read_only(self, scratch_db):
+        with pytest.raises(OperationalError):
+            async with async_database.async_read_session() as db:
+                await db.execute(text(
+                    "INSERT INTO raw_logs (id, content, source) VALUES ('r1', 'c', 's')"
+                ))
+                
+        await async_database.close_async_database_connections()
+        
+    @pytest.mark.asyncio
+    async def test_write_session_rolls_back_on_error(self, scratch_db):
+        with pytest.raises(RuntimeError):
+            async with async_database.async_write_session() as db:
+                db.add(RawLog(id="a2", content="content", source="async"))
+                await db.flush()
+                raise RuntimeError("boom")
+                
+        async with async_database.async_read_session() as db:
+            count = (await db.execute(text("SELECT COUNT(*) FROM raw_logs"))).scalar()
+        assert count == 0
+        
+        await async_database.close_async_database_connections()
+        
+    def test_writers_on_every_pool_wait_for_the_write_lock(self, scratch_db):
+        def insert(row_id):
+            return text(f"INSERT INTO raw_logs (id, content, source) VALUES ('{row_id}', 'c', 's')")
+        
+        held = threading.Event()
+        errors = []
+        
+        def hold_write_lock():
+            with database.get_write_session() as db:
+                db.execute(insert("sync-writer"))
+                db.flush()
+                held.set()
+                time.sleep(0.5)
+                
+        def default_engine_write():
+            try:
+                with database.get_db_session() as db:
+                    # Read first: the write transaction only begins at the INSERT
+                    db.execute(text("SELECT COUNT(*) FROM raw_logs")).scalar()
+                    db.execute(insert("default-engine"))
+            except Exception as e:
+                errors.append(e)
+                
+        async def async_write():
+            try:
+                async with async_database.async_write_session() as db:
+                    await db.execute(insert("async-writer"))
+            finally:
+                await async_database.close_async_database_connections()
+                
+        holder = threading.Thread(target=hold_write_lock)
+        holder.start()
+        held.wait()
+        start = time.monotonic()
+        other = threading.Thread(target=default_engine_write)
+        other.start()
+        asyncio.run(async_write())
+        other.join()
+        holder.join()
+        
+        assert errors == []
+        assert time.monotonic() - start >= 0.3
+        with database.get_read_session() as db:
+            assert db.execute(text("SELECT COUNT(*) FROM raw_logs")).scalar() == 3
+
+
+class TestConfigManagerAsync:
+    """Test loading the monitoring configuration on the async read pool."""
+    
+    @pytest.mark.asyncio
+    async def test_load_config_async_matches_sync_load(self, scratch_db, tmp_path):
+        log_path = tmp_path / "auth.log"
+        log_path.touch()
+        writer = ConfigManager()
+        config = writer.load_config()
+        config.log_sources.append(LogSourceConfig(source_name="auth", path=str(log_path)))
+        assert writer.save_config(config)
+        
+        loaded = await ConfigManager().load_config_async()
+        
+        assert [source.source_name for source in loaded.log_sources] == ["auth"]
+        assert loaded.log_sources == ConfigManager().load_config().log_sources
+        
+        await async_database.close_async_database_connections()
+        
+    @pytest.mark.asyncio
+    async def test_load_config_async_creates_default(self, scratch_db):
+        manager = ConfigManager()
+        
+        config = await manager.load_config_async()
+        
+        assert config.log_sources == []
+        with database.get_read_session() as db:
+            assert db.execute(text("SELECT COUNT(*) FROM monitoring_config")).scalar() == 1
+        
+        await async_database.close_async_database_connections()
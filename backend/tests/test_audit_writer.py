@@ -0,0 +1,120 @@
+"""
+Tests for the batched background audit writer.
+"""
+import threading
+import time
+
+import app.database as database
+from app.models import AuditLog
+from app.realtime.audit import AuditEventType, AuditLogger, AuditWriter
+
+
+class RecordingWriter:
+    """Collects batches instead of writing them."""
+
+    def __init__(self, fail=False, gate=None):
+        self.batches = []
+        self.fail = fail
+        self.gate = gate
+
+    def __call__(self, rows):
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError("database is locked")
+        self.batches.append([row["id"] for row in rows])
+
+
+class TestAuditWriter:
+    """Test batching, draining and loss accounting."""
+
+    def test_rows_written_in_size_limited_batches(self):
+        recorder = RecordingWriter()
+        writer = AuditWriter(batch_size=3, flush_interval=60, write_rows=recorder)
+
+        for i in range(7):
+            assert writer.submit({"id": i})
+        assert writer.flush(timeout=5)
+
+        assert [len(batch) for batch in recorder.batches] == [3, 3, 1]
+        assert writer.get_stats()["written"] == 7
+        writer.stop()
+
+    def test_partial_batch_written_after_interval(self):
+        recorder = RecordingWriter()
+        writer = AuditWriter(batch_size=100, flush_interval=0.05, write_rows=recorder)
+
+        writer.submit({"id": "only"})
+        deadline = time.monotonic() + 5
+        while not recorder.batches and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert recorder.batches == [["only"]]
+        writer.stop()
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        gate = threading.Event()
+        writer = AuditWriter(queue_size=2, batch_size=1, flush_interval=60,
+                             write_rows=RecordingWriter(gate=gate))
+
+        results = [writer.submit({"id": i}) for i in range(10)]
+        gate.set()
+        assert writer.stop(timeout=5)
+
+        stats = writer.get_stats()
+        assert results.count(False) == stats["dropped"] > 0
+        assert stats["written"] + stats["dropped"] == 10
+        assert stats["queue_depth"] == 0
+
+    def test_failed_batches_counted(self):
+        writer = AuditWriter(batch_size=10, flush_interval=60, write_rows=RecordingWriter(fail=True))
+
+        for i in range(4):
+            writer.submit({"id": i})
+        assert writer.flush(timeout=5)
+
+        assert writer.get_stats()["failed"] == 4
+        writer.stop()
+
+    def test_stop_drains_queue(self):
+        recorder = RecordingWriter()
+        writer = AuditWriter(batch_size=2, flush_interval=60, write_rows=recorder)
+
+        for i in range(5):
+            writer.submit({"id": i})
+        assert writer.stop(timeout=5)
+
+        assert sorted(i for batch in recorder.batches for i in batch) == list(range(5))
+        assert not writer.running
+
+
+class TestAuditLoggerPersistence:
+    """Test entries reaching audit_logs through the writer."""
+
+    def test_entries_inserted_with_ids(self, scratch_db):
+        audit_logger = AuditLogger(writer=AuditWriter(batch_size=50, flush_interval=60))
+
+        entries = [
+            audit_logger.log_authentication_event(
+                AuditEventType.USER_LOGIN, f"Login {i}", username="analyst", metadata={"attempt": i}
+            )
+            for i in range(5)
+        ]
+        assert audit_logger.close(timeout=5)
+
+        with database.get_read_session() as db:
+            rows = db.query(AuditLog).order_by(AuditLog.description).all()
+
+        assert [row.id for row in rows] == [entry.id for entry in entries]
+        assert rows[0].event_type == "user_login" and rows[0].success == 1
+        assert audit_logger.get_writer_statistics()["batches"] == 1
+
+    def test_synchronous_mode_without_writer(self, scratch_db, monkeypatch):
+        monkeypatch.setattr("app.realtime.audit.AUDIT_ASYNC", False)
+        audit_logger = AuditLogger()
+
+        audit_logger.log_event(AuditEventType.CONFIG_CREATED, "Created source", resource_type="log_source")
+
+        with database.get_read_session() as db:
+            assert db.query(AuditLog).count() == 1
+        assert audit_logger.get_writer_statistics() == {"enabled": False, "buffered": 0}
@@ -0,0 +1,193 @@
+"""
+Tests for session stores and the verified-token cache.
+"""
+
+import pytest
+import hashlib
+import threading
+from datetime import datetime, timezone, timedelta
+from unittest.mock import patch
+
+import app.database as database
+from app.models import User, UserSession
+from app.realtime.auth import (
+    AuthenticationManager, DatabaseSessionStore, MemorySessionStore, UserRole,
+    VerifiedTokenCache, create_session_store
+)
+
+
+@pytest.fixture
+def session_db(scratch_db):
+    """Scratch database with one user."""
+    with database.get_write_session() as db:
+        db.add(User(
+            id="user-1",
+            username="analyst",
+            password_hash=hashlib.sha256(b"secret").hexdigest(),
+            role="analyst",
+            enabled=1
+        ))
+    
+    return scratch_db
+
+
+def _manager(store, timeout=3600):
+    """Create an authentication manager on the given session store."""
+    return AuthenticationManager(secret_key="shared-secret", session_timeout=timeout, session_store=store)
+
+
+class TestMemorySessionStore:
+    """Test heap-based expiry."""
+    
+    def test_pop_expired_only_returns_due_sessions(self):
+        """Test that cleanup only returns sessions past their deadline."""
+        manager = _manager(MemorySessionStore(), timeout=60)
+        short = manager.create_session("u1", "one", UserRole.VIEWER)
+        manager.session_timeout = 3600
+        long = manager.create_session("u2", "two", UserRole.VIEWER)
+        
+        assert manager.session_store.pop_expired(datetime.now(timezone.utc)) == []
+        expired = manager.session_store.pop_expired(datetime.now(timezone.utc) + timedelta(minutes=5))
+        
+        assert [s.session_id for s in expired] == [short.session_id]
+        assert manager.validate_session(long.session_id) is not None
+    
+    def test_extended_session_survives_old_deadline(self):
+        """Test that a session extended after it was queued is not expired early."""
+        store = MemorySessionStore()
+        manager = _manager(store, timeout=10)
+        session = manager.create_session("u1", "one", UserRole.VIEWER)
+        
+        # Slide the expiry well past the deadline recorded in the heap
+        session.expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+        later = datetime.now(timezone.utc) + timedelta(seconds=30)
+        
+        assert store.pop_expired(later) == []
+        assert [s.session_id for s in store.pop_expired(later + timedelta(hours=1))] == [session.session_id]
+    
+    def test_unknown_store_rejected(self):
+        """Test that unknown session store names are rejected."""
+        with pytest.raises(ValueError):
+            create_session_store("redis")
+
+
+class TestVerifiedTokenCache:
+    """Test the verified-token LRU."""
+    
+    def test_lru_eviction_and_session_discard(self):
+        """Test LRU eviction and dropping every token of a session."""
+        cache = VerifiedTokenCache(max_size=2, ttl=60)
+        manager = _manager(MemorySessionStore())
+        first = manager.create_session("u1", "one", UserRole.VIEWER)
+        second = manager.create_session("u2", "two", UserRole.VIEWER)
+        
+        cache.put("a", first)
+        cache.put("b", second)
+        assert cache.get("a") is first
+        cache.put("c", second)
+        
+        assert cache.get("b") is None
+        cache.discard_session(second.session_id)
+        assert cache.get("c") is None and cache.get("a") is first
+    
+    def test_entry_never_outlives_token(self):
+        """Test that cached entries expire with their token."""
+        cache = VerifiedTokenCache(ttl=60)
+        session = _manager(MemorySessionStore()).create_session("u1", "one", UserRole.VIEWER)
+        
+        cache.put("expired", session, token_expires_at=0)
+        
+        assert cache.get("expired") is None
+    
+    def test_repeat_validation_skips_decode(self):
+        """Test that a cached token is not decoded again."""
+        jwt = pytest.importorskip("jwt")
+        manager = _manager(MemorySessionStore())
+        token = manager.generate_token(manager.create_session("u1", "one", UserRole.ADMIN)).token
+        
+        with patch.object(jwt, "decode", wraps=jwt.decode) as decode:
+            for _ in range(5):
+                assert manager.validate_token(token) is not None
+        
+        assert decode.call_count == 1
+        assert manager.token_cache.hits == 4
+
+
+class TestDatabaseSessionStore:
+    """Test sessions shared between workers through user_sessions."""
+    
+    def test_session_visible_to_other_worker(self, session_db):
+        """Test that a session created by one worker validates on another."""
+        worker_a = _manager(DatabaseSessionStore())
+        worker_b = _manager(DatabaseSessionStore())
+        
+        session = worker_a.create_session("user-1", "analyst", UserRole.ANALYST, client_ip="10.0.0.1")
+        shared = worker_b.validate_session(session.session_id)
+        
+        assert shared is not None
+        assert shared.username == "analyst" and shared.role == UserRole.ANALYST
+        assert shared.client_ip == "10.0.0.1"
+    
+    @pytest.mark.asyncio
+    async def test_invalidation_applies_to_other_worker(self, session_db):
+        """Test that logging out on one worker ends the session on another."""
+        worker_a = _manager(DatabaseSessionStore())
+        worker_b = _manager(DatabaseSessionStore())
+        session = worker_a.create_session("user-1", "analyst", UserRole.ANALYST)
+        
+        await worker_b._invalidate_session(session.session_id, "User logout")
+        
+        assert worker_a.validate_session(session.session_id) is None
+        await worker_a.shutdown()
+        await worker_b.shutdown()
+    
+    def test_disabled_user_loses_session(self, session_db):
+        """Test that disabling a user invalidates their sessions."""
+        manager = _manager(DatabaseSessionStore())
+        session = manager.create_session("user-1", "analyst", UserRole.ANALYST)
+        
+        with database.get_write_session() as db:
+            db.query(User).filter(User.id == "user-1").update({User.enabled: 0})
+        
+        assert manager.validate_session(session.session_id) is None
+    
+    @pytest.mark.asyncio
+    async def test_expired_rows_removed(self, session_db):
+        """Test that cleanup deletes expired session rows."""
+        manager = _manager(DatabaseSessionStore())
+        stale = manager.create_session("user-1", "analyst", UserRole.ANALYST)
+        fresh = manager.create_session("user-1", "analyst", UserRole.ANALYST)
+        with database.get_write_session() as db:
+            db.query(UserSession).filter(UserSession.id == stale.session_id).update({
+                UserSession.expires_at: datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(minutes=1)
+            })
+        
+        await manager._remove_expired_sessions()
+        
+        with database.get_read_session() as db:
+            assert [row.id for row in db.query(UserSession).all()] == [fresh.session_id]
+        await manager.shutdown()
+    
+    @pytest.mark.asyncio
+    async def test_async_validation_queries_off_the_event_loop(self, session_db):
+        """Test that async validation reads and touches the store in a worker thread."""
+        manager = _manager(DatabaseSessionStore())
+        session = manager.create_session("user-1", "analyst", UserRole.ANALYST)
+        store_threads = []
+        
+        def record_thread(method):
+            def wrapper(*args):
+                store_threads.append(threading.get_ident())
+                return method(*args)
+            return wrapper
+        
+        store = manager.session_store
+        with patch.object(store, "get", record_thread(store.get)), \
+                patch.object(store, "touch", record_thread(store.touch)), \
+                patch("app.realtime.auth.AUTH_SESSION_TOUCH_INTERVAL", 0):
+            session_info = await manager.validate_session_async(session.session_id)
+        
+        assert session_info.username == "analyst"
+        assert len(store_threads) == 2
+        assert threading.get_ident() not in store_threads
+        await manager.shutdown()
@@ -0,0 +1,128 @@
+"""
+Tests for the benchmark corpora, harness and pipeline benchmark.
+"""
+import asyncio
+
+import pytest
+
+from app.parser import LogParser
+from benchmarks.corpus import CORPORA, generate_corpus, with_noise
+from benchmarks.harness import (
+    BenchmarkCase, BenchmarkRunner, build_results, compare_results, latency_summary,
+    load_results, save_results, summarize_timings
+)
+from benchmarks.macro import run_pipeline_benchmark
+
+
+def _results(benchmarks):
+    return {"benchmarks": benchmarks}
+
+
+class TestCorpus:
+    """Test synthetic corpus generation."""
+
+    @pytest.mark.parametrize("kind", list(CORPORA))
+    def test_corpus_is_seeded_and_parseable(self, kind):
+        lines = generate_corpus(kind, 200, seed=7)
+
+        assert lines == generate_corpus(kind, 200, seed=7)
+        assert lines != generate_corpus(kind, 200, seed=8)
+        events = LogParser().parse_log_entries("\n".join(lines), "test")
+        assert len(events) == len(lines)
+
+    def test_unknown_corpus_kind(self):
+        with pytest.raises(ValueError):
+            generate_corpus("windows", 10)
+
+    def test_noise_keeps_line_count(self):
+        lines = generate_corpus("syslog", 100)
+
+        noisy = with_noise(lines, ratio=0.5, seed=3)
+
+        assert len(noisy) == len(lines)
+        assert noisy == with_noise(lines, ratio=0.5, seed=3)
+        assert sum(a != b for a, b in zip(lines, noisy)) > 20
+
+
+class TestHarness:
+    """Test timing summaries, the runner and result comparison."""
+
+    def test_summarize_timings(self):
+        summary = summarize_timings([0.4, 0.1, 0.2, 0.3, 0.5], items=100)
+
+        assert summary["median"] == pytest.approx(0.3)
+        assert summary["min"] == pytest.approx(0.1)
+        assert summary["iqr"] == pytest.approx(0.2)
+        assert summary["items_per_second"] == pytest.approx(100 / 0.3)
+
+    def test_latency_summary_in_milliseconds(self):
+        summary = latency_summary([i / 1000 for i in range(1, 101)])
+
+        assert summary["max"] == pytest.approx(100.0)
+        assert summary["p50"] == pytest.approx(50.5)
+        assert summary["p99"] == pytest.approx(99.01)
+        assert latency_summary([])["p99"] == 0.0
+
+    def test_runner_times_sync_and_async_cases(self):
+        calls = []
+
+        async def async_case():
+            calls.append("async")
+
+        runner = BenchmarkRunner(rounds=3, min_round_time=0.001)
+        results = runner.run([
+            BenchmarkCase("sync", "test", lambda: sum(range(100)), items=100),
+            BenchmarkCase("async", "test", async_case)
+        ])
+
+        assert results["sync"]["rounds"] == 3
+        assert results["sync"]["kind"] == "micro"
+        assert results["sync"]["items_per_second"] > 0
+        assert len(calls) >= 4 * results["async"]["calls_per_round"]
+
+    def test_compare_results_statuses(self):
+        baseline = _results({
+            "parse": {"median": 1.0},
+            "queue": {"median": 1.0},
+            "pipeline": {"lines_per_second": 1000.0, "latency_ms": {"p99": 100.0},
+                         "compare": {"lines_per_second": False, "latency_ms.p99": True}},
+            "removed": {"median": 1.0}
+        })
+        current = _results({
+            "parse": {"median": 1.5},
+            "queue": {"median": 1.05},
+            "pipeline": {"lines_per_second": 500.0, "latency_ms": {"p99": 50.0},
+                         "compare": {"lines_per_second": False, "latency_ms.p99": True}},
+            "added": {"median": 1.0}
+        })
+
+        rows = {(row["benchmark"], row["metric"]): row for row in compare_results(baseline, current)}
+
+        assert set(rows) == {("parse", "median"), ("queue", "median"),
+                             ("pipeline", "lines_per_second"), ("pipeline", "latency_ms.p99")}
+        assert rows[("parse", "median")]["status"] == "regression"
+        assert rows[("queue", "median")]["status"] == "unchanged"
+        assert rows[("pipeline", "lines_per_second")]["status"] == "regression"
+        assert rows[("pipeline", "latency_ms.p99")]["status"] == "improvement"
+
+    def test_results_round_trip(self, tmp_path):
+        results = build_results("micro", {"parse": {"median": 1.0}}, {"seed": 1})
+
+        path = save_results(results, tmp_path / "nested" / "results.json")
+
+        assert load_results(path) == results
+        path.write_text('{"schema_version": 99}')
+        with pytest.raises(ValueError):
+            load_results(path)
+
+
+class TestPipelineBenchmark:
+    """Test the end-to-end pipeline benchmark."""
+
+    def test_lines_are_committed(self):
+        result = asyncio.run(run_pipeline_benchmark("macos_auth", lines=120, chunk_lines=40, timeout=30))
+
+        assert result["lines_committed"] == 120
+        assert result["lines_lost"] == 0
+        assert result["lines_per_second"] > 0
+        assert 0 < result["latency_ms"]["p50"] <= result["latency_ms"]["p99"]
@@ -0,0 +1,67 @@
+"""
+Tests for the separate read and write connection pools.
+"""
+import time
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+import app.database as database
+
+
+class TestReadWritePools:
+    """Test the dedicated writer and read-only reader pools."""
+    
+    def test_engines_are_separate(self, scratch_db):
+        write_engine = database.create_write_engine()
+        read_engine = database.create_read_engine()
+        
+        assert write_engine is not read_engine
+        assert write_engine.pool.size() == 1
+        assert read_engine.pool.size() == database.DB_READ_POOL_SIZE
+        
+    def test_read_session_is_read_only(self, scratch_db):
+        with pytest.raises(OperationalError):
+            with database.get_read_session() as db:
+                db.execute(text(
+                    "INSERT INTO raw_logs (id, content, source) VALUES ('r1', 'c', 's')"
+                ))
+                
+    def test_pragmas_applied_per_connection(self, scratch_db):
+        with database.get_read_session() as db:
+            assert db.execute(text("PRAGMA query_only")).scalar() == 1
+            assert db.execute(text("PRAGMA cache_size")).scalar() == -database.SQLITE_CACHE_SIZE_KB
+            
+        with database.get_write_session() as db:
+            assert db.execute(text("PRAGMA query_only")).scalar() == 0
+            assert db.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+            assert db.execute(text("PRAGMA busy_timeout")).scalar() == database.SQLITE_BUSY_TIMEOUT_MS
+            
+    def test_reads_do_not_wait_for_open_write(self, scratch_db):
+        with database.get_write_session() as writer:
+            writer.execute(text(
+                "INSERT INTO raw_logs (id, content, source) VALUES ('w1', 'c', 's')"
+            ))
+            writer.flush()
+            
+            # Writer transaction still open: readers see the last committed state immediately
+            start = time.time()
+            with database.get_read_session() as reader:
+                count = reader.execute(text("SELECT COUNT(*) FROM raw_logs")).scalar()
+            assert count == 0
+            assert time.time() - start < 1.0
+            
+        with database.get_read_session() as reader:
+            assert reader.execute(text("SELECT COUNT(*) FROM raw_logs")).scalar() == 1
+            
+    def test_write_session_rolls_back_on_error(self, scratch_db):
+        with pytest.raises(RuntimeError):
+            with database.get_write_session() as db:
+                db.execute(text(
+                    "INSERT INTO raw_logs (id, content, source) VALUES ('w2', 'c', 's')"
+                ))
+                raise RuntimeError("boom")
+                
+        with database.get_read_session() as reader:
+            assert reader.execute(text("SELECT COUNT(*) FROM raw_logs")).scalar() == 0
@@ -18,9 +18,12 @@ from unittest.mock import patch, Mock, MagicMock
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
 
 from main import app
-from app.database import get_database_session
+from app.database import get_database_session, get_read_database_session
+from app.async_database import get_async_read_session
 from app.models import Base, RawLog, Event, AIAnalysis as AIAnalysisModel
 from app.schemas import EventCategory, AIAnalysis, ParsedEvent
 from tests.fixtures.test_data import TestDataFixtures
@@ -47,7 +50,16 @@ class TestE2EIntegration:
             finally:
                 db.close()
         
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+        AsyncTestingSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+        
+        async def override_get_async_db():
+            async with AsyncTestingSessionLocal() as db:
+                yield db
+        
         app.dependency_overrides[get_database_session] = override_get_db
+        app.dependency_overrides[get_read_database_session] = override_get_db
+        app.dependency_overrides[get_async_read_session] = override_get_async_db
         
         yield TestingSessionLocal
         
@@ -4,6 +4,9 @@ Tests for error handling and logging functionality.
 import pytest
 import json
 import logging
+import queue
+import sys
+import threading
 from unittest.mock import Mock, patch, MagicMock
 from datetime import datetime, timezone
 from fastapi import HTTPException, Request
@@ -35,7 +38,12 @@ from app.logging_config import (
     generate_correlation_id,
     log_error_with_context,
     JSONFormatter,
-    CorrelationIdFilter
+    CorrelationIdFilter,
+    DroppingQueueHandler,
+    LogRateLimitFilter,
+    parse_rate_limits,
+    shutdown_logging,
+    get_logging_statistics
 )
 from app.middleware import (
     CorrelationIdMiddleware,
@@ -368,6 +376,104 @@ class TestLoggingConfiguration:
             assert call_args[1]['extra']['user_message'] == "User message"
 
 
+class TestQueuedLogging:
+    """Test the queued logging pipeline and log rate limiting."""
+    
+    @staticmethod
+    def _record(name="app.parser", msg="Failed to parse line %d", created=100.0):
+        record = logging.LogRecord(name, logging.WARNING, "parser.py", 1, msg, (1,), None)
+        record.created = created
+        return record
+    
+    def test_rate_limit_suppresses_repeats(self):
+        """Test that a message group is limited per interval."""
+        rate_filter = LogRateLimitFilter(parse_rate_limits("app.parser=3/60"))
+        
+        results = [rate_filter.filter(self._record()) for _ in range(10)]
+        
+        assert results == [True] * 3 + [False] * 7
+        assert rate_filter.suppressed_total == 7
+        
+        later = self._record(created=161.0)
+        assert rate_filter.filter(later) is True
+        assert later.suppressed_count == 7
+    
+    def test_rate_limit_applies_to_child_loggers_only(self):
+        """Test that limits cover child loggers and leave others alone."""
+        rate_filter = LogRateLimitFilter(parse_rate_limits("app.parser=1/60"))
+        
+        assert rate_filter.filter(self._record(name="app.parser.syslog"))
+        assert not rate_filter.filter(self._record(name="app.parser.syslog"))
+        assert all(rate_filter.filter(self._record(name="app.ingestion")) for _ in range(5))
+        
+        with pytest.raises(ValueError):
+            parse_rate_limits("app.parser=fast")
+    
+    def test_rate_limit_counts_across_threads(self):
+        """Test that concurrent threads share one burst per message group."""
+        rate_filter = LogRateLimitFilter(parse_rate_limits("app.parser=50/60"))
+        passed = []
+        
+        def log_records():
+            passed.append(sum(rate_filter.filter(self._record()) for _ in range(200)))
+        
+        threads = [threading.Thread(target=log_records) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert sum(passed) == 50
+        assert rate_filter.suppressed_total == 8 * 200 - 50
+    
+    def test_full_queue_drops_and_reports(self):
+        """Test that a full queue drops records instead of blocking."""
+        handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+        
+        for _ in range(5):
+            handler.handle(self._record(name="app.test"))
+        assert handler.dropped == 3
+        
+        handler.queue.get_nowait()
+        handler.queue.get_nowait()
+        handler.handle(self._record(name="app.test"))
+        
+        summary = [handler.queue.get_nowait() for _ in range(2)][1]
+        assert summary.getMessage() == "Dropped 3 log records because the log queue was full"
+    
+    def test_queued_records_have_merged_messages(self):
+        """Test that queued records carry the formatted message and exc_info."""
+        handler = DroppingQueueHandler(queue.Queue())
+        try:
+            raise ValueError("bad line")
+        except ValueError:
+            record = self._record()
+            record.exc_info = sys.exc_info()
+        
+        handler.handle(record)
+        queued = handler.queue.get_nowait()
+        assert queued is not record
+        assert queued.msg == "Failed to parse line 1" and queued.args is None
+        assert queued.exc_info[0] is ValueError
+        assert record.args == (1,)
+    
+    def test_records_written_by_listener(self, tmp_path):
+        """Test that queued records reach the file with their correlation ID."""
+        log_file = tmp_path / "threatlens.log"
+        try:
+            setup_logging(log_file=str(log_file), enable_console=False, use_queue=True)
+            set_correlation_id("queued-correlation-id")
+            get_logger("app.test").info("queued message")
+            assert get_logging_statistics()["queued"] is True
+            shutdown_logging()
+            
+            entry = json.loads(log_file.read_text().strip().splitlines()[-1])
+            assert entry["message"] == "queued message"
+            assert entry["correlation_id"] == "queued-correlation-id"
+        finally:
+            setup_logging(enable_console=True)
+
+
 class TestMiddleware:
     """Test middleware components."""
     
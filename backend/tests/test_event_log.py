@@ -0,0 +1,85 @@
+"""
+Tests for the WebSocket event replay log.
+"""
+import pytest
+
+from app.realtime.event_log import EventLog
+from app.realtime.websocket_server import EventUpdate
+
+
+def _event(i):
+    return EventUpdate(event_type="security_event", data={"id": i}, priority=5)
+
+
+class TestEventLog:
+    """Test the in-memory ring buffer."""
+
+    def test_sequence_numbers_are_contiguous(self):
+        log = EventLog(capacity=10, persist=False)
+
+        seqs = [log.append(_event(i)) for i in range(3)]
+
+        assert seqs == list(range(seqs[0], seqs[0] + 3))
+        assert log.oldest_seq == seqs[0] and log.latest_seq == seqs[-1]
+
+    def test_since_returns_missed_events(self):
+        log = EventLog(capacity=10, persist=False)
+        first = log.append(_event(0))
+        for i in range(1, 5):
+            log.append(_event(i))
+
+        assert [event.data["id"] for _, event in log.since(first + 1)] == [2, 3, 4]
+        assert log.since(log.latest_seq) == []
+        assert len(log.since(first - 1)) == 5
+
+    def test_wraparound_keeps_newest(self):
+        log = EventLog(capacity=4, persist=False)
+        first = log.append(_event(0))
+        for i in range(1, 10):
+            log.append(_event(i))
+
+        assert len(log) == 4
+        assert log.oldest_seq == first + 6
+        assert [event.data["id"] for _, event in log.since(log.oldest_seq - 1)] == [6, 7, 8, 9]
+
+    def test_too_far_behind_or_ahead(self):
+        log = EventLog(capacity=4, persist=False)
+        first = log.append(_event(0))
+        for i in range(1, 10):
+            log.append(_event(i))
+
+        assert log.since(first) is None
+        assert log.since(log.latest_seq + 1) is None
+
+
+class TestEventLogPersistence:
+    """Test saving and restoring the log."""
+
+    @pytest.mark.asyncio
+    async def test_restart_continues_sequence(self, scratch_db):
+        log = EventLog(capacity=4, persist=True)
+        for i in range(6):
+            log.append(_event(i))
+        assert await log.flush() == 4
+
+        restored = EventLog(capacity=4, persist=True)
+        assert await restored.load() == 4
+
+        assert restored.oldest_seq == log.oldest_seq
+        assert restored.latest_seq == log.latest_seq
+        assert [event.data["id"] for _, event in restored.since(log.oldest_seq - 1)] == [2, 3, 4, 5]
+        assert restored.append(_event(6)) == log.latest_seq + 1
+
+    @pytest.mark.asyncio
+    async def test_flush_trims_evicted_rows(self, scratch_db):
+        log = EventLog(capacity=3, persist=True)
+        for i in range(3):
+            log.append(_event(i))
+        await log.flush()
+        for i in range(3, 5):
+            log.append(_event(i))
+        await log.flush()
+
+        restored = EventLog(capacity=10, persist=True)
+        assert await restored.load() == 3
+        assert restored.oldest_seq == log.oldest_seq
@@ -190,7 +190,7 @@ class TestFileIngestion:
         """Test successful file ingestion."""
         file = mock_upload_file("test.log", sample_log_content)
         
-        with patch('app.ingestion.get_db_session') as mock_get_db:
+        with patch('app.ingestion.get_write_session') as mock_get_db:
             mock_db = Mock()
             mock_get_db.return_value.__enter__.return_value = mock_db
             
@@ -221,7 +221,7 @@ class TestFileIngestion:
         # This is a more realistic test than trying to force encoding errors
         file = mock_upload_file("test.log", "Valid content that will be processed")
         
-        with patch('app.ingestion.get_db_session') as mock_get_db:
+        with patch('app.ingestion.get_write_session') as mock_get_db:
             mock_db = Mock()
             mock_get_db.return_value.__enter__.return_value = mock_db
             
@@ -238,7 +238,7 @@ class TestFileIngestion:
         """Test file ingestion with custom source."""
         file = mock_upload_file("test.log", sample_log_content)
         
-        with patch('app.ingestion.get_db_session') as mock_get_db:
+        with patch('app.ingestion.get_write_session') as mock_get_db:
             mock_db = Mock()
             mock_get_db.return_value.__enter__.return_value = mock_db
             
@@ -260,7 +260,7 @@ class TestTextIngestion:
         """Test successful text ingestion."""
         request = IngestionRequest(content=sample_log_content, source="test_source")
         
-        with patch('app.ingestion.get_db_session') as mock_get_db:
+        with patch('app.ingestion.get_write_session') as mock_get_db:
             mock_db = Mock()
             mock_get_db.return_value.__enter__.return_value = mock_db
             
@@ -333,7 +333,7 @@ class TestIngestionStats:
     
     def test_get_ingestion_stats_empty(self):
         """Test getting stats when no logs exist."""
-        with patch('app.ingestion.get_db_session') as mock_get_db:
+        with patch('app.ingestion.get_read_session') as mock_get_db:
             mock_db = Mock()
             mock_get_db.return_value.__enter__.return_value = mock_db
             
@@ -351,7 +351,7 @@ class TestIngestionStats:
     
     def test_get_ingestion_stats_with_data(self):
         """Test getting stats with sample data."""
-        with patch('app.ingestion.get_db_session') as mock_get_db:
+        with patch('app.ingestion.get_read_session') as mock_get_db:
             mock_db = Mock()
             mock_get_db.return_value.__enter__.return_value = mock_db
             
@@ -374,7 +374,7 @@ class TestIngestionStats:
     
     def test_get_ingestion_stats_database_error(self):
         """Test stats retrieval with database error."""
-        with patch('app.ingestion.get_db_session') as mock_get_db:
+        with patch('app.ingestion.get_read_session') as mock_get_db:
             mock_get_db.side_effect = Exception("Database connection failed")
             
             stats = get_ingestion_stats()
@@ -391,7 +391,7 @@ class TestIngestionIntegration:
         """Test complete file ingestion workflow."""
         file = mock_upload_file("system.log", sample_log_content)
         
-        with patch('app.ingestion.get_db_session') as mock_get_db:
+        with patch('app.ingestion.get_write_session') as mock_get_db:
             mock_db = Mock()
             mock_get_db.return_value.__enter__.return_value = mock_db
             
@@ -415,7 +415,7 @@ class TestIngestionIntegration:
         """Test complete text ingestion workflow."""
         request = IngestionRequest(content=sample_log_content, source="manual_input")
         
-        with patch('app.ingestion.get_db_session') as mock_get_db:
+        with patch('app.ingestion.get_write_session') as mock_get_db:
             mock_db = Mock()
             mock_get_db.return_value.__enter__.return_value = mock_db
             
@@ -0,0 +1,182 @@
+"""
+Tests for the shared metric primitives.
+"""
+import numpy as np
+import pytest
+
+from app.metrics import (
+    DecayingRate, MetricsRegistry, PIPELINE_ITEMS, PIPELINE_STAGE_SECONDS, QuantileSketch,
+    RingBuffer, stage_timer, summarize
+)
+from app.realtime.health_monitor import HealthMonitor
+
+
+class TestRingBuffer:
+    """Test the fixed-size sample buffer."""
+
+    def test_keeps_most_recent_samples_in_order(self):
+        buffer = RingBuffer(4)
+        for value in range(10):
+            buffer.append(value)
+
+        assert len(buffer) == 4 and buffer.full
+        assert list(buffer) == [6.0, 7.0, 8.0, 9.0]
+        assert buffer[0] == 6.0 and buffer[-1] == 9.0
+        assert buffer[-2:].tolist() == [8.0, 9.0]
+        assert buffer.mean() == 7.5 and buffer.max() == 9.0
+
+    def test_summaries_of_empty_buffer(self):
+        buffer = RingBuffer(3)
+
+        assert buffer == []
+        assert buffer.mean() == 0.0
+        assert summarize(buffer) == {"count": 0, "mean": 0.0, "min": 0.0, "max": 0.0}
+        with pytest.raises(IndexError):
+            buffer[0]
+
+    def test_summarize_accepts_sequences(self):
+        assert summarize([1.0, 2.0, 3.0]) == {"count": 3, "mean": 2.0, "min": 1.0, "max": 3.0}
+
+    def test_count_at_least(self):
+        buffer = RingBuffer(5)
+        for timestamp in (10.0, 20.0, 30.0):
+            buffer.append(timestamp)
+
+        assert buffer.count_at_least(20.0) == 2
+
+
+class TestDecayingRate:
+    """Test exponentially decaying rates."""
+
+    def test_converges_to_steady_rate(self):
+        rate = DecayingRate(half_life=10)
+        for i in range(2000):
+            rate.add(now=i * 0.1)
+
+        assert rate.rate(now=200) == pytest.approx(10, rel=0.01)
+        assert rate.total == 2000
+
+    def test_decays_after_traffic_stops(self):
+        rate = DecayingRate(half_life=10)
+        for i in range(2000):
+            rate.add(now=i * 0.1)
+
+        assert rate.rate(now=210) == pytest.approx(rate.rate(now=200) / 2)
+        assert DecayingRate().rate() == 0.0
+
+
+class TestQuantileSketch:
+    """Test streaming quantile estimates."""
+
+    def test_estimates_within_relative_accuracy(self):
+        values = np.random.default_rng(7).lognormal(mean=3, sigma=1, size=20000)
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(float(value))
+
+        estimates = sketch.quantiles()
+        for name, q in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            assert estimates[name] == pytest.approx(np.quantile(values, q), rel=0.02)
+        assert sketch.quantile(0) == values.min() and sketch.quantile(1) == values.max()
+        assert sketch.count == 20000
+
+    def test_merge_combines_counts(self):
+        low, high = QuantileSketch(), QuantileSketch()
+        for _ in range(50):
+            low.add(1.0)
+            high.add(100.0)
+
+        low.merge(high)
+
+        assert low.count == 100
+        assert low.quantile(0.25) == pytest.approx(1.0, rel=0.01)
+        assert low.quantile(0.75) == pytest.approx(100.0, rel=0.01)
+        with pytest.raises(ValueError):
+            low.merge(QuantileSketch(relative_accuracy=0.05))
+
+    def test_zero_and_empty(self):
+        sketch = QuantileSketch()
+        assert sketch.quantiles() == {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+
+        sketch.add(0.0)
+        assert sketch.quantile(0.5) == 0.0
+
+
+class TestHealthMonitorMetrics:
+    """Test component metrics computed from the primitives."""
+
+    @pytest.mark.asyncio
+    async def test_component_metrics_from_bounded_storage(self, monkeypatch):
+        monkeypatch.setattr("app.realtime.health_monitor.PROCESSING_TIMESTAMP_SAMPLES", 100)
+        monitor = HealthMonitor()
+        for i in range(500):
+            monitor.record_processing_event("pipeline", latency_ms=float(i % 100))
+
+        await monitor._update_component_metrics()
+        metrics = monitor.get_component_metrics("pipeline")
+
+        # Storage stays bounded and the rate comes from the span it covers
+        assert len(monitor.processing_rates["pipeline"]) == 100
+        assert metrics.processing_rate > 100
+        assert metrics.p50_latency_ms == pytest.approx(49.5, rel=0.05)
+        assert metrics.p99_latency_ms == pytest.approx(98, rel=0.05)
+
+
+class TestMetricsRegistry:
+    """Test Prometheus metric families and text exposition."""
+
+    def test_counter_and_gauge_exposition(self):
+        registry = MetricsRegistry()
+        events = registry.counter("test_events_total", "Events seen", ("source", "category"))
+        depth = registry.gauge("test_queue_depth", "Queue depth")
+
+        events.labels("auth", "login").inc()
+        events.labels(source="auth", category="login").inc(2)
+        events.labels("sys\\log", 'say "hi"\n').inc()
+        depth.set(7)
+        depth.dec(2)
+
+        lines = registry.render().splitlines()
+        assert lines[:2] == ["# HELP test_events_total Events seen", "# TYPE test_events_total counter"]
+        assert 'test_events_total{source="auth",category="login"} 3.0' in lines
+        assert 'test_events_total{source="sys\\\\log",category="say \\"hi\\"\\n"} 1.0' in lines
+        assert "test_queue_depth 5.0" in lines
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        latency = registry.histogram("test_stage_seconds", "Stage latency", ("stage",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.labels("parse").observe(value)
+
+        lines = registry.render().splitlines()
+        assert "# TYPE test_stage_seconds histogram" in lines
+        assert 'test_stage_seconds_bucket{stage="parse",le="0.1"} 2' in lines
+        assert 'test_stage_seconds_bucket{stage="parse",le="1.0"} 3' in lines
+        assert 'test_stage_seconds_bucket{stage="parse",le="+Inf"} 4' in lines
+        assert 'test_stage_seconds_sum{stage="parse"} 3.65' in lines
+        assert 'test_stage_seconds_count{stage="parse"} 4' in lines
+
+    def test_invalid_use_rejected(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("test_total", "Test", ("stage",))
+
+        with pytest.raises(ValueError):
+            registry.counter("test_total", "Duplicate")
+        with pytest.raises(ValueError):
+            counter.labels("a", "b")
+        with pytest.raises(ValueError):
+            counter.labels("a").inc(-1)
+        with pytest.raises(ValueError):
+            registry.histogram("test_seconds", "Test", ("le",))
+
+    def test_stage_timer_records_outcomes(self):
+        with stage_timer("validate", "test-stage-source") as stage:
+            stage.outcome = "rejected"
+        with pytest.raises(RuntimeError):
+            with stage_timer("validate", "test-stage-source"):
+                raise RuntimeError("boom")
+
+        assert PIPELINE_ITEMS.labels("validate", "test-stage-source", "rejected").value == 1
+        assert PIPELINE_ITEMS.labels("validate", "test-stage-source", "error").value == 1
+        cumulative, _ = PIPELINE_STAGE_SECONDS.labels("validate", "test-stage-source").snapshot()
+        assert cumulative[-1] == 2
@@ -6,10 +6,12 @@ and the notification system for real-time event notifications.
 """
 import asyncio
 import pytest
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from unittest.mock import Mock, AsyncMock, patch
 from typing import List, Dict, Any
 
+from app.metrics import PIPELINE_STAGE_SECONDS
 from app.schemas import EventResponse, AIAnalysis as AIAnalysisSchema, ParsedEvent, EventCategory
 from app.realtime.enhanced_processor import EnhancedBackgroundProcessor
 from app.realtime.ingestion_queue import LogEntry, LogEntryPriority, RealtimeIngestionQueue
@@ -222,6 +224,58 @@ class TestNotificationIntegration:
         assert metrics['notifications_triggered'] == 1
         assert metrics['notifications_failed'] == 1
     
+    @pytest.mark.asyncio
+    async def test_notify_stage_labeled_with_log_source(self, enhanced_processor):
+        """Test that notify timings use the configured source, not the parsed event source."""
+        event = self.create_test_parsed_event(EventCategory.SECURITY)
+        event.source = "sshd[4242]"
+        ai_analysis = self.create_test_ai_analysis(severity=8)
+        enhanced_processor.notification_manager.send_notification_with_retry = AsyncMock(
+            return_value={'high_severity_test:test_email': True}
+        )
+        
+        await enhanced_processor._process_notifications_for_events([(event, ai_analysis)], "auth-log")
+        
+        rendered = PIPELINE_STAGE_SECONDS.render()
+        assert any('stage="notify",source="auth-log"' in line for line in rendered)
+        assert not any('sshd[4242]' in line for line in rendered)
+    
+    @pytest.mark.asyncio
+    async def test_notification_fan_outs_are_bounded(self, enhanced_processor):
+        """Test that batches wait for a free notification slot."""
+        release = asyncio.Event()
+        
+        async def send_notification_with_retry(*args, **kwargs):
+            await release.wait()
+            return {'high_severity_test:test_email': True}
+        
+        @asynccontextmanager
+        async def write_session():
+            yield Mock()
+        
+        enhanced_processor.notification_manager.send_notification_with_retry = send_notification_with_retry
+        enhanced_processor._notification_slots = asyncio.Semaphore(1)
+        entry = self.create_test_log_entry()
+        
+        with patch('app.realtime.enhanced_processor.analyze_event', return_value=self.create_test_ai_analysis()), \
+                patch('app.realtime.enhanced_processor.async_write_session', write_session):
+            assert await enhanced_processor._store_and_analyze_events(entry, [self.create_test_parsed_event()])
+            
+            second = asyncio.create_task(
+                enhanced_processor._store_and_analyze_events(entry, [self.create_test_parsed_event()])
+            )
+            await asyncio.sleep(0.05)
+            assert not second.done()
+            assert enhanced_processor.get_notification_metrics()['notifications_in_flight'] == 1
+            
+            release.set()
+            assert await second
+            await asyncio.gather(*enhanced_processor._notification_tasks)
+        
+        metrics = enhanced_processor.get_notification_metrics()
+        assert metrics['notification_backpressure_waits'] == 1
+        assert metrics['notifications_sent'] == 2
+    
     @pytest.mark.asyncio
     async def test_websocket_broadcast_for_notification_status(self, enhanced_processor, mock_websocket_manager):
         """Test that notification status is broadcast via WebSocket."""
@@ -0,0 +1,487 @@
+"""
+Tests for notification delivery through per-channel queues.
+"""
+import asyncio
+import random
+import smtplib
+import threading
+import time
+from datetime import datetime, timezone, timedelta
+from email.mime.text import MIMEText
+from unittest.mock import Mock, AsyncMock, patch
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import app.async_database as async_database
+from app.schemas import EventResponse, EventCategory, AIAnalysis as AIAnalysisSchema
+import app.realtime.notifications as notifications
+from app.realtime.notifications import (
+    ChannelDispatcher, EmailNotifier, NotificationManager, NotificationRule, NotificationStatus,
+    NotificationContext, RuleIndex, SMTPConnectionPool, WebhookNotifier
+)
+
+
+def _event(event_id="event-1", source="auth.log", category="auth"):
+    return EventResponse(
+        id=event_id,
+        raw_log_id="raw-1",
+        timestamp=datetime.now(timezone.utc),
+        source=source,
+        message="Failed password for root",
+        category=category,
+        parsed_at=datetime.now(timezone.utc)
+    )
+
+
+def _channel(send_notification, channel_type='email'):
+    channel = Mock()
+    channel.channel_type.value = channel_type
+    channel.enabled = True
+    channel.validate_config.return_value = True
+    channel.send_notification = send_notification
+    return channel
+
+
+def _rule(channels, throttle_minutes=0, digest=False):
+    return NotificationRule(
+        rule_name="all_events",
+        enabled=True,
+        min_severity=1,
+        max_severity=10,
+        categories=[],
+        sources=[],
+        channels=channels,
+        throttle_minutes=throttle_minutes,
+        digest=digest
+    )
+
+
+def _analysis(event_id, severity):
+    return AIAnalysisSchema(
+        id=f"analysis-{event_id}",
+        event_id=event_id,
+        severity_score=severity,
+        explanation="Repeated authentication failures",
+        recommendations=["Block the source address"]
+    )
+
+
+@pytest.fixture
+def manager():
+    manager = NotificationManager()
+    manager._record_notification_history = AsyncMock()
+    return manager
+
+
+def reference_find_matching_rules(rules, event, ai_analysis):
+    """Linear rule scan the index must agree with."""
+    severity = ai_analysis.severity_score if ai_analysis else 5
+    return [
+        rule for rule in rules
+        if rule.enabled
+        and rule.min_severity <= severity <= rule.max_severity
+        and (not rule.categories or event.category in rule.categories)
+        and (not rule.sources or event.source in rule.sources)
+    ]
+
+
+class TestRuleIndex:
+    """Test indexed rule matching against a linear scan."""
+
+    CATEGORIES = [c.value for c in EventCategory]
+    SOURCES = [f"host-{i}" for i in range(8)]
+
+    def _random_rule(self, rng, i):
+        low = rng.randint(1, 10)
+        return NotificationRule(
+            rule_name=f"rule-{i}",
+            enabled=rng.random() > 0.1,
+            min_severity=low,
+            max_severity=rng.randint(low, 10),
+            categories=rng.sample(self.CATEGORIES, rng.choice([0, 0, 1, 2])),
+            sources=rng.sample(self.SOURCES, rng.choice([0, 0, 1, 3])),
+            channels=['email']
+        )
+
+    @pytest.mark.parametrize("seed", range(3))
+    def test_matches_linear_scan(self, seed):
+        rng = random.Random(seed)
+        manager = NotificationManager()
+        manager.configure_rules([self._random_rule(rng, i) for i in range(200)])
+
+        for i in range(300):
+            event = _event(f"event-{i}", source=rng.choice(self.SOURCES + ["other"]),
+                           category=rng.choice(self.CATEGORIES))
+            analysis = _analysis(event.id, rng.randint(1, 10)) if rng.random() > 0.2 else None
+
+            assert manager._find_matching_rules(event, analysis) == \
+                reference_find_matching_rules(manager.rules, event, analysis)
+
+    def test_index_follows_rule_changes(self):
+        manager = NotificationManager()
+        event = _event(category="auth")
+        manager.configure_rules([_rule(['email'])])
+        assert [r.rule_name for r in manager._find_matching_rules(event, None)] == ["all_events"]
+
+        auth_rule = NotificationRule(rule_name="auth_only", categories=["auth"], channels=['email'])
+        manager.add_rule(auth_rule)
+        assert [r.rule_name for r in manager._find_matching_rules(event, None)] == ["all_events", "auth_only"]
+
+        # Enabled flags are read at match time
+        auth_rule.enabled = False
+        assert [r.rule_name for r in manager._find_matching_rules(event, None)] == ["all_events"]
+
+        manager.remove_rule("all_events")
+        assert manager._find_matching_rules(event, None) == []
+
+    def test_candidates_are_memoized(self):
+        index = RuleIndex([_rule(['email'])])
+
+        first = index.candidates("auth", "auth.log", 5)
+        assert index.candidates(EventCategory.AUTH, "auth.log", 5) is first
+
+
+class TestChannelQueues:
+    """Test concurrent fan-out and retries."""
+
+    @pytest.mark.asyncio
+    async def test_slow_channel_does_not_delay_fast_channel(self, manager):
+        delivered_at = {}
+
+        async def send_slow(context):
+            await asyncio.sleep(0.3)
+            delivered_at['slow'] = time.monotonic()
+            return True
+
+        async def send_fast(context):
+            delivered_at['fast'] = time.monotonic()
+            return True
+
+        manager.add_channel('slow', _channel(send_slow))
+        manager.add_channel('fast', _channel(send_fast, 'webhook'))
+        manager.configure_rules([_rule(['slow', 'fast'])])
+
+        start = time.monotonic()
+        results = await manager.send_notification(_event())
+
+        assert results == {'all_events:slow': True, 'all_events:fast': True}
+        assert delivered_at['fast'] - start < 0.1
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_events_are_delivered_concurrently(self, manager):
+        async def send(context):
+            await asyncio.sleep(0.2)
+            return True
+
+        manager.add_channel('email', _channel(send))
+        manager.configure_rules([_rule(['email'])])
+
+        start = time.monotonic()
+        results = await asyncio.gather(*(
+            manager.send_notification(_event(f"event-{i}", source=f"host-{i}")) for i in range(4)
+        ))
+
+        assert all(r == {'all_events:email': True} for r in results)
+        assert time.monotonic() - start < 0.6
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_retry_with_backoff_succeeds(self, manager):
+        send = AsyncMock(side_effect=[ConnectionError("refused"), False, True])
+        manager.add_channel('email', _channel(send))
+        manager.configure_rules([_rule(['email'])])
+
+        results = await manager.send_notification_with_retry(_event(), max_retries=2, retry_delay=0.01)
+
+        assert results == {'all_events:email': True}
+        assert send.await_count == 3
+        manager._record_notification_history.assert_awaited_once_with(
+            "event-1", "all_events", "email", NotificationStatus.SENT, None
+        )
+        assert manager.get_channel_status()['email']['delivery']['retried'] == 2
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_final_failure_is_recorded(self, manager):
+        send = AsyncMock(side_effect=ConnectionError("refused"))
+        manager.add_channel('email', _channel(send))
+        manager.configure_rules([_rule(['email'])])
+
+        results = await manager.send_notification_with_retry(_event(), max_retries=1, retry_delay=0.01)
+
+        assert results == {'all_events:email': False}
+        assert send.await_count == 2
+        manager._record_notification_history.assert_awaited_once_with(
+            "event-1", "all_events", "email", NotificationStatus.FAILED, "refused"
+        )
+        await manager.shutdown()
+
+
+    @pytest.mark.asyncio
+    async def test_full_queue_is_recorded_as_rejected(self, manager, monkeypatch):
+        monkeypatch.setattr(notifications, "NOTIFICATION_ENQUEUE_TIMEOUT", 0.05)
+
+        async def send(context):
+            await asyncio.sleep(0.3)
+            return True
+
+        channel = _channel(send)
+        manager.add_channel('email', channel)
+        manager.dispatchers['email'] = ChannelDispatcher('email', channel, manager, queue_size=1, worker_count=1)
+        manager.configure_rules([_rule(['email'])])
+
+        results = await asyncio.gather(*(
+            manager.send_notification(_event(f"event-{i}", source=f"host-{i}")) for i in range(3)
+        ))
+
+        assert sorted(r['all_events:email'] for r in results) == [False, True, True]
+        manager._record_notification_history.assert_any_await(
+            "event-2", "all_events", "email", NotificationStatus.REJECTED,
+            "Delivery queue for channel email is full"
+        )
+        delivery = manager.get_channel_status()['email']['delivery']
+        assert (delivery['delivered'], delivery['rejected'], delivery['failed']) == (2, 1, 0)
+        await manager.shutdown()
+
+
+class TestThrottling:
+    """Test throttle bookkeeping around concurrent deliveries."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_events_send_once_while_throttled(self, manager):
+        async def send(context):
+            await asyncio.sleep(0.05)
+            return True
+
+        manager.add_channel('email', _channel(AsyncMock(side_effect=send)))
+        manager.configure_rules([_rule(['email'], throttle_minutes=5)])
+
+        results = await asyncio.gather(*(manager.send_notification(_event(f"event-{i}")) for i in range(3)))
+
+        assert sorted(len(r) for r in results) == [0, 0, 1]
+        assert manager.channels['email'].send_notification.await_count == 1
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_failed_delivery_releases_throttle(self, manager):
+        send = AsyncMock(side_effect=[False, True])
+        manager.add_channel('email', _channel(send))
+        manager.configure_rules([_rule(['email'], throttle_minutes=5)])
+
+        assert await manager.send_notification(_event()) == {'all_events:email': False}
+        assert manager.throttle_cache == {}
+
+        assert await manager.send_notification(_event()) == {'all_events:email': True}
+        assert len(manager.throttle_cache) == 1
+        await manager.shutdown()
+
+
+class TestDigests:
+    """Test aggregation of throttled events into digests."""
+
+    async def _storm(self, manager, count):
+        for i in range(count):
+            await manager.send_notification(_event(f"event-{i}"), _analysis(f"event-{i}", 3 + i))
+
+    @pytest.mark.asyncio
+    async def test_throttled_events_are_aggregated_and_sent(self, manager, scratch_db):
+        send = AsyncMock(return_value=True)
+        manager.add_channel('email', _channel(send))
+        manager.configure_rules([_rule(['email'], throttle_minutes=5, digest=True)])
+
+        await self._storm(manager, 4)
+
+        assert send.await_count == 1
+        digest = next(iter(manager.pending_digests.values()))
+        assert (digest.event_count, digest.max_severity) == (3, 6)
+        assert [sample['event_id'] for sample in digest.samples] == ["event-1", "event-2", "event-3"]
+
+        # Nothing is sent before the window closes
+        assert await manager.flush_digests() == 0
+        assert await manager.flush_digests(digest.window_end) == 1
+
+        assert send.await_count == 2
+        context = send.await_args.args[0]
+        assert context.additional_data['digest']['event_count'] == 3
+        assert context.ai_analysis.severity_score == 6
+        assert "3 more events" in context.event.message
+        assert manager.pending_digests == {}
+        await manager.shutdown()
+        await async_database.close_async_database_connections()
+
+    @pytest.mark.asyncio
+    async def test_plain_throttle_drops_repeats(self, manager):
+        send = AsyncMock(return_value=True)
+        manager.add_channel('email', _channel(send))
+        manager.configure_rules([_rule(['email'], throttle_minutes=5)])
+
+        await self._storm(manager, 3)
+
+        assert send.await_count == 1
+        assert manager.pending_digests == {}
+        await manager.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_pending_digests_survive_restart(self, manager, scratch_db):
+        manager.add_channel('email', _channel(AsyncMock(return_value=True)))
+        manager.configure_rules([_rule(['email'], throttle_minutes=5, digest=True)])
+        await self._storm(manager, 3)
+        await manager.shutdown()
+
+        restarted = NotificationManager()
+        restarted._record_notification_history = AsyncMock()
+        send = AsyncMock(return_value=True)
+        restarted.add_channel('email', _channel(send))
+        restarted.configure_rules([_rule(['email'], throttle_minutes=5, digest=True)])
+
+        assert await restarted.load_pending_digests() == 1
+        digest = next(iter(restarted.pending_digests.values()))
+        assert digest.event_count == 2
+
+        assert await restarted.flush_digests(datetime.now() + timedelta(minutes=10)) == 1
+        send.assert_awaited_once()
+
+        # Sent digests are removed from the store
+        assert await restarted.load_pending_digests() == 0
+        await restarted.shutdown()
+        await async_database.close_async_database_connections()
+
+
+class TestSMTPConnectionPool:
+    """Test SMTP connection reuse and reconnects."""
+
+    def _message(self):
+        msg = MIMEText("body")
+        msg['Subject'] = "alert"
+        return msg
+
+    def test_connection_reused_across_messages(self):
+        pool = SMTPConnectionPool("smtp.example.com", 587, "user", "secret")
+
+        with patch('app.realtime.notifications.smtplib.SMTP') as smtp_class:
+            pool.send(self._message(), ["a@example.com", "b@example.com"])
+            pool.send(self._message(), ["c@example.com"])
+
+        smtp_class.assert_called_once()
+        server = smtp_class.return_value
+        server.starttls.assert_called_once()
+        server.login.assert_called_once_with("user", "secret")
+        assert server.send_message.call_count == 2
+        assert pool.stats == {'connections_opened': 1, 'messages_sent': 2, 'reconnects': 0}
+
+    def test_reconnects_when_server_drops_idle_connection(self):
+        pool = SMTPConnectionPool("smtp.example.com", 587, use_tls=False)
+        stale, fresh = Mock(), Mock()
+        stale.send_message.side_effect = [None, smtplib.SMTPServerDisconnected("closed")]
+
+        with patch('app.realtime.notifications.smtplib.SMTP', side_effect=[stale, fresh]):
+            pool.send(self._message(), ["a@example.com"])
+            pool.send(self._message(), ["a@example.com"])
+
+        fresh.send_message.assert_called_once()
+        assert pool.stats['reconnects'] == 1
+        assert pool.stats['messages_sent'] == 2
+
+    def test_idle_connections_expire(self):
+        pool = SMTPConnectionPool("smtp.example.com", 587, use_tls=False, idle_timeout=0)
+
+        with patch('app.realtime.notifications.smtplib.SMTP') as smtp_class:
+            pool.send(self._message(), ["a@example.com"])
+            time.sleep(0.01)
+            pool.send(self._message(), ["a@example.com"])
+
+        assert smtp_class.call_count == 2
+        smtp_class.return_value.quit.assert_called_once()
+
+    def test_fresh_connection_errors_propagate(self):
+        pool = SMTPConnectionPool("smtp.example.com", 587, use_tls=False)
+        server = Mock()
+        server.send_message.side_effect = smtplib.SMTPServerDisconnected("closed")
+
+        with patch('app.realtime.notifications.smtplib.SMTP', return_value=server):
+            with pytest.raises(smtplib.SMTPServerDisconnected):
+                pool.send(self._message(), ["a@example.com"])
+
+        assert pool.stats['reconnects'] == 0
+
+    def test_stale_connections_closed_outside_lock(self):
+        pool = SMTPConnectionPool("smtp.example.com", 587, use_tls=False, idle_timeout=0)
+        quitting, release = threading.Event(), threading.Event()
+        stale = Mock()
+        stale.quit.side_effect = lambda: (quitting.set(), release.wait(5))
+        pool._idle.append((stale, time.monotonic() - 1))
+
+        with patch('app.realtime.notifications.smtplib.SMTP'):
+            checkout = threading.Thread(target=pool._checkout)
+            checkout.start()
+            assert quitting.wait(5)
+
+            # Other senders are not held up while the stale connection says QUIT
+            checkin = threading.Thread(target=pool._checkin, args=(Mock(),))
+            checkin.start()
+            checkin.join(1)
+            assert not checkin.is_alive()
+
+            release.set()
+            checkout.join(5)
+
+        assert pool.stats['messages_sent'] == 1
+        assert pool.stats['connections_opened'] == 1
+
+    @pytest.mark.asyncio
+    async def test_email_close_stops_smtp_threads(self):
+        notifier = EmailNotifier({'smtp_host': 'smtp.example.com', 'from_email': 'alerts@example.com',
+                                  'recipients': ['a@example.com'], 'smtp_use_tls': False})
+        context = NotificationContext(event=_event(), rule_name="all_events", channel_type='email')
+
+        with patch('app.realtime.notifications.smtplib.SMTP') as smtp_class:
+            assert await notifier.send_notification(context)
+            executor = notifier._executor
+            await notifier.close()
+
+        smtp_class.return_value.quit.assert_called_once()
+        assert executor._shutdown
+        assert notifier._executor is None
+
+
+class TestChannelReplacement:
+    """Test that replaced channels release their connections."""
+
+    def test_replaced_channel_closed_without_running_loop(self):
+        manager = NotificationManager()
+        old = _channel(AsyncMock(return_value=True))
+        old.close = AsyncMock()
+
+        manager.add_channel('email', old)
+        manager.add_channel('email', _channel(AsyncMock(return_value=True)))
+
+        old.close.assert_awaited_once()
+
+
+class TestPooledWebhookSession:
+    """Test webhook delivery over a kept-alive session."""
+
+    @pytest.mark.asyncio
+    async def test_webhook_reuses_connection(self):
+        peers = []
+
+        async def handler(request):
+            peers.append(request.transport.get_extra_info('peername'))
+            return web.json_response({'ok': True})
+
+        app = web.Application()
+        app.router.add_post('/hook', handler)
+
+        async with TestServer(app) as server:
+            notifier = WebhookNotifier({'webhook_url': str(server.make_url('/hook'))})
+            context = NotificationContext(event=_event(), rule_name="all_events", channel_type='webhook')
+
+            assert await notifier.send_notification(context)
+            assert await notifier.send_notification(context)
+            await notifier.close()
+
+        assert len(peers) == 2
+        assert peers[0] == peers[1]
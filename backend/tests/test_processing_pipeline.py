@@ -0,0 +1,73 @@
+"""
+Unit tests for realtime log entry validation and sanitization.
+"""
+from datetime import datetime, timezone
+
+import pytest
+
+from app.realtime.ingestion_queue import LogEntry
+from app.realtime.processing_pipeline import (
+    LogEntryValidator, LogEntrySanitizer, ValidationResult,
+    has_only_allowed_chars, process_log_entry
+)
+
+
+def _entry(content):
+    return LogEntry(
+        content=content,
+        source_path="/var/log/test.log",
+        source_name="test_source",
+        timestamp=datetime.now(timezone.utc)
+    )
+
+
+class TestCharacterChecks:
+    """Test the allowed character fast path."""
+
+    def test_allowed_characters(self):
+        assert has_only_allowed_chars("Jan 15 10:30:45 host sshd[1]: ok\tdone\r\n")
+        assert has_only_allowed_chars("")
+
+    @pytest.mark.parametrize("content", ["bell\x07", "del\x7f", "null\x00", "café", " "])
+    def test_disallowed_characters(self, content):
+        assert not has_only_allowed_chars(content)
+        assert not LogEntryValidator()._validate_characters(content)
+
+    def test_sanitize_replaces_runs(self):
+        sanitizer = LogEntrySanitizer()
+
+        assert sanitizer._sanitize_characters("clean line") == ("clean line", False)
+        assert sanitizer._sanitize_characters("a\x01bééc") == ("a?b??c", True)
+        # Long runs are capped at max_consecutive_replacements
+        assert sanitizer._sanitize_characters("x" + "\x1b" * 25 + "y") == ("x" + "?" * 10 + "y", True)
+
+
+class TestSuspiciousPatterns:
+    """Test the combined suspicious pattern detection."""
+
+    @pytest.mark.parametrize("content,rule", [
+        ("id=1 UNION  SELECT password", "sql_injection"),
+        ("user' or 1 = 1", "sql_tautology"),
+        ("<SCRIPT>alert", "xss_markup"),
+        ("confirm (1)", "xss_dialog"),
+        ("GET ../../secret", "path_traversal"),
+        ("read /etc/passwd", "sensitive_path"),
+        ("ls | grep", "command_chaining"),
+        ("wget http://x", "network_tool"),
+        ("GET /a%2fb", "url_encoding"),
+        ("payload \\x41\\x42", "hex_encoding"),
+    ])
+    def test_detects_rule(self, content, rule):
+        assert LogEntryValidator()._detect_suspicious_patterns(content) == rule
+
+    def test_clean_content(self):
+        assert LogEntryValidator()._detect_suspicious_patterns("Jan 15 10:30:45 host sshd[1]: ok") is None
+
+    def test_rule_reported_in_result(self):
+        entry = _entry("GET /index.php?file=../../etc/passwd")
+
+        result = process_log_entry(entry)
+
+        assert result.validation_result == ValidationResult.SUSPICIOUS
+        assert result.metadata['suspicious_pattern'] == "path_traversal"
+        assert entry.metadata['suspicious_pattern'] == "path_traversal"
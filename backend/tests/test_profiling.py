@@ -0,0 +1,124 @@
+"""
+Tests for per-batch stage profiling and sampling profiles.
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.metrics import stage_timer
+from app.parser import LogParser
+from app.profiling import ProfilerBusyError, SamplingProfiler, StageProfiler, add_stage_time, profile_stage
+from app.realtime.auth import Permission, SessionInfo, UserRole, get_current_session
+from app.realtime.health_api import health_router
+
+
+def spin_in_profiled_function(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestStageProfiler:
+    """Test per-batch stage timings."""
+
+    def test_stages_recorded_per_batch(self):
+        profiler = StageProfiler(history=10)
+
+        for size in (2, 3):
+            with profiler.batch(size):
+                with stage_timer("validate", "test-profile-source"):
+                    time.sleep(0.01)
+                with profile_stage("detect_format"):
+                    pass
+                LogParser()._categorize_event("Failed password for root", "sshd")
+        add_stage_time("parse", 1.0)  # outside a batch: ignored
+
+        report = profiler.get_report()
+        assert report["batches_profiled"] == 2 and report["window_entries"] == 5
+        assert set(report["stages"]) == {"validate", "detect_format", "categorize"}
+        assert report["stages"]["validate"]["total_seconds"] >= 0.02
+        assert 0 < report["stages"]["validate"]["share_of_batch_time"] <= 1
+        assert next(iter(report["stages"])) == "validate"
+        assert [batch["size"] for batch in report["recent_batches"]] == [2, 3]
+        assert profiler.get_report(last=1)["window_entries"] == 3
+
+    def test_disabled_profiler_records_nothing(self):
+        profiler = StageProfiler(enabled=False)
+
+        with profiler.batch(5) as profile:
+            add_stage_time("parse", 1.0)
+
+        assert profile is None
+        assert profiler.get_report()["window_batches"] == 0
+
+
+class TestSamplingProfiler:
+    """Test sampling profiles in collapsed stack format."""
+
+    def test_collapsed_stacks_of_busy_thread(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=spin_in_profiled_function, args=(stop,))
+        worker.start()
+        try:
+            result = SamplingProfiler(interval=0.002).profile(0.3, thread_id=worker.ident)
+        finally:
+            stop.set()
+            worker.join()
+
+        assert result.samples > 10
+        lines = result.collapsed().splitlines()
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert "spin_in_profiled_function (test_profiling.py:" in stack
+        assert stack.startswith("Thread._bootstrap (threading.py:")
+
+    def test_one_profile_at_a_time(self):
+        profiler = SamplingProfiler(interval=0.01)
+        thread = threading.Thread(target=profiler.profile, args=(0.3,))
+        thread.start()
+        time.sleep(0.05)
+        try:
+            with pytest.raises(ProfilerBusyError):
+                profiler.profile(0.1)
+        finally:
+            thread.join()
+        assert not profiler.running
+
+
+class TestProfileEndpoints:
+    """Test the profiling endpoints."""
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        app.include_router(health_router)
+        now = datetime.now(timezone.utc)
+        app.dependency_overrides[get_current_session] = lambda: SessionInfo(
+            session_id="s", user_id="u", username="admin", role=UserRole.ADMIN,
+            permissions={Permission.SYSTEM_ADMIN}, created_at=now,
+            expires_at=now + timedelta(hours=1), last_activity=now
+        )
+        return TestClient(app)
+
+    def test_sample_profile_returns_collapsed_stacks(self, client):
+        response = client.post("/api/health/profile/sample",
+                               params={"seconds": 0.2, "interval_ms": 5, "all_threads": True})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert int(response.headers["x-profile-samples"]) > 0
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in response.text.splitlines())
+
+    def test_sample_profile_is_bounded(self, client):
+        response = client.post("/api/health/profile/sample", params={"seconds": 3600})
+
+        assert response.status_code == 422
+
+    def test_stage_profile_report(self, client):
+        response = client.get("/api/health/profile/stages")
+
+        assert response.status_code == 200
+        assert "stages" in response.json()
@@ -0,0 +1,107 @@
+"""
+Tests for the bounded sliding-window rate limiting engine.
+"""
+import pytest
+
+from app.rate_limit import (
+    DatabaseRateLimitBackend, ExpiringMap, SlidingWindowCounter, create_rate_limit_backend
+)
+
+
+class TestExpiringMap:
+    """Test the bounded TTL map."""
+
+    def test_entries_expire(self):
+        blocked = ExpiringMap(ttl=10)
+        blocked.set("10.0.0.1", "until", now=100)
+
+        assert blocked.get("10.0.0.1", now=105) == "until"
+        assert blocked.get("10.0.0.1", now=111) is None
+        assert blocked.size == 0
+
+    def test_size_is_bounded(self):
+        blocked = ExpiringMap(ttl=60, max_size=3)
+        for i in range(10):
+            blocked.set(f"10.0.0.{i}", i, now=100)
+
+        assert blocked.size == 3
+        assert blocked.get("10.0.0.9", now=100) == 9
+        assert blocked.get("10.0.0.0", now=100) is None
+
+
+class TestSlidingWindowCounter:
+    """Test approximate sliding-window counting."""
+
+    def test_limit_within_window(self):
+        counter = SlidingWindowCounter(window=10)
+
+        results = [counter.hit("client", 5, now=100 + i * 0.1) for i in range(8)]
+
+        assert results == [True] * 5 + [False] * 3
+        assert counter.stats["limited"] == 3
+
+    def test_previous_window_decays(self):
+        counter = SlidingWindowCounter(window=10)
+        for _ in range(10):
+            counter.hit("client", 10, now=105)
+
+        # Halfway into the next window half of the previous count still applies
+        assert counter.count("client", now=115) == pytest.approx(5)
+        assert counter.hit("client", 6, now=115)
+        assert not counter.hit("client", 6, now=115)
+        assert counter.count("client", now=130) == 0
+
+    def test_retry_after(self):
+        counter = SlidingWindowCounter(window=60)
+        for _ in range(3):
+            counter.hit("client", 3, now=120)
+
+        assert counter.retry_after("client", 3, now=130) == 50
+        assert counter.retry_after("unknown", 3, now=130) == 0
+
+    def test_many_clients_use_bounded_memory(self):
+        counter = SlidingWindowCounter(window=60, max_clients=1000)
+
+        for i in range(20000):
+            counter.hit(f"10.{i // 65536}.{i // 256 % 256}.{i % 256}", 100, now=100)
+
+        assert counter.size == 1000
+        assert counter.stats["evicted"] == 19000
+
+    def test_idle_clients_expire(self):
+        counter = SlidingWindowCounter(window=10)
+        counter.hit("idle", 5, now=100)
+
+        counter.hit("active", 5, now=125)
+
+        assert counter.size == 1
+
+    def test_unknown_backend_rejected(self):
+        assert create_rate_limit_backend("memory") is None
+        with pytest.raises(ValueError):
+            create_rate_limit_backend("redis")
+
+
+class TestSharedBackend:
+    """Test limits shared between workers through the database."""
+
+    @pytest.mark.asyncio
+    async def test_counts_combined_across_workers(self, scratch_db, monkeypatch):
+        monkeypatch.setattr("app.rate_limit.time.time", lambda: 1000.0)
+        worker_a = SlidingWindowCounter(window=60, name="http_minute", backend=DatabaseRateLimitBackend())
+        worker_b = SlidingWindowCounter(window=60, name="http_minute", backend=DatabaseRateLimitBackend())
+
+        for _ in range(4):
+            assert worker_a.hit("10.0.0.1", 6)
+        assert worker_b.hit("10.0.0.1", 6)
+
+        await worker_a.sync()
+        await worker_b.sync()
+
+        # Worker B now sees A's four requests on top of its own
+        assert worker_b.count("10.0.0.1") == 5
+        assert worker_b.hit("10.0.0.1", 6)
+        assert not worker_b.hit("10.0.0.1", 6)
+
+        await worker_a.close()
+        await worker_b.close()
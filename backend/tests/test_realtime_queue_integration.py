@@ -175,14 +175,14 @@ class TestEnhancedBackgroundProcessor:
     @pytest.mark.asyncio
     @patch('app.realtime.enhanced_processor.parse_log_entries')
     @patch('app.realtime.enhanced_processor.analyze_event')
-    @patch('app.realtime.enhanced_processor.get_database_session')
+    @patch('app.realtime.enhanced_processor.async_write_session')
     async def test_entry_processing(self, mock_db, mock_analyze, mock_parse, queue_and_processor):
         """Test processing of a single entry."""
         queue, processor = queue_and_processor
         
         # Mock dependencies
         mock_parse.return_value = []  # No parsed events for simplicity
-        mock_db.return_value.__enter__.return_value = Mock()
+        mock_db.return_value.__aenter__.return_value = Mock()
         
         # Create test entry
         entry = LogEntry(
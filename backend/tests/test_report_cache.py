@@ -0,0 +1,196 @@
+"""
+Tests for the daily report cache and parallel backfill.
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, date, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, RawLog, Event, AIAnalysis
+from app.report_cache import ReportCache, get_report_data_version
+
+
+REPORT_DATE = date(2024, 1, 15)
+
+
+def _add_event(session, event_id, report_date=REPORT_DATE, severity=5):
+    """Store an event with AI analysis on the given date."""
+    if not session.get(RawLog, "raw-cache"):
+        session.add(RawLog(id="raw-cache", content="content", source="test"))
+    session.add(Event(
+        id=event_id,
+        raw_log_id="raw-cache",
+        timestamp=datetime.combine(report_date, datetime.min.time()) + timedelta(hours=1),
+        source="cache.log",
+        message=f"Event {event_id}",
+        category="system",
+        parsed_at=datetime.now()
+    ))
+    session.add(AIAnalysis(
+        id=f"analysis-{event_id}",
+        event_id=event_id,
+        severity_score=severity,
+        explanation="Cached report analysis",
+        recommendations=json.dumps(["Review logs"]),
+        analyzed_at=datetime.now()
+    ))
+    session.commit()
+
+
+@pytest.fixture
+def cache_env():
+    """Create a temporary database and reports directory and route report reads to them."""
+    db_fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(db_fd)
+    reports_dir = tempfile.mkdtemp()
+    
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(bind=engine)
+    
+    @contextmanager
+    def read_session():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+            
+    with patch('app.report_cache.get_read_session', read_session), \
+         patch('app.report_generator.get_read_session', read_session):
+        session = TestingSessionLocal()
+        yield session, ReportCache(reports_dir), db_path
+        session.close()
+        
+    engine.dispose()
+    os.unlink(db_path)
+    shutil.rmtree(reports_dir)
+
+
+class TestReportCache:
+    """Test cache hits and invalidation."""
+    
+    def test_data_version_changes_with_events(self, cache_env):
+        session, cache, _ = cache_env
+        
+        empty_version = get_report_data_version(session, REPORT_DATE)
+        _add_event(session, "event-1")
+        version = get_report_data_version(session, REPORT_DATE)
+        
+        assert version != empty_version
+        assert get_report_data_version(session, REPORT_DATE) == version
+        
+        # Events on other days do not affect the version
+        _add_event(session, "event-other", report_date=REPORT_DATE + timedelta(days=1))
+        assert get_report_data_version(session, REPORT_DATE) == version
+        
+    def test_get_or_generate_reuses_unchanged_report(self, cache_env):
+        session, cache, _ = cache_env
+        _add_event(session, "event-1")
+        
+        first = cache.get_or_generate(REPORT_DATE)
+        assert first.cache_hit is False
+        assert Path(first.file_path).read_bytes().startswith(b'%PDF')
+        
+        with patch('app.report_cache.generate_daily_report_file') as mock_generate:
+            second = cache.get_or_generate(REPORT_DATE)
+            mock_generate.assert_not_called()
+            
+        assert second.cache_hit is True
+        assert second.file_path == first.file_path
+        
+    def test_get_or_generate_rerenders_when_data_changes(self, cache_env):
+        session, cache, _ = cache_env
+        _add_event(session, "event-1")
+        first = cache.get_or_generate(REPORT_DATE)
+        
+        _add_event(session, "event-2", severity=9)
+        second = cache.get_or_generate(REPORT_DATE)
+        
+        assert second.cache_hit is False
+        assert second.data_version != first.data_version
+        assert not list(cache.reports_dir.glob("*.tmp"))
+        
+    def test_failed_render_leaves_no_cache_entry(self, cache_env):
+        session, cache, _ = cache_env
+        
+        with patch('app.report_cache.generate_daily_report_file', side_effect=RuntimeError("boom")):
+            with pytest.raises(RuntimeError):
+                cache.get_or_generate(REPORT_DATE)
+                
+        assert cache.lookup(REPORT_DATE, get_report_data_version(session, REPORT_DATE)) is None
+        assert not list(cache.reports_dir.iterdir())
+
+        
+    def test_concurrent_renders_use_separate_temp_files(self, cache_env):
+        session, cache, _ = cache_env
+        _add_event(session, "event-1")
+        both_rendering = threading.Barrier(2, timeout=5)
+        output_paths = []
+        
+        def render(report_date, output_path):
+            output_paths.append(output_path)
+            both_rendering.wait()
+            Path(output_path).write_bytes(b'%PDF-' + output_path.encode())
+            return output_path
+            
+        with patch('app.report_cache.generate_daily_report_file', side_effect=render):
+            threads = [threading.Thread(target=cache.get_or_generate, args=(REPORT_DATE,)) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+                
+        assert len(set(output_paths)) == 2
+        assert cache.report_path(REPORT_DATE).read_bytes().decode() in {f"%PDF-{path}" for path in output_paths}
+        assert not list(cache.reports_dir.glob("*.tmp"))
+
+class TestReportBackfill:
+    """Test rendering a range of dates."""
+    
+    def test_backfill_skips_cached_dates(self, cache_env):
+        session, cache, _ = cache_env
+        _add_event(session, "event-1")
+        cache.get_or_generate(REPORT_DATE)
+        
+        results = cache.backfill(REPORT_DATE - timedelta(days=1), REPORT_DATE + timedelta(days=1), max_workers=1)
+        
+        assert [r["report_date"] for r in results] == [
+            REPORT_DATE - timedelta(days=1), REPORT_DATE, REPORT_DATE + timedelta(days=1)
+        ]
+        assert all(r["success"] for r in results)
+        assert [r["cache_hit"] for r in results] == [False, True, False]
+        
+    def test_backfill_rejects_invalid_ranges(self, cache_env):
+        _, cache, _ = cache_env
+        
+        with pytest.raises(ValueError):
+            cache.backfill(REPORT_DATE, REPORT_DATE - timedelta(days=1))
+        with pytest.raises(ValueError):
+            cache.backfill(REPORT_DATE - timedelta(days=1000), REPORT_DATE)
+            
+    def test_backfill_in_process_pool(self, cache_env, monkeypatch):
+        session, cache, db_path = cache_env
+        _add_event(session, "event-1")
+        _add_event(session, "event-2", report_date=REPORT_DATE + timedelta(days=1), severity=8)
+        
+        # Spawned workers read the database location from the environment
+        monkeypatch.setenv("DATABASE_URL", f"sqlite:///{db_path}")
+        
+        results = cache.backfill(REPORT_DATE, REPORT_DATE + timedelta(days=2), max_workers=2)
+        
+        assert [r["success"] for r in results] == [True, True, True]
+        for result in results:
+            assert Path(result["file_path"]).read_bytes().startswith(b'%PDF')
+            
+        # A second pass is served entirely from the cache
+        assert all(r["cache_hit"] for r in cache.backfill(REPORT_DATE, REPORT_DATE + timedelta(days=2)))
@@ -1,19 +1,73 @@
 """
 Unit tests for the report generation module.
 """
+import os
 import pytest
 import tempfile
 import json
+from contextlib import contextmanager
 from datetime import datetime, date, timedelta
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
-from sqlalchemy.orm import Session
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
 
+import app.report_generator as report_generator_module
 from app.report_generator import ReportGenerator, generate_daily_report, save_report_record
-from app.models import Event, AIAnalysis, Report
+from app.models import Base, RawLog, Event, AIAnalysis, Report
 from app.schemas import EventCategory
 
 
+def _store_events(session, events_data):
+    """Store events data dictionaries as Event and AIAnalysis rows."""
+    session.add(RawLog(id="raw-report", content="content", source="test"))
+    for event_data in events_data:
+        session.add(Event(
+            id=event_data['id'],
+            raw_log_id="raw-report",
+            timestamp=event_data['timestamp'],
+            source=event_data['source'],
+            message=event_data['message'],
+            category=event_data['category']
+        ))
+        if event_data['ai_analysis']:
+            session.add(AIAnalysis(
+                id=f"analysis-{event_data['id']}",
+                event_id=event_data['id'],
+                severity_score=event_data['ai_analysis']['severity_score'],
+                explanation=event_data['ai_analysis']['explanation'],
+                recommendations=json.dumps(event_data['ai_analysis']['recommendations'])
+            ))
+    session.commit()
+
+
+@pytest.fixture
+def report_db():
+    """Create a temporary database and route report reads to it."""
+    db_fd, db_path = tempfile.mkstemp(suffix='.db')
+    os.close(db_fd)
+    
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(bind=engine)
+    
+    @contextmanager
+    def read_session():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+    
+    with patch('app.report_generator.get_read_session', read_session):
+        session = TestingSessionLocal()
+        yield session
+        session.close()
+    
+    engine.dispose()
+    os.unlink(db_path)
+
+
 class TestReportGenerator:
     """Test cases for the ReportGenerator class."""
     
@@ -72,6 +126,19 @@ class TestReportGenerator:
             }
         ]
     
+    @pytest.fixture
+    def sample_summary(self):
+        """Create aggregated summary statistics matching sample_events_data."""
+        return {
+            'total_events': 4,
+            'events_with_analysis': 3,
+            'avg_severity': 19 / 3,
+            'high_severity_count': 1,
+            'severity_counts': {8: 1, 5: 1, 6: 1},
+            'category_counts': {'auth': 1, 'system': 1, 'network': 1, 'application': 1},
+            'top_sources': [('app.log', 1), ('kernel.log', 1), ('network.log', 1), ('system.log', 1)]
+        }
+    
     def test_report_generator_initialization(self, report_generator):
         """Test ReportGenerator initialization."""
         assert report_generator is not None
@@ -99,44 +166,55 @@ class TestReportGenerator:
         assert colors[1] == '#2E8B57'  # Sea Green
         assert colors[10] == '#8B0000'  # Dark Red
     
-    @patch('app.report_generator.get_db_session')
-    def test_get_events_for_date(self, mock_db_session, report_generator, sample_events_data):
-        """Test retrieving events for a specific date."""
-        # Mock database session and query
-        mock_db = Mock(spec=Session)
-        mock_db_session.return_value.__enter__.return_value = mock_db
-        
-        # Create mock events
-        mock_events = []
-        for event_data in sample_events_data[:3]:  # Only events with AI analysis
-            mock_event = Mock()
-            mock_event.id = event_data['id']
-            mock_event.timestamp = event_data['timestamp']
-            mock_event.source = event_data['source']
-            mock_event.message = event_data['message']
-            mock_event.category = event_data['category']
-            
-            if event_data['ai_analysis']:
-                mock_analysis = Mock()
-                mock_analysis.severity_score = event_data['ai_analysis']['severity_score']
-                mock_analysis.explanation = event_data['ai_analysis']['explanation']
-                mock_analysis.recommendations = json.dumps(event_data['ai_analysis']['recommendations'])
-                mock_event.ai_analysis = mock_analysis
-            else:
-                mock_event.ai_analysis = None
-            
-            mock_events.append(mock_event)
+    def test_get_report_summary(self, report_db, report_generator, sample_events_data):
+        """Test aggregating summary statistics for a specific date."""
+        _store_events(report_db, sample_events_data)
+        
+        summary = report_generator._get_report_summary(report_db, date(2024, 1, 15))
+        
+        assert summary['total_events'] == 4
+        assert summary['events_with_analysis'] == 3
+        assert summary['severity_counts'] == {8: 1, 5: 1, 6: 1}
+        assert summary['high_severity_count'] == 1
+        assert summary['avg_severity'] == pytest.approx(19 / 3)
+        assert summary['category_counts']['auth'] == 1
+        assert len(summary['top_sources']) == 4
+        
+        # Events on other days are excluded
+        empty = report_generator._get_report_summary(report_db, date(2024, 1, 16))
+        assert empty['total_events'] == 0
+        assert empty['severity_counts'] == {}
+    
+    def test_iter_top_events(self, report_db, report_generator, sample_events_data):
+        """Test streaming events ordered by severity with a cap."""
+        _store_events(report_db, sample_events_data)
         
-        mock_db.query.return_value.filter.return_value.all.return_value = mock_events
+        events = list(report_generator._iter_top_events(report_db, date(2024, 1, 15), limit=3))
         
-        # Test the method
-        test_date = date(2024, 1, 15)
-        result = report_generator._get_events_for_date(mock_db, test_date)
+        assert [event['id'] for event in events] == ['event-1', 'event-3', 'event-2']
+        assert events[0]['ai_analysis']['severity_score'] == 8
+        assert len(events[0]['ai_analysis']['recommendations']) == 3
+        
+        all_events = list(report_generator._iter_top_events(report_db, date(2024, 1, 15), limit=10))
+        assert all_events[-1]['id'] == 'event-4'
+        assert all_events[-1]['ai_analysis'] is None
+    
+    def test_get_top_recommendations(self, report_db, report_generator, sample_events_data):
+        """Test unique recommendations are collected highest severity first and capped."""
+        _store_events(report_db, sample_events_data)
+        
+        recommendations = report_generator._get_top_recommendations(report_db, date(2024, 1, 15), limit=4)
         
-        assert len(result) == 3
-        assert result[0]['id'] == 'event-1'
-        assert result[0]['ai_analysis']['severity_score'] == 8
-        assert len(result[0]['ai_analysis']['recommendations']) == 3
+        assert recommendations == [
+            'Block IP address', 'Review authentication logs', 'Enable MFA', 'Analyze network traffic'
+        ]
+    
+    def test_parse_recommendations(self, report_generator):
+        """Test decoding JSON and repr-encoded recommendations."""
+        assert report_generator._parse_recommendations('["a", "b"]') == ['a', 'b']
+        assert report_generator._parse_recommendations("['a', 'b']") == ['a', 'b']
+        assert report_generator._parse_recommendations('free text') == ['free text']
+        assert report_generator._parse_recommendations('') == []
     
     def test_create_report_header(self, report_generator):
         """Test report header creation."""
@@ -149,9 +227,9 @@ class TestReportGenerator:
         # Should contain title, date info, and separator elements
         assert any('ThreatLens Security Report' in str(elem) for elem in header_elements)
     
-    def test_create_executive_summary_with_events(self, report_generator, sample_events_data):
+    def test_create_executive_summary_with_events(self, report_generator, sample_summary):
         """Test executive summary creation with events."""
-        summary_elements = report_generator._create_executive_summary(sample_events_data)
+        summary_elements = report_generator._create_executive_summary(sample_summary)
         
         assert len(summary_elements) > 0
         # Should contain summary statistics - check the paragraph content
@@ -161,18 +239,15 @@ class TestReportGenerator:
     
     def test_create_executive_summary_no_events(self, report_generator):
         """Test executive summary creation with no events."""
-        summary_elements = report_generator._create_executive_summary([])
+        summary_elements = report_generator._create_executive_summary({'total_events': 0})
         
         assert len(summary_elements) > 0
         summary_text = str(summary_elements)
         assert 'No security events were recorded' in summary_text
     
-    def test_create_severity_chart_with_data(self, report_generator, sample_events_data):
+    def test_create_severity_chart_with_data(self, report_generator, sample_summary):
         """Test severity chart creation with event data."""
-        # Filter events with AI analysis
-        events_with_analysis = [e for e in sample_events_data if e['ai_analysis']]
-        
-        chart_image = report_generator._create_severity_chart(events_with_analysis)
+        chart_image = report_generator._create_severity_chart(sample_summary['severity_counts'])
         
         assert chart_image is not None
         # Should be a ReportLab Image object
@@ -181,24 +256,13 @@ class TestReportGenerator:
     
     def test_create_severity_chart_no_data(self, report_generator):
         """Test severity chart creation with no AI analysis data."""
-        events_no_analysis = [
-            {
-                'id': 'event-1',
-                'timestamp': datetime.now(),
-                'source': 'test',
-                'message': 'test message',
-                'category': 'system',
-                'ai_analysis': None
-            }
-        ]
-        
-        chart_image = report_generator._create_severity_chart(events_no_analysis)
+        chart_image = report_generator._create_severity_chart({})
         
         assert chart_image is None
     
     def test_create_event_details_section(self, report_generator, sample_events_data):
         """Test event details section creation."""
-        details_elements = report_generator._create_event_details_section(sample_events_data)
+        details_elements = report_generator._create_event_details_section(sample_events_data, 4)
         
         assert len(details_elements) > 0
         # Should contain event details
@@ -207,7 +271,7 @@ class TestReportGenerator:
     
     def test_create_event_details_section_empty(self, report_generator):
         """Test event details section with no events."""
-        details_elements = report_generator._create_event_details_section([])
+        details_elements = report_generator._create_event_details_section(iter([]), 0)
         
         assert len(details_elements) > 0
         details_text = str(details_elements)
@@ -225,63 +289,51 @@ class TestReportGenerator:
         assert 'Event #1' in detail_text
         assert 'Severity: 8/10' in detail_text
     
-    def test_create_recommendations_section(self, report_generator, sample_events_data):
+    def test_create_event_details_section_capped(self, report_generator, sample_events_data):
+        """Test event details section notes when events exceed the detail limit."""
+        with patch.object(report_generator_module, 'REPORT_DETAIL_LIMIT', 2):
+            details_elements = report_generator._create_event_details_section(sample_events_data[:2], 4)
+        
+        details_text = str(details_elements)
+        assert 'Showing top 2 events (out of 4 total)' in details_text
+        assert 'Event #2' in details_text
+        assert 'Event #3' not in details_text
+    
+    def test_create_top_n_section(self, report_generator, sample_summary):
+        """Test top sources and categories section creation."""
+        top_elements = report_generator._create_top_n_section(sample_summary)
+        
+        top_text = str(top_elements)
+        assert 'Top Sources' in top_text
+        assert 'Top Categories' in top_text
+        assert report_generator._create_top_n_section({'total_events': 0}) == []
+    
+    def test_create_recommendations_section(self, report_generator, sample_summary):
         """Test recommendations section creation."""
-        recommendations_elements = report_generator._create_recommendations_section(sample_events_data)
+        recommendations_elements = report_generator._create_recommendations_section(
+            sample_summary, ['Block IP address', 'Enable MFA']
+        )
         
         assert len(recommendations_elements) > 0
         # Should contain recommendations
         recommendations_text = str(recommendations_elements)
         assert 'Security Recommendations' in recommendations_text
+        assert 'Immediate attention required: 1 high-severity events detected.' in recommendations_text
+        assert 'Block IP address' in recommendations_text
     
     def test_create_recommendations_section_no_analysis(self, report_generator):
         """Test recommendations section with no AI analysis."""
-        events_no_analysis = [
-            {
-                'id': 'event-1',
-                'timestamp': datetime.now(),
-                'source': 'test',
-                'message': 'test message',
-                'category': 'system',
-                'ai_analysis': None
-            }
-        ]
+        summary = {'total_events': 1, 'high_severity_count': 0}
         
-        recommendations_elements = report_generator._create_recommendations_section(events_no_analysis)
+        recommendations_elements = report_generator._create_recommendations_section(summary, [])
         
         assert len(recommendations_elements) > 0
         recommendations_text = str(recommendations_elements)
         assert 'No specific recommendations available' in recommendations_text
     
-    @patch('app.report_generator.get_db_session')
-    def test_generate_daily_report_success(self, mock_db_session, report_generator, sample_events_data):
+    def test_generate_daily_report_success(self, report_db, report_generator, sample_events_data):
         """Test successful daily report generation."""
-        # Mock database session
-        mock_db = Mock(spec=Session)
-        mock_db_session.return_value.__enter__.return_value = mock_db
-        
-        # Mock events query
-        mock_events = []
-        for event_data in sample_events_data:
-            mock_event = Mock()
-            mock_event.id = event_data['id']
-            mock_event.timestamp = event_data['timestamp']
-            mock_event.source = event_data['source']
-            mock_event.message = event_data['message']
-            mock_event.category = event_data['category']
-            
-            if event_data['ai_analysis']:
-                mock_analysis = Mock()
-                mock_analysis.severity_score = event_data['ai_analysis']['severity_score']
-                mock_analysis.explanation = event_data['ai_analysis']['explanation']
-                mock_analysis.recommendations = json.dumps(event_data['ai_analysis']['recommendations'])
-                mock_event.ai_analysis = mock_analysis
-            else:
-                mock_event.ai_analysis = None
-            
-            mock_events.append(mock_event)
-        
-        mock_db.query.return_value.filter.return_value.all.return_value = mock_events
+        _store_events(report_db, sample_events_data)
         
         # Test report generation
         test_date = date(2024, 1, 15)
@@ -339,35 +391,27 @@ class TestReportGeneratorFunctions:
 class TestReportGeneratorIntegration:
     """Integration tests for report generation."""
     
-    @patch('app.report_generator.get_db_session')
-    def test_full_report_generation_workflow(self, mock_db_session):
+    def test_full_report_generation_workflow(self, report_db):
         """Test the complete report generation workflow."""
-        # Mock database with realistic data
-        mock_db = Mock(spec=Session)
-        mock_db_session.return_value.__enter__.return_value = mock_db
-        
-        # Create mock events with various severities
-        mock_events = []
+        # Store realistic data with various severities
         severities = [1, 3, 5, 7, 9, 10]
         categories = ['auth', 'system', 'network', 'security', 'application']
         
-        for i, severity in enumerate(severities):
-            mock_event = Mock()
-            mock_event.id = f"event-{i+1}"
-            mock_event.timestamp = datetime(2024, 1, 15, 10 + i, 0, 0)
-            mock_event.source = f"source-{i+1}"
-            mock_event.message = f"Test security event {i+1}"
-            mock_event.category = categories[i % len(categories)]
-            
-            mock_analysis = Mock()
-            mock_analysis.severity_score = severity
-            mock_analysis.explanation = f"AI analysis for event {i+1}"
-            mock_analysis.recommendations = json.dumps([f"Recommendation {i+1}"])
-            mock_event.ai_analysis = mock_analysis
-            
-            mock_events.append(mock_event)
-        
-        mock_db.query.return_value.filter.return_value.all.return_value = mock_events
+        _store_events(report_db, [
+            {
+                'id': f"event-{i+1}",
+                'timestamp': datetime(2024, 1, 15, 10 + i, 0, 0),
+                'source': f"source-{i+1}",
+                'message': f"Test security event {i+1}",
+                'category': categories[i % len(categories)],
+                'ai_analysis': {
+                    'severity_score': severity,
+                    'explanation': f"AI analysis for event {i+1}",
+                    'recommendations': [f"Recommendation {i+1}"]
+                }
+            }
+            for i, severity in enumerate(severities)
+        ])
         
         # Generate report
         generator = ReportGenerator()
@@ -388,24 +432,48 @@ class TestReportGeneratorIntegration:
                 file_content = f.read()
                 assert file_content == pdf_bytes
     
-    def test_report_generation_error_handling(self):
+    def test_report_generation_error_handling(self, report_db):
         """Test error handling in report generation."""
         generator = ReportGenerator()
         
         # Test with invalid date (future date should work in generator, validation is in API)
         future_date = date.today() + timedelta(days=1)
         
-        with patch('app.report_generator.get_db_session') as mock_db_session:
-            mock_db = Mock(spec=Session)
-            mock_db_session.return_value.__enter__.return_value = mock_db
-            mock_db.query.return_value.filter.return_value.all.return_value = []
+        # Should not raise an error, just generate empty report
+        file_path, pdf_bytes = generator.generate_daily_report(future_date)
+        
+        assert isinstance(file_path, str)
+        assert isinstance(pdf_bytes, bytes)
+        assert len(pdf_bytes) > 0
+    
+    def test_large_day_report_is_capped(self, report_db):
+        """Test a busy day renders summary aggregates with a capped detail section."""
+        _store_events(report_db, [
+            {
+                'id': f"bulk-{i}",
+                'timestamp': datetime(2024, 1, 15, i % 24, i % 60, 0),
+                'source': f"host-{i % 7}",
+                'message': f"Bulk event {i}",
+                'category': 'system',
+                'ai_analysis': {
+                    'severity_score': i % 10 + 1,
+                    'explanation': f"Analysis {i}",
+                    'recommendations': [f"Recommendation {i % 25}"]
+                }
+            }
+            for i in range(2000)
+        ])
+        
+        generator = ReportGenerator()
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = Path(temp_dir) / "busy_day_report.pdf"
             
-            # Should not raise an error, just generate empty report
-            file_path, pdf_bytes = generator.generate_daily_report(future_date)
+            with patch.object(generator, '_create_event_detail', wraps=generator._create_event_detail) as detail:
+                file_path = generator.generate_daily_report_file(date(2024, 1, 15), str(output_path))
             
-            assert isinstance(file_path, str)
-            assert isinstance(pdf_bytes, bytes)
-            assert len(pdf_bytes) > 0
+            assert detail.call_count == report_generator_module.REPORT_DETAIL_LIMIT
+            assert Path(file_path).read_bytes().startswith(b'%PDF')
 
 
 if __name__ == "__main__":
@@ -0,0 +1,115 @@
+"""
+Tests for the single-pass ASGI request pipeline.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware import RequestMetrics, RequestPipelineMiddleware
+
+
+def _client(**options):
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"chunk-{i}\n"
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    options.setdefault("requests_per_minute", 1000)
+    options.setdefault("burst_limit", 1000)
+    app.add_middleware(RequestPipelineMiddleware, **options)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+class TestRequestPipeline:
+    """Test the combined middleware features."""
+
+    def test_headers_added_in_one_pass(self):
+        client = _client()
+
+        response = client.get("/ping", headers={"X-Correlation-ID": "abc-123"})
+
+        assert response.status_code == 200
+        assert response.headers["x-correlation-id"] == "abc-123"
+        assert response.headers["x-content-type-options"] == "nosniff"
+        assert response.headers["server"] == "ThreatLens/1.0"
+        assert "content-security-policy" in response.headers
+
+    def test_streaming_response_passes_through(self):
+        client = _client()
+
+        response = client.get("/stream")
+
+        assert response.text == "chunk-0\nchunk-1\nchunk-2\n"
+        assert response.headers["x-frame-options"] == "DENY"
+
+    def test_dangerous_query_rejected(self):
+        metrics = RequestMetrics()
+        client = _client(metrics=metrics)
+
+        response = client.get("/ping", params={"q": "<script>alert(1)</script>"})
+
+        assert response.status_code == 400
+        assert "invalid characters" in response.json()["detail"].lower()
+        assert "x-correlation-id" in response.headers
+        assert metrics.get_metrics()["total_errors"] == 1
+
+    def test_oversized_request_rejected(self):
+        client = _client(max_request_size=10)
+
+        response = client.post("/ping", content=b"x" * 100)
+
+        assert response.status_code == 413
+
+    def test_rate_limit_returns_retry_after(self):
+        client = _client(burst_limit=3)
+
+        statuses = [client.get("/ping").status_code for _ in range(5)]
+
+        assert statuses == [200, 200, 200, 429, 429]
+        assert int(client.get("/ping").headers["retry-after"]) >= 1
+
+    def test_rejected_requests_count_toward_rate_limit(self):
+        client = _client(burst_limit=3, max_request_size=10)
+
+        statuses = [client.post("/ping", content=b"x" * 100).status_code for _ in range(3)]
+
+        assert statuses == [413, 413, 413]
+        assert client.get("/ping").status_code == 429
+
+    def test_metrics_record_errors(self):
+        metrics = RequestMetrics()
+        client = _client(metrics=metrics)
+
+        client.get("/ping")
+        assert client.get("/boom").status_code == 500
+
+        data = metrics.get_metrics()
+        assert data["endpoint_metrics"]["GET /ping"]["count"] == 1
+        assert data["endpoint_metrics"]["GET /boom"]["errors"] == 1
+
+    @pytest.mark.parametrize("feature", ["security_headers", "input_validation", "rate_limit", "correlation_id"])
+    def test_features_can_be_disabled(self, feature):
+        client = _client(burst_limit=1, **{feature: False})
+
+        client.get("/ping")
+        response = client.get("/ping", params={"q": "javascript:alert(1)"})
+
+        assert ("x-content-type-options" in response.headers) == (feature != "security_headers")
+        assert ("x-correlation-id" in response.headers) == (feature != "correlation_id")
+        if feature == "input_validation":
+            assert response.status_code == 429
+        elif feature == "rate_limit":
+            assert response.status_code == 400
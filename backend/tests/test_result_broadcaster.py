@@ -0,0 +1,163 @@
+"""
+Tests for coalescing processing status and result broadcasts.
+"""
+import asyncio
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from app.realtime.error_handler import ErrorHandler
+from app.realtime.ingestion_queue import LogEntry, ProcessingStatus
+from app.realtime.processing_pipeline import ProcessingResult, ValidationResult
+from app.realtime.result_broadcaster import ProcessingResultBroadcaster
+
+
+class RecordingManager:
+    """WebSocket manager stand-in that records queued frames per client."""
+
+    def __init__(self, subscriptions):
+        self.subscriptions = subscriptions
+        self.connections = dict.fromkeys(subscriptions)
+        self.frames = {client_id: [] for client_id in subscriptions}
+        self.broadcasts = []
+
+    def get_subscribed_clients(self, event_type):
+        return {c for c, types in self.subscriptions.items() if not types or event_type in types}
+
+    async def send_frame(self, client_id, frame):
+        self.frames[client_id].append(json.loads(frame))
+        return True
+
+    async def broadcast_event(self, event):
+        self.broadcasts.append(event)
+        return len(self.connections)
+
+
+def _entry(entry_id):
+    entry = LogEntry(
+        content="line",
+        source_path="/var/log/test.log",
+        source_name="test_source",
+        timestamp=datetime.now(timezone.utc)
+    )
+    entry.entry_id = entry_id
+    return entry
+
+
+def _result(entry_id, success=True):
+    return ProcessingResult(
+        entry_id=entry_id,
+        success=success,
+        processing_time=0.01,
+        validation_result=ValidationResult.VALID,
+        errors=[] if success else ["parse failed"]
+    )
+
+
+def _broadcaster(manager, **kwargs):
+    kwargs.setdefault("coalesce_interval", 60)
+    return ProcessingResultBroadcaster(manager, ErrorHandler(), **kwargs)
+
+
+class TestCoalescing:
+    """Test batching of per-entry updates."""
+
+    @pytest.mark.asyncio
+    async def test_updates_merged_into_one_frame(self):
+        manager = RecordingManager({"dashboard": set()})
+        broadcaster = _broadcaster(manager)
+
+        for i in range(50):
+            entry = _entry(f"entry-{i}")
+            await broadcaster.broadcast_processing_status(entry, ProcessingStatus.PROCESSING)
+            await broadcaster.broadcast_processing_result(entry, _result(entry.entry_id, success=i % 10 != 0))
+        await broadcaster.broadcast_processing_status(_entry("pending"), ProcessingStatus.PROCESSING)
+        await broadcaster.close()
+
+        assert manager.broadcasts == []
+        [frame] = manager.frames["dashboard"]
+        batch = frame["data"]
+        assert frame["type"] == "processing_batch"
+        assert batch["counts"] == {
+            "processing_status_update": 51, "processing_success": 45, "processing_failure": 5
+        }
+        # Results supersede the status of the same entry
+        assert [s["entry_id"] for s in batch["statuses"]] == ["pending"]
+        assert len(batch["results"]) == 50
+        assert frame["priority"] == 8
+
+    @pytest.mark.asyncio
+    async def test_queued_updates_report_no_clients_reached(self):
+        manager = RecordingManager({"dashboard": set(), "alerts": set()})
+        broadcaster = _broadcaster(manager)
+
+        status = await broadcaster.broadcast_processing_status(_entry("a"), ProcessingStatus.PROCESSING)
+        result = await broadcaster.broadcast_processing_result(_entry("a"), _result("a"))
+        assert status.clients_reached == 0 and result.clients_reached == 0
+        assert broadcaster.get_broadcast_statistics()["total_clients_reached"] == 0
+
+        await broadcaster.close()
+        assert broadcaster.get_broadcast_statistics()["coalescing"]["frames_sent"] == 2
+
+    @pytest.mark.asyncio
+    async def test_frames_respect_subscriptions(self):
+        manager = RecordingManager({
+            "everything": set(),
+            "failures": {"processing_failure"},
+            "statuses": {"processing_status_update"},
+            "other": {"system_status_update"}
+        })
+        broadcaster = _broadcaster(manager)
+
+        await broadcaster.broadcast_processing_status(_entry("a"), ProcessingStatus.PROCESSING)
+        await broadcaster.broadcast_processing_result(_entry("b"), _result("b", success=False))
+        await broadcaster.close()
+
+        assert manager.frames["other"] == []
+        failures = manager.frames["failures"][0]["data"]
+        assert failures["statuses"] == [] and [r["entry_id"] for r in failures["results"]] == ["b"]
+        statuses = manager.frames["statuses"][0]["data"]
+        assert statuses["results"] == [] and statuses["counts"] == {"processing_status_update": 1}
+        assert len(manager.frames["everything"][0]["data"]["results"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_delta_encoding(self):
+        manager = RecordingManager({"dashboard": set()})
+        broadcaster = _broadcaster(manager, delta_encoding=True)
+
+        await broadcaster.broadcast_processing_status(_entry("a"), ProcessingStatus.PROCESSING)
+        await broadcaster.broadcast_processing_result(_entry("b"), _result("b"))
+        await broadcaster.broadcast_processing_result(_entry("c"), _result("c", success=False))
+        await broadcaster.close()
+
+        batch = manager.frames["dashboard"][0]["data"]
+        assert batch["encoding"] == "delta"
+        assert batch["statuses"] == [["a", "processing"]]
+        keys, rows = batch["results"]["keys"], batch["results"]["rows"]
+        decoded = [dict(zip(keys, row)) for row in rows]
+        assert [(r["entry_id"], r["result_type"]) for r in decoded] == [("b", "success"), ("c", "failure")]
+        assert decoded[0]["errors"] is None and decoded[1]["errors"] == ["parse failed"]
+
+    @pytest.mark.asyncio
+    async def test_window_flushes_on_timer(self):
+        manager = RecordingManager({"dashboard": set()})
+        broadcaster = _broadcaster(manager, coalesce_interval=0.01)
+
+        await broadcaster.broadcast_processing_status(_entry("a"), ProcessingStatus.PROCESSING)
+        await asyncio.sleep(0.05)
+        await broadcaster.broadcast_processing_status(_entry("b"), ProcessingStatus.PROCESSING)
+        await asyncio.sleep(0.05)
+
+        assert len(manager.frames["dashboard"]) == 2
+        assert broadcaster.get_broadcast_statistics()["coalescing"]["batches_flushed"] == 2
+
+    @pytest.mark.asyncio
+    async def test_disabled_sends_each_update(self):
+        manager = RecordingManager({"dashboard": set()})
+        broadcaster = _broadcaster(manager, coalesce_interval=0)
+
+        await broadcaster.broadcast_processing_status(_entry("a"), ProcessingStatus.PROCESSING)
+        await broadcaster.broadcast_processing_result(_entry("a"), _result("a"))
+
+        assert [e.event_type for e in manager.broadcasts] == ["processing_status_update", "processing_success"]
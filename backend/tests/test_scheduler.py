@@ -53,6 +53,12 @@ def db_session():
 
 
 # Test helper functions
+def fake_report_renderer(report_date, output_path=None):
+    """Stand-in for the PDF renderer that writes a small fake report."""
+    Path(output_path).write_bytes(b"fake pdf content")
+    return str(output_path)
+
+
 def create_test_event(db_session, event_id=None, timestamp=None, message="Test event", category="system"):
     """Create a test event in the database."""
     import uuid
@@ -156,8 +162,8 @@ class TestScheduledReportManager:
         analysis = create_test_ai_analysis(db_session, event.id)
         
         # Mock the report generation
-        with patch('app.scheduler.generate_daily_report') as mock_generate:
-            mock_generate.return_value = ("/fake/path/report.pdf", b"fake pdf content")
+        with patch('app.report_cache.generate_daily_report_file') as mock_generate:
+            mock_generate.side_effect = fake_report_renderer
             
             with patch('app.scheduler.save_report_record') as mock_save:
                 mock_save.return_value = "test-report-id"
@@ -179,7 +185,7 @@ class TestScheduledReportManager:
     async def test_generate_daily_report_job_failure(self, report_manager):
         """Test daily report generation job failure handling."""
         # Mock the report generation to fail
-        with patch('app.scheduler.generate_daily_report') as mock_generate:
+        with patch('app.report_cache.generate_daily_report_file') as mock_generate:
             mock_generate.side_effect = Exception("Report generation failed")
             
             # Execute the job and expect it to raise
@@ -286,8 +292,8 @@ class TestScheduledReportManager:
         test_date = date.today() - timedelta(days=1)
         
         # Mock the report generation
-        with patch('app.scheduler.generate_daily_report') as mock_generate:
-            mock_generate.return_value = ("/fake/path/report.pdf", b"fake pdf content")
+        with patch('app.report_cache.generate_daily_report_file') as mock_generate:
+            mock_generate.side_effect = fake_report_renderer
             
             with patch('app.scheduler.save_report_record') as mock_save:
                 mock_save.return_value = "manual-report-id"
@@ -311,7 +317,7 @@ class TestScheduledReportManager:
         test_date = date.today() - timedelta(days=1)
         
         # Mock the report generation to fail
-        with patch('app.scheduler.generate_daily_report') as mock_generate:
+        with patch('app.report_cache.generate_daily_report_file') as mock_generate:
             mock_generate.side_effect = Exception("Manual generation failed")
             
             # Trigger manual report
@@ -425,8 +431,8 @@ class TestSchedulerGlobalFunctions:
         test_date = date.today() - timedelta(days=1)
         
         # Mock the report generation
-        with patch('app.scheduler.generate_daily_report') as mock_generate:
-            mock_generate.return_value = ("/fake/path/report.pdf", b"fake pdf content")
+        with patch('app.report_cache.generate_daily_report_file') as mock_generate:
+            mock_generate.side_effect = fake_report_renderer
             
             with patch('app.scheduler.save_report_record') as mock_save:
                 mock_save.return_value = "global-test-report-id"
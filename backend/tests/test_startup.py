@@ -0,0 +1,97 @@
+"""
+Tests for startup timing and lazy imports.
+"""
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from app.startup import LazyModule, StartupTimer, lazy_import, startup_timer
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture
+def probe_package(tmp_path, monkeypatch):
+    """Create an importable package whose child module is slow to import."""
+    package = tmp_path / "startup_probe"
+    package.mkdir()
+    (package / "__init__.py").write_text("from . import slow_child\nVALUE = 42\n")
+    (package / "slow_child.py").write_text("import time\ntime.sleep(0.05)\n")
+    (tmp_path / "lazy_probe.py").write_text("def make(value):\n    return value * 2\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    yield
+
+    for name in ("startup_probe", "startup_probe.slow_child", "lazy_probe"):
+        sys.modules.pop(name, None)
+
+
+class TestStartupTimer:
+    """Test import and phase timing."""
+
+    def test_import_times_are_attributed_per_module(self, probe_package):
+        timer = StartupTimer()
+        timer.track_imports(("startup_probe",))
+        try:
+            import startup_probe
+        finally:
+            timer.stop_tracking_imports()
+
+        report = timer.get_report()
+        by_module = {entry["module"]: entry for entry in report["slowest_imports"]}
+
+        assert startup_probe.VALUE == 42
+        assert by_module["startup_probe.slow_child"]["self_seconds"] >= 0.05
+        # The package's own time excludes the child it imported
+        assert by_module["startup_probe"]["seconds"] >= 0.05
+        assert by_module["startup_probe"]["self_seconds"] < 0.05
+        assert report["slowest_imports"][0]["module"] == "startup_probe.slow_child"
+
+    def test_phases_and_failures_recorded(self):
+        timer = StartupTimer()
+
+        with timer.phase("database"):
+            pass
+        with pytest.raises(RuntimeError):
+            with timer.phase("scheduler"):
+                raise RuntimeError("scheduler failed")
+        report = timer.finish()
+
+        assert set(report["phases"]) == {"database", "scheduler"}
+        assert report["failed_phases"] == ["scheduler"]
+        assert report["ready_seconds"] is not None
+
+
+class TestLazyImports:
+    """Test deferred module loading."""
+
+    def test_module_loaded_on_first_use(self, probe_package):
+        make = lazy_import("lazy_probe", "make")
+        assert "lazy_probe" not in sys.modules
+
+        assert make(21) == 42
+        assert "lazy_probe" in sys.modules
+        assert "lazy_probe" in startup_timer.get_report()["lazy_imports"]
+
+    def test_lazy_module_attribute_access(self, probe_package):
+        module = LazyModule("lazy_probe")
+        assert "not loaded" in repr(module)
+
+        assert module.make(1) == 2
+        assert "not loaded" not in repr(module)
+
+    def test_heavy_dependencies_not_imported_with_app(self):
+        code = textwrap.dedent("""
+            import sys
+            import app.analyzer, app.report_generator, app.scheduler, app.realtime.notifications
+            print(",".join(m for m in ("groq", "aiohttp", "matplotlib", "reportlab") if m in sys.modules))
+        """)
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=120
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip().splitlines()[-1:] in ([], [""])
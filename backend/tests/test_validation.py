@@ -1,16 +1,45 @@
 """
 Unit tests for validation functions.
 """
+import random
+import re
 import pytest
 from datetime import datetime, timedelta
 from app.validation import (
     validate_log_content, validate_event_timestamp, validate_event_category,
     validate_severity_score, validate_recommendations_list, validate_source_identifier,
     validate_parsed_event, validate_ai_analysis_data, sanitize_log_content,
-    validate_file_upload
+    sanitize_log_content_with_report, validate_file_upload
 )
 
 
+def reference_sanitize_log_content(content):
+    """The original pass-by-pass sanitizer, kept to check output stays byte-identical."""
+    if not isinstance(content, str):
+        return ""
+    sanitized = content.replace('\x00', '')
+    sanitized = re.sub(r'[\x01-\x08\x0B\x0C\x0E-\x1F\x7F]', '', sanitized)
+    sanitized = re.sub(r'<[^>]*>', '', sanitized)
+    sanitized = re.sub(r'javascript:', '', sanitized, flags=re.IGNORECASE)
+    sanitized = re.sub(r'on\w+\s*=', '', sanitized, flags=re.IGNORECASE)
+    for pattern in [
+        r'(\b(union|select|insert|update|delete|drop|create|alter|exec|execute)\b)',
+        r'(--|#|/\*|\*/)',
+        r'(\bor\b\s+\d+\s*=\s*\d+)',
+        r'(\band\b\s+\d+\s*=\s*\d+)'
+    ]:
+        sanitized = re.sub(pattern, '', sanitized, flags=re.IGNORECASE)
+    for pattern in [r'[;&|`$(){}[\]\\]', r'\$\([^)]*\)', r'`[^`]*`']:
+        sanitized = re.sub(pattern, '', sanitized)
+    sanitized = re.sub(r'\r\n|\r', '\n', sanitized)
+    cleaned_lines = []
+    for line in sanitized.split('\n'):
+        cleaned_line = re.sub(r'[ \t]+', ' ', line.strip())
+        if cleaned_line:
+            cleaned_lines.append(cleaned_line)
+    return '\n'.join(cleaned_lines)
+
+
 class TestValidateLogContent:
     """Test cases for log content validation."""
     
@@ -294,6 +323,48 @@ class TestSanitizeLogContent:
         """Test non-string input returns empty string."""
         assert sanitize_log_content(None) == ""
         assert sanitize_log_content(123) == ""
+    
+    def test_report_counts_fired_rules(self):
+        """Test the report lists each rule that removed content."""
+        content = "Jan 1 sshd[12]: <b>login</b> user=admin' OR 1=1 -- union\x01"
+        sanitized, fired = sanitize_log_content_with_report(content)
+        assert sanitized == sanitize_log_content(content)
+        assert fired == {
+            'control_char': 1,
+            'html_tag': 2,
+            'sql_keyword': 1,
+            'sql_comment': 1,
+            'sql_or_tautology': 1,
+            'shell_metachar': 2
+        }
+    
+    def test_report_empty_for_clean_content(self):
+        """Test clean content fires no rules."""
+        sanitized, fired = sanitize_log_content_with_report("Jan 1 10:00:00 host app: started")
+        assert sanitized == "Jan 1 10:00:00 host app: started"
+        assert fired == {}
+    
+    def test_rules_apply_in_order(self):
+        """Test removals that join text into a later match behave as before."""
+        assert sanitize_log_content("java<i>script:alert") == "alert"
+        assert sanitize_log_content("sel<b>ect name") == "name"
+        assert sanitize_log_content("x<b>union y") == "xunion y"
+        assert sanitize_log_content("or -- 1=1") == ""
+        assert sanitize_log_content("onclick\n\n= go") == "go"
+    
+    @pytest.mark.parametrize("seed", range(5))
+    def test_matches_reference_sanitizer(self, seed):
+        """Test output is byte-identical to the original pass-by-pass sanitizer."""
+        tokens = [
+            "<", ">", "<b>", "on", "click", "=", " ", "  ", "\n", "\r\n", "\r", "\t", "or", "AND",
+            "1", "22", "union", "SeLeCt", "exec", "execute", "#", "--", "-", "/*", "*/", "javascript:",
+            "java", "x", "\x00", "\x01", "(", "$", "`", ";", "\xa0", "\u2028", "\u017f", "\u212a",
+            "Jan 15 10:30:45 host sshd[123]: ", "2024-01-15 "
+        ]
+        rng = random.Random(seed)
+        for _ in range(500):
+            content = ''.join(rng.choice(tokens) for _ in range(rng.randint(0, 40)))
+            assert sanitize_log_content(content) == reference_sanitize_log_content(content), repr(content)
 
 
 class TestValidateFileUpload:
@@ -0,0 +1,226 @@
+"""
+Tests for serialize-once broadcasting and per-client send queues.
+"""
+import asyncio
+import json
+import random
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+from fastapi import WebSocket
+
+from app.realtime import websocket_server
+from app.realtime.event_broadcaster import EventBroadcaster, EventFilter
+from app.realtime.websocket_server import (
+    WebSocketManager, EventUpdate, ClientSendQueue, encode_message
+)
+
+
+class FakeWebSocket(WebSocket):
+    """WebSocket double that records frames and can be made slow."""
+
+    def __init__(self, block_sends=False):
+        self.scope = {"type": "websocket", "headers": []}
+        self.frames = []
+        self.closed = False
+        self.block_sends = block_sends
+        self.release = asyncio.Event()
+
+    async def accept(self, *args, **kwargs):
+        pass
+
+    async def send_text(self, data):
+        if self.block_sends:
+            await self.release.wait()
+        self.frames.append(data)
+
+    async def close(self, code=1000, reason=None):
+        self.closed = True
+
+
+async def _drain(manager):
+    """Let writer tasks flush every queued frame."""
+    for _ in range(100):
+        if not any(len(q) for q in manager.send_queues.values()):
+            break
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+
+async def _connect(manager, client_id, **kwargs):
+    websocket = FakeWebSocket(**kwargs)
+    await manager.connect(websocket, client_id=client_id)
+    return websocket
+
+
+def _event(event_type="security_event", priority=5):
+    return EventUpdate(event_type=event_type, data={"id": 1}, priority=priority)
+
+
+class TestEncodeMessage:
+    """Test frame encoding."""
+
+    def test_matches_stdlib_output(self):
+        message = {"type": "x", "at": datetime(2024, 1, 15, tzinfo=timezone.utc), "n": [1, 2.5, None]}
+
+        assert json.loads(encode_message(message)) == json.loads(json.dumps(message, default=str))
+
+    def test_falls_back_without_orjson(self):
+        with patch.object(websocket_server, "orjson", None):
+            assert encode_message({"a": 1}) == '{"a": 1}'
+
+
+class TestClientSendQueue:
+    """Test the bounded per-client queue."""
+
+    def test_drop_oldest_when_full(self):
+        queue = ClientSendQueue(max_size=2)
+
+        assert queue.put("a") and queue.put("b")
+        assert queue.put("c") is False
+        assert list(queue.frames) == ["b", "c"]
+        assert queue.dropped == 1
+
+
+class TestBroadcast:
+    """Test broadcasting through per-client writers."""
+
+    @pytest.mark.asyncio
+    async def test_event_encoded_once_for_all_clients(self):
+        manager = WebSocketManager(require_auth=False)
+        sockets = [await _connect(manager, f"client-{i}") for i in range(5)]
+        await _drain(manager)
+
+        with patch.object(websocket_server, "encode_message", wraps=encode_message) as encoder:
+            await manager._process_broadcast_event(_event())
+            await _drain(manager)
+
+        assert encoder.call_count == 1
+        for websocket in sockets:
+            assert json.loads(websocket.frames[-1])["type"] == "security_event"
+        await manager._disconnect_all_clients()
+
+    @pytest.mark.asyncio
+    async def test_slow_client_does_not_delay_others(self):
+        manager = WebSocketManager(require_auth=False, send_queue_size=3)
+        slow = await _connect(manager, "slow", block_sends=True)
+        fast = await _connect(manager, "fast")
+
+        for _ in range(10):
+            await manager._process_broadcast_event(_event())
+            await asyncio.sleep(0.001)
+        await _drain(manager)
+
+        # The fast client got everything while the slow one kept only the newest frames
+        assert len(fast.frames) == 11
+        assert len(manager.send_queues["slow"]) == 3
+        assert manager.stats["messages_dropped"] > 0
+
+        slow.release.set()
+        await _drain(manager)
+        assert [json.loads(f)["type"] for f in slow.frames[-3:]] == ["security_event"] * 3
+        await manager._disconnect_all_clients()
+
+    @pytest.mark.asyncio
+    async def test_disconnect_policy(self):
+        manager = WebSocketManager(require_auth=False, send_queue_size=2, slow_client_policy="disconnect")
+        slow = await _connect(manager, "slow", block_sends=True)
+
+        for _ in range(5):
+            await manager._process_broadcast_event(_event())
+
+        assert "slow" not in manager.connections
+        assert "slow" not in manager.send_queues
+        assert slow.closed
+        assert manager.stats["slow_client_disconnects"] == 1
+
+    def test_unknown_policy_rejected(self):
+        with pytest.raises(ValueError):
+            WebSocketManager(require_auth=False, slow_client_policy="block")
+
+    @pytest.mark.asyncio
+    async def test_event_broadcaster_reuses_frame(self):
+        manager = WebSocketManager(require_auth=False)
+        broadcaster = EventBroadcaster(manager)
+        sockets = [await _connect(manager, f"client-{i}") for i in range(3)]
+        for i in range(3):
+            broadcaster.subscribe_client(f"client-{i}", ["security_event"])
+        await _drain(manager)
+
+        result = await broadcaster.broadcast_event(_event())
+        await _drain(manager)
+
+        assert result["messages_sent"] == 3
+        assert len({websocket.frames[-1] for websocket in sockets}) == 1
+        await manager._disconnect_all_clients()
+
+
+class TestSubscriptionIndex:
+    """Test routing through the subscription index."""
+
+    def test_matches_linear_scan(self):
+        rng = random.Random(7)
+        types = ["security_event", "system_status", "processing_update", "health_check"]
+        categories = ["auth", "network", "system"]
+        sources = ["sshd", "nginx", "kernel"]
+        broadcaster = EventBroadcaster(WebSocketManager(require_auth=False))
+
+        def some(values):
+            return set(rng.sample(values, rng.randint(1, 2))) if rng.random() < 0.5 else None
+
+        for i in range(200):
+            client_id = f"client-{i}"
+            if rng.random() < 0.7:
+                broadcaster.subscribe_client(client_id, list(some(types) or []))
+            if rng.random() < 0.6:
+                broadcaster.add_client_filter(client_id, EventFilter(
+                    event_types=some(types),
+                    categories=some(categories),
+                    min_priority=rng.choice([None, 0, 3, 8]),
+                    max_priority=rng.choice([None, 5, 10]),
+                    sources=some(sources) if rng.random() < 0.3 else None
+                ))
+            if rng.random() < 0.2:
+                broadcaster.unsubscribe_client(client_id, [rng.choice(types)])
+            if rng.random() < 0.1:
+                broadcaster.remove_client_filter(client_id)
+
+        all_clients = set(broadcaster.client_subscriptions) | set(broadcaster.client_filters)
+        for _ in range(500):
+            data = {"id": 1}
+            if rng.random() < 0.8:
+                data["category"] = rng.choice(categories)
+            if rng.random() < 0.8:
+                data["source"] = rng.choice(sources)
+            event = EventUpdate(event_type=rng.choice(types), data=data, priority=rng.randint(1, 10))
+
+            expected = {c for c in all_clients if broadcaster._client_should_receive_event(c, event)}
+            assert broadcaster._get_target_clients(event, set()) == expected
+
+    def test_removed_filter_drops_client(self):
+        broadcaster = EventBroadcaster(WebSocketManager(require_auth=False))
+        broadcaster.add_client_filter("client-1", EventFilter(min_priority=8))
+
+        assert broadcaster._get_target_clients(_event(priority=9), set()) == {"client-1"}
+        assert broadcaster._get_target_clients(_event(priority=5), set()) == set()
+
+        broadcaster.remove_client_filter("client-1")
+        assert broadcaster._get_target_clients(_event(priority=9), set()) == set()
+
+    @pytest.mark.asyncio
+    async def test_manager_routes_by_event_type(self):
+        manager = WebSocketManager(require_auth=False)
+        for client_id in ("all", "security", "status"):
+            await _connect(manager, client_id)
+        await manager.subscribe("security", ["security_event"])
+        await manager.subscribe("status", ["system_status"])
+
+        assert manager.get_subscribed_clients("security_event") == {"all", "security"}
+        assert manager.get_subscribed_clients("system_status") == {"all", "status"}
+
+        await manager.unsubscribe("security", ["security_event"])
+        await manager.disconnect("all")
+        assert manager.get_subscribed_clients("security_event") == {"security"}
+        assert manager.get_subscribed_clients("system_status") == {"security", "status"}
+        await manager._disconnect_all_clients()
@@ -5,6 +5,7 @@ Tests for WebSocket server functionality.
 import asyncio
 import json
 import pytest
+import pytest_asyncio
 from datetime import datetime, timezone
 from unittest.mock import Mock, AsyncMock, patch
 
@@ -58,7 +59,7 @@ def mock_websocket():
     return MockWebSocket()
 
 
-@pytest.fixture
+@pytest_asyncio.fixture
 async def websocket_manager():
     """Create a WebSocket manager for testing."""
     manager = WebSocketManager(max_connections=10)
@@ -69,7 +70,7 @@ async def websocket_manager():
         await manager.stop()
 
 
-@pytest.fixture
+@pytest_asyncio.fixture
 async def event_broadcaster():
     """Create an event broadcaster for testing."""
     # Create a simple websocket manager for the broadcaster
@@ -86,7 +87,7 @@ async def event_broadcaster():
         await ws_manager.stop()
 
 
-@pytest.fixture
+@pytest_asyncio.fixture
 async def websocket_api():
     """Create a WebSocket API for testing."""
     # Create components
@@ -311,27 +312,45 @@ class TestEventBroadcaster:
         assert event_broadcaster.client_subscriptions[client_id] == {"processing_update"}
     
     @pytest.mark.asyncio
-    async def test_message_queuing(self, event_broadcaster):
-        """Test message queuing for disconnected clients."""
-        client_id = "disconnected_client"
+    async def test_event_replay(self, event_broadcaster):
+        """Test catch-up replay for reconnecting clients."""
+        client_id = "reconnecting_client"
+        event_broadcaster.event_log.persist = False
+        sent = []
         
-        # Create test event
-        event = EventUpdate(
-            event_type="test_event",
-            data={"message": "Queued message"},
-            priority=5
-        )
-        
-        # Queue message for disconnected client
-        await event_broadcaster._queue_message(client_id, event)
+        async def record(target, message):
+            sent.append(message)
+            return True
         
-        # Verify message was queued
-        assert client_id in event_broadcaster.message_queue
-        assert len(event_broadcaster.message_queue[client_id]) == 1
+        event_broadcaster.websocket_manager.send_to_client = record
         
-        queued_msg = event_broadcaster.message_queue[client_id][0]
-        assert queued_msg.client_id == client_id
-        assert queued_msg.event.event_type == "test_event"
+        # Broadcast while the client is disconnected
+        seqs = []
+        for i in range(3):
+            result = await event_broadcaster.broadcast_event(EventUpdate(
+                event_type="test_event",
+                data={"message": f"Missed message {i}"},
+                priority=5
+            ))
+            seqs.append(result["seq"])
+        
+        assert seqs == [seqs[0], seqs[0] + 1, seqs[0] + 2]
+        
+        # Reconnect after the first event
+        result = await event_broadcaster.replay_events(client_id, seqs[0])
+        
+        assert result["status"] == "success"
+        assert [m["type"] for m in sent] == ["replay", "replay_complete"]
+        assert [e["seq"] for e in sent[0]["data"]["events"]] == seqs[1:]
+        assert sent[1]["data"]["latest_seq"] == seqs[-1]
+        
+        # Events older than the log are reported instead of replayed
+        sent.clear()
+        result = await event_broadcaster.replay_events(client_id, seqs[0] - 100)
+        
+        assert result["status"] == "too_far_behind"
+        assert sent[0]["type"] == "replay_unavailable"
+        assert sent[0]["data"]["oldest_seq"] == seqs[0]
 
 
 class TestWebSocketAPI:
@@ -362,6 +381,46 @@ class TestWebSocketAPI:
         assert event.data["event_id"] == "test_event_123"
         assert event.data["severity"] == 8
     
+    @pytest.mark.asyncio
+    async def test_reconnect_replay_waits_for_subscriptions(self, websocket_api, mock_websocket):
+        """Test that last_seq replay only sends missed events of resubscribed types."""
+        from app.realtime.websocket_api import WebSocketMessage
+        
+        client_id = "reconnecting_client"
+        broadcaster = websocket_api.event_broadcaster
+        broadcaster.event_log.persist = False
+        sent = []
+        
+        async def record(target, message):
+            sent.append(message)
+            return True
+        
+        websocket_api.websocket_manager.connect = AsyncMock(return_value=client_id)
+        websocket_api.websocket_manager.disconnect = AsyncMock()
+        websocket_api.websocket_manager.subscribe = AsyncMock(return_value=True)
+        websocket_api.websocket_manager.send_to_client = record
+        
+        first = await broadcaster.broadcast_event(EventUpdate(event_type="system_status", data={}, priority=3))
+        for event_type in ("security_event", "system_status", "security_event"):
+            await broadcaster.broadcast_event(EventUpdate(event_type=event_type, data={}, priority=5))
+        sent.clear()
+        
+        async def subscribe_then_disconnect(websocket, target):
+            # Nothing is replayed before the client restores its subscriptions
+            assert sent == []
+            await websocket_api._handle_message(websocket, target, WebSocketMessage(
+                type=MessageType.SUBSCRIBE, data={"event_types": ["security_event"]}
+            ))
+        
+        with patch.object(websocket_api, "_message_loop", side_effect=subscribe_then_disconnect):
+            await websocket_api.handle_websocket_connection(mock_websocket, client_id, last_seq=first["seq"])
+        
+        replays = [message for message in sent if message["type"] == "replay"]
+        assert len(replays) == 1
+        assert [event["type"] for event in replays[0]["data"]["events"]] == ["security_event"] * 2
+        assert sent[-1]["type"] == "replay_complete"
+        assert client_id not in websocket_api._pending_replays
+    
     def test_connection_info(self, websocket_api):
         """Test getting connection information."""
         info = websocket_api.get_connection_info()